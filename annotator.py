@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import chess  # type: ignore
+import chess.pgn  # type: ignore
+import chess.uci  # type: ignore
+
+from picotutor import PicoTutor, classify_move
+import picotutor_constants as c
+
+NAGS = {'??': chess.pgn.NAG_BLUNDER, '?': chess.pgn.NAG_MISTAKE, '?!': chess.pgn.NAG_DUBIOUS_MOVE,
+        '!!': chess.pgn.NAG_BRILLIANT_MOVE, '!': chess.pgn.NAG_GOOD_MOVE, '!?': chess.pgn.NAG_SPECULATIVE_MOVE}
+BAD_MOVES = ('??', '?', '?!')  # these get the best line as variation
+
+_worker: Dict = {}  # engine & search settings of a pool process
+
+
+def _init_worker(engine_path: str, deep_depth: int, low_depth: int, multipv: int):
+    engine = chess.uci.popen_engine(engine_path)
+    engine.uci()
+    engine.setoption({'MultiPV': multipv, 'Contempt': 0, 'Threads': c.NUM_THREADS})
+    engine.isready()
+    handler = chess.uci.InfoHandler()
+    engine.info_handlers.append(handler)
+    multiprocessing.util.Finalize(engine, engine.quit, exitpriority=10)
+    _worker.update(engine=engine, handler=handler, deep_depth=deep_depth, low_depth=low_depth)
+
+
+def _search(board: chess.Board, depth: int, searchmoves=None) -> Dict:
+    engine, handler = _worker['engine'], _worker['handler']
+    engine.position(board)
+    engine.go(depth=depth, searchmoves=searchmoves)
+    with handler as info:
+        return {num: (list(info['pv'][num]), info['score'][num]) for num in info['score'] if info['pv'].get(num)}
+
+
+def analyse_position(task):
+    """Pool worker: evaluate the played move of a position - returns (key, result) with result None on failure."""
+    key, fen, uci = task
+    board = chess.Board(fen)
+    move = chess.Move.from_uci(uci)
+    try:
+        lines = _search(board, _worker['deep_depth'])
+        played = [line for line in lines.values() if line[0][0] == move]
+        if not played:
+            played = list(_search(board, _worker['deep_depth'], [move]).values())
+        low = list(_search(board, _worker['low_depth'], [move]).values())
+    except chess.uci.EngineTerminatedException:
+        logging.error('engine terminated while analysing %s', fen)
+        return key, None
+    if not lines or not played or not low:
+        return key, None
+    best_pv, best_score = lines[min(lines)]
+    return key, {'best_pv': [best.uci() for best in best_pv],
+                 'best': PicoTutor._eval_score(best_score),
+                 'played': PicoTutor._eval_score(played[0][1]),
+                 'low': PicoTutor._eval_score(low[0][1]),
+                 'depth': _worker['deep_depth'],
+                 'legal_no': board.legal_moves.count()}
+
+
+def _eval_comment(score: float, mate: int, turn: bool) -> str:
+    # score/mate are from the view of the moving side - the comment uses whites view
+    sign = 1 if turn == chess.WHITE else -1
+    if mate:
+        return '[%eval #{}]'.format(sign * mate)
+    return '[%eval {:.2f}]'.format(sign * score)
+
+
+class Annotator(object):
+
+    """Annotate pgn games with the PicoTutor move classification, using a pool of engine processes."""
+
+    def __init__(self, engine_path: str, processes: Optional[int] = None, deep_depth=c.DEEP_DEPTH, low_depth=c.LOW_DEPTH,
+                 multipv=c.ADAPTIVE_MULTIPV):
+        self.engine_path = engine_path
+        self.processes = processes or max(1, (os.cpu_count() or 2) - 1)
+        self.deep_depth = deep_depth
+        self.low_depth = low_depth
+        self.multipv = multipv
+        self.lock = threading.Lock()
+        self.total = 0
+        self.done = 0
+        self.started = 0.0
+        self.pool = None
+        self.stopped = threading.Event()
+
+    def progress(self) -> Dict:
+        """Return the number of analysed and total positions with the estimated remaining secs."""
+        with self.lock:
+            elapsed = time.monotonic() - self.started if self.started else 0.0
+            remaining = elapsed / self.done * (self.total - self.done) if self.done else None
+            return {'done': self.done, 'total': self.total,
+                    'percent': round(100 * self.done / self.total, 1) if self.total else 0.0,
+                    'elapsed': round(elapsed, 1), 'remaining': round(remaining, 1) if remaining is not None else None}
+
+    def cancel(self):
+        """Stop a running annotation - the games are returned with the positions analysed so far."""
+        self.stopped.set()
+
+    def annotate_games(self, games: List[chess.pgn.Game], callback: Optional[Callable[[Dict], None]] = None):
+        """Add nags, evals and best lines to the games (in place) - callback gets the progress after each position."""
+        tasks = []
+        for game_no, game in enumerate(games):
+            node = game
+            ply = 0
+            while node.variations:
+                next_node = node.variations[0]
+                tasks.append(((game_no, ply), node.board().fen(), next_node.move.uci()))
+                node = next_node
+                ply += 1
+
+        self.stopped.clear()
+        with self.lock:
+            self.total, self.done, self.started = len(tasks), 0, time.monotonic()
+            self.pool = multiprocessing.Pool(self.processes, initializer=_init_worker,
+                                             initargs=(self.engine_path, self.deep_depth, self.low_depth, self.multipv))
+        results = {}
+        try:
+            # poll the results, so that cancel() is seen while the workers are busy - the pool is
+            # only terminated after this loop, a terminated pool never finishes the iterator
+            pending = self.pool.imap_unordered(analyse_position, tasks)
+            while not self.stopped.is_set():
+                try:
+                    key, result = pending.next(timeout=0.1)
+                except multiprocessing.TimeoutError:
+                    continue
+                except StopIteration:
+                    break
+                results[key] = result
+                with self.lock:
+                    self.done += 1
+                if callback:
+                    callback(self.progress())
+        except Exception as exc:  # a failed worker
+            logging.warning('annotation stopped: %s', exc)
+        finally:
+            with self.lock:
+                self.pool.terminate()
+                self.pool.join()
+                self.pool = None
+
+        for game_no, game in enumerate(games):
+            self._annotate_game(game, {ply: result for (number, ply), result in results.items() if number == game_no})
+        return games
+
+    def _annotate_game(self, game: chess.pgn.Game, results: Dict[int, Dict]):
+        before_score = {chess.WHITE: 0.0, chess.BLACK: 0.0}
+        node = game
+        ply = 0
+        while node.variations:
+            turn = node.board().turn
+            next_node = node.variations[0]
+            result = results.get(ply)
+            if result:
+                best_score, best_mate = result['best']
+                score, mate = result['played']
+                low_score, _ = result['low']
+                eval_string = classify_move(best_score, best_mate, score, mate, before_score[turn], low_score, result['legal_no'])
+                before_score[turn] = score
+                if eval_string:
+                    next_node.nags.add(NAGS[eval_string])
+                comment = _eval_comment(score, mate, turn)
+                next_node.comment = next_node.comment + ' ' + comment if next_node.comment else comment
+                best_pv = [chess.Move.from_uci(uci) for uci in result['best_pv']]
+                if eval_string in BAD_MOVES and best_pv and best_pv[0] != next_node.move:
+                    node.add_line(best_pv, comment=_eval_comment(best_score, best_mate, turn))
+            node = next_node
+            ply += 1
+
+    def annotate_file(self, in_path: str, out_path: str, callback: Optional[Callable[[Dict], None]] = None) -> int:
+        """Annotate all games of a pgn file into out_path - returns the number of games."""
+        games = []
+        with open(in_path, encoding='utf-8', errors='replace') as in_file:
+            while True:
+                game = chess.pgn.read_game(in_file)
+                if game is None:
+                    break
+                games.append(game)
+        self.annotate_games(games, callback)
+        with open(out_path, 'w', encoding='utf-8') as out_file:
+            for game in games:
+                print(game, file=out_file, end='\n\n')
+        return len(games)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Annotate pgn games with the PicoTutor move evaluation.')
+    parser.add_argument('pgn', help='pgn file, eg. games/games.pgn')
+    parser.add_argument('-o', '--output', help='annotated pgn file (default: <pgn>_annotated.pgn)')
+    parser.add_argument('-e', '--engine', default='/opt/picochess/engines/armv7l/a-stockf', help='uci engine for the analysis')
+    parser.add_argument('-p', '--processes', type=int, help='number of engine processes (default: cpu count - 1)')
+    parser.add_argument('-d', '--depth', type=int, default=c.DEEP_DEPTH, help='search depth (default: %(default)s)')
+    parser.add_argument('-l', '--low-depth', type=int, default=c.LOW_DEPTH, help='depth of the "obvious move" search (default: %(default)s)')
+    parser.add_argument('-m', '--multipv', type=int, default=c.ADAPTIVE_MULTIPV, help='lines searched per position (default: %(default)s)')
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.pgn)[0] + '_annotated.pgn'
+    annotator = Annotator(args.engine, args.processes, args.depth, args.low_depth, args.multipv)
+
+    def show_progress(progress):
+        print('\r{done}/{total} positions ({percent}%), {remaining}s left   '.format(**progress), end='', flush=True)
+
+    games = annotator.annotate_file(args.pgn, output, show_progress)
+    print('\n{} games annotated into {}'.format(games, output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import random
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import chess  # type: ignore
+import chess.polyglot  # type: ignore
+
+
+class BookService(object):
+
+    """
+    Keep every opening book memory mapped and cache the book entries of the last positions.
+
+    Selecting another book only switches the reader, the lookups have the interface of the
+    polyglot reader (weighted_choice raises IndexError), so AlternativeMover can use both.
+    """
+
+    def __init__(self, books: List[Dict], maxsize=512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.book_file = ''
+        self._readers: Dict[str, chess.polyglot.MemoryMappedReader] = {}
+        self._cache: 'OrderedDict[Tuple[str, int], Tuple[chess.polyglot.Entry, ...]]' = OrderedDict()
+        self._lock = threading.Lock()
+        for book in books:
+            self._open(book['file'])
+
+    def _open(self, book_file: str) -> Optional[chess.polyglot.MemoryMappedReader]:
+        reader = self._readers.get(book_file)
+        if reader is None:
+            try:
+                reader = chess.polyglot.open_reader(book_file)
+            except OSError as os_exc:
+                logging.debug('cant open book %s: %s', book_file, os_exc)
+                return None
+            self._readers[book_file] = reader
+        return reader
+
+    def select(self, book_file: str) -> bool:
+        """Use this book for the next lookups - returns False if the book cant be opened."""
+        with self._lock:
+            if self._open(book_file) is None:
+                logging.warning('book %s not present', book_file)
+                return False
+            self.book_file = book_file
+            return True
+
+    def entries(self, board: chess.Board) -> Tuple[chess.polyglot.Entry, ...]:
+        """Return the legal book entries (weight > 0) of the position in book order."""
+        key = (self.book_file, chess.polyglot.zobrist_hash(board))
+        with self._lock:
+            entries = self._cache.get(key)
+            if entries is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return entries
+            self.misses += 1
+            reader = self._readers.get(self.book_file)
+            entries = tuple(reader.find_all(board)) if reader else ()
+            self._cache[key] = entries
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            return entries
+
+    def weighted_choice(self, board: chess.Board, exclude_moves=(), random=random) -> chess.polyglot.Entry:
+        """
+        Select a random entry, distributed by the weights of the entries.
+
+        :raises: :exc:`IndexError` if no entries are found.
+        """
+        entries = [entry for entry in self.entries(board) if entry.move(chess960=board.chess960) not in exclude_moves]
+        total_weights = sum(entry.weight for entry in entries)
+        if not total_weights:
+            raise IndexError()
+        choice = random.randint(0, total_weights - 1)
+        current_sum = 0
+        for entry in entries:
+            current_sum += entry.weight
+            if current_sum > choice:
+                return entry
+        raise IndexError()
+
+    def all_moves(self, board: chess.Board) -> List[chess.Move]:
+        """Return the book moves of the position, the most played first."""
+        entries = sorted(self.entries(board), key=lambda entry: entry.weight, reverse=True)
+        return [entry.move(chess960=board.chess960) for entry in entries]
+
+    def close(self):
+        """Unmap all books."""
+        with self._lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+            self._cache.clear()
@@ -15,6 +15,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import logging
+import threading
+import time
+import weakref
+
+from metrics import Histogram
+
 
 class BaseClass(object):
 
@@ -44,6 +51,64 @@ def ClassFactory(name, argnames, BaseClass=BaseClass):
     return newclass
 
 
+handler_registries: 'weakref.WeakSet[HandlerRegistry]' = weakref.WeakSet()  # for the stats - a registry is dropped with its owner
+
+
+class HandlerRegistry(object):
+
+    """Dispatch table from ClassFactory classes to their handler incl. a duration histogram per class."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.handlers = {}
+        self.durations = {}  # classtype: Histogram
+        self.lock = threading.Lock()
+        handler_registries.add(self)
+
+    def register(self, *classes):
+        """Decorator: register the function as handler for the given classes."""
+        def decorator(function):
+            for cls in classes:
+                self.handlers[cls] = function
+            return function
+        return decorator
+
+    def get(self, obj):
+        """Get the handler for obj or None."""
+        return self.handlers.get(type(obj))
+
+    def dispatch(self, obj, *args) -> bool:
+        """Call the handler for obj (with args before obj) - returns False if no handler is registered."""
+        handler = self.handlers.get(type(obj))
+        if handler is None:
+            return False
+        start = time.perf_counter()
+        handler(*args, obj)
+        self.record(obj, time.perf_counter() - start)
+        return True
+
+    def record(self, obj, duration: float):
+        """Add a handling duration for obj's class."""
+        with self.lock:
+            histogram = self.durations.get(repr(obj))
+            if histogram is None:
+                histogram = self.durations[repr(obj)] = Histogram()
+        histogram.add(duration)
+
+    def stats(self):
+        """Return the histograms as {classtype: {count, avg_ms, max_ms, buckets}}."""
+        with self.lock:
+            durations = list(self.durations.items())
+        return {classtype: histogram.snapshot() for classtype, histogram in durations}
+
+    def log_stats(self):
+        """Log the counters sorted by total time."""
+        stats = self.stats()
+        for classtype in sorted(stats, key=lambda key: stats[key]['count'] * stats[key]['avg_ms'], reverse=True):
+            logging.debug('[%s] %s: %i calls avg %.3fms max %.3fms', self.name, classtype,
+                          stats[classtype]['count'], stats[classtype]['avg_ms'], stats[classtype]['max_ms'])
+
+
 class EventApi():
 
     """The api for the events."""
@@ -85,9 +150,7 @@ class EventApi():
     KEYBOARD_FEN = 'EVT_KEYBOARD_FEN'  # Virtual board sends a fen
     # Engine events
     BEST_MOVE = 'EVT_BEST_MOVE'  # Engine has found a move
-    NEW_PV = 'EVT_NEW_PV'  # Engine sends a new principal variation
-    NEW_SCORE = 'EVT_NEW_SCORE'  # Engine sends a new score
-    NEW_DEPTH = 'EVT_NEW_DEPTH'  # Engine sends a new depth
+    NEW_INFO = 'EVT_NEW_INFO'  # Engine sends a new score, principal variation and/or depth
     START_SEARCH = 'EVT_START_SEARCH'  # Engine starts the search
     STOP_SEARCH = 'EVT_STOP_SEARCH'  # Engine stops the search
     # Timecontrol events
@@ -97,6 +160,7 @@ class EventApi():
     EXIT_MENU = 'EVT_EXIT_MENU'  # User exists the menu
     UPDATE_PICO = 'EVT_UPDATE'  # User wants to upgrade/downgrade picochess
     REMOTE_ROOM = 'EVT_REMOTE_ROOM'  # User enters/leaves the remote room
+    RESUME_CLOCK = 'EVT_RESUME_CLOCK'  # Scheduled messages are shown, restart the clock
 
 
 class MessageApi():
@@ -345,7 +409,7 @@ class Event():
     PICOCOMMENT = ClassFactory(EventApi.PICOCOMMENT, ['picocomment'])
     TAKE_BACK = ClassFactory(EventApi.TAKE_BACK, ['take_back'])
     RSPEED = ClassFactory(EventApi.RSPEED, ['rspeed'])
-    READ_GAME = ClassFactory(EventApi.READ_GAME, ['pgn_filename'])
+    READ_GAME = ClassFactory(EventApi.READ_GAME, ['pgn_filename', 'game_number'])
     SAVE_GAME = ClassFactory(EventApi.SAVE_GAME, ['pgn_filename'])
     CONTLAST = ClassFactory(EventApi.CONTLAST, ['contlast'])
     ALTMOVES = ClassFactory(EventApi.ALTMOVES, ['altmoves'])
@@ -354,9 +418,7 @@ class Event():
     KEYBOARD_FEN = ClassFactory(EventApi.KEYBOARD_FEN, ['fen'])
     # Engine events
     BEST_MOVE = ClassFactory(EventApi.BEST_MOVE, ['move', 'ponder', 'inbook'])
-    NEW_PV = ClassFactory(EventApi.NEW_PV, ['pv'])
-    NEW_SCORE = ClassFactory(EventApi.NEW_SCORE, ['score', 'mate'])
-    NEW_DEPTH = ClassFactory(EventApi.NEW_DEPTH, ['depth'])
+    NEW_INFO = ClassFactory(EventApi.NEW_INFO, ['score', 'mate', 'pv', 'depth'])
     START_SEARCH = ClassFactory(EventApi.START_SEARCH, [])
     STOP_SEARCH = ClassFactory(EventApi.STOP_SEARCH, [])
     # Timecontrol events
@@ -366,3 +428,4 @@ class Event():
     EXIT_MENU = ClassFactory(EventApi.EXIT_MENU, [])
     UPDATE_PICO = ClassFactory(EventApi.UPDATE_PICO, ['tag'])
     REMOTE_ROOM = ClassFactory(EventApi.REMOTE_ROOM, ['inside'])
+    RESUME_CLOCK = ClassFactory(EventApi.RESUME_CLOCK, [])
@@ -26,7 +26,7 @@ import chess  # type: ignore
 from utilities import DisplayMsg, Observable, DispatchDgt, RepeatedTimer, write_picochess_ini
 from dgt.menu import DgtMenu
 from dgt.util import ClockSide, ClockIcons, BeepLevel, Mode, GameResult, TimeMode, PlayMode
-from dgt.api import Dgt, Event, Message
+from dgt.api import Dgt, Event, Message, HandlerRegistry
 from timecontrol import TimeControl
 from dgt.board import Rev2Info
 from dgt.translate import DgtTranslate
@@ -36,6 +36,8 @@ class DgtDisplay(DisplayMsg, threading.Thread):
 
     """Dispatcher for Messages towards DGT hardware or back to the event system (picochess)."""
 
+    _handlers = HandlerRegistry('dgt')
+
     def __init__(self, dgttranslate: DgtTranslate, dgtmenu: DgtMenu, time_control: TimeControl):
         super(DgtDisplay, self).__init__()
         self.dgttranslate = dgttranslate
@@ -359,6 +361,7 @@ class DgtDisplay(DisplayMsg, threading.Thread):
             self.play_turn = None
             Observable.fire(Event.SWITCH_SIDES())
 
+    @_handlers.register(Message.DGT_BUTTON)
     def _process_button(self, message):
         button = int(message.button)
         if not self.dgtmenu.get_engine_restart():
@@ -582,6 +585,7 @@ class DgtDisplay(DisplayMsg, threading.Thread):
             else:
                 Observable.fire(Event.FEN(fen=fen))
 
+    @_handlers.register(Message.ENGINE_READY)
     def _process_engine_ready(self, message):
         for index in range(0, len(self.dgtmenu.installed_engines)):
             if self.dgtmenu.installed_engines[index]['file'] == message.eng['file']:
@@ -592,6 +596,7 @@ class DgtDisplay(DisplayMsg, threading.Thread):
             DispatchDgt.fire(message.eng_text)
         self.dgtmenu.set_engine_restart(False)
 
+    @_handlers.register(Message.ENGINE_STARTUP)
     def _process_engine_startup(self, message):
         self.dgtmenu.installed_engines = message.installed_engines
         for index in range(0, len(self.dgtmenu.installed_engines)):
@@ -611,6 +616,7 @@ class DgtDisplay(DisplayMsg, threading.Thread):
         self.leds_are_on = False
         DispatchDgt.fire(Dgt.LIGHT_CLEAR(devs={'ser', 'web'}))
 
+    @_handlers.register(Message.START_NEW_GAME)
     def _process_start_new_game(self, message):
         self.c_time_counter = 0
         self.c_last_player = ''
@@ -624,6 +630,7 @@ class DgtDisplay(DisplayMsg, threading.Thread):
         if self.dgtmenu.get_mode() in (Mode.NORMAL, Mode.BRAIN, Mode.OBSERVE, Mode.REMOTE, Mode.TRAINING):
             self._set_clock()
 
+    @_handlers.register(Message.COMPUTER_MOVE)
     def _process_computer_move(self, message):
         self.force_leds_off(log=True)  # can happen in case of a book move
         move = message.move
@@ -665,7 +672,8 @@ class DgtDisplay(DisplayMsg, threading.Thread):
         if not self.low_time and not self.dgtmenu.get_confirm():  # only display if the user has >60sec on his clock
             DispatchDgt.fire(self.dgttranslate.text(text_key))
 
-    def _process_computer_move_done(self):
+    @_handlers.register(Message.COMPUTER_MOVE_DONE)
+    def _process_computer_move_done(self, _):
 
         self.c_last_player = 'C'
         self.c_time_counter = 0
@@ -690,6 +698,7 @@ class DgtDisplay(DisplayMsg, threading.Thread):
         else:
             self._display_confirm('K05_okpico')
 
+    @_handlers.register(Message.USER_MOVE_DONE)
     def _process_user_move_done(self, message):
         self.force_leds_off(log=True)  # can happen in case of a sliding move
 
@@ -716,6 +725,7 @@ class DgtDisplay(DisplayMsg, threading.Thread):
         else:
             self._display_confirm('K05_okuser')
 
+    @_handlers.register(Message.REVIEW_MOVE_DONE)
     def _process_review_move_done(self, message):
 
         self.force_leds_off(log=True)  # can happen in case of a sliding move
@@ -727,6 +737,7 @@ class DgtDisplay(DisplayMsg, threading.Thread):
         self.c_last_player = ''
         self.c_time_counter = 0
 
+    @_handlers.register(Message.TIME_CONTROL)
     def _process_time_control(self, message):
         wait = not self.dgtmenu.get_confirm() or not message.show_ok
         if wait:
@@ -734,6 +745,7 @@ class DgtDisplay(DisplayMsg, threading.Thread):
         self.time_control = TimeControl(**message.tc_init)
         self._set_clock()
 
+    @_handlers.register(Message.NEW_SCORE)
     def _process_new_score(self, message):
         if message.mate is None:
             score = int(message.score)
@@ -750,6 +762,7 @@ class DgtDisplay(DisplayMsg, threading.Thread):
             text.wait = True
             DispatchDgt.fire(text)
 
+    @_handlers.register(Message.NEW_PV)
     def _process_new_pv(self, message):
         self.hint_move = message.pv[0]
         self.hint_fen = message.game.fen()
@@ -854,6 +867,7 @@ class DgtDisplay(DisplayMsg, threading.Thread):
                 self.dgtmenu.tc_node_list.append(timectrl.get_list_text())
                 self.dgtmenu.set_time_node(index)
 
+    @_handlers.register(Message.CLOCK_START)
     def _process_clock_start(self, message):
         self.time_control = TimeControl(**message.tc_init)
         side = ClockSide.LEFT if (message.turn == chess.WHITE) != self.dgtmenu.get_flip_board() else ClockSide.RIGHT
@@ -945,385 +959,362 @@ class DgtDisplay(DisplayMsg, threading.Thread):
 
         DispatchDgt.fire(text)
 
-    def _process_message(self, message):
-        if False:  # switch-case
-            pass
-
-        elif isinstance(message, Message.ENGINE_READY):
-            self._process_engine_ready(message)
-
-        elif isinstance(message, Message.ENGINE_STARTUP):
-            self._process_engine_startup(message)
-
-        elif isinstance(message, Message.ENGINE_FAIL):
-            DispatchDgt.fire(self.dgttranslate.text('Y10_erroreng'))
-            self.dgtmenu.set_engine_restart(False)
-
-        elif isinstance(message, Message.REMOTE_FAIL):
-            DispatchDgt.fire(self.dgttranslate.text('Y10_erroreng'))
-
-        elif isinstance(message, Message.COMPUTER_MOVE):
-            self._process_computer_move(message)
-
-        elif isinstance(message, Message.START_NEW_GAME):
-            self._process_start_new_game(message)
-
-        elif isinstance(message, Message.COMPUTER_MOVE_DONE):
-            self._process_computer_move_done()
+    @_handlers.register(Message.ENGINE_FAIL)
+    def _on_engine_fail(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('Y10_erroreng'))
+        self.dgtmenu.set_engine_restart(False)
 
-        elif isinstance(message, Message.USER_MOVE_DONE):
-            self._process_user_move_done(message)
+    @_handlers.register(Message.REMOTE_FAIL)
+    def _on_remote_fail(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('Y10_erroreng'))
 
-        elif isinstance(message, Message.REVIEW_MOVE_DONE):
-            self._process_review_move_done(message)
+    @_handlers.register(Message.ALTERNATIVE_MOVE)
+    def _on_alternative_move(self, message):
+        self.force_leds_off()
+        self.play_mode = message.play_mode
+        self.play_move = chess.Move.null()
+        DispatchDgt.fire(self.dgttranslate.text('B05_altmove'))
 
-        elif isinstance(message, Message.ALTERNATIVE_MOVE):
-            self.force_leds_off()
-            self.play_mode = message.play_mode
-            self.play_move = chess.Move.null()
-            DispatchDgt.fire(self.dgttranslate.text('B05_altmove'))
+    @_handlers.register(Message.LEVEL)
+    def _on_level(self, message):
+        if not self.dgtmenu.get_engine_restart():
+            DispatchDgt.fire(message.level_text)
 
-        elif isinstance(message, Message.LEVEL):
-            if not self.dgtmenu.get_engine_restart():
-                DispatchDgt.fire(message.level_text)
+    @_handlers.register(Message.OPENING_BOOK)
+    def _on_opening_book(self, message):
+        if not self.dgtmenu.get_confirm() or not message.show_ok:
+            DispatchDgt.fire(message.book_text)
 
-        elif isinstance(message, Message.TIME_CONTROL):
-            self._process_time_control(message)
+    @_handlers.register(Message.TAKE_BACK)
+    def _on_take_back(self, message):
+        self.take_back_move = chess.Move.null()
+        game_copy = message.game.copy()
 
-        elif isinstance(message, Message.OPENING_BOOK):
-            if not self.dgtmenu.get_confirm() or not message.show_ok:
-                DispatchDgt.fire(message.book_text)
+        self.force_leds_off()
+        self._reset_moves_and_score()
+        DispatchDgt.fire(self.dgttranslate.text('C10_takeback'))
 
-        elif isinstance(message, Message.TAKE_BACK):
+        try:
+            self.take_back_move = game_copy.pop()
+        except Exception:
             self.take_back_move = chess.Move.null()
-            game_copy = message.game.copy()
-
-            self.force_leds_off()
-            self._reset_moves_and_score()
-            DispatchDgt.fire(self.dgttranslate.text('C10_takeback'))
-
-            try:
-                self.take_back_move = game_copy.pop()
-            except Exception:
-                self.take_back_move = chess.Move.null()
-
-            if self.take_back_move != chess.Move.null():
-                #  and not ModeInfo.get_pgn_mode()
-                side = self._get_clock_side(game_copy.turn)
-                beep = self.dgttranslate.bl(BeepLevel.NO)
-                text = Dgt.DISPLAY_MOVE(move=self.take_back_move, fen=game_copy.fen(), side=side, wait=True, maxtime=1,
-                                        beep=beep, devs={'ser', 'i2c', 'web'}, uci960=self.uci960,
-                                        lang=self.dgttranslate.language, capital=self.dgttranslate.capital, long=True)  # molli: for take back display use long notation
-                text.wait = True
-                DispatchDgt.fire(text)
-                self.force_leds_off()
-                DispatchDgt.fire(Dgt.LIGHT_SQUARES(uci_move=self.take_back_move.uci(), devs={'ser', 'web'}))
-                self.leds_are_on = True
-            else:
-                DispatchDgt.fire(Dgt.DISPLAY_TIME(force=True, wait=True, devs={'ser', 'i2c', 'web'}))
-
-            self.c_time_counter = 0
-            self.c_last_player = ''
-
-        elif isinstance(message, Message.GAME_ENDS):
-            logging.debug('game_ends outside if: result %s', message.result)
-            if not self.dgtmenu.get_engine_restart():  # filter out the shutdown/reboot process
-                logging.debug('inside if: result.value %s', message.result.value)
-                if message.result == GameResult.DRAW:
-                    ModeInfo.set_game_ending(result='1/2-1/2')
-                elif message.result == GameResult.WIN_WHITE:
-                    ModeInfo.set_game_ending(result='1-0')
-                elif message.result == GameResult.WIN_BLACK:
-                    ModeInfo.set_game_ending(result='0-1')
-                elif message.result == GameResult.OUT_OF_TIME:
-                    if message.game.turn == chess.WHITE:
-                        ModeInfo.set_game_ending(result='0-1')
-                    else:
-                        ModeInfo.set_game_ending(result='1-0')
-
-                text = self.dgttranslate.text(message.result.value)
-                text.beep = self.dgttranslate.bl(BeepLevel.CONFIG)
-                text.maxtime = 0.5
-                DispatchDgt.fire(text)
-                if self.dgtmenu.get_mode() in (Mode.PONDER, Mode.TRAINING):
-                    self._reset_moves_and_score()
-                    text.beep = False
-                    text.maxtime = 1
-                    self.score = text
-
-            self.c_last_player = ''
-            self.c_time_counter = 0
 
-        elif isinstance(message, Message.INTERACTION_MODE):
-            if not self.dgtmenu.get_confirm() or not message.show_ok:
-                DispatchDgt.fire(message.mode_text)
-
-        elif isinstance(message, Message.PLAY_MODE):
-            self.force_leds_off()  # molli: in case of flashing take back move
-            self.play_mode = message.play_mode
-            DispatchDgt.fire(message.play_mode_text)
-
-        elif isinstance(message, Message.NEW_SCORE):
-            self._process_new_score(message)
-
-        elif isinstance(message, Message.BOOK_MOVE):
-            self.score = self.dgttranslate.text('N10_score', None)
-            DispatchDgt.fire(self.dgttranslate.text('N10_bookmove'))
-
-        elif isinstance(message, Message.NEW_PV):
-            self._process_new_pv(message)
-
-        elif isinstance(message, Message.NEW_DEPTH):
-            self.depth = message.depth
-
-        elif isinstance(message, Message.IP_INFO):
-            self.dgtmenu.int_ip = message.info['int_ip']
-            self.dgtmenu.ext_ip = message.info['ext_ip']
-
-        elif isinstance(message, Message.STARTUP_INFO):
+        if self.take_back_move != chess.Move.null():
+            #  and not ModeInfo.get_pgn_mode()
+            side = self._get_clock_side(game_copy.turn)
+            beep = self.dgttranslate.bl(BeepLevel.NO)
+            text = Dgt.DISPLAY_MOVE(move=self.take_back_move, fen=game_copy.fen(), side=side, wait=True, maxtime=1,
+                                    beep=beep, devs={'ser', 'i2c', 'web'}, uci960=self.uci960,
+                                    lang=self.dgttranslate.language, capital=self.dgttranslate.capital, long=True)  # molli: for take back display use long notation
+            text.wait = True
+            DispatchDgt.fire(text)
             self.force_leds_off()
-            self._process_startup_info(message)
-
-        elif isinstance(message, Message.SEARCH_STARTED):
-            logging.debug('search started')
-
-        elif isinstance(message, Message.SEARCH_STOPPED):
-            logging.debug('search stopped')
-
-        elif isinstance(message, Message.CLOCK_START):
-            self._process_clock_start(message)
-
-        elif isinstance(message, Message.CLOCK_STOP):
-            DispatchDgt.fire(Dgt.CLOCK_STOP(devs=message.devs, wait=True))
+            DispatchDgt.fire(Dgt.LIGHT_SQUARES(uci_move=self.take_back_move.uci(), devs={'ser', 'web'}))
+            self.leds_are_on = True
+        else:
+            DispatchDgt.fire(Dgt.DISPLAY_TIME(force=True, wait=True, devs={'ser', 'i2c', 'web'}))
 
-        elif isinstance(message, Message.DGT_BUTTON):
-            self._process_button(message)
+        self.c_time_counter = 0
+        self.c_last_player = ''
 
-        elif isinstance(message, Message.DGT_FEN):
-            if self.dgtmenu.inside_updt_menu():
-                logging.debug('inside update menu => ignore fen %s', message.fen)
-            else:
-                self._process_fen(message.fen, message.raw)
+    @_handlers.register(Message.GAME_ENDS)
+    def _on_game_ends(self, message):
+        logging.debug('game_ends outside if: result %s', message.result)
+        if not self.dgtmenu.get_engine_restart():  # filter out the shutdown/reboot process
+            logging.debug('inside if: result.value %s', message.result.value)
+            if message.result == GameResult.DRAW:
+                ModeInfo.set_game_ending(result='1/2-1/2')
+            elif message.result == GameResult.WIN_WHITE:
+                ModeInfo.set_game_ending(result='1-0')
+            elif message.result == GameResult.WIN_BLACK:
+                ModeInfo.set_game_ending(result='0-1')
+            elif message.result == GameResult.OUT_OF_TIME:
+                if message.game.turn == chess.WHITE:
+                    ModeInfo.set_game_ending(result='0-1')
+                else:
+                    ModeInfo.set_game_ending(result='1-0')
 
-        elif isinstance(message, Message.DGT_CLOCK_VERSION):
-            DispatchDgt.fire(Dgt.CLOCK_VERSION(main=message.main, sub=message.sub, devs={message.dev}))
-            text = self.dgttranslate.text('Y21_picochess', devs={message.dev})
-            text.rd = ClockIcons.DOT
+            text = self.dgttranslate.text(message.result.value)
+            text.beep = self.dgttranslate.bl(BeepLevel.CONFIG)
+            text.maxtime = 0.5
             DispatchDgt.fire(text)
+            if self.dgtmenu.get_mode() in (Mode.PONDER, Mode.TRAINING):
+                self._reset_moves_and_score()
+                text.beep = False
+                text.maxtime = 1
+                self.score = text
 
-            if message.dev == 'ser':  # send the "board connected message" to serial clock
-                DispatchDgt.fire(message.text)
-            self._set_clock(devs={message.dev})
-            self._exit_display(devs={message.dev})
-
-        elif isinstance(message, Message.DGT_CLOCK_TIME):
-            time_white = message.time_left
-            time_black = message.time_right
-            if self.dgtmenu.get_flip_board():
-                time_white, time_black = time_black, time_white
-            Observable.fire(Event.CLOCK_TIME(time_white=time_white, time_black=time_black, connect=message.connect, dev=message.dev))
+        self.c_last_player = ''
+        self.c_time_counter = 0
 
-        elif isinstance(message, Message.CLOCK_TIME):
-            self.low_time = message.low_time
-            if self.low_time:
-                logging.debug('time too low, disable confirm - w: %i, b: %i', message.time_white, message.time_black)
+    @_handlers.register(Message.INTERACTION_MODE)
+    def _on_interaction_mode(self, message):
+        if not self.dgtmenu.get_confirm() or not message.show_ok:
+            DispatchDgt.fire(message.mode_text)
 
-        elif isinstance(message, Message.DGT_SERIAL_NR):
-            pass
+    @_handlers.register(Message.PLAY_MODE)
+    def _on_play_mode(self, message):
+        self.force_leds_off()  # molli: in case of flashing take back move
+        self.play_mode = message.play_mode
+        DispatchDgt.fire(message.play_mode_text)
 
-        elif isinstance(message, Message.DGT_JACK_CONNECTED_ERROR):  # only working in case of 2 clocks connected!
-            DispatchDgt.fire(self.dgttranslate.text('Y00_errorjack'))
+    @_handlers.register(Message.BOOK_MOVE)
+    def _on_book_move(self, _):
+        self.score = self.dgttranslate.text('N10_score', None)
+        DispatchDgt.fire(self.dgttranslate.text('N10_bookmove'))
 
-        elif isinstance(message, Message.DGT_EBOARD_VERSION):
-            if self.dgtmenu.inside_updt_menu():
-                logging.debug('inside update menu => board channel not displayed')
-            else:
-                DispatchDgt.fire(message.text)
-                self._exit_display(devs={'i2c', 'web'})  # ser is done, when clock found
+    @_handlers.register(Message.NEW_DEPTH)
+    def _on_new_depth(self, message):
+        self.depth = message.depth
 
-        elif isinstance(message, Message.DGT_NO_EBOARD_ERROR):
-            if self.dgtmenu.inside_updt_menu() or self.dgtmenu.inside_main_menu():
-                logging.debug('inside menu => board error not displayed')
-            else:
-                DispatchDgt.fire(message.text)
+    @_handlers.register(Message.IP_INFO)
+    def _on_ip_info(self, message):
+        self.dgtmenu.int_ip = message.info['int_ip']
+        self.dgtmenu.ext_ip = message.info['ext_ip']
 
-        elif isinstance(message, Message.DGT_NO_CLOCK_ERROR):
-            pass
+    @_handlers.register(Message.STARTUP_INFO)
+    def _on_startup_info(self, message):
+        self.force_leds_off()
+        self._process_startup_info(message)
 
-        elif isinstance(message, Message.SWITCH_SIDES):
-            self.c_time_counter = 0
+    @_handlers.register(Message.SEARCH_STARTED)
+    def _on_search_started(self, _):
+        logging.debug('search started')
 
-            if self.play_mode == PlayMode.USER_WHITE:
-                self.play_mode == PlayMode.USER_BLACK
-            else:
-                self.play_mode == PlayMode.USER_WHITE
+    @_handlers.register(Message.SEARCH_STOPPED)
+    def _on_search_stopped(self, _):
+        logging.debug('search stopped')
 
-            self.play_move = chess.Move.null()
-            self.play_fen = None
-            self.play_turn = None
+    @_handlers.register(Message.CLOCK_STOP)
+    def _on_clock_stop(self, message):
+        DispatchDgt.fire(Dgt.CLOCK_STOP(devs=message.devs, wait=True))
 
-            self.hint_move = chess.Move.null()
-            self.hint_fen = None
-            self.hint_turn = None
-            self.force_leds_off()
-            logging.debug('user ignored move %s', message.move)
+    @_handlers.register(Message.DGT_FEN)
+    def _on_dgt_fen(self, message):
+        if self.dgtmenu.inside_updt_menu():
+            logging.debug('inside update menu => ignore fen %s', message.fen)
+        else:
+            self._process_fen(message.fen, message.raw)
 
-        elif isinstance(message, Message.EXIT_MENU):
-            self._exit_display()
+    @_handlers.register(Message.DGT_CLOCK_VERSION)
+    def _on_dgt_clock_version(self, message):
+        DispatchDgt.fire(Dgt.CLOCK_VERSION(main=message.main, sub=message.sub, devs={message.dev}))
+        text = self.dgttranslate.text('Y21_picochess', devs={message.dev})
+        text.rd = ClockIcons.DOT
+        DispatchDgt.fire(text)
 
-        elif isinstance(message, Message.WRONG_FEN):
-            DispatchDgt.fire(self.dgttranslate.text('C10_setpieces'))
-            time.sleep(1)
+        if message.dev == 'ser':  # send the "board connected message" to serial clock
+            DispatchDgt.fire(message.text)
+        self._set_clock(devs={message.dev})
+        self._exit_display(devs={message.dev})
+
+    @_handlers.register(Message.DGT_CLOCK_TIME)
+    def _on_dgt_clock_time(self, message):
+        time_white = message.time_left
+        time_black = message.time_right
+        if self.dgtmenu.get_flip_board():
+            time_white, time_black = time_black, time_white
+        Observable.fire(Event.CLOCK_TIME(time_white=time_white, time_black=time_black, connect=message.connect, dev=message.dev))
+
+    @_handlers.register(Message.CLOCK_TIME)
+    def _on_clock_time(self, message):
+        self.low_time = message.low_time
+        if self.low_time:
+            logging.debug('time too low, disable confirm - w: %i, b: %i', message.time_white, message.time_black)
+
+    @_handlers.register(Message.DGT_JACK_CONNECTED_ERROR)  # only working in case of 2 clocks connected!
+    def _on_dgt_jack_connected_error(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('Y00_errorjack'))
+
+    @_handlers.register(Message.DGT_EBOARD_VERSION)
+    def _on_dgt_eboard_version(self, message):
+        if self.dgtmenu.inside_updt_menu():
+            logging.debug('inside update menu => board channel not displayed')
+        else:
+            DispatchDgt.fire(message.text)
+            self._exit_display(devs={'i2c', 'web'})  # ser is done, when clock found
 
-        elif isinstance(message, Message.UPDATE_PICO):
-            DispatchDgt.fire(self.dgttranslate.text('Y00_update'))
+    @_handlers.register(Message.DGT_NO_EBOARD_ERROR)
+    def _on_dgt_no_eboard_error(self, message):
+        if self.dgtmenu.inside_updt_menu() or self.dgtmenu.inside_main_menu():
+            logging.debug('inside menu => board error not displayed')
+        else:
+            DispatchDgt.fire(message.text)
 
-        elif isinstance(message, Message.BATTERY):
-            if message.percent == 0x7f:
-                percent = ' NA'
-            elif message.percent > 99:
-                percent = ' 99'
-            else:
-                percent = str(message.percent)
-            self.dgtmenu.battery = percent
+    @_handlers.register(Message.SWITCH_SIDES)
+    def _on_switch_sides(self, message):
+        self.c_time_counter = 0
 
-        elif isinstance(message, Message.REMOTE_ROOM):
-            self.dgtmenu.inside_room = message.inside
+        if self.play_mode == PlayMode.USER_WHITE:
+            self.play_mode == PlayMode.USER_BLACK
+        else:
+            self.play_mode == PlayMode.USER_WHITE
 
-        elif isinstance(message, Message.RESTORE_GAME):
-            DispatchDgt.fire(self.dgttranslate.text('C10_restoregame'))
+        self.play_move = chess.Move.null()
+        self.play_fen = None
+        self.play_turn = None
 
-        elif isinstance(message, Message.ENGINE_NAME):
-            DispatchDgt.fire(self.dgttranslate.text('K20_enginename', message.engine_name))
+        self.hint_move = chess.Move.null()
+        self.hint_fen = None
+        self.hint_turn = None
+        self.force_leds_off()
+        logging.debug('user ignored move %s', message.move)
+
+    @_handlers.register(Message.EXIT_MENU)
+    def _on_exit_menu(self, _):
+        self._exit_display()
+
+    @_handlers.register(Message.WRONG_FEN)
+    def _on_wrong_fen(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('C10_setpieces'))
+        time.sleep(1)
+
+    @_handlers.register(Message.UPDATE_PICO)
+    def _on_update_pico(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('Y00_update'))
+
+    @_handlers.register(Message.BATTERY)
+    def _on_battery(self, message):
+        if message.percent == 0x7f:
+            percent = ' NA'
+        elif message.percent > 99:
+            percent = ' 99'
+        else:
+            percent = str(message.percent)
+        self.dgtmenu.battery = percent
+
+    @_handlers.register(Message.REMOTE_ROOM)
+    def _on_remote_room(self, message):
+        self.dgtmenu.inside_room = message.inside
+
+    @_handlers.register(Message.RESTORE_GAME)
+    def _on_restore_game(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('C10_restoregame'))
+
+    @_handlers.register(Message.ENGINE_NAME)
+    def _on_engine_name(self, message):
+        DispatchDgt.fire(self.dgttranslate.text('K20_enginename', message.engine_name))
+        time.sleep(1.5)
+
+    @_handlers.register(Message.SHOW_TEXT)
+    def _on_show_text(self, message):
+        string_part = ''
+        if message.text_string == 'NEW_POSITION':
+            DispatchDgt.fire(self.dgttranslate.text('K20_newposition'))
             time.sleep(1.5)
-
-        elif isinstance(message, Message.SHOW_TEXT):
-            string_part = ''
-            if message.text_string == 'NEW_POSITION':
-                DispatchDgt.fire(self.dgttranslate.text('K20_newposition'))
+        else:
+            for string_part in self._convert_pico_string(message.text_string):
+                DispatchDgt.fire(self.dgttranslate.text('K20_default', string_part))
                 time.sleep(1.5)
-            else:
-                for string_part in self._convert_pico_string(message.text_string):
-                    DispatchDgt.fire(self.dgttranslate.text('K20_default', string_part))
-                    time.sleep(1.5)
-
-        elif isinstance(message, Message.SEEKING):
-            DispatchDgt.fire(self.dgttranslate.text('C10_seeking'))
-
-        elif isinstance(message, Message.ENGINE_SETUP):
-            DispatchDgt.fire(self.dgttranslate.text('C20_enginesetup'))
-
-        elif isinstance(message, Message.MOVE_RETRY):
-            DispatchDgt.fire(self.dgttranslate.text('C10_moveretry'))
-
-        elif isinstance(message, Message.MOVE_WRONG):
-            DispatchDgt.fire(self.dgttranslate.text('C10_movewrong'))
-
-        elif isinstance(message, Message.SET_PLAYMODE):
-            self.force_leds_off()  # molli: in case of flashing take back move
-            self.play_mode = message.play_mode
 
-        elif isinstance(message, Message.ONLINE_NAMES):
-            logging.debug('molli: user online name %s', message.own_user)
-            logging.debug('molli: opponent online name %s', message.opp_user)
-            DispatchDgt.fire(self.dgttranslate.text('C10_onlineuser', message.opp_user))
-
-        elif isinstance(message, Message.ONLINE_LOGIN):
-            DispatchDgt.fire(self.dgttranslate.text('C10_login'))
-
-        elif isinstance(message, Message.ONLINE_FAILED):
-            DispatchDgt.fire(self.dgttranslate.text('C10_serverfailed'))
-
-        elif isinstance(message, Message.ONLINE_USER_FAILED):
-            DispatchDgt.fire(self.dgttranslate.text('C10_userfailed'))
-
-        elif isinstance(message, Message.ONLINE_NO_OPPONENT):
-            DispatchDgt.fire(self.dgttranslate.text('C10_noopponent'))
-
-        elif isinstance(message, Message.LOST_ON_TIME):
-            DispatchDgt.fire(self.dgttranslate.text('C10_gameresult_time'))
-
-        elif isinstance(message, Message.SET_NOBOOK):
-            self.dgtmenu.set_book(message.book_index)  # molli for emulation, online & pgn modes
-
-        elif isinstance(message, Message.PICOTUTOR_MSG):
-            DispatchDgt.fire(self.dgttranslate.text('C10_picotutor_msg', message.eval_str))
-            if message.eval_str == 'POSOK' or message.eval_str == 'ANALYSIS' and self.play_move == chess.Move.null():
-                self.force_leds_off()  # molli: sometime if you move the pieces too quickly a LED may still flash on the rev2
-
-        elif isinstance(message, Message.POSITION_FAIL):
-            self.force_leds_off()
-            DispatchDgt.fire(self.dgttranslate.text('C10_position_fail', message.fen_result))
-            DispatchDgt.fire(Dgt.LIGHT_SQUARE(square=message.fen_result[-2:], devs={'ser', 'web'}))
-            self.leds_are_on = True
-            time.sleep(3)
-
-        elif isinstance(message, Message.SHOW_ENGINENAME):
-            pass
-
-        elif isinstance(message, Message.PICOWATCHER):
-            pass
-
-        elif isinstance(message, Message.PICOCOACH):
-            pass
-
-        elif isinstance(message, Message.PICOEXPLORER):
-            pass
-
-        elif isinstance(message, Message.PICOCOMMENT):
-            pass
-
-        elif isinstance(message, Message.RSPEED):
-            pass
-
-        elif isinstance(message, Message.CONTLAST):
-            pass
-
-        elif isinstance(message, Message.ALTMOVES):
-            pass
-
-        elif isinstance(message, Message.SAVE_GAME):
-            pass
-
-        elif isinstance(message, Message.READ_GAME):
-            DispatchDgt.fire(self.dgttranslate.text('C10_game_read_menu'))
-
-        elif isinstance(message, Message.TIMECONTROL_CHECK):
-            msg_str = 'TC'
-            DispatchDgt.fire(self.dgttranslate.text('C10_timecontrol_check', msg_str))
-            time.sleep(2.5)
-            msg_str = 'M' + str(message.movestogo) + 'mv/' + str(message.time1)
-            DispatchDgt.fire(self.dgttranslate.text('C10_timecontrol_check', msg_str))
-            time.sleep(3.5)
-            msg_str = 'A' + str(message.time2) + 'min'
-            DispatchDgt.fire(self.dgttranslate.text('C10_timecontrol_check', msg_str))
-            time.sleep(3.5)
-
-        elif isinstance(message, Message.PGN_GAME_END):
-            DispatchDgt.fire(self.dgttranslate.text('C10_pgngame_end', message.result))
-
-            if '1-0' in message.result:
-                text = self.dgttranslate.text('C10_gameresult_white')
-            elif '0-1' in message.result:
-                text = self.dgttranslate.text('C10_gameresult_black')
-            elif '0.5-0.5' in message.result or '1/2-1/2' in message.result:
-                text = self.dgttranslate.text('C10_gameresult_draw')
-            elif '*' in message.result:
-                text = self.dgttranslate.text('C10_gameresult_unknown')
-            else:
-                text = self.dgttranslate.text('C10_gameresult_unknown')
-            time.sleep(1.5)
+    @_handlers.register(Message.SEEKING)
+    def _on_seeking(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('C10_seeking'))
+
+    @_handlers.register(Message.ENGINE_SETUP)
+    def _on_engine_setup(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('C20_enginesetup'))
+
+    @_handlers.register(Message.MOVE_RETRY)
+    def _on_move_retry(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('C10_moveretry'))
+
+    @_handlers.register(Message.MOVE_WRONG)
+    def _on_move_wrong(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('C10_movewrong'))
+
+    @_handlers.register(Message.SET_PLAYMODE)
+    def _on_set_playmode(self, message):
+        self.force_leds_off()  # molli: in case of flashing take back move
+        self.play_mode = message.play_mode
+
+    @_handlers.register(Message.ONLINE_NAMES)
+    def _on_online_names(self, message):
+        logging.debug('molli: user online name %s', message.own_user)
+        logging.debug('molli: opponent online name %s', message.opp_user)
+        DispatchDgt.fire(self.dgttranslate.text('C10_onlineuser', message.opp_user))
+
+    @_handlers.register(Message.ONLINE_LOGIN)
+    def _on_online_login(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('C10_login'))
+
+    @_handlers.register(Message.ONLINE_FAILED)
+    def _on_online_failed(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('C10_serverfailed'))
+
+    @_handlers.register(Message.ONLINE_USER_FAILED)
+    def _on_online_user_failed(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('C10_userfailed'))
+
+    @_handlers.register(Message.ONLINE_NO_OPPONENT)
+    def _on_online_no_opponent(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('C10_noopponent'))
+
+    @_handlers.register(Message.LOST_ON_TIME)
+    def _on_lost_on_time(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('C10_gameresult_time'))
+
+    @_handlers.register(Message.SET_NOBOOK)
+    def _on_set_nobook(self, message):
+        self.dgtmenu.set_book(message.book_index)  # molli for emulation, online & pgn modes
+
+    @_handlers.register(Message.PICOTUTOR_MSG)
+    def _on_picotutor_msg(self, message):
+        DispatchDgt.fire(self.dgttranslate.text('C10_picotutor_msg', message.eval_str))
+        if message.eval_str == 'POSOK' or message.eval_str == 'ANALYSIS' and self.play_move == chess.Move.null():
+            self.force_leds_off()  # molli: sometime if you move the pieces too quickly a LED may still flash on the rev2
+
+    @_handlers.register(Message.POSITION_FAIL)
+    def _on_position_fail(self, message):
+        self.force_leds_off()
+        DispatchDgt.fire(self.dgttranslate.text('C10_position_fail', message.fen_result))
+        DispatchDgt.fire(Dgt.LIGHT_SQUARE(square=message.fen_result[-2:], devs={'ser', 'web'}))
+        self.leds_are_on = True
+        time.sleep(3)
+
+    @_handlers.register(Message.READ_GAME)
+    def _on_read_game(self, _):
+        DispatchDgt.fire(self.dgttranslate.text('C10_game_read_menu'))
+
+    @_handlers.register(Message.TIMECONTROL_CHECK)
+    def _on_timecontrol_check(self, message):
+        msg_str = 'TC'
+        DispatchDgt.fire(self.dgttranslate.text('C10_timecontrol_check', msg_str))
+        time.sleep(2.5)
+        msg_str = 'M' + str(message.movestogo) + 'mv/' + str(message.time1)
+        DispatchDgt.fire(self.dgttranslate.text('C10_timecontrol_check', msg_str))
+        time.sleep(3.5)
+        msg_str = 'A' + str(message.time2) + 'min'
+        DispatchDgt.fire(self.dgttranslate.text('C10_timecontrol_check', msg_str))
+        time.sleep(3.5)
+
+    @_handlers.register(Message.PGN_GAME_END)
+    def _on_pgn_game_end(self, message):
+        DispatchDgt.fire(self.dgttranslate.text('C10_pgngame_end', message.result))
+
+        if '1-0' in message.result:
+            text = self.dgttranslate.text('C10_gameresult_white')
+        elif '0-1' in message.result:
+            text = self.dgttranslate.text('C10_gameresult_black')
+        elif '0.5-0.5' in message.result or '1/2-1/2' in message.result:
+            text = self.dgttranslate.text('C10_gameresult_draw')
+        elif '*' in message.result:
+            text = self.dgttranslate.text('C10_gameresult_unknown')
+        else:
+            text = self.dgttranslate.text('C10_gameresult_unknown')
+        time.sleep(1.5)
 
-            text.beep = self.dgttranslate.bl(BeepLevel.CONFIG)
-            text.maxtime = 0.5
+        text.beep = self.dgttranslate.bl(BeepLevel.CONFIG)
+        text.maxtime = 0.5
 
-            DispatchDgt.fire(text)
+        DispatchDgt.fire(text)
 
-        elif isinstance(message, Message.PROMOTION_DONE):
-            DispatchDgt.fire(Dgt.PROMOTION_DONE(uci_move=message.move.uci(), devs={'ser'}))
+    @_handlers.register(Message.PROMOTION_DONE)
+    def _on_promotion_done(self, message):
+        DispatchDgt.fire(Dgt.PROMOTION_DONE(uci_move=message.move.uci(), devs={'ser'}))
 
-        else:  # Default
-            pass
+    def _process_message(self, message):
+        self._handlers.dispatch(message, self)
 
     def run(self):
         """Call by threading.Thread start() function."""
@@ -1902,22 +1902,22 @@ class DgtMenu(object):
             text = self._fire_dispatchdgt(self.dgttranslate.text('B10_oksavegame'))
 
         elif self.state == MenuState.GAME_GAMEREAD_GAMELAST:
-            event = Event.READ_GAME(pgn_filename='last_game.pgn')
+            event = Event.READ_GAME(pgn_filename='last_game.pgn', game_number=0)
             Observable.fire(event)
             text = self._fire_dispatchdgt(self.dgttranslate.text('B10_okreadgame'))
 
         elif self.state == MenuState.GAME_GAMEREAD_GAME1:
-            event = Event.READ_GAME(pgn_filename='picochess_game_1.pgn')
+            event = Event.READ_GAME(pgn_filename='picochess_game_1.pgn', game_number=0)
             Observable.fire(event)
             text = self._fire_dispatchdgt(self.dgttranslate.text('B10_okreadgame'))
 
         elif self.state == MenuState.GAME_GAMEREAD_GAME2:
-            event = Event.READ_GAME(pgn_filename='picochess_game_2.pgn')
+            event = Event.READ_GAME(pgn_filename='picochess_game_2.pgn', game_number=0)
             Observable.fire(event)
             text = self._fire_dispatchdgt(self.dgttranslate.text('B10_okreadgame'))
 
         elif self.state == MenuState.GAME_GAMEREAD_GAME3:
-            event = Event.READ_GAME(pgn_filename='picochess_game_3.pgn')
+            event = Event.READ_GAME(pgn_filename='picochess_game_3.pgn', game_number=0)
             Observable.fire(event)
             text = self._fire_dispatchdgt(self.dgttranslate.text('B10_okreadgame'))
 
@@ -18,7 +18,7 @@
 import logging
 import queue
 from threading import Timer, Thread, Lock
-from copy import deepcopy
+from copy import copy
 from typing import Dict, Set
 
 from utilities import DisplayDgt, DispatchDgt, dispatch_queue
@@ -158,7 +158,7 @@ class Dispatcher(DispatchDgt, Thread):
                 logging.debug('received command from dispatch_queue: %s devs: %s', msg, ','.join(msg.devs))
 
                 for dev in msg.devs & self.devices:
-                    message = deepcopy(msg)
+                    message = copy(msg)  # shallow: only message.devs gets replaced per device
                     if self.maxtimer_running[dev]:
                         if hasattr(message, 'wait'):
                             if message.wait:
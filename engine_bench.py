@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import csv
+import datetime
+import json
+import logging
+import os
+import platform
+import statistics
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import chess  # type: ignore
+import chess.uci  # type: ignore
+
+from uci.engine import UciEngine, UciShell
+from uci.read import read_engine_ini
+
+# middlegame & endgame positions of the stockfish "bench" command
+BENCH_EPD = [
+    'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - id "bench01";',
+    '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - id "bench02";',
+    '4rrk1/pp1n3p/3q2pQ/2p1pb2/2PP4/2P3N1/P2B2PP/4RRK1 b - - id "bench03";',
+    'rq3rk1/ppp2ppp/1bnpb3/3N2B1/3NP3/7P/PPPQ1PP1/2KR3R w - - id "bench04";',
+    'r1bq1r1k/1pp1n1pp/1p1p4/4p2Q/4Pp2/1BNP4/PPP2PPP/3R1RK1 w - - id "bench05";',
+    'r3r1k1/2p2ppp/p1p1bn2/8/1q2P3/2NPQN2/PPP3PP/R4RK1 b - - id "bench06";',
+    'r1bbk1nr/pp3p1p/2n5/1N4p1/2Np1B2/8/PPP2PPP/2KR1B1R w kq - id "bench07";',
+    'r1bq1rk1/ppp1nppp/4n3/3p3Q/3P4/1BP1B3/PP1N2PP/R4RK1 w - - id "bench08";',
+    '4r1k1/r1q2ppp/ppp2n2/4P3/5Rb1/1N1BQ3/PPP3PP/R5K1 w - - id "bench09";',
+    '2rqkb1r/ppp2p2/2npb1p1/1N1Nn2p/2P1PP2/8/PP2B1PP/R1BQK2R b KQ - id "bench10";',
+    'r1bq1r1k/b1p1npp1/p2p3p/1p6/3PP3/1B2NN2/PP3PPP/R2Q1RK1 w - - id "bench11";',
+    '3r1rk1/p5pp/bpp1pp2/8/q1PP1P2/b3P3/P2NQRPP/1R2B1K1 b - - id "bench12";',
+    'r1q2rk1/2p1bppp/2Pp4/p6b/Q1PNp3/4B3/PP1R1PPP/2K4R w - - id "bench13";',
+    '4k2r/1pb2ppp/1p2p3/1R1p4/3P4/2r1PN2/P4PPP/1R4K1 b - - id "bench14";',
+    '3q2k1/pb3p1p/4pbp1/2r5/PpN2N2/1P2P2P/5PP1/Q2R2K1 b - - id "bench15";',
+    '8/8/8/8/5kp1/P7/8/1K1N4 w - - id "bench16";',
+    '8/8/3P3k/8/1p6/8/1P6/1K3n2 b - - id "bench17";',
+    '6k1/6p1/6Pp/ppp5/3pn2P/1P3K2/1PP2P2/8 b - - id "bench18";',
+]
+DEPTH = 12
+MOVETIME = 30000  # ms - upper limit per position, for weak levels which never reach DEPTH
+FIELDS = ['engine', 'name', 'level', 'position', 'depth', 'time_to_depth', 'time_to_bestmove', 'nodes', 'nps', 'bestmove', 'rss_mb']
+
+
+def read_epd(lines: List[str]) -> List[Tuple[str, chess.Board]]:
+    """Return (id, board) of the epd lines - the id is the line number if the epd has no id opcode."""
+    positions = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            board, operations = chess.Board.from_epd(line)
+            positions.append((str(operations.get('id', number)), board))
+    return positions
+
+
+class _BenchHandler(chess.uci.InfoHandler):
+
+    """Remember when the search reached the target depth."""
+
+    def __init__(self):
+        super(_BenchHandler, self).__init__()
+        self.target_depth = 0
+        self.started = 0.0
+        self.reached: Optional[float] = None
+
+    def on_go(self):
+        super(_BenchHandler, self).on_go()
+        self.started = time.perf_counter()
+        self.reached = None
+
+    def post_info(self):
+        if self.reached is None and self.info.get('depth', 0) >= self.target_depth:
+            self.reached = time.perf_counter() - self.started
+        super(_BenchHandler, self).post_info()
+
+
+class EngineBench(object):
+
+    """Search a position set with every engine (and level) and measure the speed and memory."""
+
+    def __init__(self, positions: List[Tuple[str, chess.Board]], depth=DEPTH, movetime=MOVETIME):
+        self.positions = positions
+        self.depth = depth
+        self.movetime = movetime
+        self.rows: List[Dict] = []
+        self.stopped = threading.Event()
+
+    def cancel(self):
+        """Stop after the current search."""
+        self.stopped.set()
+
+    def run(self, engines: List[Dict], with_levels=True, callback: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Bench the engines.ini entries - callback gets every result row."""
+        for eng in engines:
+            levels = list(eng['level_dict']) if with_levels and eng['level_dict'] else ['']
+            for level in levels:
+                if self.stopped.is_set():
+                    return self.rows
+                self.bench_engine(eng, level, callback)
+        return self.rows
+
+    def bench_engine(self, eng: Dict, level: str, callback: Optional[Callable[[Dict], None]] = None):
+        """Bench one engine level ('' = the options picochess uses without a level)."""
+        engine = UciEngine(file=eng['file'], uci_shell=UciShell(), mame_par='')
+        if not hasattr(engine, 'engine') or not engine.engine.is_alive():
+            logging.error('engine %s not started', eng['file'])
+            return
+        try:
+            engine.startup(eng['level_dict'][level] if level else {})
+            handler = _BenchHandler()
+            handler.target_depth = self.depth
+            engine.engine.info_handlers.append(handler)
+            for position, board in self.positions:
+                if self.stopped.is_set():
+                    break
+                row = self._search(engine, handler, board)
+                row.update(engine=os.path.basename(eng['file']), name=eng['name'], level=level, position=position)
+                self.rows.append(row)
+                if callback:
+                    callback(row)
+        except chess.uci.EngineTerminatedException:
+            logging.error('engine %s terminated', eng['file'])
+        finally:
+            engine.quit()
+
+    def _search(self, engine: UciEngine, handler: _BenchHandler, board: chess.Board) -> Dict:
+        engine.newgame(board)  # clear the hash for comparable results
+        engine.engine.isready()
+        result = engine.engine.go(depth=self.depth, movetime=self.movetime)
+        duration = time.perf_counter() - handler.started
+        with handler as info:
+            nodes = info.get('nodes')
+            nps = info.get('nps') or (int(nodes / info['time'] * 1000) if nodes and info.get('time') else None)
+            depth = info.get('depth')
+        return {'depth': depth,
+                'time_to_depth': round(handler.reached, 3) if handler.reached is not None else None,
+                'time_to_bestmove': round(duration, 3),
+                'nodes': nodes, 'nps': nps,
+                'bestmove': result.bestmove.uci() if result and result.bestmove else None,
+                'rss_mb': round(engine.rss_mb(), 1)}
+
+    def summary(self) -> List[Dict]:
+        """Return the mean/median values per engine level."""
+        groups: Dict[Tuple[str, str], List[Dict]] = {}
+        for row in self.rows:
+            groups.setdefault((row['engine'], row['level']), []).append(row)
+        summary = []
+        for (engine, level), rows in groups.items():
+            nps = [row['nps'] for row in rows if row['nps']]
+            to_depth = [row['time_to_depth'] for row in rows if row['time_to_depth'] is not None]
+            summary.append({'engine': engine, 'name': rows[0]['name'], 'level': level, 'positions': len(rows),
+                            'mean_nps': int(statistics.mean(nps)) if nps else None,
+                            'median_time_to_depth': round(statistics.median(to_depth), 3) if to_depth else None,
+                            'reached_depth': len(to_depth),
+                            'mean_time_to_bestmove': round(statistics.mean(row['time_to_bestmove'] for row in rows), 3),
+                            'max_rss_mb': max(row['rss_mb'] for row in rows)})
+        return summary
+
+    def write_csv(self, path: str):
+        """Write one line per engine level & position."""
+        with open(path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+    def write_json(self, path: str):
+        """Write the rows, the summary and the machine info."""
+        report = {'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                  'machine': platform.machine(), 'cpus': os.cpu_count(),
+                  'depth': self.depth, 'movetime': self.movetime, 'positions': len(self.positions),
+                  'summary': self.summary(), 'rows': self.rows}
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the engines of engines.ini on a standard position set.')
+    parser.add_argument('-p', '--engine-path', help='engine folder with engines.ini (default: engines/<machine>)')
+    parser.add_argument('-e', '--engines', nargs='*', help='only these engines (file names, eg. a-stockf)')
+    parser.add_argument('--epd', help='epd file with the positions (default: the stockfish bench positions)')
+    parser.add_argument('-d', '--depth', type=int, default=DEPTH, help='search depth (default: %(default)s)')
+    parser.add_argument('-t', '--movetime', type=int, default=MOVETIME, help='max. ms per position (default: %(default)s)')
+    parser.add_argument('-n', '--no-levels', action='store_true', help='bench only the default setting of each engine')
+    parser.add_argument('-o', '--output', default='engine_bench', help='report name, writes <output>.csv and <output>.json')
+    args = parser.parse_args()
+
+    if args.epd:
+        with open(args.epd) as file:
+            positions = read_epd(file.readlines())
+    else:
+        positions = read_epd(BENCH_EPD)
+    engines = read_engine_ini(engine_path=args.engine_path)
+    if args.engines:
+        engines = [eng for eng in engines if os.path.basename(eng['file']) in args.engines]
+    if not engines:
+        parser.error('no engines found - create engines.ini with build/engines.py first')
+
+    bench = EngineBench(positions, args.depth, args.movetime)
+
+    def show_row(row):
+        print('{engine:<12} {level:<12} {position:<10} depth {depth} in {time_to_bestmove}s {nps} nps {rss_mb} MB'.format(**row))
+
+    bench.run(engines, not args.no_levels, show_row)
+    bench.write_csv(args.output + '.csv')
+    bench.write_json(args.output + '.json')
+    print('report written to {0}.csv and {0}.json'.format(args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import chess  # type: ignore
+import chess.polyglot  # type: ignore
+import chess.uci  # type: ignore
+
+
+def eval_key(board: chess.Board, stage: str, engine='') -> str:
+    """
+    Return the cache key of a position - stage separates searches of different depth limits.
+
+    engine identifies the engine & its (evaluation relevant) options, so a stored file isn't reused by another engine.
+    """
+    return '{:016x}/{}/{}'.format(chess.polyglot.zobrist_hash(board), stage, engine)
+
+
+class EvalCache(object):
+
+    """
+    LRU cache of (multipv) engine evaluations, optionally backed by a sqlite file.
+
+    An entry is a dict with depth, lines (the multipv count of the search), pv {num: [uci moves]}
+    and score {num: [cp, mate]} - num keys are strings, so the entry is json compatible.
+    """
+
+    def __init__(self, maxsize=256, path: Optional[str] = None, disk_maxsize=20000, pv_length=10):
+        self.maxsize = maxsize
+        self.disk_maxsize = disk_maxsize
+        self.pv_length = pv_length
+        self.hits = 0
+        self.misses = 0
+        self._cache: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._puts = 0
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute('CREATE TABLE IF NOT EXISTS evals (key TEXT PRIMARY KEY, depth INTEGER, data TEXT, stamp REAL)')
+                self._db.commit()
+            except sqlite3.Error as db_exc:
+                logging.warning('cant open eval cache file %s: %s', path, db_exc)
+                self._db = None
+
+    def get(self, key: str, min_depth=0) -> Optional[Dict]:
+        """Return the entry with at least min_depth or None."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None and self._db is not None:
+                entry = self._db_get(key)
+                if entry is not None:
+                    self._store(key, entry)
+            if entry is None or entry['depth'] < min_depth:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, info: Dict, lines: int, min_depth=0):
+        """Store the pv/score/depth of an InfoHandler info dict - unless it's below min_depth or a deeper entry exists."""
+        depth = info.get('depth')
+        if not depth or depth < min_depth or not info['pv']:
+            return
+        entry = {'depth': depth, 'lines': lines, 'pv': {}, 'score': {}}
+        for num, moves in info['pv'].items():
+            score = info['score'].get(num)
+            if moves and score is not None:
+                entry['pv'][str(num)] = [move.uci() for move in moves[:self.pv_length]]
+                entry['score'][str(num)] = [score.cp, score.mate]
+        if not entry['pv']:
+            return
+        with self._lock:
+            old = self._cache.get(key)
+            if old is not None and (old['depth'], old['lines']) > (depth, lines):
+                return
+            self._store(key, entry)
+            if self._db is not None:
+                self._db_put(key, entry)
+
+    def _store(self, key: str, entry: Dict):
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def _db_get(self, key: str) -> Optional[Dict]:
+        try:
+            row = self._db.execute('SELECT data FROM evals WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error as db_exc:
+            logging.warning('eval cache read failed: %s', db_exc)
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _db_put(self, key: str, entry: Dict):
+        try:
+            self._db.execute('INSERT OR REPLACE INTO evals VALUES (?, ?, ?, ?)',
+                             (key, entry['depth'], json.dumps(entry), time.time()))
+            self._puts += 1
+            if self._puts % 100 == 0:
+                self._db.execute('DELETE FROM evals WHERE key IN (SELECT key FROM evals ORDER BY stamp DESC LIMIT -1 OFFSET ?)',
+                                 (self.disk_maxsize,))
+            self._db.commit()
+        except sqlite3.Error as db_exc:
+            logging.warning('eval cache write failed: %s', db_exc)
+
+    @staticmethod
+    def to_info_handler(entry: Dict, board: chess.Board) -> chess.uci.InfoHandler:
+        """Return an InfoHandler filled with the entry (as if the engine searched board)."""
+        handler = chess.uci.InfoHandler()
+        handler.info['depth'] = entry['depth']
+        for num, ucis in entry['pv'].items():
+            cp, mate = entry['score'][num]
+            handler.info['pv'][int(num)] = [chess.Move.from_uci(uci) for uci in ucis]
+            handler.info['score'][int(num)] = chess.uci.Score(cp, mate)
+        return handler
+
+    def clear(self):
+        """Remove all positions from memory and reset the counters (the file is kept)."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+    def close(self):
+        """Close the sqlite file."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit/miss counters and the current size."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache), 'maxsize': self.maxsize}
@@ -0,0 +1,262 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import json
+import logging
+import os
+import threading
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import chess  # type: ignore
+import chess.pgn  # type: ignore
+import chess.polyglot  # type: ignore
+
+GAMES_FOLDER = 'games'
+INDEX_SUFFIX = '.idx'
+
+
+class _IndexVisitor(chess.pgn.BaseVisitor):
+
+    """Collect the headers, the ply count and the final position of a game without building a game tree."""
+
+    def __init__(self):
+        self.headers: Dict[str, str] = {}
+        self.board: Optional[chess.Board] = None
+        self.plies = 0
+        self.variations = 0
+        self.error = False
+
+    def visit_header(self, tagname, tagvalue):
+        self.headers[tagname] = tagvalue
+
+    def begin_variation(self):
+        self.variations += 1
+
+    def end_variation(self):
+        self.variations -= 1
+
+    def visit_move(self, board, move):
+        if not self.variations:
+            if self.board is None:
+                self.board = board.copy(stack=False)
+            self.board.push(move)
+            self.plies += 1
+
+    def visit_result(self, result):
+        if self.headers.get('Result', '*') == '*':
+            self.headers['Result'] = result
+
+    def result(self):
+        return self
+
+    def final_board(self) -> chess.Board:
+        if self.board is not None:
+            return self.board
+        try:
+            return chess.Board(self.headers['FEN']) if 'FEN' in self.headers else chess.Board()
+        except ValueError:
+            return chess.Board()
+
+    def handle_error(self, error):
+        logging.debug('pgn error: %s', error)
+        self.error = True
+
+
+def _split_games(file: BinaryIO) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Split the pgn file (from its read position) into the texts of the games - yield (offset, end, text).
+
+    A game starts at its first header line or at a move text after a blank line, so a game which isn't
+    followed by a blank line doesn't swallow the headers of the next one (like read_game() does).
+    """
+    offset = end = file.tell()
+    lines: List[bytes] = []
+    moves = blank = False
+    for line in file:
+        text = not line.isspace() and not line.startswith((b'%', b';'))
+        if text and moves and (blank or line.startswith(b'[')):
+            yield offset, end, b''.join(lines)
+            lines, moves = [], False
+        if lines or text:
+            if not lines:
+                offset = end
+            lines.append(line)
+        if text:
+            moves = moves or not line.startswith(b'[')
+            blank = False
+        elif line.isspace():
+            blank = True
+        end += len(line)
+    if lines:
+        yield offset, end, b''.join(lines)
+
+
+def _entry(offset: int, end: int, headers: Dict[str, str], board: chess.Board, plies: int) -> Dict:
+    return {'offset': offset, 'end': end, 'headers': headers, 'result': headers.get('Result', '*'),
+            'plies': plies, 'key': chess.polyglot.zobrist_hash(board)}
+
+
+class GameArchive(object):
+
+    """
+    Growing pgn file of the saved games with a sidecar index (<file>.idx, one json line per game).
+
+    The index holds the byte offset, the headers, the result, the ply count and the zobrist key of the
+    final position of each game, so the games can be listed & filtered without reading the pgn file
+    and the Nth game is loaded with one seek. Games appended by other programs are indexed on the next call.
+    """
+
+    default_name = 'games.pgn'  # the --pgn-file in the games folder
+
+    def __init__(self, path: str, index_path: Optional[str] = None):
+        self.path = path
+        self.index_path = index_path or path + INDEX_SUFFIX
+        self._entries: List[Dict] = []
+        self._end = 0  # size of the pgn file covered by the index (incl. unreadable games)
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _read_index(self) -> List[Dict]:
+        entries = []
+        try:
+            with open(self.index_path, encoding='utf-8') as file:
+                for line in file:
+                    entries.append(json.loads(line))
+        except OSError:
+            pass
+        except ValueError:
+            logging.warning('damaged game index %s - indexing %s again', self.index_path, self.path)
+            entries = []
+            self._write_index(entries)
+        return entries
+
+    def _write_index(self, entries: List[Dict], mode='w'):
+        with open(self.index_path, mode, encoding='utf-8') as file:
+            file.writelines(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries)
+
+    def _sync(self):
+        """Load the index and bring it up to the current size of the pgn file."""
+        if not self._loaded:
+            self._entries = self._read_index()
+            self._end = self._entries[-1]['end'] if self._entries else 0
+            self._loaded = True
+        size = os.path.getsize(self.path) if os.path.isfile(self.path) else 0
+        if size < self._end:
+            logging.warning('%s is smaller than its index - indexing it again', self.path)
+            self._entries = []
+            self._write_index(self._entries)
+            self._end = 0
+        if size > self._end:
+            self._index_tail(self._end)
+
+    def _index_tail(self, start: int):
+        added = []
+        with open(self.path, 'rb') as file:
+            file.seek(start)
+            for offset, end, text in _split_games(file):
+                visitor = chess.pgn.read_game(io.StringIO(text.decode('utf-8', errors='replace')), Visitor=_IndexVisitor)
+                if visitor is None or visitor.error or (not visitor.plies and not visitor.headers):
+                    continue
+                added.append(_entry(offset, end, visitor.headers, visitor.final_board(), visitor.plies))
+            self._end = file.tell()
+        if added:
+            logging.debug('%i games of %s indexed', len(added), self.path)
+            self._entries.extend(added)
+            self._write_index(added, 'a')
+
+    def preload(self):
+        """Load & update the index in the background (eg. at startup) - a long pgn file takes some seconds."""
+        threading.Thread(target=self.count, name='game_archive_preload', daemon=True).start()
+
+    def append(self, game: chess.pgn.Game) -> int:
+        """Append the game to the pgn file and the index - return its number."""
+        text = (str(game) + '\n\n').encode('utf-8')
+        with self._lock:
+            self._sync()
+            with open(self.path, 'ab+') as file:
+                offset = file.tell()
+                if offset:
+                    file.seek(offset - 1)
+                    if file.read(1) != b'\n':
+                        text = b'\n\n' + text
+                file.write(text)
+                end = self._end = file.tell()
+            board = game.end().board()
+            entry = _entry(offset, end, dict(game.headers), board, len(board.move_stack))
+            self._entries.append(entry)
+            self._write_index([entry], 'a')
+            return len(self._entries) - 1
+
+    def count(self) -> int:
+        """Return the number of games."""
+        with self._lock:
+            self._sync()
+            return len(self._entries)
+
+    def games(self, start=0, length: Optional[int] = None, player='', result='', text='', key: Optional[int] = None) -> List[Dict]:
+        """
+        Return the index entries (incl. their number) of the games matching all given filters.
+
+        player and text are case insensitive parts of the White/Black resp. any header, key is the zobrist
+        key of the final position.
+        """
+        player, text = player.lower(), text.lower()
+        with self._lock:
+            self._sync()
+            matches = []
+            for number, entry in enumerate(self._entries):
+                headers = entry['headers']
+                if player and player not in headers.get('White', '').lower() and player not in headers.get('Black', '').lower():
+                    continue
+                if result and entry['result'] != result:
+                    continue
+                if text and not any(text in value.lower() for value in headers.values()):
+                    continue
+                if key is not None and entry['key'] != key:
+                    continue
+                matches.append(dict(entry, number=number))
+        return matches[start:] if length is None else matches[start:start + length]
+
+    def _read(self, number: int) -> bytes:
+        with self._lock:
+            self._sync()
+            entry = self._entries[number]
+        with open(self.path, 'rb') as file:
+            file.seek(entry['offset'])
+            return file.read(entry['end'] - entry['offset'])
+
+    def pgn(self, number: int) -> str:
+        """Return the pgn text of the game (negative numbers count from the last game) - IndexError if there's none."""
+        return self._read(number).decode('utf-8', errors='replace').strip()
+
+    def load(self, number: int) -> chess.pgn.Game:
+        """Return the game (negative numbers count from the last game) - IndexError if there's none."""
+        return chess.pgn.read_game(io.StringIO(self.pgn(number)))
+
+
+_archives: Dict[str, GameArchive] = {}
+_archives_lock = threading.Lock()
+
+
+def get_archive(path: Optional[str] = None) -> GameArchive:
+    """Return the shared archive of the pgn file (default: the --pgn-file of picochess)."""
+    path = os.path.abspath(path or os.path.join(GAMES_FOLDER, GameArchive.default_name))
+    with _archives_lock:
+        if path not in _archives:
+            _archives[path] = GameArchive(path)
+        return _archives[path]
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import array
+import glob
+import heapq
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+import chess  # type: ignore
+import chess.pgn  # type: ignore
+import chess.polyglot  # type: ignore
+
+PROGRAM_PATH = os.path.dirname(os.path.realpath(__file__))
+DB_FOLDER = os.path.join(PROGRAM_PATH, 'gamesdb', 'db')
+PGN_FOLDERS = [os.path.join(PROGRAM_PATH, 'games'), os.path.join(PROGRAM_PATH, 'engines', 'pgn_engine', 'pgn_games')]
+
+# games.bin: one record per game - header offset, first move, plies, white elo, black elo, year, result
+GAME_STRUCT = struct.Struct('>QQHHHHB')
+# moves.bin: from square | to square << 6 | promotion piece << 12
+MOVE_STRUCT = struct.Struct('>H')
+# positions-NNN.bin: sorted (zobrist hash, game) - one segment per ingest run
+POSITION_STRUCT = struct.Struct('>QI')
+# manifest.json: games.bin size & segments of the last finished ingest - replaced atomically, the lookups key on it
+RESULTS = ['*', '1-0', '0-1', '1/2-1/2']
+INDEX_PLIES = 40  # positions after this ply arent indexed (almost every game is unique there)
+RUN_SIZE = 1000000  # positions sorted in memory before they go to a temporary run file
+SORTS = {'elo': lambda record: record[3] + record[4], 'date': lambda record: record[5], 'number': None}
+RANKED_SIZE = 16  # sorted game lists (of the position & sort) kept for the next pages
+
+
+def encode_move(move: chess.Move) -> int:
+    return move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+
+
+def decode_move(value: int) -> chess.Move:
+    return chess.Move(value & 0x3f, value >> 6 & 0x3f, value >> 12 or None)
+
+
+def _int(text: str) -> int:
+    try:
+        return max(0, min(0xffff, int(text)))
+    except ValueError:
+        return 0
+
+
+def pgn_files(paths: List[str]) -> List[str]:
+    """Return the pgn files of the paths (files or folders, searched recursively)."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '**', '*.pgn'), recursive=True)))
+        else:
+            files.append(path)
+    return files
+
+
+class _GameVisitor(chess.pgn.BaseVisitor):
+
+    """Collect the headers and the mainline moves of a game without building a game tree."""
+
+    def __init__(self):
+        self.headers: Dict[str, str] = {}
+        self.moves: List[chess.Move] = []
+        self.variations = 0
+        self.error = False
+
+    def visit_header(self, tagname, tagvalue):
+        self.headers[tagname] = tagvalue
+
+    def begin_variation(self):
+        self.variations += 1
+
+    def end_variation(self):
+        self.variations -= 1
+
+    def visit_move(self, board, move):
+        if not self.variations:
+            self.moves.append(move)
+
+    def visit_result(self, result):
+        if self.headers.get('Result', '*') == '*':
+            self.headers['Result'] = result
+
+    def result(self):
+        return self
+
+    def handle_error(self, error):
+        logging.debug('pgn error: %s', error)
+        self.error = True
+
+
+class GameDb(object):
+
+    """
+    Game database for the web explorer (the get_games api of the scid gamesdb server).
+
+    The pgn collections are read in one streaming pass into flat files (game records, 16 bit moves,
+    json headers) and a sorted zobrist hash index of the first positions of each game. The files are
+    memory mapped for the lookups. An ingest publishes its games & segments in manifest.json once it's
+    finished - another ingest (eg. by the command line) is seen by the next lookup after that.
+    """
+
+    def __init__(self, folder=DB_FOLDER, maxsize=256, index_plies=INDEX_PLIES):
+        self.folder = folder
+        self.maxsize = maxsize
+        self.index_plies = index_plies
+        self.hits = 0
+        self.misses = 0
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._segments: List[mmap.mmap] = []
+        self._games_size = 0
+        self._stamp: Optional[Tuple] = ()  # of the manifest mapped (None: no manifest)
+        self._cache: 'OrderedDict[Tuple, Dict]' = OrderedDict()
+        self._ranked: 'OrderedDict[Tuple, array.array]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.folder, name)
+
+    # ingest
+
+    def ingest(self, paths: List[str], callback: Optional[Callable[[str, int], None]] = None) -> int:
+        """
+        Add the games of the pgn files (or folders) - returns the number of added games, callback gets the count per file.
+
+        The read position of every file is remembered, so files which only grew (like games/games.pgn)
+        are continued and unchanged files are skipped on the next ingest.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        sources = self._read_sources()
+        added = 0
+        runs: List[str] = []
+        buffer: List[int] = []
+        with open(self._path('games.bin'), 'ab') as games, open(self._path('moves.bin'), 'ab') as moves, \
+                open(self._path('headers.bin'), 'ab') as headers:
+            number = games.tell() // GAME_STRUCT.size
+            for path in pgn_files(paths):
+                source = os.path.abspath(path)
+                file_added = 0
+                start = sources.get(source, 0)
+                if start > os.path.getsize(path):
+                    logging.warning('%s is smaller than at the last ingest - reading it again', path)
+                    start = 0
+                with open(path, encoding='utf-8', errors='replace') as file:
+                    file.seek(start)
+                    while True:
+                        visitor = chess.pgn.read_game(file, Visitor=_GameVisitor)
+                        if visitor is None:
+                            break
+                        if visitor.error or (not visitor.moves and not visitor.headers):
+                            continue
+                        buffer.extend(self._write_game(number, visitor, games, moves, headers))
+                        number += 1
+                        file_added += 1
+                        if len(buffer) >= RUN_SIZE:
+                            runs.append(self._write_run(buffer))
+                            buffer = []
+                    sources[source] = file.tell()
+                added += file_added
+                if callback:
+                    callback(path, file_added)
+        if buffer:
+            runs.append(self._write_run(buffer))
+        if runs:
+            self._merge_runs(runs)
+        self._write_sources(sources)
+        self._write_manifest(number * GAME_STRUCT.size)
+        return added
+
+    def _write_game(self, number: int, visitor: _GameVisitor, games: BinaryIO, moves: BinaryIO, headers: BinaryIO) -> List[int]:
+        tags = visitor.headers
+        try:
+            board = chess.Board(tags['FEN']) if 'FEN' in tags else chess.Board()
+        except ValueError:
+            board = chess.Board()
+        keys = {chess.polyglot.zobrist_hash(board)}
+        for ply, move in enumerate(visitor.moves):
+            if ply >= self.index_plies:
+                break
+            board.push(move)
+            keys.add(chess.polyglot.zobrist_hash(board))
+
+        header_offset = headers.tell()
+        headers.write(json.dumps(tags, ensure_ascii=False).encode('utf-8') + b'\n')
+        move_offset = moves.tell() // MOVE_STRUCT.size
+        moves.write(b''.join(MOVE_STRUCT.pack(encode_move(move)) for move in visitor.moves))
+        result = RESULTS.index(tags.get('Result', '*')) if tags.get('Result', '*') in RESULTS else 0
+        games.write(GAME_STRUCT.pack(header_offset, move_offset, min(len(visitor.moves), 0xffff),
+                                     _int(tags.get('WhiteElo', '')), _int(tags.get('BlackElo', '')),
+                                     _int(tags.get('Date', '').split('.')[0]), result))
+        return [key << 32 | number for key in keys]
+
+    def _write_run(self, buffer: List[int]) -> str:
+        buffer.sort()
+        descriptor, path = tempfile.mkstemp(prefix='run-', dir=self.folder)
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(b''.join(POSITION_STRUCT.pack(value >> 32, value & 0xffffffff) for value in buffer))
+        return path
+
+    @staticmethod
+    def _read_run(path: str) -> Iterator[int]:
+        with open(path, 'rb') as file:
+            while True:
+                chunk = file.read(POSITION_STRUCT.size * 4096)
+                if not chunk:
+                    break
+                for key, number in POSITION_STRUCT.iter_unpack(chunk):
+                    yield key << 32 | number
+
+    def _merge_runs(self, runs: List[str]):
+        segment = len(glob.glob(self._path('positions-*.bin')))
+        temp = self._path('positions.tmp')
+        with open(temp, 'wb') as file:
+            for value in heapq.merge(*[self._read_run(run) for run in runs]):
+                file.write(POSITION_STRUCT.pack(value >> 32, value & 0xffffffff))
+        os.replace(temp, self._path('positions-{:03d}.bin'.format(segment)))
+        for run in runs:
+            os.remove(run)
+
+    def _read_sources(self) -> Dict[str, int]:
+        try:
+            with open(self._path('sources.json')) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_sources(self, sources: Dict[str, int]):
+        with open(self._path('sources.json'), 'w') as file:
+            json.dump(sources, file, indent=1)
+
+    def _write_manifest(self, games_size: int):
+        temp = self._path('manifest.tmp')
+        with open(temp, 'w') as file:
+            json.dump({'games': games_size, 'segments': sorted(os.path.basename(path) for path in glob.glob(self._path('positions-*.bin')))}, file)
+        os.replace(temp, self._path('manifest.json'))
+
+    def _read_manifest(self) -> Dict:
+        try:
+            with open(self._path('manifest.json')) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            pass
+        try:  # a database of an older version - the next ingest writes the manifest
+            games_size = os.path.getsize(self._path('games.bin'))
+        except OSError:
+            games_size = 0
+        return {'games': games_size, 'segments': sorted(os.path.basename(path) for path in glob.glob(self._path('positions-*.bin')))}
+
+    # lookup
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self._path('manifest.json'))
+            stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        if stamp == self._stamp:
+            return
+        self._unmap()
+        self._stamp = stamp
+        manifest = self._read_manifest()
+        if not manifest['games']:
+            return
+        for name in ('games.bin', 'moves.bin', 'headers.bin'):
+            self._maps[name] = self._map(self._path(name))
+        self._segments = [self._map(self._path(name)) for name in manifest['segments']]
+        self._segments = [segment for segment in self._segments if segment is not None]
+        self._games_size = manifest['games']  # games.bin might be longer already (a running ingest)
+
+    @staticmethod
+    def _map(path: str) -> Optional[mmap.mmap]:
+        try:
+            with open(path, 'rb') as file:
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # ValueError: empty file
+            return None
+
+    def _unmap(self):
+        for data in list(self._maps.values()) + self._segments:
+            if data is not None:
+                data.close()
+        self._maps = {}
+        self._segments = []
+        self._games_size = 0
+        self._cache.clear()
+        self._ranked.clear()
+
+    def _numbers(self, key: int) -> Iterator[int]:
+        for segment in self._segments:
+            low, high = 0, len(segment) // POSITION_STRUCT.size
+            while low < high:
+                mid = (low + high) // 2
+                if POSITION_STRUCT.unpack_from(segment, mid * POSITION_STRUCT.size)[0] < key:
+                    low = mid + 1
+                else:
+                    high = mid
+            size = len(segment) // POSITION_STRUCT.size
+            while low < size:
+                entry_key, number = POSITION_STRUCT.unpack_from(segment, low * POSITION_STRUCT.size)
+                if entry_key != key:
+                    break
+                yield number
+                low += 1
+
+    def _record(self, number: int) -> Tuple:
+        return GAME_STRUCT.unpack_from(self._maps['games.bin'], number * GAME_STRUCT.size)
+
+    def _game(self, number: int) -> chess.pgn.Game:
+        header_offset, move_offset, plies, _, _, _, _ = self._record(number)
+        headers = self._maps['headers.bin']
+        tags = json.loads(headers[header_offset:headers.find(b'\n', header_offset)].decode('utf-8'))
+        game = chess.pgn.Game()
+        for tag, value in tags.items():
+            game.headers[tag] = value
+        if 'FEN' in tags:
+            try:
+                game.setup(tags['FEN'])
+            except ValueError:
+                pass
+        node = game
+        moves = self._maps['moves.bin']
+        for ply in range(plies):
+            node = node.add_main_variation(decode_move(MOVE_STRUCT.unpack_from(moves, (move_offset + ply) * MOVE_STRUCT.size)[0]))
+        return game
+
+    def count(self) -> int:
+        """Return the number of games."""
+        with self._lock:
+            self._refresh()
+            return self._games_size // GAME_STRUCT.size
+
+    def games(self, board: chess.Board, sort='elo', start=0, length=5) -> Tuple[int, List[chess.pgn.Game]]:
+        """Return the number of games with the position and one page of them - sorted by elo, date (newest first) or number."""
+        with self._lock:
+            self._refresh()
+            total, numbers = self._page(chess.polyglot.zobrist_hash(board), SORTS[sort], start, length)
+            return total, [self._game(number) for number in numbers]
+
+    def _page(self, key: int, sort_key, start: int, length: int) -> Tuple[int, List[int]]:
+        if not self._segments:
+            return 0, []
+        total = 0
+        if sort_key is None:
+            numbers = []
+            for number in self._numbers(key):
+                if start <= total < start + length:
+                    numbers.append(number)
+                total += 1
+            return total, numbers
+
+        # all games of the position sorted once (best first, equal ones by number) - a page is a slice then
+        ranked_key = (key, sort_key)
+        numbers = self._ranked.get(ranked_key)
+        if numbers is None:
+            numbers = array.array('I', sorted(self._numbers(key), key=lambda number: (-sort_key(self._record(number)), number)))
+            self._ranked[ranked_key] = numbers
+            if len(self._ranked) > RANKED_SIZE:
+                self._ranked.popitem(last=False)
+        else:
+            self._ranked.move_to_end(ranked_key)
+        return len(numbers), numbers[start:start + length].tolist()
+
+    def query(self, fen: str, sort='elo', start=0, length=5) -> Dict:
+        """Return the get_games json of one page (cached) - the rows look like the ones of the old scid server."""
+        if sort not in SORTS:
+            sort = 'elo'
+        try:
+            board = chess.Board(fen)
+        except ValueError:
+            logging.debug('invalid fen for the game database: %s', fen)
+            return {'data': [], 'recordsTotal': 0}
+        cache_key = (chess.polyglot.zobrist_hash(board), sort, start, length)
+        with self._lock:
+            self._refresh()
+            result = self._cache.get(cache_key)
+            if result is not None:
+                self._cache.move_to_end(cache_key)
+                self.hits += 1
+                return result
+            self.misses += 1
+        total, games = self.games(board, sort, start, length)
+        data = []
+        for game in games:
+            headers = game.headers
+            white_elo = ' ({})'.format(headers['WhiteElo']) if _int(headers.get('WhiteElo', '')) else ''
+            black_elo = ' ({})'.format(headers['BlackElo']) if _int(headers.get('BlackElo', '')) else ''
+            data.append({'white': headers.get('White', '?') + white_elo, 'black': headers.get('Black', '?') + black_elo,
+                         'result': headers.get('Result', '*'),
+                         'event': '{}, {}'.format(headers.get('Date', '????').split('.')[0], headers.get('Event', '?')),
+                         'pgn': str(game)})
+        result = {'data': data, 'recordsTotal': total}
+        with self._lock:
+            self._cache[cache_key] = result
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit/miss counters, the current size and the number of games & index segments."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache), 'maxsize': self.maxsize,
+                    'games': self._games_size // GAME_STRUCT.size, 'segments': len(self._segments), 'ranked': len(self._ranked)}
+
+    def clear(self):
+        """Remove all games."""
+        with self._lock:
+            self._unmap()
+            self._stamp = ()
+            names = ['manifest.json', 'games.bin', 'moves.bin', 'headers.bin', 'sources.json'] + glob.glob(self._path('positions-*.bin'))
+            for name in names:
+                path = self._path(os.path.basename(name))
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def close(self):
+        """Unmap the files."""
+        with self._lock:
+            self._unmap()
+            self._stamp = ()
+
+
+game_db = GameDb()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add pgn files to the game database of the web explorer.')
+    parser.add_argument('paths', nargs='*', help='pgn files or folders (default: games and the pgn engine games)')
+    parser.add_argument('-d', '--db-folder', default=DB_FOLDER, help='database folder (default: %(default)s)')
+    parser.add_argument('-p', '--index-plies', type=int, default=INDEX_PLIES,
+                        help='index the positions of the first plies of each game (default: %(default)s)')
+    parser.add_argument('-r', '--rebuild', action='store_true', help='remove the database before adding the games')
+    args = parser.parse_args()
+
+    database = GameDb(args.db_folder, index_plies=args.index_plies)
+    if args.rebuild:
+        database.clear()
+    added = database.ingest(args.paths or PGN_FOLDERS, lambda path, games: print('{} ({} games)'.format(path, games)))
+    print('{} games added, {} games in {}'.format(added, database.count(), args.db_folder))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import chess  # type: ignore
+import chess.polyglot  # type: ignore
+
+
+class LegalFenCache(object):
+
+    """LRU cache of {board_fen: move} for all legal moves of a position, keyed by its zobrist hash."""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: 'OrderedDict[int, Dict[str, chess.Move]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def compute(board: chess.Board) -> Dict[str, chess.Move]:
+        """Compute the {board_fen: move} dict (in legal_moves order) without using the cache."""
+        board = board.copy(stack=False)
+        fen_moves = {}
+        for move in board.legal_moves:
+            board.push(move)
+            fen_moves[board.board_fen()] = move
+            board.pop()
+        return fen_moves
+
+    def get(self, board: chess.Board) -> Dict[str, chess.Move]:
+        """Return the {board_fen: move} dict for the given position - dont modify the result."""
+        key = chess.polyglot.zobrist_hash(board)
+        with self._lock:
+            fen_moves = self._cache.get(key)
+            if fen_moves is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return fen_moves
+            self.misses += 1
+        fen_moves = self.compute(board)
+        with self._lock:
+            self._cache[key] = fen_moves
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return fen_moves
+
+    def clear(self):
+        """Remove all positions and reset the counters."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit/miss counters and the current size."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache), 'maxsize': self.maxsize}
+
+
+legal_fen_cache = LegalFenCache()
+
+
+class FenResolver(object):
+
+    """Resolve board fens sent by the eboard to the legal move of a position."""
+
+    def __init__(self, board: Optional[chess.Board] = None):
+        self.fen_moves: Dict[str, chess.Move] = legal_fen_cache.get(board) if board is not None else {}
+
+    def __contains__(self, fen):
+        return fen in self.fen_moves
+
+    def __iter__(self):
+        return iter(self.fen_moves)
+
+    def __len__(self):
+        return len(self.fen_moves)
+
+    def __repr__(self):
+        return 'FenResolver({} fens)'.format(len(self.fen_moves))
+
+    def move(self, fen: str) -> Optional[chess.Move]:
+        """Return the move leading to fen or None."""
+        return self.fen_moves.get(fen)
+
+
+def takeback_plies(board: chess.Board, fen: str) -> int:
+    """Return the number of plies to take back until board_fen equals fen - 0 if fen never happend in the game."""
+    board = board.copy()
+    plies = 0
+    while board.move_stack:
+        board.pop()
+        plies += 1
+        if board.board_fen() == fen:
+            return plies
+    return 0
@@ -0,0 +1,100 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import queue
+import threading
+import time
+import weakref
+from typing import Dict
+
+# upper bounds (in ms) of the histogram buckets - the last bucket counts everything above
+BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class Histogram(object):
+
+    """Thread safe duration histogram with fixed millisecond buckets."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, duration: float):
+        """Add a duration (in seconds)."""
+        millis = duration * 1000
+        index = 0
+        while index < len(BUCKETS_MS) and millis > BUCKETS_MS[index]:
+            index += 1
+        with self.lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.total += millis
+            self.maximum = max(self.maximum, millis)
+
+    def snapshot(self) -> Dict:
+        """Return the histogram as json compatible dict."""
+        with self.lock:
+            buckets = {'<={}ms'.format(bound): count for bound, count in zip(BUCKETS_MS, self.buckets)}
+            buckets['>{}ms'.format(BUCKETS_MS[-1])] = self.buckets[-1]
+            return {'count': self.count,
+                    'avg_ms': round(self.total / self.count, 3) if self.count else 0.0,
+                    'max_ms': round(self.maximum, 3),
+                    'buckets': buckets}
+
+
+queue_registry: 'weakref.WeakSet[TimedQueue]' = weakref.WeakSet()  # for the metrics - a queue is dropped with its owner
+
+
+class TimedQueue(queue.Queue):
+
+    """Queue which timestamps each item on put and measures its waiting time on get."""
+
+    def __init__(self, name: str, maxsize=0):
+        super(TimedQueue, self).__init__(maxsize)
+        self.name = name
+        self.wait_time = Histogram()
+        self.max_depth = 0
+        queue_registry.add(self)
+
+    def _put(self, item):
+        self.queue.append((time.perf_counter(), item))
+        self.max_depth = max(self.max_depth, len(self.queue))
+
+    def _get(self):
+        enqueued, item = self.queue.popleft()
+        self.wait_time.add(time.perf_counter() - enqueued)
+        return item
+
+    def snapshot(self) -> Dict:
+        """Return the depth gauges and the wait histogram."""
+        return {'depth': self.qsize(), 'max_depth': self.max_depth, 'wait': self.wait_time.snapshot()}
+
+
+def queue_metrics() -> Dict[str, Dict]:
+    """Return the snapshots of all timed queues by name (same named queues get a number added)."""
+    result: Dict[str, Dict] = {}
+    for timed_queue in sorted(queue_registry, key=lambda timed_queue: timed_queue.name):
+        name = timed_queue.name
+        number = 1
+        while name in result:
+            number += 1
+            name = '{}#{}'.format(timed_queue.name, number)
+        result[name] = timed_queue.snapshot()
+    return result
@@ -16,6 +16,8 @@ from threading import Timer
 
 import chess  # type: ignore
 
+from legal_fens import legal_fen_cache
+
 
 class MoveDebouncer(object):
     """
@@ -75,21 +77,18 @@ class MoveDebouncer(object):
 
     def _is_move_extendable(self, previous_fen: str, fen: str):
         board = self._board_from_fen(previous_fen, 'b')
-        legal_moves = board.legal_moves
-        legal_fens = self._legal_fens(board, legal_moves)
+        legal_fens = legal_fen_cache.get(board)
         result = False
         if fen in legal_fens:
-            result = self._is_extendable(board, legal_moves, legal_fens.index(fen))
+            result = self._is_extendable(board, legal_fens.values(), legal_fens[fen])
         else:
             board = self._board_from_fen(previous_fen, 'w')
-            legal_moves = board.legal_moves
-            legal_fens = self._legal_fens(board, legal_moves)
+            legal_fens = legal_fen_cache.get(board)
             if fen in legal_fens:
-                result = self._is_extendable(board, legal_moves, legal_fens.index(fen))
+                result = self._is_extendable(board, legal_fens.values(), legal_fens[fen])
         return result
 
-    def _is_extendable(self, board: chess.Board, legal_moves: list, index: int):
-        move = list(legal_moves)[index]
+    def _is_extendable(self, board: chess.Board, legal_moves, move: chess.Move):
         if board.piece_type_at(move.from_square) == chess.KNIGHT:
             return False
         for m in legal_moves:
@@ -99,12 +98,3 @@ class MoveDebouncer(object):
 
     def _board_from_fen(self, board_fen: str, color: str):
         return chess.Board(board_fen + ' ' + color + ' - - 0 1')
-
-    def _legal_fens(self, b: chess.Board, legal_moves: list):
-        board = b.copy()
-        fens = []
-        for move in legal_moves:
-            board.push(move)
-            fens.append(board.board_fen())
-            board.pop()
-        return fens
@@ -0,0 +1,177 @@
+# Copyright (C) 2013-2019 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import csv
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+INDEX_CACHE_VERSION = 1
+
+
+class _OpeningNode(object):
+
+    """One SAN move inside the opening trie."""
+
+    __slots__ = ('children', 'opening')
+
+    def __init__(self):
+        self.children: Dict[str, _OpeningNode] = {}
+        self.opening: Optional[Tuple[str, str, str]] = None
+
+
+class OpeningIndex(object):
+
+    """Prebuilt lookup tables for opening names (by SAN moves and by board FEN)."""
+
+    def __init__(self):
+        self.root = _OpeningNode()
+        self.fen_names: Dict[str, str] = {}
+        self.openings: List[Tuple[str, str, str]] = []
+        self.size = 0
+
+    def add_opening(self, eco: str, opening_name: str, moves: str):
+        """Add an opening to the move trie - the first entry for a move sequence wins."""
+        node = self.root
+        for san in moves.split():
+            node = node.children.setdefault(san, _OpeningNode())
+        if node is not self.root and node.opening is None:
+            node.opening = (opening_name, moves, eco)
+            self.openings.append((eco, opening_name, moves))
+            self.size += 1
+
+    def add_fen_opening(self, fen: str, opening_name: str):
+        """Add an opening name for a board fen - the first entry for a position wins."""
+        self.fen_names.setdefault(fen, opening_name)
+
+    def longest_match(self, played: str) -> Tuple[str, str, str]:
+        """Return (opening_name, moves, eco) of the longest opening which is a prefix of played."""
+        opening_name = moves = eco = ''
+        node = self.root
+        for san in played.split():
+            node = node.children.get(san)
+            if node is None:
+                break
+            if node.opening is not None:
+                opening_name, moves, eco = node.opening
+        return opening_name, moves, eco
+
+    def fen_opening(self, fen: str) -> str:
+        """Return the opening name for a board fen or an empty string."""
+        return self.fen_names.get(fen, '')
+
+    def load_eco_file(self, file_name: str):
+        """Read the openings from the chess-eco_pos.txt file."""
+        try:
+            with open(file_name) as fp:
+                for row in csv.DictReader(filter(lambda row: row[0] != '#', fp.readlines()), delimiter='|'):
+                    self.add_opening(row.get('eco') or '', row.get('opening_name') or '', row.get('moves') or '')
+        except EnvironmentError:
+            logging.warning('cant read opening file %s', file_name)
+
+    def load_fen_file(self, file_name: str):
+        """Read the openings from the opening_name_fen.txt file (fen line followed by its name line)."""
+        try:
+            with open(file_name) as fp:
+                lines = fp.readlines()
+        except EnvironmentError:
+            logging.warning('cant read opening file %s', file_name)
+            return
+        self.add_fen_lines(lines)
+
+    def add_fen_lines(self, lines: List[str]):
+        """Add the (fen, name) line pairs - the name keeps its line ending like in the file."""
+        for index in range(0, len(lines) - 1, 2):
+            line_list = lines[index].split()
+            if line_list:
+                self.add_fen_opening(line_list[0], lines[index + 1])
+
+    @classmethod
+    def from_files(cls, eco_file='chess-eco_pos.txt', fen_file='opening_name_fen.txt'):
+        """Build the index from both opening files."""
+        index = cls()
+        index.load_eco_file(eco_file)
+        index.load_fen_file(fen_file)
+        logging.debug('opening index: %i move sequences, %i positions', index.size, len(index.fen_names))
+        return index
+
+    def save_cache(self, cache_file: str, stamp: List):
+        """Write the (already deduplicated) index as json together with the source file stamp."""
+        data = {'version': INDEX_CACHE_VERSION, 'stamp': stamp,
+                'openings': self.openings, 'fens': list(self.fen_names.items())}
+        try:
+            with open(cache_file + '.tmp', 'w') as fp:
+                json.dump(data, fp, separators=(',', ':'))
+            os.replace(cache_file + '.tmp', cache_file)
+        except (EnvironmentError, TypeError, ValueError):
+            logging.warning('cant write opening cache %s', cache_file)
+
+    @classmethod
+    def from_cache(cls, cache_file: str, stamp: List):
+        """Build the index from a cache file - returns None if its missing or out of date."""
+        try:
+            with open(cache_file) as fp:
+                data = json.load(fp)
+        except (EnvironmentError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != INDEX_CACHE_VERSION or data.get('stamp') != stamp:
+            return None
+        index = cls()
+        try:
+            for eco, opening_name, moves in data['openings']:
+                index.add_opening(eco, opening_name, moves)
+            for fen, opening_name in data['fens']:
+                index.add_fen_opening(fen, opening_name)
+        except (KeyError, TypeError, ValueError):
+            logging.warning('ignoring broken opening cache %s', cache_file)
+            return None
+        return index
+
+
+def _file_stamp(file_name: str) -> List:
+    try:
+        stat = os.stat(file_name)
+        return [os.path.abspath(file_name), stat.st_mtime_ns, stat.st_size]
+    except OSError:
+        return [os.path.abspath(file_name), 0, 0]
+
+
+_lock = threading.Lock()
+_shared_index: Optional[OpeningIndex] = None
+_shared_stamp: List = []
+
+
+def get_opening_index(eco_file='chess-eco_pos.txt', fen_file='opening_name_fen.txt',
+                      cache_file: Optional[str] = 'opening_index.json') -> OpeningIndex:
+    """Return the process wide opening index - its (re)loaded only if the opening files changed."""
+    global _shared_index, _shared_stamp
+    stamp = [_file_stamp(eco_file), _file_stamp(fen_file)]
+    with _lock:
+        if _shared_index is not None and _shared_stamp == stamp:
+            return _shared_index
+        index = OpeningIndex.from_cache(cache_file, stamp) if cache_file else None
+        if index is None:
+            index = OpeningIndex.from_files(eco_file, fen_file)
+            if cache_file:
+                index.save_cache(cache_file, stamp)
+        else:
+            logging.debug('opening index loaded from cache %s', cache_file)
+        _shared_index = index
+        _shared_stamp = stamp
+        return index
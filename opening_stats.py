@@ -0,0 +1,134 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import chess  # type: ignore
+import chess.polyglot  # type: ignore
+
+# opening.data of obooksrv: polyglot sorted entries with the game statistics instead of weight & learn
+# key (zobrist hash), move (polyglot encoded), white wins %, draws %, game count - all big endian
+ENTRY_STRUCT = struct.Struct('>QHBBI')
+DATA_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'obooksrv', 'opening.data')
+
+
+class OpeningStats(object):
+
+    """Opening statistics of the web explorer (the get_book_moves api of obooksrv) from the memory mapped opening.data."""
+
+    def __init__(self, path=DATA_FILE, maxsize=1024):
+        self.path = path
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._mmap: Optional[mmap.mmap] = None
+        self._size = 0
+        self._warned = False
+        self._cache: 'OrderedDict[int, List[Dict]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _open(self) -> bool:
+        if self._mmap is None:
+            try:
+                with open(self.path, 'rb') as file:
+                    self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as exc:  # ValueError: empty file
+                if not self._warned:
+                    logging.warning('cant open opening statistics %s: %s', self.path, exc)
+                    self._warned = True
+                return False
+            self._size = len(self._mmap) // ENTRY_STRUCT.size
+        return True
+
+    def _bisect_key_left(self, key: int) -> int:
+        low, high = 0, self._size
+        while low < high:
+            mid = (low + high) // 2
+            if ENTRY_STRUCT.unpack_from(self._mmap, mid * ENTRY_STRUCT.size)[0] < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _read(self, key: int) -> List[Dict]:
+        moves = []
+        index = self._bisect_key_left(key)
+        while index < self._size:
+            entry_key, raw_move, whitewins, draws, count = ENTRY_STRUCT.unpack_from(self._mmap, index * ENTRY_STRUCT.size)
+            if entry_key != key:
+                break
+            move = chess.polyglot.Entry(entry_key, raw_move, 0, 0).move()
+            moves.append({'move': move.uci(), 'whitewins': whitewins, 'draws': draws,
+                          'blackwins': 100 - whitewins - draws, 'count': count})
+            index += 1
+        return moves
+
+    def moves(self, board: chess.Board) -> List[Dict]:
+        """Return the moves with statistics in file order - dont modify the result."""
+        key = chess.polyglot.zobrist_hash(board)
+        with self._lock:
+            moves = self._cache.get(key)
+            if moves is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return moves
+            self.misses += 1
+            if not self._open():
+                return []
+            moves = self._read(key)
+            self._cache[key] = moves
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            return moves
+
+    def query(self, fens: List[str]) -> Dict[str, List[Dict]]:
+        """Return the moves of many positions - an invalid fen has no moves."""
+        result = {}
+        for fen in fens:
+            try:
+                board = chess.Board(fen)
+            except ValueError:
+                logging.debug('invalid fen for opening statistics: %s', fen)
+                result[fen] = []
+                continue
+            result[fen] = self.moves(board)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit/miss counters, the current size and the entry count of the file."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache), 'maxsize': self.maxsize,
+                    'entries': self._size}
+
+    def close(self):
+        """Unmap the file - the next lookup maps it again (eg. after an update of opening.data)."""
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+                self._size = 0
+            self._warned = False
+            self._cache.clear()
+
+
+opening_stats = OpeningStats()
@@ -35,7 +35,8 @@ import chess  # type: ignore
 import chess.pgn  # type: ignore
 from timecontrol import TimeControl
 from utilities import DisplayMsg
-from dgt.api import Dgt, Message
+from game_archive import get_archive
+from dgt.api import Dgt, Message, HandlerRegistry
 from dgt.util import GameResult, PlayMode, Mode, TimeMode
 
 
@@ -276,7 +277,7 @@ class PgnDisplay(DisplayMsg, threading.Thread):
 
     def _save_and_email_pgn(self, message):
         logging.debug('Saving game to [%s]', self.file_name)
-        pgn_game = chess.pgn.Game().from_board(message.game)
+        pgn_game = chess.pgn.Game().from_board(message.game.copy())  # the message board is shared
 
         # Headers
         if ModeInfo.get_online_mode():
@@ -405,18 +406,15 @@ class PgnDisplay(DisplayMsg, threading.Thread):
         last_file.flush()
         last_file.close()
 
-        file = open(self.file_name, 'a')
-        exporter = chess.pgn.FileExporter(file)
-        pgn_game.accept(exporter)
-        file.flush()
-        file.close()
+        # append to the games file & its index (for browsing the saved games)
+        get_archive(self.file_name).append(pgn_game)
 
         self.emailer.send('Game PGN', str(pgn_game), self.file_name)
 
     def _save_pgn(self, message):
         l_file_name = 'games' + os.sep + message.pgn_filename
         logging.debug('Saving PGN game to [%s]', l_file_name)
-        pgn_game = chess.pgn.Game().from_board(message.game)
+        pgn_game = chess.pgn.Game().from_board(message.game.copy())  # the message board is shared
 
         # Headers
         if ModeInfo.get_online_mode():
@@ -541,91 +539,102 @@ class PgnDisplay(DisplayMsg, threading.Thread):
         file.close()
         logging.debug('molli: save pgn finished')
 
-    def _process_message(self, message):
-        if False:  # switch-case
-            pass
-
-        elif isinstance(message, Message.SYSTEM_INFO):
-            if 'engine_name' in message.info:
-                self.engine_name = message.info['engine_name']
-                self.old_engine = self.engine_name
-                self.old_level_name = self.level_name
-                self.old_level_text = self.level_text
-                self.old_engine_elo = self.engine_elo
-            if 'user_name' in message.info:
-                self.user_name = message.info['user_name']
-                self.user_name_orig = message.info['user_name']
-            if 'user_elo' in message.info:
-                self.user_elo = message.info['user_elo']
-            if 'rspeed' in message.info:
-                self.rspeed = message.info['rspeed']
-
-        elif isinstance(message, Message.IP_INFO):
-            self.location = message.info['location']
-
-        elif isinstance(message, Message.STARTUP_INFO):
-            self.level_text = message.info['level_text']
-            self.level_name = message.info['level_name']
-            self.old_level_name = self.level_name
-            self.old_level_text = self.level_text
-            self.old_engine_elo = self.engine_elo
-
-        elif isinstance(message, Message.LEVEL):
-            self.level_text = message.level_text
-            self.level_name = message.level_name
-            self.old_level_name = self.level_name
-            self.old_level_text = self.level_text
-            self.old_engine_elo = self.engine_elo
-
-        elif isinstance(message, Message.INTERACTION_MODE):
-            self.mode = message.mode
-            if message.mode == Mode.REMOTE:
-                self.old_engine = self.engine_name
-                self.engine_name = 'Remote Player'
-                self.level_text = None
-                self.level_name = ''
-            elif message.mode == Mode.OBSERVE:
-                self.old_engine = self.engine_name
-                self.engine_name = 'Player B'
-                self.user_name = 'Player A'
-                self.level_text = None
-                self.level_name = ''
-            else:
-                self.engine_name = self.old_engine
-                self.level_name = self.old_level_name
-                self.level_text = self.old_level_text
-                self.engine_elo = self.old_engine_elo
-                self.user_name = self.user_name_orig
-
-        elif isinstance(message, Message.ENGINE_STARTUP):
-            for index in range(0, len(message.installed_engines)):
-                eng = message.installed_engines[index]
-                if eng['file'] == message.file:
-                    self.engine_elo = eng['elo']
-                    break
-
-        elif isinstance(message, Message.ENGINE_READY):
-            self.old_engine = self.engine_name = message.engine_name
-            self.engine_elo = message.eng['elo']
-            if not message.has_levels:
-                self.level_text = None
-                self.level_name = ''
+    _handlers = HandlerRegistry('pgn')
 
+    @_handlers.register(Message.SYSTEM_INFO)
+    def _system_info(self, message):
+        if 'engine_name' in message.info:
+            self.engine_name = message.info['engine_name']
+            self.old_engine = self.engine_name
             self.old_level_name = self.level_name
             self.old_level_text = self.level_text
             self.old_engine_elo = self.engine_elo
+        if 'user_name' in message.info:
+            self.user_name = message.info['user_name']
+            self.user_name_orig = message.info['user_name']
+        if 'user_elo' in message.info:
+            self.user_elo = message.info['user_elo']
+        if 'rspeed' in message.info:
+            self.rspeed = message.info['rspeed']
+
+    @_handlers.register(Message.IP_INFO)
+    def _ip_info(self, message):
+        self.location = message.info['location']
+
+    @_handlers.register(Message.STARTUP_INFO)
+    def _startup_info(self, message):
+        self.level_text = message.info['level_text']
+        self.level_name = message.info['level_name']
+        self.old_level_name = self.level_name
+        self.old_level_text = self.level_text
+        self.old_engine_elo = self.engine_elo
+
+    @_handlers.register(Message.LEVEL)
+    def _level(self, message):
+        self.level_text = message.level_text
+        self.level_name = message.level_name
+        self.old_level_name = self.level_name
+        self.old_level_text = self.level_text
+        self.old_engine_elo = self.engine_elo
+
+    @_handlers.register(Message.INTERACTION_MODE)
+    def _interaction_mode(self, message):
+        self.mode = message.mode
+        if message.mode == Mode.REMOTE:
+            self.old_engine = self.engine_name
+            self.engine_name = 'Remote Player'
+            self.level_text = None
+            self.level_name = ''
+        elif message.mode == Mode.OBSERVE:
+            self.old_engine = self.engine_name
+            self.engine_name = 'Player B'
+            self.user_name = 'Player A'
+            self.level_text = None
+            self.level_name = ''
+        else:
+            self.engine_name = self.old_engine
+            self.level_name = self.old_level_name
+            self.level_text = self.old_level_text
+            self.engine_elo = self.old_engine_elo
+            self.user_name = self.user_name_orig
+
+    @_handlers.register(Message.ENGINE_STARTUP)
+    def _engine_startup(self, message):
+        for index in range(0, len(message.installed_engines)):
+            eng = message.installed_engines[index]
+            if eng['file'] == message.file:
+                self.engine_elo = eng['elo']
+                break
+
+    @_handlers.register(Message.ENGINE_READY)
+    def _engine_ready(self, message):
+        self.old_engine = self.engine_name = message.engine_name
+        self.engine_elo = message.eng['elo']
+        if not message.has_levels:
+            self.level_text = None
+            self.level_name = ''
+
+        self.old_level_name = self.level_name
+        self.old_level_text = self.level_text
+        self.old_engine_elo = self.engine_elo
+
+    @_handlers.register(Message.GAME_ENDS)
+    def _game_ends(self, message):
+        if message.game.move_stack and not ModeInfo.get_pgn_mode() and self.mode != Mode.PONDER:
+            self._save_and_email_pgn(message)
+
+    @_handlers.register(Message.START_NEW_GAME)
+    def _start_new_game(self, _):
+        self.startime = datetime.datetime.now().strftime('%H:%M:%S')
 
-        elif isinstance(message, Message.GAME_ENDS):
-            if message.game.move_stack and not ModeInfo.get_pgn_mode() and self.mode != Mode.PONDER:
-                self._save_and_email_pgn(message)
-
-        elif isinstance(message, Message.START_NEW_GAME):
-            self.startime = datetime.datetime.now().strftime('%H:%M:%S')
+    @_handlers.register(Message.SAVE_GAME)
+    def _save_game(self, message):
+        logging.debug('molli: save game message pgn dispatch')
+        if message.game.move_stack:
+            self._save_pgn(message)
 
-        elif isinstance(message, Message.SAVE_GAME):
-            logging.debug('molli: save game message pgn dispatch')
-            if message.game.move_stack:
-                self._save_pgn(message)
+    def _process_message(self, message):
+        self._handlers.dispatch(message, self)
 
     def run(self):
         """Call by threading.Thread start() function."""
@@ -30,28 +30,34 @@ from logging.handlers import RotatingFileHandler
 import time
 import queue
 import configargparse  # type: ignore
-import paramiko
 import math
 from typing import Optional, Set, Tuple
 
 from uci.engine import UciShell, UciEngine
+from uci.engine_pool import EnginePool
+from uci.ssh_connection import ssh_connections
+from uci.informer import Informer
 from uci.engine_provider import EngineProvider
 from uci.rating import Rating, determine_result
 import chess  # type: ignore
 import chess.pgn  # type: ignore
-import chess.polyglot  # type: ignore
 import chess.uci  # type: ignore
 
 from timecontrol import TimeControl
 from theme import calc_theme
 from utilities import get_location, update_picochess, get_opening_books, shutdown, reboot, checkout_tag
 from utilities import Observable, DisplayMsg, version, evt_queue, write_picochess_ini, hms_time, get_engine_mame_par
+from utilities import message_scheduler
 from pgn import Emailer, PgnDisplay, ModeInfo
 from server import WebServer
 from picotalker import PicoTalkerDisplay
 from dispatcher import Dispatcher
+from legal_fens import FenResolver, takeback_plies
+from book import BookService
+from tablebase import tablebases
+from game_archive import GameArchive, get_archive
 
-from dgt.api import Dgt, Message, Event
+from dgt.api import Dgt, Message, Event, HandlerRegistry
 import dgt.util
 from dgt.util import GameResult, TimeMode, Mode, PlayMode, PicoComment
 from dgt.hw import DgtHw
@@ -161,10 +167,10 @@ class PicochessState:
         self.game = None
         self.game_declared = False  # User declared resignation or draw
         self.interaction_mode = Mode.NORMAL
-        self.last_legal_fens = []
+        self.last_legal_fens = FenResolver()
         self.last_move = None
-        self.legal_fens = []
-        self.legal_fens_after_cmove = []
+        self.legal_fens = FenResolver()
+        self.legal_fens_after_cmove = FenResolver()
         self.max_guess = 0
         self.max_guess_black = 0
         self.max_guess_white = 0
@@ -346,19 +352,6 @@ class PicochessState:
         return timec, textc
 
 
-def check_ssh(host, username, password):
-    l_ssh = True
-    try:
-        s = paramiko.SSHClient()
-        s.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        s.connect(host, username=username, password=password, timeout=7)
-        s.close()
-    except Exception:
-        l_ssh = False
-
-    return (l_ssh)
-
-
 def log_pgn(state: PicochessState):
     logging.debug('molli pgn: pgn_book_test: %s', str(state.pgn_book_test))
     logging.debug('molli pgn: game turn: %s', state.game.turn)
@@ -478,19 +471,14 @@ def compare_fen(fen_board_external='', fen_board_internal='') -> str:
     return put_field
 
 
-def compute_legal_fens(game_copy: chess.Board):
+def compute_legal_fens(game_copy: chess.Board) -> FenResolver:
     """
-    Compute a list of legal FENs for the given game.
+    Compute the legal FENs for the given game.
 
     :param game_copy: The game
-    :return: A list of legal FENs
+    :return: A resolver from legal FENs to their moves
     """
-    fens = []
-    for move in game_copy.legal_moves:
-        game_copy.push(move)
-        fens.append(game_copy.board_fen())
-        game_copy.pop()
-    return fens
+    return FenResolver(game_copy)
 
 
 def main() -> None:
@@ -612,8 +600,8 @@ def main() -> None:
             state.searchmoves.reset()
             state.game_declared = False
             state.legal_fens = compute_legal_fens(state.game.copy())
-            state.legal_fens_after_cmove = []
-            state.last_legal_fens = []
+            state.legal_fens_after_cmove = FenResolver()
+            state.last_legal_fens = FenResolver()
             if picotutor_mode(state):
                 state.picotutor.reset()
                 state.picotutor.set_position(state.game.fen(), i_turn=state.game.turn)
@@ -692,20 +680,27 @@ def main() -> None:
         info = {'location': location, 'ext_ip': ext_ip, 'int_ip': int_ip, 'version': version}
         DisplayMsg.show(Message.IP_INFO(info=info))
 
-    def read_pgn_file(file_name: str, state: PicochessState):
-        """Read game from PGN file"""
+    def read_pgn_file(file_name: str, state: PicochessState, game_number=0):
+        """Read game from PGN file - the first one or the game_number (negative: from the end) of the archive index"""
         logging.debug('molli: read game from pgn file')
 
         l_filename = 'games' + os.sep + file_name
-        try:
-            l_file_pgn = open(l_filename)
-            if not l_file_pgn:
+        if game_number:
+            try:
+                l_game_pgn = get_archive(l_filename).load(game_number)
+            except (OSError, IndexError):
+                logging.warning('game %i of %s not found', game_number, l_filename)
+                return
+        else:
+            try:
+                l_file_pgn = open(l_filename)
+                if not l_file_pgn:
+                    return
+            except OSError:
                 return
-        except OSError:
-            return
 
-        l_game_pgn = chess.pgn.read_game(l_file_pgn)
-        l_file_pgn.close()
+            l_game_pgn = chess.pgn.read_game(l_file_pgn)
+            l_file_pgn.close()
 
         logging.debug('molli: read game filename %s', l_filename)
 
@@ -803,16 +798,16 @@ def main() -> None:
         state.game_declared = False
 
         state.legal_fens = compute_legal_fens(state.game.copy())
-        state.legal_fens_after_cmove = []
-        state.last_legal_fens = []
+        state.legal_fens_after_cmove = FenResolver()
+        state.last_legal_fens = FenResolver()
         assert engine.is_waiting(), 'molli: read_pgn engine not waiting! thinking status: %s' % engine.is_thinking()
         engine.position(copy.deepcopy(state.game))
 
         game_end = state.check_game_state()
         if game_end:
             state.play_mode = PlayMode.USER_WHITE if turn == chess.WHITE else PlayMode.USER_BLACK
-            state.legal_fens = []
-            state.legal_fens_after_cmove = []
+            state.legal_fens = FenResolver()
+            state.legal_fens_after_cmove = FenResolver()
             DisplayMsg.show(game_end)
         else:
             state.play_mode = PlayMode.USER_WHITE if turn == chess.WHITE else PlayMode.USER_BLACK
@@ -878,8 +873,8 @@ def main() -> None:
                         state.searchmoves.reset()
                         state.game_declared = False
                         state.legal_fens = compute_legal_fens(state.game.copy())
-                        state.legal_fens_after_cmove = []
-                        state.last_legal_fens = []
+                        state.legal_fens_after_cmove = FenResolver()
+                        state.last_legal_fens = FenResolver()
                         DisplayMsg.show(Message.SHOW_TEXT(text_string='NEW_POSITION'))
                         set_wait_state(Message.START_NEW_GAME(game=state.game.copy(), newgame=False), state)
                         assert engine.is_waiting(), 'engine not waiting! thinking status: %s' % engine.is_thinking()
@@ -898,8 +893,8 @@ def main() -> None:
                             state.searchmoves.reset()
                             state.game_declared = False
                             state.legal_fens = compute_legal_fens(state.game.copy())
-                            state.legal_fens_after_cmove = []
-                            state.last_legal_fens = []
+                            state.legal_fens_after_cmove = FenResolver()
+                            state.last_legal_fens = FenResolver()
                             DisplayMsg.show(Message.SHOW_TEXT(text_string='NEW_POSITION'))
                             set_wait_state(Message.START_NEW_GAME(game=state.game.copy(), newgame=False), state)
                             assert engine.is_waiting(), 'engine not waiting! thinking status: %s' % engine.is_thinking()
@@ -990,16 +985,19 @@ def main() -> None:
         Start a new search on the current game.
 
         If a move is found in the opening book, fire an event in a few seconds.
+        With --tablebase-moves the same happens for a tablebase position.
         """
         DisplayMsg.show(msg)
         if not online_mode() or game.fullmove_number > 1:
             state.start_clock()
-        book_res = state.searchmoves.book(bookreader, game.copy())
+        book_res = state.searchmoves.book(book_service, game.copy())
+        tb_res = tablebases.best_move(game) if args.tablebase_moves and not book_res and not searchlist else None
         if (book_res and not emulation_mode() and not online_mode() and not pgn_mode()) or (book_res and (pgn_mode() and state.pgn_book_test)):
             Observable.fire(Event.BEST_MOVE(move=book_res.bestmove, ponder=book_res.ponder, inbook=True))
+        elif tb_res and not emulation_mode() and not online_mode() and not pgn_mode():
+            Observable.fire(Event.BEST_MOVE(move=tb_res.bestmove, ponder=tb_res.ponder, inbook=False))
         else:
-            while not engine.is_waiting():
-                time.sleep(0.05)
+            while not engine.wait_idle(1):
                 logging.warning('engine is still not waiting')
             uci_dict = timec.uci()
             if searchlist:
@@ -1016,8 +1014,7 @@ def main() -> None:
         If a move is found in the opening book, fire an event in a few seconds.
         """
 
-        while not engine.is_waiting():
-            time.sleep(0.05)
+        while not engine.wait_idle(1):
             logging.warning('engine is still not waiting')
         engine.position(copy.deepcopy(game))
 
@@ -1065,10 +1062,57 @@ def main() -> None:
         """Stop current search."""
         engine.stop()
         if not emulation_mode():
-            while not engine.is_waiting():
-                time.sleep(0.05)
+            while not engine.wait_idle(1):
                 logging.warning('engine is still not waiting')
 
+    def show_tutor_feedback(move: chess.Move, game_before: chess.Board, new_move: bool, state: PicochessState):
+        """
+        Show the tutor evaluation of the user move (incl. threat & hint of a blunder) without blocking the event loop.
+
+        Maybe called by an engine thread of the tutor - it only reads the tutor and schedules messages.
+        """
+        eval_str, l_mate, _ = state.picotutor.get_user_move_eval()
+        tutor_msgs = []
+        if eval_str != '' and new_move:  # molli takeback_mame
+            tutor_msgs.append((Message.PICOTUTOR_MSG(eval_str=eval_str), 3 if '??' in eval_str else 1))
+        if l_mate:
+            n_mate = int(l_mate)
+        else:
+            n_mate = 0
+        if n_mate < 0:
+            msg_str = 'USRMATE_' + str(abs(n_mate))
+            tutor_msgs.append((Message.PICOTUTOR_MSG(eval_str=msg_str), 1.5))
+        elif n_mate > 1:
+            n_mate = n_mate - 1
+            msg_str = 'PICMATE_' + str(abs(n_mate))
+            tutor_msgs.append((Message.PICOTUTOR_MSG(eval_str=msg_str), 1.5))
+        # get additional info in case of blunder
+        if eval_str == '??' and new_move:
+            t_mate, t_hint_move, t_pv_best_move, t_pv_user_move = state.picotutor.get_user_move_info()
+
+            try:
+                threat_move = t_pv_user_move[1]
+            except IndexError:
+                threat_move = chess.Move.null()
+
+            if threat_move != chess.Move.null():
+                game_tutor = game_before.copy()
+                game_tutor.push(move)
+                san_move = game_tutor.san(threat_move)
+                game_tutor.push(threat_move)
+
+                tutor_str = 'THREAT' + san_move
+                tutor_msgs.append((Message.PICOTUTOR_MSG(eval_str=tutor_str, game=game_tutor.copy()), 5))
+
+            if t_hint_move.uci() != chess.Move.null():
+                game_tutor = game_before.copy()
+                san_move = game_tutor.san(t_hint_move)
+                game_tutor.push(t_hint_move)
+                tutor_str = 'HINT' + san_move
+                tutor_msgs.append((Message.PICOTUTOR_MSG(eval_str=tutor_str, game=game_tutor.copy()), 5))
+        if tutor_msgs:
+            message_scheduler.show_sequence(tutor_msgs)
+
     def user_move(move: chess.Move, sliding: bool, state: PicochessState):
         """Handle an user move."""
         global fen_error_occured
@@ -1077,9 +1121,10 @@ def main() -> None:
         eval_str = ''
 
         state.take_back_locked = False
+        message_scheduler.cancel()  # user moved, old tutor messages are out of date
 
         logging.info('user move [%s] sliding: %s', move, sliding)
-        if move not in state.game.legal_moves:
+        if move is None or not state.game.is_legal(move):
             logging.warning('illegal move [%s]', move)
         else:
 
@@ -1116,75 +1161,20 @@ def main() -> None:
             eval_str = ''
 
             if picotutor_mode(state) and not position_mode and not state.takeback_active:
-                l_mate = ''
-                t_hint_move = chess.Move.null()
                 valid = state.picotutor.push_move(move)
                 # get evalutaion result and give user feedback
                 if state.dgtmenu.get_picowatcher():
                     if valid:
-                        eval_str, l_mate, l_hint = state.picotutor.get_user_move_eval()
+                        # after the (background) verification of the user move in adaptive multipv mode
+                        new_move = state.last_move != move
+                        state.picotutor.when_evaluated(lambda: show_tutor_feedback(move, game_before, new_move, state))
                     else:
                         # invalid move from tutor side!? Something went wrong
-                        eval_str = 'ER'
                         state.picotutor.set_position(state.game.fen(), i_turn=state.game.turn)
                         if state.play_mode == PlayMode.USER_BLACK:
                             state.picotutor.set_user_color(chess.BLACK)
                         else:
                             state.picotutor.set_user_color(chess.WHITE)
-                            l_mate = ''
-                        eval_str = ''  # no error message
-                    if eval_str != '' and state.last_move != move:  # molli takeback_mame
-                        msg = Message.PICOTUTOR_MSG(eval_str=eval_str)
-                        DisplayMsg.show(msg)
-                        if '??' in eval_str:
-                            time.sleep(3)
-                        else:
-                            time.sleep(1)
-                    if l_mate:
-                        n_mate = int(l_mate)
-                    else:
-                        n_mate = 0
-                    if n_mate < 0:
-                        msg_str = 'USRMATE_' + str(abs(n_mate))
-                        msg = Message.PICOTUTOR_MSG(eval_str=msg_str)
-                        DisplayMsg.show(msg)
-                        time.sleep(1.5)
-                    elif n_mate > 1:
-                        n_mate = n_mate - 1
-                        msg_str = 'PICMATE_' + str(abs(n_mate))
-                        msg = Message.PICOTUTOR_MSG(eval_str=msg_str)
-                        DisplayMsg.show(msg)
-                        time.sleep(1.5)
-                    # get additional info in case of blunder
-                    if eval_str == '??' and state.last_move != move:
-                        t_hint_move = chess.Move.null()
-                        threat_move = chess.Move.null()
-                        t_mate, t_hint_move, t_pv_best_move, t_pv_user_move = state.picotutor.get_user_move_info()
-
-                        try:
-                            threat_move = t_pv_user_move[1]
-                        except IndexError:
-                            threat_move = chess.Move.null()
-
-                        if threat_move != chess.Move.null():
-                            game_tutor = game_before.copy()
-                            game_tutor.push(move)
-                            san_move = game_tutor.san(threat_move)
-                            game_tutor.push(t_pv_user_move[1])
-
-                            tutor_str = 'THREAT' + san_move
-                            msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=game_tutor.copy())
-                            DisplayMsg.show(msg)
-                            time.sleep(5)
-
-                        if t_hint_move.uci() != chess.Move.null():
-                            game_tutor = game_before.copy()
-                            san_move = game_tutor.san(t_hint_move)
-                            game_tutor.push(t_hint_move)
-                            tutor_str = 'HINT' + san_move
-                            msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=game_tutor.copy())
-                            DisplayMsg.show(msg)
-                            time.sleep(5)
 
                 if state.game.fullmove_number < 1:
                     ModeInfo.reset_opening()
@@ -1204,11 +1194,11 @@ def main() -> None:
                         mame_endgame(state.game, state.time_control, msg)
                         DisplayMsg.show(msg)
                         DisplayMsg.show(game_end)
-                        state.legal_fens_after_cmove = []  # molli
+                        state.legal_fens_after_cmove = FenResolver()  # molli
                     else:
                         DisplayMsg.show(msg)
                         DisplayMsg.show(game_end)
-                        state.legal_fens_after_cmove = []  # molli
+                        state.legal_fens_after_cmove = FenResolver()  # molli
                 else:
                     if state.interaction_mode in (Mode.NORMAL, Mode.TRAINING) or not ponder_hit:
                         if not state.check_game_state():
@@ -1305,21 +1295,17 @@ def main() -> None:
             logging.debug('Already in this fen: %s', fen)
             flag_startup = False
             # molli: Chess tutor
-            if picotutor_mode(state) and state.dgtmenu.get_picocoach() and fen != chess.STARTING_BOARD_FEN and not state.take_back_locked and not fen_error_occured and not position_mode and not state.automatic_takeback:
+            if picotutor_mode(state) and state.dgtmenu.get_picocoach() and fen != chess.STARTING_BOARD_FEN and not state.take_back_locked and not fen_error_occured and not position_mode and not state.automatic_takeback and not message_scheduler.is_busy():
                 if ((state.game.turn == chess.WHITE and state.play_mode == PlayMode.USER_WHITE) or (state.game.turn == chess.BLACK and state.play_mode == PlayMode.USER_BLACK)) and not (state.game.is_checkmate() or state.game.is_stalemate()):
                     state.stop_clock()
                     state.stop_fen_timer()
                     eval_str = 'ANALYSIS'
-                    msg = Message.PICOTUTOR_MSG(eval_str=eval_str)
-                    DisplayMsg.show(msg)
-                    time.sleep(2)
-
                     t_best_move, t_best_score, t_best_mate, t_pv_best_move, t_alt_best_moves = state.picotutor.get_pos_analysis()
 
+                    # show the analysis without blocking the event loop - the clock restarts afterwards
+                    tutor_msgs = [(Message.PICOTUTOR_MSG(eval_str=eval_str), 2)]
                     tutor_str = 'POS' + str(t_best_score)
-                    msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, score=t_best_score)
-                    DisplayMsg.show(msg)
-                    time.sleep(5)
+                    tutor_msgs.append((Message.PICOTUTOR_MSG(eval_str=tutor_str, score=t_best_score), 5))
 
                     if t_best_mate:
                         l_mate = int(t_best_mate)
@@ -1328,21 +1314,15 @@ def main() -> None:
                             san_move = game_tutor.san(t_best_move)
                             game_tutor.push(t_best_move)  # for picotalker (last move spoken)
                             tutor_str = 'BEST' + san_move
-                            msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=game_tutor.copy())
-                            DisplayMsg.show(msg)
-                            time.sleep(5)
+                            tutor_msgs.append((Message.PICOTUTOR_MSG(eval_str=tutor_str, game=game_tutor.copy()), 5))
                     else:
                         l_mate = 0
                     if l_mate > 0:
                         eval_str = 'PICMATE_' + str(abs(l_mate))
-                        msg = Message.PICOTUTOR_MSG(eval_str=eval_str)
-                        DisplayMsg.show(msg)
-                        time.sleep(5)
+                        tutor_msgs.append((Message.PICOTUTOR_MSG(eval_str=eval_str), 5))
                     elif l_mate < 0:
                         eval_str = 'USRMATE_' + str(abs(l_mate))
-                        msg = Message.PICOTUTOR_MSG(eval_str=eval_str)
-                        DisplayMsg.show(msg)
-                        time.sleep(5)
+                        tutor_msgs.append((Message.PICOTUTOR_MSG(eval_str=eval_str), 5))
                     else:
                         l_max = 0
                         for alt_move in t_alt_best_moves:
@@ -1353,13 +1333,11 @@ def main() -> None:
                                 game_tutor.push(alt_move)  # for picotalker (last move spoken)
 
                                 tutor_str = 'BEST' + san_move
-                                msg = Message.PICOTUTOR_MSG(eval_str=tutor_str, game=game_tutor.copy())
-                                DisplayMsg.show(msg)
-                                time.sleep(5)
+                                tutor_msgs.append((Message.PICOTUTOR_MSG(eval_str=tutor_str, game=game_tutor.copy()), 5))
                             else:
                                 break
 
-                    state.start_clock()
+                    message_scheduler.show_sequence(tutor_msgs, fire_after=Event.RESUME_CLOCK())
             else:
                 if position_mode:
                     # position finally alright!
@@ -1435,68 +1413,62 @@ def main() -> None:
                     else:
                         state.picotutor.set_user_color(chess.WHITE)
                 logging.info('wrong color move -> sliding, reverting to: %s', state.game.fen())
-            legal_moves = list(state.game.legal_moves)
-            move = legal_moves[state.last_legal_fens.index(fen)]
+            move = state.last_legal_fens.move(fen)
             user_move(move, sliding=True, state=state)
             if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.REMOTE, Mode.TRAINING):
-                state.legal_fens = []
+                state.legal_fens = FenResolver()
             else:
                 state.legal_fens = compute_legal_fens(state.game.copy())
 
         # allow playing/correcting moves for pico's side in TRAINING mode:
         elif fen in legal_fens_pico and state.interaction_mode == Mode.TRAINING:
-            legal_moves = list(state.game.legal_moves)
-            move = legal_moves[legal_fens_pico.index(fen)]
-
-            if state.done_computer_fen:
-                if fen == state.done_computer_fen:
-                    pass
-                else:
-                    DisplayMsg.show(Message.WRONG_FEN())  # display set pieces/pico's move
-                    time.sleep(3)  # display set pieces again and accept new players move as pico's move
-                    DisplayMsg.show(Message.ALTERNATIVE_MOVE(game=state.game.copy(), play_mode=state.play_mode))
-                    time.sleep(2)
-                    DisplayMsg.show(Message.COMPUTER_MOVE(move=move, ponder=False, game=state.game.copy(), wait=False))
-                    time.sleep(2)
-            logging.info('user move did a move for pico')
+            move = legal_fens_pico.move(fen)
 
-            user_move(move, sliding=False, state=state)
-            state.last_legal_fens = state.legal_fens
-            if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.REMOTE, Mode.TRAINING):
-                state.legal_fens = []
+            if state.done_computer_fen and fen != state.done_computer_fen:
+                # display set pieces/pico's move, then set pieces again - and accept the new players move as pico's move
+                # once they are shown (fen again, now without a pico move to compare)
+                state.done_computer_fen = None
+                message_scheduler.show_sequence([(Message.WRONG_FEN(), 3),
+                                                 (Message.ALTERNATIVE_MOVE(game=state.game.copy(), play_mode=state.play_mode), 2),
+                                                 (Message.COMPUTER_MOVE(move=move, ponder=False, game=state.game.copy(), wait=False), 2)],
+                                                fire_after=Event.FEN(fen=fen))
             else:
-                state.legal_fens = compute_legal_fens(state.game.copy())
+                logging.info('user move did a move for pico')
+
+                user_move(move, sliding=False, state=state)
+                state.last_legal_fens = state.legal_fens
+                if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.REMOTE, Mode.TRAINING):
+                    state.legal_fens = FenResolver()
+                else:
+                    state.legal_fens = compute_legal_fens(state.game.copy())
 
         # standard legal move
         elif fen in state.legal_fens:
             logging.info('standard move detected')
             newgame_happened = False
-            legal_moves = list(state.game.legal_moves)
-            move = legal_moves[state.legal_fens.index(fen)]
+            move = state.legal_fens.move(fen)
             user_move(move, sliding=False, state=state)
             state.last_legal_fens = state.legal_fens
             if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.REMOTE):
-                state.legal_fens = []
+                state.legal_fens = FenResolver()
             else:
                 state.legal_fens = compute_legal_fens(state.game.copy())
 
     # molli: allow direct play of an alternative move for pico
         elif fen in legal_fens_pico and fen not in state.legal_fens and fen != state.done_computer_fen and state.done_computer_fen and state.interaction_mode in (Mode.NORMAL, Mode.BRAIN) and not online_mode() and not emulation_mode() and not pgn_mode() and state.dgtmenu.get_game_altmove() and not state.takeback_active:
-            legal_moves = list(state.game.legal_moves)
             computer_move = state.done_move
-            state.done_move = legal_moves[legal_fens_pico.index(fen)]
+            state.done_move = legal_fens_pico.move(fen)
             state.best_move_posted = False
             state.best_move_displayed = None
+            # the displays get these in order (not cancelable) without blocking the event loop
+            alt_msgs = []
             if computer_move:
-                DisplayMsg.show(Message.COMPUTER_MOVE(move=computer_move, ponder=False, game=state.game.copy(), wait=False))
-                time.sleep(3)
-            DisplayMsg.show(Message.ALTERNATIVE_MOVE(game=state.game.copy(), play_mode=state.play_mode))
-            time.sleep(3)
+                alt_msgs.append((Message.COMPUTER_MOVE(move=computer_move, ponder=False, game=state.game.copy(), wait=False), 3))
+            alt_msgs.append((Message.ALTERNATIVE_MOVE(game=state.game.copy(), play_mode=state.play_mode), 3))
             if state.done_move:
-                DisplayMsg.show(Message.COMPUTER_MOVE(move=state.done_move, ponder=False, game=state.game.copy(), wait=False))
-                time.sleep(1.5)
+                alt_msgs.append((Message.COMPUTER_MOVE(move=state.done_move, ponder=False, game=state.game.copy(), wait=False), 1.5))
 
-            DisplayMsg.show(Message.COMPUTER_MOVE_DONE())
+            alt_msgs.append((Message.COMPUTER_MOVE_DONE(), 0))
             logging.info('user did a move for pico')
             state.game.push(state.done_move)
             state.done_computer_fen = None
@@ -1512,13 +1484,14 @@ def main() -> None:
                     state.picotutor.set_position(state.game.fen(), i_turn=state.game.turn)
 
             if game_end:
-                state.legal_fens = []
-                state.legal_fens_after_cmove = []
+                state.legal_fens = FenResolver()
+                state.legal_fens_after_cmove = FenResolver()
                 if online_mode():
                     stop_search_and_clock()
                     state.stop_fen_timer()
                 stop_search_and_clock()
-                DisplayMsg.show(game_end)
+                alt_msgs.append((game_end, 0))
+                message_scheduler.show_sequence(alt_msgs, cancelable=False)
             else:
                 state.searchmoves.reset()
                 state.time_control.add_time(not state.game.turn)
@@ -1528,15 +1501,15 @@ def main() -> None:
                     state.time_control.add_game2(not state.game.turn)
                     t_player = False
                     msg = Message.TIMECONTROL_CHECK(player=t_player, movestogo=state.time_control.moves_to_go_orig, time1=state.time_control.game_time, time2=state.time_control.game_time2)
-                    DisplayMsg.show(msg)
+                    alt_msgs.append((msg, 0))
 
-                state.start_clock()
+                message_scheduler.show_sequence(alt_msgs, fire_after=Event.RESUME_CLOCK(), cancelable=False)
 
                 if state.interaction_mode == Mode.BRAIN:
                     brain(state.game, state.time_control, state)
 
             state.legal_fens = compute_legal_fens(state.game.copy())  # calc. new legal moves based on alt. move
-            state.last_legal_fens = []
+            state.last_legal_fens = FenResolver()
 
         # Player has done the computer or remote move on the board
         elif fen == state.done_computer_fen:
@@ -1562,8 +1535,8 @@ def main() -> None:
             game_end = state.check_game_state()
             if game_end:
                 update_elo(state, game_end.result)
-                state.legal_fens = []
-                state.legal_fens_after_cmove = []
+                state.legal_fens = FenResolver()
+                state.legal_fens_after_cmove = FenResolver()
                 if online_mode():
                     stop_search_and_clock()
                     state.stop_fen_timer()
@@ -1598,21 +1571,21 @@ def main() -> None:
                     if state.game.turn == chess.WHITE:
                         if state.max_guess_white > 0:
                             if state.no_guess_white > state.max_guess_white:
-                                state.last_legal_fens = []
+                                state.last_legal_fens = FenResolver()
                                 get_next_pgn_move(state)
                         else:
-                            state.last_legal_fens = []
+                            state.last_legal_fens = FenResolver()
                             get_next_pgn_move(state)
                     elif state.game.turn == chess.BLACK:
                         if state.max_guess_black > 0:
                             if state.no_guess_black > state.max_guess_black:
-                                state.last_legal_fens = []
+                                state.last_legal_fens = FenResolver()
                                 get_next_pgn_move(state)
                         else:
-                            state.last_legal_fens = []
+                            state.last_legal_fens = FenResolver()
                             get_next_pgn_move(state)
 
-            state.last_legal_fens = []
+            state.last_legal_fens = FenResolver()
             newgame_happened = False
 
             if state.game.fullmove_number < 1:
@@ -1644,18 +1617,17 @@ def main() -> None:
             if state.interaction_mode == Mode.BRAIN:
                 brain(state.game, state.time_control, state)
 
-            state.last_legal_fens = []
-            state.legal_fens_after_cmove = []
-            state.legal_fens = compute_legal_fens(state.game.copy())  # molli new legal fance based on cmove
+            state.last_legal_fens = FenResolver()
+            state.legal_fens = state.legal_fens_after_cmove  # molli new legal fance based on cmove
+            state.legal_fens_after_cmove = FenResolver()
 
             # standard user move handling
-            legal_moves = list(state.game.legal_moves)
-            move = legal_moves[state.legal_fens.index(fen)]
+            move = state.legal_fens.move(fen)
             user_move(move, sliding=False, state=state)
             state.last_legal_fens = state.legal_fens
             newgame_happened = False
             if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.REMOTE, Mode.TRAINING):
-                state.legal_fens = []
+                state.legal_fens = FenResolver()
             else:
                 state.legal_fens = compute_legal_fens(state.game.copy())
 
@@ -1664,32 +1636,28 @@ def main() -> None:
             if state.take_back_locked or online_mode() or (emulation_mode() and not state.automatic_takeback):
                 handled_fen = False
             else:
-                handled_fen = False
-                game_copy = copy.deepcopy(state.game)
-                while game_copy.move_stack:
-                    game_copy.pop()
-                    if game_copy.board_fen() == fen:
-                        handled_fen = True
-                        logging.info('current game fen      : %s', state.game.fen())
-                        logging.info('undoing game until fen: %s', fen)
-                        stop_search_and_clock()
-                        while len(game_copy.move_stack) < len(state.game.move_stack):
-                            state.game.pop()
+                plies = takeback_plies(state.game, fen)
+                handled_fen = plies > 0
+                if handled_fen:
+                    logging.info('current game fen      : %s', state.game.fen())
+                    logging.info('undoing game until fen: %s', fen)
+                    message_scheduler.cancel()
+                    stop_search_and_clock()
+                    for _ in range(plies):
+                        state.game.pop()
 
-                            if picotutor_mode(state):
-                                if state.best_move_posted:  # molli computer move already sent to tutor!
-                                    state.picotutor.pop_last_move()
-                                    state.best_move_posted = False
+                        if picotutor_mode(state):
+                            if state.best_move_posted:  # molli computer move already sent to tutor!
                                 state.picotutor.pop_last_move()
+                                state.best_move_posted = False
+                            state.picotutor.pop_last_move()
 
-                        # its a complete new pos, delete saved values
-                        state.done_computer_fen = None
-                        state.done_move = state.pb_move = chess.Move.null()
-                        state.searchmoves.reset()
-                        state.takeback_active = True
-                        set_wait_state(Message.TAKE_BACK(game=state.game.copy()), state)  # new: force stop no matter if picochess turn
-
-                        break
+                    # its a complete new pos, delete saved values
+                    state.done_computer_fen = None
+                    state.done_move = state.pb_move = chess.Move.null()
+                    state.searchmoves.reset()
+                    state.takeback_active = True
+                    set_wait_state(Message.TAKE_BACK(game=state.game.copy()), state)  # new: force stop no matter if picochess turn
 
                 if pgn_mode():  # molli pgn
                     log_pgn(state)
@@ -1738,7 +1706,7 @@ def main() -> None:
         """Enter engine waiting (normal mode) and maybe (by parameter) start pondering."""
         if not state.done_computer_fen:
             state.legal_fens = compute_legal_fens(state.game.copy())
-            state.last_legal_fens = []
+            state.last_legal_fens = FenResolver()
         if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN):  # @todo handle Mode.REMOTE too
             if state.done_computer_fen:
                 logging.debug('best move displayed, dont search and also keep play mode: %s', state.play_mode)
@@ -1831,9 +1799,9 @@ def main() -> None:
 
                 stop_search_and_clock()
 
-                state.last_legal_fens = []
-                state.legal_fens_after_cmove = []
-                state.legal_fens = []
+                state.last_legal_fens = FenResolver()
+                state.legal_fens_after_cmove = FenResolver()
+                state.legal_fens = FenResolver()
 
                 think(state.game, state.time_control, msg, state)
 
@@ -1857,8 +1825,8 @@ def main() -> None:
         if not engine.is_waiting():
             stop_search_and_clock()
 
-        state.last_legal_fens = []
-        state.legal_fens_after_cmove = []
+        state.last_legal_fens = FenResolver()
+        state.legal_fens_after_cmove = FenResolver()
         state.best_move_displayed = state.done_computer_fen
         if state.best_move_displayed:
             state.done_computer_fen = None
@@ -1872,7 +1840,7 @@ def main() -> None:
         if state.time_control.mode == TimeMode.FIXED:
             state.time_control.reset()
 
-        state.legal_fens = []
+        state.legal_fens = FenResolver()
 
         cond1 = state.game.turn == chess.WHITE and state.play_mode == PlayMode.USER_BLACK
         cond2 = state.game.turn == chess.BLACK and state.play_mode == PlayMode.USER_WHITE
@@ -1964,6 +1932,9 @@ def main() -> None:
     parser.add_argument('-ctga', '--continue-game', action='store_true', help='continue last game after (re)start of picochess')
     parser.add_argument('-seng', '--show-engine', action='store_false', help='show engine after startup and new game')
     parser.add_argument('-teng', '--tutor-engine', type=str, default='/opt/picochess/engines/armv7l/a-stockf', help='engine used for PicoTutor analysis')
+    parser.add_argument('-tsin', '--tutor-single-engine', action='store_true', help='PicoTutor uses only one analysis engine (low depth results are taken from the deep search), default is off')
+    parser.add_argument('-tamp', '--tutor-adaptive-multipv', action='store_true', help='PicoTutor searches only the best lines (and verifies the user move separately) instead of all moves, default is off')
+    parser.add_argument('-tevc', '--tutor-eval-cache', action='store_true', help='PicoTutor keeps its position evaluations in games/tutor_evals.db across restarts, default is off')
     parser.add_argument('-watc', '--tutor-watcher', action='store_true', help='Pico Watcher: atomatic move evaluation, blunder warning & move suggestion, default is off')
     parser.add_argument('-coch', '--tutor-coach', action='store_true', help='Pico Coach: move and position evaluation, move suggestion etc. on demand, default is off')
     parser.add_argument('-open', '--tutor-explorer', action='store_true', help='Pico Opening Explorer: shows the name(s) of the opening (based on ECO file), default is off')
@@ -1977,6 +1948,13 @@ def main() -> None:
     parser.add_argument('-rspeed', '--rspeed', type=str, default='1.0', help='RetroSpeed factor for mame eingines, 0.0 for fullspeed, 1.0 for original speed, 0.5 for half of the original speed or any other value from 0.0 to 7.0')
     parser.add_argument('-rsound', '--rsound', action='store_true', help='enable/disable mame engine sound (default is off)')
     parser.add_argument('-ratdev', '--rating-deviation', type=str, help='Player rating deviation for automatic adjustment of ELO', default=350)
+    parser.add_argument('-eint', '--engine-info-interval', type=float, default=0.5, help='min. seconds between two engine score/pv/depth updates, default is 0.5')
+    parser.add_argument('-epsz', '--engine-pool-size', type=int, default=0, help='number of engines kept running (idle) after an engine change for a fast switch back (retro engines are never kept), default is 0 = off')
+    parser.add_argument('-epmm', '--engine-pool-memory', type=int, default=512, help='max. memory (in MB) of the idle engines, default is 512')
+    parser.add_argument('-eaio', '--engine-asyncio', action='store_true', help='talk to local engines with the asyncio uci transport (one event loop instead of reader threads), default is off')
+    parser.add_argument('-tbp', '--tablebase-path', type=str, default='tablebases/syzygy', help='folder of the syzygy tablebases used by the tutor and the score display, default is tablebases/syzygy')
+    parser.add_argument('-tbm', '--tablebase-moves', action='store_true', help='play the tablebase move without an engine search when the position is in the tablebases, default is off')
+    parser.add_argument('-epfv', '--engine-pool-favorites', action='store_true', help='start the favorite engines (idle) in the background at startup, default is off')
     args, unknown = parser.parse_known_args()
 
     # Enable logging
@@ -1992,6 +1970,11 @@ def main() -> None:
     a_copy = copy.copy(vars(args))
     a_copy['mailgun_key'] = a_copy['smtp_pass'] = a_copy['engine_remote_key'] = a_copy['engine_remote_pass'] = '*****'
     logging.debug('startup parameters: %s', a_copy)
+    Informer.default_interval = args.engine_info_interval
+    tablebases.open(args.tablebase_path)
+    GameArchive.default_name = args.pgn_file
+    get_archive().preload()
+    UciEngine.asyncio_transport = args.engine_asyncio
     if unknown:
         logging.warning('invalid parameter given %s', unknown)
 
@@ -2119,8 +2102,9 @@ def main() -> None:
     if engine_file is None:
         engine_file = EngineProvider.installed_engines[0]['file']
 
-    engine = UciEngine(file=engine_file, uci_shell=uci_local_shell,
-                       mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
+    engine_pool = EnginePool(args.engine_pool_size, args.engine_pool_memory)
+    engine = engine_pool.acquire(file=engine_file, uci_shell=uci_local_shell,
+                                 mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
     try:
         engine_name = engine.get_name()
     except AttributeError:
@@ -2144,7 +2128,8 @@ def main() -> None:
         logging.warning('selected book not present, defaulting to %s', all_books[7]['file'])
         book_index = 7
     state.book_in_use = args.book
-    bookreader = chess.polyglot.open_reader(all_books[book_index]['file'])
+    book_service = BookService(all_books)
+    book_service.select(all_books[book_index]['file'])
     state.searchmoves = AlternativeMover()
 
     if args.pgn_elo and args.pgn_elo.isnumeric() and args.rating_deviation:
@@ -2154,6 +2139,9 @@ def main() -> None:
         args.engine_level = None
     engine_opt, level_index = get_engine_level_dict(args.engine_level)
     engine.startup(engine_opt, state.rating)
+    if args.engine_pool_favorites:
+        engine_pool.preload([eng for eng in EngineProvider.favorite_engines if eng['file'] != engine_file], uci_local_shell,
+                            get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
 
     # Startup - external
     state.engine_level = args.engine_level
@@ -2205,7 +2193,9 @@ def main() -> None:
     DisplayMsg.show(Message.PICOCOMMENT(picocomment='ok'))
 
     state.comment_file = get_comment_file()
-    state.picotutor = PicoTutor(i_engine_path=tutor_engine, i_comment_file=state.comment_file, i_lang=args.language)
+    state.picotutor = PicoTutor(i_engine_path=tutor_engine, i_comment_file=state.comment_file, i_lang=args.language,
+                                i_single_engine=args.tutor_single_engine, i_adaptive_multipv=args.tutor_adaptive_multipv,
+                                i_persist_evals=args.tutor_eval_cache)
     state.picotutor.set_status(state.dgtmenu.get_picowatcher(), state.dgtmenu.get_picocoach(), state.dgtmenu.get_picoexplorer(), state.dgtmenu.get_picocomment())
 
     ModeInfo.set_game_ending(result='*')
@@ -2217,1397 +2207,1457 @@ def main() -> None:
     if state.dgtmenu.get_enginename():
         DisplayMsg.show(Message.ENGINE_NAME(engine_name=state.engine_text))
 
-    # Event loop
-    logging.info('evt_queue ready')
-    while True:
-        try:
-            event = evt_queue.get()
-        except queue.Empty:
-            pass
+    # Event handlers of the event loop
+    event_handlers = HandlerRegistry('main')
+
+    @event_handlers.register(Event.FEN)
+    def _fen(event):
+        process_fen(event.fen, state)
+
+    @event_handlers.register(Event.KEYBOARD_MOVE)
+    def _keyboard_move(event):
+        move = event.move
+        logging.debug('keyboard move [%s]', move)
+        if move not in state.game.legal_moves:
+            logging.warning('illegal move. fen: [%s]', state.game.fen())
         else:
-            logging.debug('received event from evt_queue: %s', event)
-            if False:  # switch-case
-                pass
-            elif isinstance(event, Event.FEN):
-                process_fen(event.fen, state)
-
-            elif isinstance(event, Event.KEYBOARD_MOVE):
-                move = event.move
-                logging.debug('keyboard move [%s]', move)
-                if move not in state.game.legal_moves:
-                    logging.warning('illegal move. fen: [%s]', state.game.fen())
-                else:
-                    game_copy = state.game.copy()
-                    game_copy.push(move)
-                    fen = game_copy.board_fen()
-                    DisplayMsg.show(Message.DGT_FEN(fen=fen, raw=False))
+            game_copy = state.game.copy()
+            game_copy.push(move)
+            fen = game_copy.board_fen()
+            DisplayMsg.show(Message.DGT_FEN(fen=fen, raw=False))
+
+    @event_handlers.register(Event.NEW_INFO)
+    def _new_info(event):
+        nonlocal flag_pgn_game_over
+        if state.interaction_mode == Mode.BRAIN and engine.is_pondering():
+            logging.debug('in brain mode and pondering ignore info pv: %s score: %s depth: %s',
+                          event.pv[:3] if event.pv else None, event.score, event.depth)
+            return
+        if event.pv is not None:
+            # illegal moves can occur if a pv from the engine arrives at the same time as an user move
+            if state.game.is_legal(event.pv[0]):
+                DisplayMsg.show(Message.NEW_PV(pv=event.pv, mode=state.interaction_mode, game=state.game.copy()))
+            else:
+                logging.info('illegal move can not be displayed. move: %s fen: %s', event.pv[0], state.game.fen())
+                logging.info('engine status: t:%s p:%s', engine.is_thinking(), engine.is_pondering())
+        if event.score is not None or event.mate is not None or event.depth is not None:
+            # molli pgn mode: score or depth 999 signals that pgn is at end
+            flag_pgn_game_over = event.score in (999, -999) or event.depth == 999
+        if event.score is not None or event.mate is not None:
+            score = event.score
+            if event.mate is None and not pgn_mode():
+                # inside the tablebases show the exact result instead of the engine guess
+                tb_score = tablebases.score(state.game)
+                score = score if tb_score is None else tb_score
+            DisplayMsg.show(Message.NEW_SCORE(score=score, mate=event.mate, mode=state.interaction_mode,
+                                              turn=state.game.turn))
+        if event.depth is not None:
+            DisplayMsg.show(Message.NEW_DEPTH(depth=event.depth))
+
+    @event_handlers.register(Event.START_SEARCH)
+    def _start_search(_):
+        DisplayMsg.show(Message.SEARCH_STARTED())
+
+    @event_handlers.register(Event.STOP_SEARCH)
+    def _stop_search(_):
+        DisplayMsg.show(Message.SEARCH_STOPPED())
+
+    @event_handlers.register(Event.PROMOTION)
+    def _promotion(event):
+        DisplayMsg.show(Message.PROMOTION_DONE(move=event.move))
+
+    @event_handlers.register(Event.RESUME_CLOCK)
+    def _resume_clock(_):
+        state.start_clock()
 
-            elif isinstance(event, Event.LEVEL):
-                if event.options:
-                    engine.startup(event.options, state.rating)
-                state.new_engine_level = event.level_name
-                DisplayMsg.show(Message.LEVEL(level_text=event.level_text, level_name=event.level_name,
-                                              do_speak=bool(event.options)))
-
-            elif isinstance(event, Event.NEW_ENGINE):
-                old_file = engine.get_file()
-                old_options = {}
-                old_options = engine.get_pgn_options()
-                engine_fallback = False
-                # Stop the old engine cleanly
-                if not emulation_mode():
-                    stop_search()
-                # Closeout the engine process and threads
+    @event_handlers.register(Event.LEVEL)
+    def _level(event):
+        if event.options:
+            engine.startup(event.options, state.rating)
+        state.new_engine_level = event.level_name
+        DisplayMsg.show(Message.LEVEL(level_text=event.level_text, level_name=event.level_name,
+                                      do_speak=bool(event.options)))
+
+    @event_handlers.register(Event.NEW_ENGINE)
+    def _new_engine(event):
+        nonlocal engine, engine_file, engine_name, uci_remote_shell, level_text, text, is_out_of_time_already
+        nonlocal flag_last_engine_emu, flag_last_engine_online, flag_last_engine_pgn
+        nonlocal fischer_inc, game_time, login, opp_user, own_user
+        old_file = engine.get_file()
+        old_options = {}
+        old_options = engine.get_pgn_options()
+        engine_fallback = False
+        # Stop the old engine cleanly
+        if not emulation_mode():
+            stop_search()
+        # Closeout the engine process and threads
 
-                engine_file = event.eng['file']
-                help_str = engine_file.rsplit(os.sep, 1)[1]
-                remote_file = engine_remote_home + os.sep + help_str
+        engine_file = event.eng['file']
+        help_str = engine_file.rsplit(os.sep, 1)[1]
+        remote_file = engine_remote_home + os.sep + help_str
 
-                flag_eng = False
-                flag_eng = check_ssh(args.engine_remote_server, args.engine_remote_user, args.engine_remote_pass)
+        flag_eng = remote_engine_mode() and ssh_connections.check(args.engine_remote_server, args.engine_remote_user,
+                                                                   args.engine_remote_key, args.engine_remote_pass, remote_windows())
 
-                logging.debug('molli check_ssh:%s', flag_eng)
-                DisplayMsg.show(Message.ENGINE_SETUP())
+        logging.debug('molli check_ssh:%s', flag_eng)
+        DisplayMsg.show(Message.ENGINE_SETUP())
 
-                if remote_engine_mode():
-                    if flag_eng:
-                        if not uci_remote_shell:
-                            if remote_windows():
-                                logging.info('molli: Remote Windows Connection')
-                                uci_remote_shell = UciShell(hostname=args.engine_remote_server, username=args.engine_remote_user, key_file=args.engine_remote_key, password=args.engine_remote_pass, windows=True)
-                            else:
-                                logging.info('molli: Remote Mac/UNIX Connection')
-                                uci_remote_shell = UciShell(hostname=args.engine_remote_server, username=args.engine_remote_user, key_file=args.engine_remote_key, password=args.engine_remote_pass)
+        if remote_engine_mode():
+            if flag_eng:
+                if not uci_remote_shell:
+                    if remote_windows():
+                        logging.info('molli: Remote Windows Connection')
+                        uci_remote_shell = UciShell(hostname=args.engine_remote_server, username=args.engine_remote_user, key_file=args.engine_remote_key, password=args.engine_remote_pass, windows=True)
                     else:
-                        engine_fallback = True
-                        DisplayMsg.show(Message.ONLINE_FAILED())
-                        time.sleep(2)
-                        DisplayMsg.show(Message.REMOTE_FAIL())
-                        time.sleep(2)
-
-                if engine.quit():
-                    # Load the new one and send args.
-                    if remote_engine_mode() and flag_eng and uci_remote_shell:
-                        engine = UciEngine(file=remote_file, uci_shell=uci_remote_shell,
+                        logging.info('molli: Remote Mac/UNIX Connection')
+                        uci_remote_shell = UciShell(hostname=args.engine_remote_server, username=args.engine_remote_user, key_file=args.engine_remote_key, password=args.engine_remote_pass)
+            else:
+                engine_fallback = True
+                DisplayMsg.show(Message.ONLINE_FAILED())
+                time.sleep(2)
+                DisplayMsg.show(Message.REMOTE_FAIL())
+                time.sleep(2)
+
+        if engine_pool.release(engine):
+            # Load the new one and send args.
+            if remote_engine_mode() and flag_eng and uci_remote_shell:
+                engine = engine_pool.acquire(file=remote_file, uci_shell=uci_remote_shell,
                                            mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
-                    else:
-                        engine = UciEngine(file=engine_file, uci_shell=uci_local_shell,
+            else:
+                engine = engine_pool.acquire(file=engine_file, uci_shell=uci_local_shell,
                                            mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
-                    try:
-                        engine_name = engine.get_name()
-                    except AttributeError:
-                        # New engine failed to start, restart old engine
-                        logging.error('new engine failed to start, reverting to %s', old_file)
-                        engine_fallback = True
-                        event.options = old_options
-                        engine_file = old_file
-                        help_str = old_file.rsplit(os.sep, 1)[1]
-                        remote_file = engine_remote_home + os.sep + help_str
-
-                        if remote_engine_mode() and flag_eng and uci_remote_shell:
-                            engine = UciEngine(file=remote_file, uci_shell=uci_remote_shell,
+            try:
+                engine_name = engine.get_name()
+            except AttributeError:
+                # New engine failed to start, restart old engine
+                logging.error('new engine failed to start, reverting to %s', old_file)
+                engine_fallback = True
+                event.options = old_options
+                engine_file = old_file
+                help_str = old_file.rsplit(os.sep, 1)[1]
+                remote_file = engine_remote_home + os.sep + help_str
+
+                if remote_engine_mode() and flag_eng and uci_remote_shell:
+                    engine = engine_pool.acquire(file=remote_file, uci_shell=uci_remote_shell,
                                                mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
-                        else:
-                            engine = UciEngine(file=old_file, uci_shell=uci_local_shell,
+                else:
+                    engine = engine_pool.acquire(file=old_file, uci_shell=uci_local_shell,
                                                mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
-                        try:
-                            engine_name = engine.get_name()
-                        except AttributeError:
-                            # Help - old engine failed to restart. There is no engine
-                            logging.error('no engines started')
-                            DisplayMsg.show(Message.ENGINE_FAIL())
-                            time.sleep(3)
-                            sys.exit(-1)
-
-                    # All done - rock'n'roll
-                    if state.interaction_mode == Mode.BRAIN and not engine.has_ponder():
-                        logging.debug('new engine doesnt support brain mode, reverting to %s', old_file)
-                        engine_fallback = True
-                        if engine.quit():
-                            if remote_engine_mode() and flag_eng and uci_remote_shell:
-                                engine = UciEngine(file=remote_file, uci_shell=uci_remote_shell,
-                                                   mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
-                            else:
-                                engine = UciEngine(file=old_file, uci_shell=uci_local_shell,
-                                                   mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
-                            engine.startup(old_options, state.rating)
-                            engine.newgame(state.game.copy())
-                            try:
-                                engine_name = engine.get_name()
-                            except AttributeError:
-                                logging.error('no engines started')
-                                DisplayMsg.show(Message.ENGINE_FAIL())
-                                time.sleep(3)
-                                sys.exit(-1)
-                        else:
-                            logging.error('engine shutdown failure')
-                            DisplayMsg.show(Message.ENGINE_FAIL())
-
-                    engine.startup(event.options, state.rating)
-
-                    if online_mode():
-                        state.stop_clock()
-                        DisplayMsg.show(Message.ONLINE_LOGIN())
-                        # check if login successful (correct server & correct user)
-                        login, own_color, own_user, opp_user, game_time, fischer_inc = read_online_user_info()
-                        logging.debug('molli online login: %s', login)
-
-                        if 'ok' not in login:
-                            # server connection failed: check settings!
-                            DisplayMsg.show(Message.ONLINE_FAILED())
-                            time.sleep(3)
-                            engine_fallback = True
-                            event.options = dict()
-                            old_file = 'engines/armv7l/a-stockf'
-                            help_str = old_file.rsplit(os.sep, 1)[1]
-                            remote_file = engine_remote_home + os.sep + help_str
-
-                            if remote_engine_mode() and flag_eng and uci_remote_shell:
-                                engine = UciEngine(file=remote_file, uci_shell=uci_remote_shell,
-                                                   mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
-                            else:
-                                engine = UciEngine(file=old_file, uci_shell=uci_local_shell,
+                try:
+                    engine_name = engine.get_name()
+                except AttributeError:
+                    # Help - old engine failed to restart. There is no engine
+                    logging.error('no engines started')
+                    DisplayMsg.show(Message.ENGINE_FAIL())
+                    time.sleep(3)
+                    sys.exit(-1)
+
+            # All done - rock'n'roll
+            if state.interaction_mode == Mode.BRAIN and not engine.has_ponder():
+                logging.debug('new engine doesnt support brain mode, reverting to %s', old_file)
+                engine_fallback = True
+                if engine_pool.release(engine):
+                    if remote_engine_mode() and flag_eng and uci_remote_shell:
+                        engine = engine_pool.acquire(file=remote_file, uci_shell=uci_remote_shell,
                                                    mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
-                            try:
-                                engine_name = engine.get_name()
-                            except AttributeError:
-                                # Help - old engine failed to restart. There is no engine
-                                logging.error('no engines started')
-                                DisplayMsg.show(Message.ENGINE_FAIL())
-                                time.sleep(3)
-                                sys.exit(-1)
-                            engine.startup(event.options, state.rating)
-                        else:
-                            time.sleep(2)
-                    elif emulation_mode() or pgn_mode():
-                        # molli for emulation engine we have to reset to starting position
-                        stop_search_and_clock()
-                        state.game = chess.Board()
-                        state.game.turn = chess.WHITE
-                        state.play_mode = PlayMode.USER_WHITE
-                        engine.newgame(state.game.copy())
-                        state.done_computer_fen = None
-                        state.done_move = state.pb_move = chess.Move.null()
-                        state.searchmoves.reset()
-                        state.game_declared = False
-                        state.legal_fens = compute_legal_fens(state.game.copy())
-                        state.last_legal_fens = []
-                        state.legal_fens_after_cmove = []
-                        is_out_of_time_already = False
-                    else:
-                        engine.newgame(state.game.copy())
-
-                    engine_mode()
-
-                    if engine_fallback:
-                        msg = Message.ENGINE_FAIL()
-                        # molli: in case of engine fail, set correct old engine display settings
-                        for index in range(0, len(EngineProvider.installed_engines)):
-                            if EngineProvider.installed_engines[index]['file'] == old_file:
-                                logging.debug('molli index:%s', str(index))
-                                state.dgtmenu.set_engine_index(index)
-                        # in case engine fails, reset level as well
-                        if state.old_engine_level:
-                            level_text = state.dgttranslate.text('B00_level', state.old_engine_level)
-                            level_text.beep = False
-                        else:
-                            level_text = None
-                        DisplayMsg.show(Message.LEVEL(level_text=level_text, level_name=state.old_engine_level,
-                                                      do_speak=False))
-                        state.new_engine_level = state.old_engine_level
                     else:
-                        state.searchmoves.reset()
-                        msg = Message.ENGINE_READY(eng=event.eng, engine_name=engine_name,
-                                                   eng_text=event.eng_text, has_levels=engine.has_levels(),
-                                                   has_960=engine.has_chess960(), has_ponder=engine.has_ponder(),
-                                                   show_ok=event.show_ok)
-                    # Schedule cleanup of old objects
-                    gc.collect()
-
-                    set_wait_state(msg, state, not engine_fallback)
-                    if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.TRAINING):   # engine isnt started/searching => stop the clock
-                        state.stop_clock()
-                    state.engine_text = state.dgtmenu.get_current_engine_name()
-                    state.dgtmenu.exit_menu()
+                        engine = engine_pool.acquire(file=old_file, uci_shell=uci_local_shell,
+                                                   mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
+                    engine.startup(old_options, state.rating)
+                    engine.newgame(state.game.copy())
+                    try:
+                        engine_name = engine.get_name()
+                    except AttributeError:
+                        logging.error('no engines started')
+                        DisplayMsg.show(Message.ENGINE_FAIL())
+                        time.sleep(3)
+                        sys.exit(-1)
                 else:
                     logging.error('engine shutdown failure')
                     DisplayMsg.show(Message.ENGINE_FAIL())
 
-                state.old_engine_level = state.new_engine_level
-                state.engine_level = state.new_engine_level
-                state.dgtmenu.set_state_current_engine(engine_file)
-                state.dgtmenu.exit_menu()
-                # here dont care if engine supports pondering, cause Mode.NORMAL from startup
-                if not remote_engine_mode() and not online_mode() and not pgn_mode() and not engine_fallback:
-                    # dont write engine(_level) if remote/online engine or engine failure
-                    write_picochess_ini('engine', event.eng['file'])
-                    write_picochess_ini('engine-level', state.engine_level)
-
-                if pgn_mode():
-                    if not flag_last_engine_pgn:
-                        state.tc_init_last = state.time_control.get_parameters()
-
-                    det_pgn_guess_tctrl(state)
-
-                    flag_last_engine_pgn = True
-                elif emulation_mode():
-                    if not flag_last_engine_emu:
-                        state.tc_init_last = state.time_control.get_parameters()
-                    flag_last_engine_emu = True
-                else:
-                    # molli restore last saved timecontrol
-                    if (flag_last_engine_pgn or flag_last_engine_emu) and state.tc_init_last is not None and not online_mode() and not emulation_mode() and not pgn_mode():
-                        state.stop_clock()
-                        text = state.dgttranslate.text('N00_oktime')
-                        Observable.fire(Event.SET_TIME_CONTROL(tc_init=state.tc_init_last, time_text=text, show_ok=True))
-                        state.stop_clock()
-                        DisplayMsg.show(Message.EXIT_MENU())
-                    flag_last_engine_pgn = False
-                    flag_last_engine_emu = False
-                    state.tc_init_last = None
-
-                state.comment_file = get_comment_file()  # for picotutor game comments like Boris & Sargon
-                state.picotutor.init_comments(state.comment_file)
-
-                if pgn_mode() or emulation_mode():
-                    # molli: in these cases we can't continue from current position but
-                    #        have to start a new game
-                    if emulation_mode():
-                        set_emulation_tctrl(state)
-                    # prepare new game
-                    if pgn_mode():
-                        pgn_game_name, pgn_problem, pgn_fen, pgn_result, pgn_white, pgn_black = read_pgn_info()
-                        if 'mate in' in pgn_problem or 'Mate in' in pgn_problem:
-                            set_fen_from_pgn(pgn_fen, state)
-                            state.play_mode = PlayMode.USER_WHITE if state.game.turn == chess.WHITE else PlayMode.USER_BLACK
-                            msg = Message.PLAY_MODE(play_mode=state.play_mode, play_mode_text=state.dgttranslate.text(state.play_mode.value))
-                            DisplayMsg.show(msg)
-                            time.sleep(1)
-                    pos960 = 518
-                    Observable.fire(Event.NEW_GAME(pos960=pos960))
+            engine.startup(event.options, state.rating)
 
-                if online_mode():
-                    ModeInfo.set_online_mode(mode=True)
-                    logging.debug('online game fen: %s', state.game.fen())
-                    if (not flag_last_engine_online) or (state.game.board_fen() == chess.STARTING_BOARD_FEN):
-                        pos960 = 518
-                        Observable.fire(Event.NEW_GAME(pos960=pos960))
-                    flag_last_engine_online = True
-                else:
-                    flag_last_engine_online = False
-                    ModeInfo.set_online_mode(mode=False)
+            if online_mode():
+                state.stop_clock()
+                DisplayMsg.show(Message.ONLINE_LOGIN())
+                # check if login successful (correct server & correct user)
+                login, own_color, own_user, opp_user, game_time, fischer_inc = read_online_user_info()
+                logging.debug('molli online login: %s', login)
+
+                if 'ok' not in login:
+                    # server connection failed: check settings!
+                    DisplayMsg.show(Message.ONLINE_FAILED())
+                    time.sleep(3)
+                    engine_fallback = True
+                    event.options = dict()
+                    old_file = 'engines/armv7l/a-stockf'
+                    help_str = old_file.rsplit(os.sep, 1)[1]
+                    remote_file = engine_remote_home + os.sep + help_str
 
-                if pgn_mode():
-                    ModeInfo.set_pgn_mode(mode=True)
+                    if remote_engine_mode() and flag_eng and uci_remote_shell:
+                        engine = engine_pool.acquire(file=remote_file, uci_shell=uci_remote_shell,
+                                                   mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
+                    else:
+                        engine = engine_pool.acquire(file=old_file, uci_shell=uci_local_shell,
+                                                   mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
+                    try:
+                        engine_name = engine.get_name()
+                    except AttributeError:
+                        # Help - old engine failed to restart. There is no engine
+                        logging.error('no engines started')
+                        DisplayMsg.show(Message.ENGINE_FAIL())
+                        time.sleep(3)
+                        sys.exit(-1)
+                    engine.startup(event.options, state.rating)
                 else:
-                    ModeInfo.set_pgn_mode(mode=False)
-
-                update_elo_display(state)
-
-            elif isinstance(event, Event.SETUP_POSITION):
-                logging.debug('setting up custom fen: %s', event.fen)
-                uci960 = event.uci960
-
-                if state.game.move_stack:
-                    if not (state.game.is_game_over() or state.game_declared):
-                        result = GameResult.ABORT
-                        DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=result, play_mode=state.play_mode, game=state.game.copy()))
-                state.game = chess.Board(event.fen, uci960)
-                # see new_game
+                    time.sleep(2)
+            elif emulation_mode() or pgn_mode():
+                # molli for emulation engine we have to reset to starting position
                 stop_search_and_clock()
-                if engine.has_chess960():
-                    engine.option('UCI_Chess960', uci960)
-                    engine.send()
-
+                state.game = chess.Board()
+                state.game.turn = chess.WHITE
+                state.play_mode = PlayMode.USER_WHITE
                 engine.newgame(state.game.copy())
                 state.done_computer_fen = None
                 state.done_move = state.pb_move = chess.Move.null()
-                state.legal_fens_after_cmove = []
-                is_out_of_time_already = False
-                state.time_control.reset()
                 state.searchmoves.reset()
                 state.game_declared = False
-                if picotutor_mode(state):
-                    state.picotutor.reset()
-                    state.picotutor.set_position(state.game.fen(), i_turn=state.game.turn)
-                    if state.play_mode == PlayMode.USER_BLACK:
-                        state.picotutor.set_user_color(chess.BLACK)
-                    else:
-                        state.picotutor.set_user_color(chess.WHITE)
-                set_wait_state(Message.START_NEW_GAME(game=state.game.copy(), newgame=True), state)
+                state.legal_fens = compute_legal_fens(state.game.copy())
+                state.last_legal_fens = FenResolver()
+                state.legal_fens_after_cmove = FenResolver()
+                is_out_of_time_already = False
+            else:
+                engine.newgame(state.game.copy())
 
-            elif isinstance(event, Event.NEW_GAME):
-                last_move_no = state.game.fullmove_number
-                state.takeback_active = False
-                flag_startup = False
-                flag_pgn_game_over = False
-                ModeInfo.set_game_ending(result='*')  # initialize game result for game saving status
-                engine_name = engine.get_name()
-                position_mode = False
-                fen_error_occured = False
-                newgame_happened = True
-                newgame = state.game.move_stack or (state.game.chess960_pos() != event.pos960)
-
-                if newgame:
-                    logging.debug('starting a new game with code: %s', event.pos960)
-                    uci960 = event.pos960 != 518
-
-                    if not (state.game.is_game_over() or state.game_declared):
-
-                        if emulation_mode():  # force abortion for mame ## molli mame enhance
-                            if state.is_not_user_turn():
-                                # clock must be stopped BEFORE the "book_move" event cause SetNRun resets the clock display
-                                state.stop_clock()
-                                state.best_move_posted = True
-                                # @todo 8/8/R6P/1R6/7k/2B2K1p/8/8 and sliding Ra6 over a5 to a4 - handle this in correct way!!
-                                state.game_declared = True
-                                state.stop_fen_timer()
-                                state.legal_fens_after_cmove = []
+            engine_mode()
+
+            if engine_fallback:
+                msg = Message.ENGINE_FAIL()
+                # molli: in case of engine fail, set correct old engine display settings
+                for index in range(0, len(EngineProvider.installed_engines)):
+                    if EngineProvider.installed_engines[index]['file'] == old_file:
+                        logging.debug('molli index:%s', str(index))
+                        state.dgtmenu.set_engine_index(index)
+                # in case engine fails, reset level as well
+                if state.old_engine_level:
+                    level_text = state.dgttranslate.text('B00_level', state.old_engine_level)
+                    level_text.beep = False
+                else:
+                    level_text = None
+                DisplayMsg.show(Message.LEVEL(level_text=level_text, level_name=state.old_engine_level,
+                                              do_speak=False))
+                state.new_engine_level = state.old_engine_level
+            else:
+                state.searchmoves.reset()
+                msg = Message.ENGINE_READY(eng=event.eng, engine_name=engine_name,
+                                           eng_text=event.eng_text, has_levels=engine.has_levels(),
+                                           has_960=engine.has_chess960(), has_ponder=engine.has_ponder(),
+                                           show_ok=event.show_ok)
+            # Schedule cleanup of old objects
+            gc.collect()
+
+            set_wait_state(msg, state, not engine_fallback)
+            if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.TRAINING):   # engine isnt started/searching => stop the clock
+                state.stop_clock()
+            state.engine_text = state.dgtmenu.get_current_engine_name()
+            state.dgtmenu.exit_menu()
+        else:
+            logging.error('engine shutdown failure')
+            DisplayMsg.show(Message.ENGINE_FAIL())
+
+        state.old_engine_level = state.new_engine_level
+        state.engine_level = state.new_engine_level
+        state.dgtmenu.set_state_current_engine(engine_file)
+        state.dgtmenu.exit_menu()
+        # here dont care if engine supports pondering, cause Mode.NORMAL from startup
+        if not remote_engine_mode() and not online_mode() and not pgn_mode() and not engine_fallback:
+            # dont write engine(_level) if remote/online engine or engine failure
+            write_picochess_ini('engine', event.eng['file'])
+            write_picochess_ini('engine-level', state.engine_level)
 
-                        result = GameResult.ABORT
-                        DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=result, play_mode=state.play_mode, game=state.game.copy()))
-                        time.sleep(0.3)
+        if pgn_mode():
+            if not flag_last_engine_pgn:
+                state.tc_init_last = state.time_control.get_parameters()
 
-                    state.game = chess.Board()
-                    state.game.turn = chess.WHITE
+            det_pgn_guess_tctrl(state)
 
-                    if uci960:
-                        state.game.set_chess960_pos(event.pos960)
+            flag_last_engine_pgn = True
+        elif emulation_mode():
+            if not flag_last_engine_emu:
+                state.tc_init_last = state.time_control.get_parameters()
+            flag_last_engine_emu = True
+        else:
+            # molli restore last saved timecontrol
+            if (flag_last_engine_pgn or flag_last_engine_emu) and state.tc_init_last is not None and not online_mode() and not emulation_mode() and not pgn_mode():
+                state.stop_clock()
+                text = state.dgttranslate.text('N00_oktime')
+                Observable.fire(Event.SET_TIME_CONTROL(tc_init=state.tc_init_last, time_text=text, show_ok=True))
+                state.stop_clock()
+                DisplayMsg.show(Message.EXIT_MENU())
+            flag_last_engine_pgn = False
+            flag_last_engine_emu = False
+            state.tc_init_last = None
+
+        state.comment_file = get_comment_file()  # for picotutor game comments like Boris & Sargon
+        state.picotutor.init_comments(state.comment_file)
+
+        if pgn_mode() or emulation_mode():
+            # molli: in these cases we can't continue from current position but
+            #        have to start a new game
+            if emulation_mode():
+                set_emulation_tctrl(state)
+            # prepare new game
+            if pgn_mode():
+                pgn_game_name, pgn_problem, pgn_fen, pgn_result, pgn_white, pgn_black = read_pgn_info()
+                if 'mate in' in pgn_problem or 'Mate in' in pgn_problem:
+                    set_fen_from_pgn(pgn_fen, state)
+                    state.play_mode = PlayMode.USER_WHITE if state.game.turn == chess.WHITE else PlayMode.USER_BLACK
+                    msg = Message.PLAY_MODE(play_mode=state.play_mode, play_mode_text=state.dgttranslate.text(state.play_mode.value))
+                    DisplayMsg.show(msg)
+                    time.sleep(1)
+            pos960 = 518
+            Observable.fire(Event.NEW_GAME(pos960=pos960))
 
-                    if state.play_mode != PlayMode.USER_WHITE:
-                        state.play_mode = PlayMode.USER_WHITE
-                        msg = Message.PLAY_MODE(play_mode=state.play_mode,
-                                                play_mode_text=state.dgttranslate.text(str(state.play_mode.value)))
-                        DisplayMsg.show(msg)
-                    stop_search_and_clock()
+        if online_mode():
+            ModeInfo.set_online_mode(mode=True)
+            logging.debug('online game fen: %s', state.game.fen())
+            if (not flag_last_engine_online) or (state.game.board_fen() == chess.STARTING_BOARD_FEN):
+                pos960 = 518
+                Observable.fire(Event.NEW_GAME(pos960=pos960))
+            flag_last_engine_online = True
+        else:
+            flag_last_engine_online = False
+            ModeInfo.set_online_mode(mode=False)
 
-                    # see setup_position
-                    if engine.has_chess960():
-                        engine.option('UCI_Chess960', uci960)
-                        engine.send()
+        if pgn_mode():
+            ModeInfo.set_pgn_mode(mode=True)
+        else:
+            ModeInfo.set_pgn_mode(mode=False)
 
-                    if state.interaction_mode == Mode.TRAINING:
-                        engine.stop()
+        update_elo_display(state)
 
-                    if online_mode():
-                        DisplayMsg.show(Message.SEEKING())
-                        engine.stop()
-                        seeking_flag = True
-                        state.stop_fen_timer()
-                        ModeInfo.set_online_mode(mode=True)
-                    else:
-                        ModeInfo.set_online_mode(mode=False)
+    @event_handlers.register(Event.SETUP_POSITION)
+    def _setup_position(event):
+        nonlocal is_out_of_time_already
+        logging.debug('setting up custom fen: %s', event.fen)
+        uci960 = event.uci960
 
-                    if emulation_mode():
-                        DisplayMsg.show(Message.ENGINE_SETUP())
+        if state.game.move_stack:
+            if not (state.game.is_game_over() or state.game_declared):
+                result = GameResult.ABORT
+                DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=result, play_mode=state.play_mode, game=state.game.copy()))
+        state.game = chess.Board(event.fen, uci960)
+        # see new_game
+        stop_search_and_clock()
+        if engine.has_chess960():
+            engine.option('UCI_Chess960', uci960)
+            engine.send()
 
-                    engine.newgame(state.game.copy())
+        engine.newgame(state.game.copy())
+        state.done_computer_fen = None
+        state.done_move = state.pb_move = chess.Move.null()
+        state.legal_fens_after_cmove = FenResolver()
+        is_out_of_time_already = False
+        state.time_control.reset()
+        state.searchmoves.reset()
+        state.game_declared = False
+        if picotutor_mode(state):
+            state.picotutor.reset()
+            state.picotutor.set_position(state.game.fen(), i_turn=state.game.turn)
+            if state.play_mode == PlayMode.USER_BLACK:
+                state.picotutor.set_user_color(chess.BLACK)
+            else:
+                state.picotutor.set_user_color(chess.WHITE)
+        set_wait_state(Message.START_NEW_GAME(game=state.game.copy(), newgame=True), state)
 
-                    state.done_computer_fen = None
-                    state.done_move = state.pb_move = chess.Move.null()
-                    state.time_control.reset()
-                    state.best_move_posted = False
-                    state.searchmoves.reset()
-                    state.game_declared = False
-                    update_elo_display(state)
+    @event_handlers.register(Event.NEW_GAME)
+    def _new_game(event):
+        global fen_error_occured
+        global flag_startup
+        global newgame_happened
+        global position_mode
+        global seeking_flag
+        nonlocal engine_name, fischer_inc, flag_pgn_game_over, game_time, is_out_of_time_already, login, opp_user, own_user
+        message_scheduler.cancel()
+        last_move_no = state.game.fullmove_number
+        state.takeback_active = False
+        flag_startup = False
+        flag_pgn_game_over = False
+        ModeInfo.set_game_ending(result='*')  # initialize game result for game saving status
+        engine_name = engine.get_name()
+        position_mode = False
+        fen_error_occured = False
+        newgame_happened = True
+        newgame = state.game.move_stack or (state.game.chess960_pos() != event.pos960)
 
-                    if online_mode():
-                        time.sleep(0.5)
-                        login, own_color, own_user, opp_user, game_time, fischer_inc = read_online_user_info()
-                        if 'no_user' in own_user and not login == 'ok':
-                            # user login failed check login settings!!!
-                            DisplayMsg.show(Message.ONLINE_USER_FAILED())
-                            time.sleep(3)
-                        elif 'no_player' in opp_user:
-                            # no opponent found start new game or engine again!!!
-                            DisplayMsg.show(Message.ONLINE_NO_OPPONENT())
-                            time.sleep(3)
-                        else:
-                            DisplayMsg.show(Message.ONLINE_NAMES(own_user=own_user, opp_user=opp_user))
-                            time.sleep(3)
-                        seeking_flag = False
-                        state.best_move_displayed = None
+        if newgame:
+            logging.debug('starting a new game with code: %s', event.pos960)
+            uci960 = event.pos960 != 518
 
-                    state.legal_fens = compute_legal_fens(state.game.copy())
-                    state.last_legal_fens = []
-                    state.legal_fens_after_cmove = []
-                    is_out_of_time_already = False
-                    if pgn_mode():
-                        if state.max_guess > 0:
-                            state.max_guess_white = state.max_guess
-                            state.max_guess_black = 0
-                        pgn_game_name, pgn_problem, pgn_fen, pgn_result, pgn_white, pgn_black = read_pgn_info()
-                        if 'mate in' in pgn_problem or 'Mate in' in pgn_problem:
-                            set_fen_from_pgn(pgn_fen, state)
-                    set_wait_state(Message.START_NEW_GAME(game=state.game.copy(), newgame=newgame), state)
-                    if 'no_player' not in opp_user and 'no_user' not in own_user:
-                        switch_online(state)
+            if not (state.game.is_game_over() or state.game_declared):
 
-                else:
-                    if online_mode():
-                        logging.debug('starting a new game with code: %s', event.pos960)
-                        uci960 = event.pos960 != 518
+                if emulation_mode():  # force abortion for mame ## molli mame enhance
+                    if state.is_not_user_turn():
+                        # clock must be stopped BEFORE the "book_move" event cause SetNRun resets the clock display
                         state.stop_clock()
+                        state.best_move_posted = True
+                        # @todo 8/8/R6P/1R6/7k/2B2K1p/8/8 and sliding Ra6 over a5 to a4 - handle this in correct way!!
+                        state.game_declared = True
+                        state.stop_fen_timer()
+                        state.legal_fens_after_cmove = FenResolver()
 
-                        state.game.turn = chess.WHITE
+                result = GameResult.ABORT
+                DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=result, play_mode=state.play_mode, game=state.game.copy()))
+                time.sleep(0.3)
 
-                        if uci960:
-                            state.game.set_chess960_pos(event.pos960)
+            state.game = chess.Board()
+            state.game.turn = chess.WHITE
 
-                        if state.play_mode != PlayMode.USER_WHITE:
-                            state.play_mode = PlayMode.USER_WHITE
-                            msg = Message.PLAY_MODE(play_mode=state.play_mode,
-                                                    play_mode_text=state.dgttranslate.text(str(state.play_mode.value)))
-                            DisplayMsg.show(msg)
+            if uci960:
+                state.game.set_chess960_pos(event.pos960)
 
-                        # see setup_position
-                        stop_search_and_clock()
-                        state.stop_fen_timer()
+            if state.play_mode != PlayMode.USER_WHITE:
+                state.play_mode = PlayMode.USER_WHITE
+                msg = Message.PLAY_MODE(play_mode=state.play_mode,
+                                        play_mode_text=state.dgttranslate.text(str(state.play_mode.value)))
+                DisplayMsg.show(msg)
+            stop_search_and_clock()
 
-                        if engine.has_chess960():
-                            engine.option('UCI_Chess960', uci960)
-                            engine.send()
+            # see setup_position
+            if engine.has_chess960():
+                engine.option('UCI_Chess960', uci960)
+                engine.send()
 
-                        state.time_control.reset()
-                        state.searchmoves.reset()
+            if state.interaction_mode == Mode.TRAINING:
+                engine.stop()
 
-                        DisplayMsg.show(Message.SEEKING())
-                        engine.stop()
-                        seeking_flag = True
+            if online_mode():
+                DisplayMsg.show(Message.SEEKING())
+                engine.stop()
+                seeking_flag = True
+                state.stop_fen_timer()
+                ModeInfo.set_online_mode(mode=True)
+            else:
+                ModeInfo.set_online_mode(mode=False)
 
-                        engine.newgame(state.game.copy())
+            if emulation_mode():
+                DisplayMsg.show(Message.ENGINE_SETUP())
 
-                        login, own_color, own_user, opp_user, game_time, fischer_inc = read_online_user_info()
-                        if 'no_user' in own_user:
-                            # user login failed check login settings!!!
-                            DisplayMsg.show(Message.ONLINE_USER_FAILED())
-                            time.sleep(3)
-                        elif 'no_player' in opp_user:
-                            # no opponent found start new game & search!!!
-                            DisplayMsg.show(Message.ONLINE_NO_OPPONENT())
-                            time.sleep(3)
-                        else:
-                            DisplayMsg.show(Message.ONLINE_NAMES(own_user=own_user, opp_user=opp_user))
-                            time.sleep(1)
-                        seeking_flag = False
-                        state.best_move_displayed = None
-                        state.done_computer_fen = None
-                        state.done_move = state.pb_move = chess.Move.null()
-                        state.legal_fens = compute_legal_fens(state.game.copy())
-                        state.last_legal_fens = []
-                        state.legal_fens_after_cmove = []
-                        is_out_of_time_already = False
-                        state.game_declared = False
-                        set_wait_state(Message.START_NEW_GAME(game=state.game.copy(), newgame=newgame), state)
-                        if 'no_player' not in opp_user and 'no_user' not in own_user:
-                            switch_online(state)
-                    else:
-                        logging.debug('no need to start a new game')
-                        if pgn_mode():
-                            pgn_game_name, pgn_problem, pgn_fen, pgn_result, pgn_white, pgn_black = read_pgn_info()
-                            if 'mate in' in pgn_problem or 'Mate in' in pgn_problem:
-                                set_fen_from_pgn(pgn_fen, state)
-                                set_wait_state(Message.START_NEW_GAME(game=state.game.copy(), newgame=newgame), state)
-                            else:
-                                DisplayMsg.show(Message.START_NEW_GAME(game=state.game.copy(), newgame=newgame))
-                        else:
-                            DisplayMsg.show(Message.START_NEW_GAME(game=state.game.copy(), newgame=newgame))
+            engine.newgame(state.game.copy())
 
-                if picotutor_mode(state):
-                    state.picotutor.reset()
-                    if not flag_startup:
-                        if state.play_mode == PlayMode.USER_BLACK:
-                            state.picotutor.set_user_color(chess.BLACK)
-                        else:
-                            state.picotutor.set_user_color(chess.WHITE)
+            state.done_computer_fen = None
+            state.done_move = state.pb_move = chess.Move.null()
+            state.time_control.reset()
+            state.best_move_posted = False
+            state.searchmoves.reset()
+            state.game_declared = False
+            update_elo_display(state)
+
+            if online_mode():
+                time.sleep(0.5)
+                login, own_color, own_user, opp_user, game_time, fischer_inc = read_online_user_info()
+                if 'no_user' in own_user and not login == 'ok':
+                    # user login failed check login settings!!!
+                    DisplayMsg.show(Message.ONLINE_USER_FAILED())
+                    time.sleep(3)
+                elif 'no_player' in opp_user:
+                    # no opponent found start new game or engine again!!!
+                    DisplayMsg.show(Message.ONLINE_NO_OPPONENT())
+                    time.sleep(3)
+                else:
+                    DisplayMsg.show(Message.ONLINE_NAMES(own_user=own_user, opp_user=opp_user))
+                    time.sleep(3)
+                seeking_flag = False
+                state.best_move_displayed = None
 
-                if state.interaction_mode != Mode.REMOTE and not online_mode():
-                    if state.dgtmenu.get_enginename():
-                        time.sleep(0.7)  # give time for ABORT message
-                        DisplayMsg.show(Message.ENGINE_NAME(engine_name=state.engine_text))
-                    if pgn_mode():
-                        pgn_white = ''
-                        pgn_black = ''
-                        time.sleep(1)
-                        pgn_game_name, pgn_problem, pgn_fen, pgn_result, pgn_white, pgn_black = read_pgn_info()
+            state.legal_fens = compute_legal_fens(state.game.copy())
+            state.last_legal_fens = FenResolver()
+            state.legal_fens_after_cmove = FenResolver()
+            is_out_of_time_already = False
+            if pgn_mode():
+                if state.max_guess > 0:
+                    state.max_guess_white = state.max_guess
+                    state.max_guess_black = 0
+                pgn_game_name, pgn_problem, pgn_fen, pgn_result, pgn_white, pgn_black = read_pgn_info()
+                if 'mate in' in pgn_problem or 'Mate in' in pgn_problem:
+                    set_fen_from_pgn(pgn_fen, state)
+            set_wait_state(Message.START_NEW_GAME(game=state.game.copy(), newgame=newgame), state)
+            if 'no_player' not in opp_user and 'no_user' not in own_user:
+                switch_online(state)
 
-                        if not pgn_white:
-                            pgn_white = '????'
-                        DisplayMsg.show(Message.SHOW_TEXT(text_string=pgn_white))
+        else:
+            if online_mode():
+                logging.debug('starting a new game with code: %s', event.pos960)
+                uci960 = event.pos960 != 518
+                state.stop_clock()
 
-                        DisplayMsg.show(Message.SHOW_TEXT(text_string='versus'))
+                state.game.turn = chess.WHITE
 
-                        if not pgn_black:
-                            pgn_black = '????'
-                        DisplayMsg.show(Message.SHOW_TEXT(text_string=pgn_black))
+                if uci960:
+                    state.game.set_chess960_pos(event.pos960)
 
-                        if pgn_result:
-                            DisplayMsg.show(Message.SHOW_TEXT(text_string=pgn_result))
-                        if 'mate in' in pgn_problem or 'Mate in' in pgn_problem:
-                            DisplayMsg.show(Message.SHOW_TEXT(text_string=pgn_problem))
-                        else:
-                            DisplayMsg.show(Message.SHOW_TEXT(text_string=pgn_game_name))
+                if state.play_mode != PlayMode.USER_WHITE:
+                    state.play_mode = PlayMode.USER_WHITE
+                    msg = Message.PLAY_MODE(play_mode=state.play_mode,
+                                            play_mode_text=state.dgttranslate.text(str(state.play_mode.value)))
+                    DisplayMsg.show(msg)
 
-                        # reset pgn guess counters
-                        if last_move_no > 1:
-                            state.no_guess_black = 1
-                            state.no_guess_white = 1
-                        else:
-                            log_pgn(state)
-                            if state.max_guess_white > 0:
-                                if state.no_guess_white > state.max_guess_white:
-                                    state.last_legal_fens = []
-                                    get_next_pgn_move(state)
+                # see setup_position
+                stop_search_and_clock()
+                state.stop_fen_timer()
 
-            elif isinstance(event, Event.PAUSE_RESUME):
-                if pgn_mode():
-                    engine.pause_pgn_audio()
+                if engine.has_chess960():
+                    engine.option('UCI_Chess960', uci960)
+                    engine.send()
+
+                state.time_control.reset()
+                state.searchmoves.reset()
+
+                DisplayMsg.show(Message.SEEKING())
+                engine.stop()
+                seeking_flag = True
+
+                engine.newgame(state.game.copy())
+
+                login, own_color, own_user, opp_user, game_time, fischer_inc = read_online_user_info()
+                if 'no_user' in own_user:
+                    # user login failed check login settings!!!
+                    DisplayMsg.show(Message.ONLINE_USER_FAILED())
+                    time.sleep(3)
+                elif 'no_player' in opp_user:
+                    # no opponent found start new game & search!!!
+                    DisplayMsg.show(Message.ONLINE_NO_OPPONENT())
+                    time.sleep(3)
                 else:
-                    if engine.is_thinking():
-                        state.stop_clock()
-                        engine.stop(show_best=True)
-                    elif not state.done_computer_fen:
-                        if state.time_control.internal_running():
-                            state.stop_clock()
-                        else:
-                            state.start_clock()
+                    DisplayMsg.show(Message.ONLINE_NAMES(own_user=own_user, opp_user=opp_user))
+                    time.sleep(1)
+                seeking_flag = False
+                state.best_move_displayed = None
+                state.done_computer_fen = None
+                state.done_move = state.pb_move = chess.Move.null()
+                state.legal_fens = compute_legal_fens(state.game.copy())
+                state.last_legal_fens = FenResolver()
+                state.legal_fens_after_cmove = FenResolver()
+                is_out_of_time_already = False
+                state.game_declared = False
+                set_wait_state(Message.START_NEW_GAME(game=state.game.copy(), newgame=newgame), state)
+                if 'no_player' not in opp_user and 'no_user' not in own_user:
+                    switch_online(state)
+            else:
+                logging.debug('no need to start a new game')
+                if pgn_mode():
+                    pgn_game_name, pgn_problem, pgn_fen, pgn_result, pgn_white, pgn_black = read_pgn_info()
+                    if 'mate in' in pgn_problem or 'Mate in' in pgn_problem:
+                        set_fen_from_pgn(pgn_fen, state)
+                        set_wait_state(Message.START_NEW_GAME(game=state.game.copy(), newgame=newgame), state)
                     else:
-                        logging.debug('best move displayed, dont start/stop clock')
+                        DisplayMsg.show(Message.START_NEW_GAME(game=state.game.copy(), newgame=newgame))
+                else:
+                    DisplayMsg.show(Message.START_NEW_GAME(game=state.game.copy(), newgame=newgame))
 
-            elif isinstance(event, Event.ALTERNATIVE_MOVE):
-                if state.done_computer_fen and not emulation_mode():
-                    state.done_computer_fen = None
-                    state.done_move = chess.Move.null()
-                    if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.TRAINING):   # @todo handle Mode.REMOTE too
-                        if state.time_control.mode == TimeMode.FIXED:
-                            state.time_control.reset()
-                        # set computer to move - in case the user just changed the engine
-                        state.play_mode = PlayMode.USER_WHITE if state.game.turn == chess.BLACK else PlayMode.USER_BLACK
-                        if not state.check_game_state():
-                            if picotutor_mode(state):
-                                state.picotutor.pop_last_move()
-                            think(state.game, state.time_control, Message.ALTERNATIVE_MOVE(game=state.game.copy(), play_mode=state.play_mode), state, searchlist=True)
-                    else:
-                        logging.warning('wrong function call [alternative]! mode: %s', state.interaction_mode)
+        if picotutor_mode(state):
+            state.picotutor.reset()
+            if not flag_startup:
+                if state.play_mode == PlayMode.USER_BLACK:
+                    state.picotutor.set_user_color(chess.BLACK)
+                else:
+                    state.picotutor.set_user_color(chess.WHITE)
 
-            elif isinstance(event, Event.SWITCH_SIDES):
-                flag_startup = False
-                DisplayMsg.show(Message.EXIT_MENU())
+        if state.interaction_mode != Mode.REMOTE and not online_mode():
+            if state.dgtmenu.get_enginename():
+                time.sleep(0.7)  # give time for ABORT message
+                DisplayMsg.show(Message.ENGINE_NAME(engine_name=state.engine_text))
+            if pgn_mode():
+                pgn_white = ''
+                pgn_black = ''
+                time.sleep(1)
+                pgn_game_name, pgn_problem, pgn_fen, pgn_result, pgn_white, pgn_black = read_pgn_info()
 
-                if state.interaction_mode == Mode.PONDER:
-                    # molli: allow switching sides in flexble ponder mode
-                    fen = state.game.board_fen()
+                if not pgn_white:
+                    pgn_white = '????'
+                DisplayMsg.show(Message.SHOW_TEXT(text_string=pgn_white))
 
-                    if state.game.turn == chess.WHITE:
-                        fen += ' b KQkq - 0 1'
-                    else:
-                        fen += ' w KQkq - 0 1'
-                    # ask python-chess to correct the castling string
-                    bit_board = chess.Board(fen)
-                    bit_board.set_fen(bit_board.fen())
-                    if bit_board.is_valid():
-                        state.game = chess.Board(bit_board.fen())
-                        stop_search_and_clock()
-                        engine.newgame(state.game.copy())
-                        state.done_computer_fen = None
-                        state.done_move = state.pb_move = chess.Move.null()
-                        state.time_control.reset()
-                        state.searchmoves.reset()
-                        state.game_declared = False
-                        state.legal_fens = compute_legal_fens(state.game.copy())
-                        state.legal_fens_after_cmove = []
-                        state.last_legal_fens = []
-                        engine.position(copy.deepcopy(state.game))
-                        engine.ponder()
-                        state.play_mode = PlayMode.USER_WHITE if state.game.turn == chess.WHITE else PlayMode.USER_BLACK
-                        msg = Message.PLAY_MODE(play_mode=state.play_mode, play_mode_text=state.dgttranslate.text(state.play_mode.value))
-                        DisplayMsg.show(msg)
-                    else:
-                        logging.debug('illegal fen %s', fen)
-                        DisplayMsg.show(Message.WRONG_FEN())
-                        DisplayMsg.show(Message.EXIT_MENU())
+                DisplayMsg.show(Message.SHOW_TEXT(text_string='versus'))
 
-                elif state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.TRAINING):
-                    if not engine.is_waiting():
-                        stop_search_and_clock()
-                    state.automatic_takeback = False
-                    state.takeback_active = False
-                    reset_auto = False
-                    state.last_legal_fens = []
-                    state.legal_fens_after_cmove = []
-                    state.best_move_displayed = state.done_computer_fen
-                    if state.best_move_displayed:
-                        move = state.done_move
-                        state.done_computer_fen = None
-                        state.done_move = state.pb_move = chess.Move.null()
-                    else:
-                        move = chess.Move.null()  # not really needed
+                if not pgn_black:
+                    pgn_black = '????'
+                DisplayMsg.show(Message.SHOW_TEXT(text_string=pgn_black))
 
-                    state.play_mode = PlayMode.USER_WHITE if state.play_mode == PlayMode.USER_BLACK else PlayMode.USER_BLACK
-                    msg = Message.PLAY_MODE(play_mode=state.play_mode, play_mode_text=state.dgttranslate.text(state.play_mode.value))
+                if pgn_result:
+                    DisplayMsg.show(Message.SHOW_TEXT(text_string=pgn_result))
+                if 'mate in' in pgn_problem or 'Mate in' in pgn_problem:
+                    DisplayMsg.show(Message.SHOW_TEXT(text_string=pgn_problem))
+                else:
+                    DisplayMsg.show(Message.SHOW_TEXT(text_string=pgn_game_name))
 
-                    if state.time_control.mode == TimeMode.FIXED:
-                        state.time_control.reset()
+                # reset pgn guess counters
+                if last_move_no > 1:
+                    state.no_guess_black = 1
+                    state.no_guess_white = 1
+                else:
+                    log_pgn(state)
+                    if state.max_guess_white > 0:
+                        if state.no_guess_white > state.max_guess_white:
+                            state.last_legal_fens = FenResolver()
+                            get_next_pgn_move(state)
 
+    @event_handlers.register(Event.PAUSE_RESUME)
+    def _pause_resume(_):
+        if pgn_mode():
+            engine.pause_pgn_audio()
+        else:
+            if engine.is_thinking():
+                state.stop_clock()
+                engine.stop(show_best=True)
+            elif not state.done_computer_fen:
+                if state.time_control.internal_running():
+                    state.stop_clock()
+                else:
+                    state.start_clock()
+            else:
+                logging.debug('best move displayed, dont start/stop clock')
+
+    @event_handlers.register(Event.ALTERNATIVE_MOVE)
+    def _alternative_move(_):
+        if state.done_computer_fen and not emulation_mode():
+            state.done_computer_fen = None
+            state.done_move = chess.Move.null()
+            if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.TRAINING):   # @todo handle Mode.REMOTE too
+                if state.time_control.mode == TimeMode.FIXED:
+                    state.time_control.reset()
+                # set computer to move - in case the user just changed the engine
+                state.play_mode = PlayMode.USER_WHITE if state.game.turn == chess.BLACK else PlayMode.USER_BLACK
+                if not state.check_game_state():
                     if picotutor_mode(state):
-                        if state.play_mode == PlayMode.USER_BLACK:
-                            state.picotutor.set_user_color(chess.BLACK)
-                        else:
-                            state.picotutor.set_user_color(chess.WHITE)
-                        if state.best_move_posted:
-                            state.best_move_posted = False
-                            state.picotutor.pop_last_move()
+                        state.picotutor.pop_last_move()
+                    think(state.game, state.time_control, Message.ALTERNATIVE_MOVE(game=state.game.copy(), play_mode=state.play_mode), state, searchlist=True)
+            else:
+                logging.warning('wrong function call [alternative]! mode: %s', state.interaction_mode)
 
-                    state.legal_fens = []
+    @event_handlers.register(Event.SWITCH_SIDES)
+    def _switch_sides(_):
+        global flag_startup
+        global reset_auto
+        nonlocal fen
+        flag_startup = False
+        DisplayMsg.show(Message.EXIT_MENU())
 
-                    if pgn_mode():  # molli change pgn guessing game sides
-                        if state.max_guess_black > 0:
-                            state.max_guess_white = state.max_guess_black
-                            state.max_guess_black = 0
-                        elif state.max_guess_white > 0:
-                            state.max_guess_black = state.max_guess_white
-                            state.max_guess_white = 0
-                        state.no_guess_black = 1
-                        state.no_guess_white = 1
-
-                    cond1 = state.game.turn == chess.WHITE and state.play_mode == PlayMode.USER_BLACK
-                    cond2 = state.game.turn == chess.BLACK and state.play_mode == PlayMode.USER_WHITE
-                    if cond1 or cond2:
-                        state.time_control.reset_start_time()
-                        think(state.game, state.time_control, msg, state)
-                    else:
-                        DisplayMsg.show(msg)
-                        state.start_clock()
-                        state.legal_fens = compute_legal_fens(state.game.copy())
+        if state.interaction_mode == Mode.PONDER:
+            # molli: allow switching sides in flexble ponder mode
+            fen = state.game.board_fen()
 
-                    if state.best_move_displayed:
-                        DisplayMsg.show(Message.SWITCH_SIDES(game=state.game.copy(), move=move))
+            if state.game.turn == chess.WHITE:
+                fen += ' b KQkq - 0 1'
+            else:
+                fen += ' w KQkq - 0 1'
+            # ask python-chess to correct the castling string
+            bit_board = chess.Board(fen)
+            bit_board.set_fen(bit_board.fen())
+            if bit_board.is_valid():
+                state.game = chess.Board(bit_board.fen())
+                stop_search_and_clock()
+                engine.newgame(state.game.copy())
+                state.done_computer_fen = None
+                state.done_move = state.pb_move = chess.Move.null()
+                state.time_control.reset()
+                state.searchmoves.reset()
+                state.game_declared = False
+                state.legal_fens = compute_legal_fens(state.game.copy())
+                state.legal_fens_after_cmove = FenResolver()
+                state.last_legal_fens = FenResolver()
+                engine.position(copy.deepcopy(state.game))
+                engine.ponder()
+                state.play_mode = PlayMode.USER_WHITE if state.game.turn == chess.WHITE else PlayMode.USER_BLACK
+                msg = Message.PLAY_MODE(play_mode=state.play_mode, play_mode_text=state.dgttranslate.text(state.play_mode.value))
+                DisplayMsg.show(msg)
+            else:
+                logging.debug('illegal fen %s', fen)
+                DisplayMsg.show(Message.WRONG_FEN())
+                DisplayMsg.show(Message.EXIT_MENU())
 
-                elif state.interaction_mode == Mode.REMOTE:
-                    if not engine.is_waiting():
-                        stop_search_and_clock()
+        elif state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.TRAINING):
+            if not engine.is_waiting():
+                stop_search_and_clock()
+            state.automatic_takeback = False
+            state.takeback_active = False
+            reset_auto = False
+            state.last_legal_fens = FenResolver()
+            state.legal_fens_after_cmove = FenResolver()
+            state.best_move_displayed = state.done_computer_fen
+            if state.best_move_displayed:
+                move = state.done_move
+                state.done_computer_fen = None
+                state.done_move = state.pb_move = chess.Move.null()
+            else:
+                move = chess.Move.null()  # not really needed
 
-                    state.last_legal_fens = []
-                    state.legal_fens_after_cmove = []
-                    state.best_move_displayed = state.done_computer_fen
-                    if state.best_move_displayed:
-                        move = state.done_move
-                        state.done_computer_fen = None
-                        state.done_move = state.pb_move = chess.Move.null()
-                    else:
-                        move = chess.Move.null()  # not really needed
+            state.play_mode = PlayMode.USER_WHITE if state.play_mode == PlayMode.USER_BLACK else PlayMode.USER_BLACK
+            msg = Message.PLAY_MODE(play_mode=state.play_mode, play_mode_text=state.dgttranslate.text(state.play_mode.value))
 
-                    state.play_mode = PlayMode.USER_WHITE if state.play_mode == PlayMode.USER_BLACK else PlayMode.USER_BLACK
-                    msg = Message.PLAY_MODE(play_mode=state.play_mode, play_mode_text=state.dgttranslate.text(state.play_mode.value))
+            if state.time_control.mode == TimeMode.FIXED:
+                state.time_control.reset()
 
-                    if state.time_control.mode == TimeMode.FIXED:
-                        state.time_control.reset()
+            if picotutor_mode(state):
+                if state.play_mode == PlayMode.USER_BLACK:
+                    state.picotutor.set_user_color(chess.BLACK)
+                else:
+                    state.picotutor.set_user_color(chess.WHITE)
+                if state.best_move_posted:
+                    state.best_move_posted = False
+                    state.picotutor.pop_last_move()
 
-                    state.legal_fens = []
-                    game_end = state.check_game_state()
-                    if game_end:
-                        DisplayMsg.show(msg)
-                    else:
-                        cond1 = state.game.turn == chess.WHITE and state.play_mode == PlayMode.USER_BLACK
-                        cond2 = state.game.turn == chess.BLACK and state.play_mode == PlayMode.USER_WHITE
-                        if cond1 or cond2:
-                            state.time_control.reset_start_time()
-                            think(state.game, state.time_control, msg, state)
-                        else:
-                            DisplayMsg.show(msg)
-                            state.start_clock()
-                            state.legal_fens = compute_legal_fens(state.game.copy())
+            state.legal_fens = FenResolver()
+
+            if pgn_mode():  # molli change pgn guessing game sides
+                if state.max_guess_black > 0:
+                    state.max_guess_white = state.max_guess_black
+                    state.max_guess_black = 0
+                elif state.max_guess_white > 0:
+                    state.max_guess_black = state.max_guess_white
+                    state.max_guess_white = 0
+                state.no_guess_black = 1
+                state.no_guess_white = 1
+
+            cond1 = state.game.turn == chess.WHITE and state.play_mode == PlayMode.USER_BLACK
+            cond2 = state.game.turn == chess.BLACK and state.play_mode == PlayMode.USER_WHITE
+            if cond1 or cond2:
+                state.time_control.reset_start_time()
+                think(state.game, state.time_control, msg, state)
+            else:
+                DisplayMsg.show(msg)
+                state.start_clock()
+                state.legal_fens = compute_legal_fens(state.game.copy())
 
-                    if state.best_move_displayed:
-                        DisplayMsg.show(Message.SWITCH_SIDES(game=state.game.copy(), move=move))
+            if state.best_move_displayed:
+                DisplayMsg.show(Message.SWITCH_SIDES(game=state.game.copy(), move=move))
 
-            elif isinstance(event, Event.DRAWRESIGN):
-                if not state.game_declared:  # in case user leaves kings in place while moving other pieces
-                    stop_search_and_clock()
-                    DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=event.result, play_mode=state.play_mode, game=state.game.copy()))
-                    state.game_declared = True
-                    state.stop_fen_timer()
-                    state.legal_fens_after_cmove = []
-                    update_elo(state, event.result)
+        elif state.interaction_mode == Mode.REMOTE:
+            if not engine.is_waiting():
+                stop_search_and_clock()
 
-            elif isinstance(event, Event.REMOTE_MOVE):
-                flag_startup = False
-                if board_type == dgt.util.EBoard.NOEBOARD:
-                    user_move(event.move, sliding=True, state=state)
+            state.last_legal_fens = FenResolver()
+            state.legal_fens_after_cmove = FenResolver()
+            state.best_move_displayed = state.done_computer_fen
+            if state.best_move_displayed:
+                move = state.done_move
+                state.done_computer_fen = None
+                state.done_move = state.pb_move = chess.Move.null()
+            else:
+                move = chess.Move.null()  # not really needed
+
+            state.play_mode = PlayMode.USER_WHITE if state.play_mode == PlayMode.USER_BLACK else PlayMode.USER_BLACK
+            msg = Message.PLAY_MODE(play_mode=state.play_mode, play_mode_text=state.dgttranslate.text(state.play_mode.value))
+
+            if state.time_control.mode == TimeMode.FIXED:
+                state.time_control.reset()
+
+            state.legal_fens = FenResolver()
+            game_end = state.check_game_state()
+            if game_end:
+                DisplayMsg.show(msg)
+            else:
+                cond1 = state.game.turn == chess.WHITE and state.play_mode == PlayMode.USER_BLACK
+                cond2 = state.game.turn == chess.BLACK and state.play_mode == PlayMode.USER_WHITE
+                if cond1 or cond2:
+                    state.time_control.reset_start_time()
+                    think(state.game, state.time_control, msg, state)
                 else:
-                    if state.interaction_mode == Mode.REMOTE and state.is_not_user_turn():
-                        stop_search_and_clock()
-                        DisplayMsg.show(Message.COMPUTER_MOVE(move=event.move, ponder=chess.Move.null(), game=state.game.copy(),
-                                                              wait=False))
-                        game_copy = state.game.copy()
-                        game_copy.push(event.move)
-                        state.done_computer_fen = game_copy.board_fen()
-                        state.done_move = event.move
-                        state.pb_move = chess.Move.null()
-                        state.legal_fens_after_cmove = compute_legal_fens(game_copy)
-                    else:
-                        logging.warning('wrong function call [remote]! mode: %s turn: %s', state.interaction_mode, state.game.turn)
+                    DisplayMsg.show(msg)
+                    state.start_clock()
+                    state.legal_fens = compute_legal_fens(state.game.copy())
 
-            elif isinstance(event, Event.BEST_MOVE):
-                flag_startup = False
-                state.take_back_locked = False
-                state.best_move_posted = False
-                state.takeback_active = False
+            if state.best_move_displayed:
+                DisplayMsg.show(Message.SWITCH_SIDES(game=state.game.copy(), move=move))
 
-                if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.TRAINING):
-                    if state.is_not_user_turn():
-                        # clock must be stopped BEFORE the "book_move" event cause SetNRun resets the clock display
-                        state.stop_clock()
-                        state.best_move_posted = True
-                        # @todo 8/8/R6P/1R6/7k/2B2K1p/8/8 and sliding Ra6 over a5 to a4 - handle this in correct way!!
-                        if state.game.is_game_over() and not online_mode():
-                            logging.warning('illegal move on game_end - sliding? move: %s fen: %s', event.move, state.game.fen())
-                        elif event.move is None:  # online game aborted or pgn move wrong or end of pgn game
-                            state.game_declared = True
-                            state.stop_fen_timer()
-                            state.legal_fens_after_cmove = []
-                            game_msg = state.game.copy()
+    @event_handlers.register(Event.DRAWRESIGN)
+    def _drawresign(event):
+        if not state.game_declared:  # in case user leaves kings in place while moving other pieces
+            stop_search_and_clock()
+            DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=event.result, play_mode=state.play_mode, game=state.game.copy()))
+            state.game_declared = True
+            state.stop_fen_timer()
+            state.legal_fens_after_cmove = FenResolver()
+            update_elo(state, event.result)
+
+    @event_handlers.register(Event.REMOTE_MOVE)
+    def _remote_move(event):
+        global flag_startup
+        flag_startup = False
+        if board_type == dgt.util.EBoard.NOEBOARD:
+            user_move(event.move, sliding=True, state=state)
+        else:
+            if state.interaction_mode == Mode.REMOTE and state.is_not_user_turn():
+                stop_search_and_clock()
+                DisplayMsg.show(Message.COMPUTER_MOVE(move=event.move, ponder=chess.Move.null(), game=state.game.copy(),
+                                                      wait=False))
+                game_copy = state.game.copy()
+                game_copy.push(event.move)
+                state.done_computer_fen = game_copy.board_fen()
+                state.done_move = event.move
+                state.pb_move = chess.Move.null()
+                state.legal_fens_after_cmove = compute_legal_fens(game_copy)
+            else:
+                logging.warning('wrong function call [remote]! mode: %s turn: %s', state.interaction_mode, state.game.turn)
 
-                            if online_mode():
-                                winner = ''
-                                result_str = ''
-                                time.sleep(0.5)
-                                result_str, winner = read_online_result()
-                                logging.debug('molli result_str:%s', result_str)
-                                logging.debug('molli winner:%s', winner)
-                                gameresult_tmp: Optional[GameResult] = None
-                                gameresult_tmp2: Optional[GameResult] = None
-
-                                if 'Checkmate' in result_str or 'checkmate' in result_str or 'mate' in result_str:
-                                    gameresult_tmp = GameResult.MATE
-                                elif 'Game abort' in result_str or 'timeout' in result_str:
-                                    if winner:
-                                        if 'white' in winner:
-                                            gameresult_tmp = GameResult.ABORT
-                                            gameresult_tmp2 = GameResult.WIN_WHITE
-                                        else:
-                                            gameresult_tmp = GameResult.ABORT
-                                            gameresult_tmp2 = GameResult.WIN_BLACK
-                                    else:
-                                        gameresult_tmp = GameResult.ABORT
-                                elif result_str == 'Draw' or result_str == 'draw':
-                                    gameresult_tmp = GameResult.DRAW
-                                elif 'Out of time: White wins' in result_str:
+    @event_handlers.register(Event.BEST_MOVE)
+    def _best_move(event):
+        global flag_startup
+        global newgame_happened
+        global start_time_cmove_done
+        flag_startup = False
+        state.take_back_locked = False
+        state.best_move_posted = False
+        state.takeback_active = False
+
+        if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.TRAINING):
+            if state.is_not_user_turn():
+                # clock must be stopped BEFORE the "book_move" event cause SetNRun resets the clock display
+                state.stop_clock()
+                state.best_move_posted = True
+                # @todo 8/8/R6P/1R6/7k/2B2K1p/8/8 and sliding Ra6 over a5 to a4 - handle this in correct way!!
+                if state.game.is_game_over() and not online_mode():
+                    logging.warning('illegal move on game_end - sliding? move: %s fen: %s', event.move, state.game.fen())
+                elif event.move is None:  # online game aborted or pgn move wrong or end of pgn game
+                    state.game_declared = True
+                    state.stop_fen_timer()
+                    state.legal_fens_after_cmove = FenResolver()
+                    game_msg = state.game.copy()
+
+                    if online_mode():
+                        winner = ''
+                        result_str = ''
+                        time.sleep(0.5)
+                        result_str, winner = read_online_result()
+                        logging.debug('molli result_str:%s', result_str)
+                        logging.debug('molli winner:%s', winner)
+                        gameresult_tmp: Optional[GameResult] = None
+                        gameresult_tmp2: Optional[GameResult] = None
+
+                        if 'Checkmate' in result_str or 'checkmate' in result_str or 'mate' in result_str:
+                            gameresult_tmp = GameResult.MATE
+                        elif 'Game abort' in result_str or 'timeout' in result_str:
+                            if winner:
+                                if 'white' in winner:
+                                    gameresult_tmp = GameResult.ABORT
+                                    gameresult_tmp2 = GameResult.WIN_WHITE
+                                else:
+                                    gameresult_tmp = GameResult.ABORT
+                                    gameresult_tmp2 = GameResult.WIN_BLACK
+                            else:
+                                gameresult_tmp = GameResult.ABORT
+                        elif result_str == 'Draw' or result_str == 'draw':
+                            gameresult_tmp = GameResult.DRAW
+                        elif 'Out of time: White wins' in result_str:
+                            gameresult_tmp = GameResult.OUT_OF_TIME
+                            gameresult_tmp2 = GameResult.WIN_WHITE
+                        elif 'Out of time: Black wins' in result_str:
+                            gameresult_tmp = GameResult.OUT_OF_TIME
+                            gameresult_tmp2 = GameResult.WIN_BLACK
+                        elif 'Out of time' in result_str or 'outoftime' in result_str:
+                            if winner:
+                                if 'white' in winner:
                                     gameresult_tmp = GameResult.OUT_OF_TIME
                                     gameresult_tmp2 = GameResult.WIN_WHITE
-                                elif 'Out of time: Black wins' in result_str:
+                                else:
                                     gameresult_tmp = GameResult.OUT_OF_TIME
                                     gameresult_tmp2 = GameResult.WIN_BLACK
-                                elif 'Out of time' in result_str or 'outoftime' in result_str:
-                                    if winner:
-                                        if 'white' in winner:
-                                            gameresult_tmp = GameResult.OUT_OF_TIME
-                                            gameresult_tmp2 = GameResult.WIN_WHITE
-                                        else:
-                                            gameresult_tmp = GameResult.OUT_OF_TIME
-                                            gameresult_tmp2 = GameResult.WIN_BLACK
-                                    else:
-                                        gameresult_tmp = GameResult.OUT_OF_TIME
-                                elif 'White wins' in result_str:
-                                    gameresult_tmp = GameResult.ABORT
+                            else:
+                                gameresult_tmp = GameResult.OUT_OF_TIME
+                        elif 'White wins' in result_str:
+                            gameresult_tmp = GameResult.ABORT
+                            gameresult_tmp2 = GameResult.WIN_WHITE
+                        elif 'Black wins' in result_str:
+                            gameresult_tmp = GameResult.ABORT
+                            gameresult_tmp2 = GameResult.WIN_BLACK
+                        elif 'OPP. resigns' in result_str or 'resign' in result_str or 'abort' in result_str:
+                            gameresult_tmp = GameResult.ABORT
+                            logging.debug('molli resign handling')
+                            if winner == '':
+                                logging.debug('molli winner not set')
+                                if state.play_mode == PlayMode.USER_BLACK:
+                                    gameresult_tmp2 = GameResult.WIN_BLACK
+                                else:
                                     gameresult_tmp2 = GameResult.WIN_WHITE
-                                elif 'Black wins' in result_str:
-                                    gameresult_tmp = GameResult.ABORT
+                            else:
+                                logging.debug('molli winner %s', winner)
+                                if 'white' in winner:
+                                    gameresult_tmp2 = GameResult.WIN_WHITE
+                                else:
                                     gameresult_tmp2 = GameResult.WIN_BLACK
-                                elif 'OPP. resigns' in result_str or 'resign' in result_str or 'abort' in result_str:
-                                    gameresult_tmp = GameResult.ABORT
-                                    logging.debug('molli resign handling')
-                                    if winner == '':
-                                        logging.debug('molli winner not set')
-                                        if state.play_mode == PlayMode.USER_BLACK:
-                                            gameresult_tmp2 = GameResult.WIN_BLACK
-                                        else:
-                                            gameresult_tmp2 = GameResult.WIN_WHITE
-                                    else:
-                                        logging.debug('molli winner %s', winner)
-                                        if 'white' in winner:
-                                            gameresult_tmp2 = GameResult.WIN_WHITE
-                                        else:
-                                            gameresult_tmp2 = GameResult.WIN_BLACK
 
-                                else:
-                                    logging.debug('molli unknown result')
-                                    gameresult_tmp = GameResult.ABORT
+                        else:
+                            logging.debug('molli unknown result')
+                            gameresult_tmp = GameResult.ABORT
 
-                                logging.debug('molli result_tmp:%s', gameresult_tmp)
-                                logging.debug('molli result_tmp2:%s', gameresult_tmp2)
+                        logging.debug('molli result_tmp:%s', gameresult_tmp)
+                        logging.debug('molli result_tmp2:%s', gameresult_tmp2)
 
-                                if gameresult_tmp2 and not (state.game.is_game_over() and gameresult_tmp == GameResult.ABORT):
-                                    if gameresult_tmp == GameResult.OUT_OF_TIME:
-                                        DisplayMsg.show(Message.LOST_ON_TIME())
-                                        time.sleep(2)
-                                        DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=gameresult_tmp2, play_mode=state.play_mode, game=game_msg))
-                                    else:
-                                        DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=gameresult_tmp, play_mode=state.play_mode, game=game_msg))
-                                        time.sleep(2)
-                                        DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=gameresult_tmp2, play_mode=state.play_mode, game=game_msg))
-                                else:
-                                    if gameresult_tmp == GameResult.ABORT and gameresult_tmp2:
-                                        DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=gameresult_tmp2, play_mode=state.play_mode, game=game_msg))
-                                    else:
-                                        DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=gameresult_tmp, play_mode=state.play_mode, game=game_msg))
+                        if gameresult_tmp2 and not (state.game.is_game_over() and gameresult_tmp == GameResult.ABORT):
+                            if gameresult_tmp == GameResult.OUT_OF_TIME:
+                                message_scheduler.show_sequence([(Message.LOST_ON_TIME(), 2),
+                                                                 (Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=gameresult_tmp2, play_mode=state.play_mode, game=game_msg), 0)])
+                            else:
+                                message_scheduler.show_sequence([(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=gameresult_tmp, play_mode=state.play_mode, game=game_msg), 2),
+                                                                 (Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=gameresult_tmp2, play_mode=state.play_mode, game=game_msg), 0)])
+                        else:
+                            if gameresult_tmp == GameResult.ABORT and gameresult_tmp2:
+                                DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=gameresult_tmp2, play_mode=state.play_mode, game=game_msg))
                             else:
+                                DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=gameresult_tmp, play_mode=state.play_mode, game=game_msg))
+                    else:
 
-                                if pgn_mode():
-                                    # molli: check if last move of pgn game file
-                                    stop_search_and_clock()
-                                    log_pgn(state)
-                                    if flag_pgn_game_over:
-                                        logging.debug('molli pgn: PGN END')
-                                        pgn_game_name, pgn_problem, pgn_fen, pgn_result, pgn_white, pgn_black = read_pgn_info()
-                                        DisplayMsg.show(Message.PGN_GAME_END(result=pgn_result))
-                                    elif state.pgn_book_test:
-                                        l_game_copy = state.game.copy()
-                                        l_game_copy.pop()
-                                        l_found = state.searchmoves.check_book(bookreader, l_game_copy)
-
-                                        if not l_found:
-                                            DisplayMsg.show(Message.PGN_GAME_END(result='*'))
+                        if pgn_mode():
+                            # molli: check if last move of pgn game file
+                            stop_search_and_clock()
+                            log_pgn(state)
+                            if flag_pgn_game_over:
+                                logging.debug('molli pgn: PGN END')
+                                pgn_game_name, pgn_problem, pgn_fen, pgn_result, pgn_white, pgn_black = read_pgn_info()
+                                DisplayMsg.show(Message.PGN_GAME_END(result=pgn_result))
+                            elif state.pgn_book_test:
+                                l_game_copy = state.game.copy()
+                                l_game_copy.pop()
+                                l_found = state.searchmoves.check_book(book_service, l_game_copy)
+
+                                if not l_found:
+                                    DisplayMsg.show(Message.PGN_GAME_END(result='*'))
+                                else:
+                                    logging.debug('molli pgn: Wrong Move! Try Again!')
+                                    # increase pgn guess counters
+                                    if state.max_guess_black > 0 and state.game.turn == chess.WHITE:
+                                        state.no_guess_black = state.no_guess_black + 1
+                                        if state.no_guess_black > state.max_guess_black:
+                                            DisplayMsg.show(Message.MOVE_WRONG())
                                         else:
-                                            logging.debug('molli pgn: Wrong Move! Try Again!')
-                                            # increase pgn guess counters
-                                            if state.max_guess_black > 0 and state.game.turn == chess.WHITE:
-                                                state.no_guess_black = state.no_guess_black + 1
-                                                if state.no_guess_black > state.max_guess_black:
-                                                    DisplayMsg.show(Message.MOVE_WRONG())
-                                                else:
-                                                    DisplayMsg.show(Message.MOVE_RETRY())
-                                            elif state.max_guess_white > 0 and state.game.turn == chess.BLACK:
-                                                state.no_guess_white = state.no_guess_white + 1
-                                                if state.no_guess_white > state.max_guess_white:
-                                                    DisplayMsg.show(Message.MOVE_WRONG())
-                                                else:
-                                                    DisplayMsg.show(Message.MOVE_RETRY())
-                                            else:
-                                                # user move wrong in pgn display mode only
-                                                DisplayMsg.show(Message.MOVE_RETRY())
-                                            state.takeback_active = True
-                                            state.automatic_takeback = True
-                                            set_wait_state(Message.TAKE_BACK(game=state.game.copy()), state)  # automatic takeback mode
-                                    else:
-                                        logging.debug('molli pgn: Wrong Move! Try Again!')
-
-                                        if state.max_guess_black > 0 and state.game.turn == chess.WHITE:
-                                            state.no_guess_black = state.no_guess_black + 1
-                                            if state.no_guess_black > state.max_guess_black:
-                                                DisplayMsg.show(Message.MOVE_WRONG())
-                                            else:
-                                                DisplayMsg.show(Message.MOVE_RETRY())
-                                        elif state.max_guess_white > 0 and state.game.turn == chess.BLACK:
-                                            state.no_guess_white = state.no_guess_white + 1
-                                            if state.no_guess_white > state.max_guess_white:
-                                                DisplayMsg.show(Message.MOVE_WRONG())
-                                            else:
-                                                DisplayMsg.show(Message.MOVE_RETRY())
+                                            DisplayMsg.show(Message.MOVE_RETRY())
+                                    elif state.max_guess_white > 0 and state.game.turn == chess.BLACK:
+                                        state.no_guess_white = state.no_guess_white + 1
+                                        if state.no_guess_white > state.max_guess_white:
+                                            DisplayMsg.show(Message.MOVE_WRONG())
                                         else:
-                                            # user move wrong in pgn display mode only
                                             DisplayMsg.show(Message.MOVE_RETRY())
-                                        state.takeback_active = True
-                                        state.automatic_takeback = True
-                                        set_wait_state(Message.TAKE_BACK(game=state.game.copy()), state)  # automatic takeback mode
-                                else:
-                                    DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=GameResult.ABORT, play_mode=state.play_mode, game=state.game.copy()))
-
-                            time.sleep(0.5)
-                        else:
-                            if event.inbook:
-                                DisplayMsg.show(Message.BOOK_MOVE())
-                            state.searchmoves.exclude(event.move)
-
-                            if online_mode() or emulation_mode():
-                                start_time_cmove_done = time.time()  # time should alraedy run for the player
-                            DisplayMsg.show(Message.EXIT_MENU())
-                            DisplayMsg.show(Message.COMPUTER_MOVE(move=event.move, ponder=event.ponder, game=state.game.copy(), wait=event.inbook))
-                            game_copy = state.game.copy()
-                            game_copy.push(event.move)
-
-                            if picotutor_mode(state):
-                                if pgn_mode():
-                                    t_color = state.picotutor.get_user_color()
-                                    if t_color == chess.BLACK:
-                                        state.picotutor.set_user_color(chess.WHITE)
                                     else:
-                                        state.picotutor.set_user_color(chess.BLACK)
-
-                                valid = state.picotutor.push_move(event.move)
-
-                                if not valid:
-                                    state.picotutor.set_position(game_copy.fen(), i_turn=game_copy.turn)
+                                        # user move wrong in pgn display mode only
+                                        DisplayMsg.show(Message.MOVE_RETRY())
+                                    state.takeback_active = True
+                                    state.automatic_takeback = True
+                                    set_wait_state(Message.TAKE_BACK(game=state.game.copy()), state)  # automatic takeback mode
+                            else:
+                                logging.debug('molli pgn: Wrong Move! Try Again!')
 
-                                    if state.play_mode == PlayMode.USER_BLACK:
-                                        state.picotutor.set_user_color(chess.BLACK)
+                                if state.max_guess_black > 0 and state.game.turn == chess.WHITE:
+                                    state.no_guess_black = state.no_guess_black + 1
+                                    if state.no_guess_black > state.max_guess_black:
+                                        DisplayMsg.show(Message.MOVE_WRONG())
                                     else:
-                                        state.picotutor.set_user_color(chess.WHITE)
-
-                            state.done_computer_fen = game_copy.board_fen()
-                            state.done_move = event.move
-
-                            brain_book = state.interaction_mode == Mode.BRAIN and event.inbook
-                            state.pb_move = event.ponder if event.ponder and not brain_book else chess.Move.null()
-                            state.legal_fens_after_cmove = compute_legal_fens(game_copy)
-
-                            if pgn_mode():
-                                # molli pgn: reset pgn guess counters
-                                if state.max_guess_black > 0 and not state.game.turn == chess.BLACK:
-                                    state.no_guess_black = 1
-                                elif state.max_guess_white > 0 and not state.game.turn == chess.WHITE:
-                                    state.no_guess_white = 1
-
-                            # molli: noeboard/WEB-Play
-                            if board_type == dgt.util.EBoard.NOEBOARD:
-                                logging.info('done move detected')
-                                assert state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.REMOTE, Mode.TRAINING), 'wrong mode: %s' % state.interaction_mode
+                                        DisplayMsg.show(Message.MOVE_RETRY())
+                                elif state.max_guess_white > 0 and state.game.turn == chess.BLACK:
+                                    state.no_guess_white = state.no_guess_white + 1
+                                    if state.no_guess_white > state.max_guess_white:
+                                        DisplayMsg.show(Message.MOVE_WRONG())
+                                    else:
+                                        DisplayMsg.show(Message.MOVE_RETRY())
+                                else:
+                                    # user move wrong in pgn display mode only
+                                    DisplayMsg.show(Message.MOVE_RETRY())
+                                state.takeback_active = True
+                                state.automatic_takeback = True
+                                set_wait_state(Message.TAKE_BACK(game=state.game.copy()), state)  # automatic takeback mode
+                        else:
+                            DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=GameResult.ABORT, play_mode=state.play_mode, game=state.game.copy()))
 
-                                time.sleep(0.5)
-                                DisplayMsg.show(Message.COMPUTER_MOVE_DONE())
+                    time.sleep(0.5)
+                else:
+                    if event.inbook:
+                        DisplayMsg.show(Message.BOOK_MOVE())
+                    state.searchmoves.exclude(event.move)
 
-                                state.best_move_posted = False
-                                state.game.push(state.done_move)
-                                state.done_computer_fen = None
-                                state.done_move = chess.Move.null()
-
-                                if online_mode() or emulation_mode():
-                                    # for online or emulation engine the user time alraedy runs with move announcement
-                                    # => subtract time between announcement and execution
-                                    end_time_cmove_done = time.time()
-                                    cmove_time = math.floor(end_time_cmove_done - start_time_cmove_done)
-                                    if cmove_time > 0:
-                                        state.time_control.sub_online_time(state.game.turn, cmove_time)
-                                    cmove_time = 0
-                                    start_time_cmove_done = 0
-
-                                game_end = state.check_game_state()
-                                if game_end:
-                                    update_elo(state, game_end.result)
-                                    state.legal_fens = []
-                                    state.legal_fens_after_cmove = []
-                                    if online_mode():
-                                        stop_search_and_clock()
-                                        state.stop_fen_timer()
-                                    stop_search_and_clock()
-                                    if not pgn_mode():
-                                        DisplayMsg.show(game_end)
-                                else:
-                                    state.searchmoves.reset()
+                    if online_mode() or emulation_mode():
+                        start_time_cmove_done = time.time()  # time should alraedy run for the player
+                    DisplayMsg.show(Message.EXIT_MENU())
+                    DisplayMsg.show(Message.COMPUTER_MOVE(move=event.move, ponder=event.ponder, game=state.game.copy(), wait=event.inbook))
+                    game_copy = state.game.copy()
+                    game_copy.push(event.move)
 
-                                    state.time_control.add_time(not state.game.turn)
+                    if picotutor_mode(state):
+                        if pgn_mode():
+                            t_color = state.picotutor.get_user_color()
+                            if t_color == chess.BLACK:
+                                state.picotutor.set_user_color(chess.WHITE)
+                            else:
+                                state.picotutor.set_user_color(chess.BLACK)
 
-                                    # molli new tournament time control
-                                    if state.time_control.moves_to_go_orig > 0 and (state.game.fullmove_number - 1) == state.time_control.moves_to_go_orig:
-                                        state.time_control.add_game2(not state.game.turn)
-                                        t_player = False
-                                        msg = Message.TIMECONTROL_CHECK(player=t_player, movestogo=state.time_control.moves_to_go_orig, time1=state.time_control.game_time, time2=state.time_control.game_time2)
-                                        DisplayMsg.show(msg)
+                        valid = state.picotutor.push_move(event.move)
 
-                                    if not online_mode() or state.game.fullmove_number > 1:
-                                        state.start_clock()
-                                    else:
-                                        DisplayMsg.show(Message.EXIT_MENU())  # show clock
-                                        end_time_cmove_done = 0
-
-                                    if state.interaction_mode == Mode.BRAIN:
-                                        brain(state.game, state.time_control, state)
-
-                                    state.legal_fens = compute_legal_fens(state.game.copy())
-
-                                    if pgn_mode():
-                                        log_pgn(state)
-                                        if state.game.turn == chess.WHITE:
-                                            if state.max_guess_white > 0:
-                                                if state.no_guess_white > state.max_guess_white:
-                                                    state.last_legal_fens = []
-                                                    get_next_pgn_move(state)
-                                            else:
-                                                state.last_legal_fens = []
-                                                get_next_pgn_move(state)
-                                        elif state.game.turn == chess.BLACK:
-                                            if state.max_guess_black > 0:
-                                                if state.no_guess_black > state.max_guess_black:
-                                                    state.last_legal_fens = []
-                                                    get_next_pgn_move(state)
-                                            else:
-                                                state.last_legal_fens = []
-                                                get_next_pgn_move(state)
-
-                                state.last_legal_fens = []
-                                newgame_happened = False
-
-                                if state.game.fullmove_number < 1:
-                                    ModeInfo.reset_opening()
-                                if picotutor_mode(state) and state.dgtmenu.get_picoexplorer():
-                                    op_eco, op_name, op_moves, op_in_book = state.picotutor.get_opening()
-                                    if op_in_book and op_name:
-                                        ModeInfo.set_opening(state.book_in_use, str(op_name), op_eco)
-                                        DisplayMsg.show(Message.SHOW_TEXT(text_string=op_name))
-                            # molli end noeboard/Web-Play
-                    else:
-                        logging.warning('wrong function call [best]! mode: %s turn: %s', state.interaction_mode, state.game.turn)
-                else:
-                    logging.warning('wrong function call [best]! mode: %s turn: %s', state.interaction_mode, state.game.turn)
+                        if not valid:
+                            state.picotutor.set_position(game_copy.fen(), i_turn=game_copy.turn)
 
-            elif isinstance(event, Event.NEW_PV):
-                if state.interaction_mode == Mode.BRAIN and engine.is_pondering():
-                    logging.debug('in brain mode and pondering ignore pv %s', event.pv[:3])
-                else:
-                    # illegal moves can occur if a pv from the engine arrives at the same time as an user move
-                    if state.game.is_legal(event.pv[0]):
-                        DisplayMsg.show(Message.NEW_PV(pv=event.pv, mode=state.interaction_mode, game=state.game.copy()))
-                    else:
-                        logging.info('illegal move can not be displayed. move: %s fen: %s', event.pv[0], state.game.fen())
-                        logging.info('engine status: t:%s p:%s', engine.is_thinking(), engine.is_pondering())
+                            if state.play_mode == PlayMode.USER_BLACK:
+                                state.picotutor.set_user_color(chess.BLACK)
+                            else:
+                                state.picotutor.set_user_color(chess.WHITE)
 
-            elif isinstance(event, Event.NEW_SCORE):
-                if state.interaction_mode == Mode.BRAIN and engine.is_pondering():
-                    logging.debug('in brain mode and pondering, ignore score %s', event.score)
-                else:
-                    if event.score == 999 or event.score == -999:
-                        flag_pgn_game_over = True  # molli pgn mode: signal that pgn is at end
-                    else:
-                        flag_pgn_game_over = False
+                    state.done_computer_fen = game_copy.board_fen()
+                    state.done_move = event.move
 
-                    DisplayMsg.show(Message.NEW_SCORE(score=event.score, mate=event.mate, mode=state.interaction_mode,
-                                                      turn=state.game.turn))
+                    brain_book = state.interaction_mode == Mode.BRAIN and event.inbook
+                    state.pb_move = event.ponder if event.ponder and not brain_book else chess.Move.null()
+                    state.legal_fens_after_cmove = compute_legal_fens(game_copy)
 
-            elif isinstance(event, Event.NEW_DEPTH):
-                if state.interaction_mode == Mode.BRAIN and engine.is_pondering():
-                    logging.debug('in brain mode and pondering, ignore depth %s', event.depth)
-                else:
-                    if event.depth == 999:
-                        flag_pgn_game_over = True
-                    else:
-                        flag_pgn_game_over = False
-                    DisplayMsg.show(Message.NEW_DEPTH(depth=event.depth))
+                    if pgn_mode():
+                        # molli pgn: reset pgn guess counters
+                        if state.max_guess_black > 0 and not state.game.turn == chess.BLACK:
+                            state.no_guess_black = 1
+                        elif state.max_guess_white > 0 and not state.game.turn == chess.WHITE:
+                            state.no_guess_white = 1
 
-            elif isinstance(event, Event.START_SEARCH):
-                DisplayMsg.show(Message.SEARCH_STARTED())
+                    # molli: noeboard/WEB-Play
+                    if board_type == dgt.util.EBoard.NOEBOARD:
+                        logging.info('done move detected')
+                        assert state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.REMOTE, Mode.TRAINING), 'wrong mode: %s' % state.interaction_mode
 
-            elif isinstance(event, Event.STOP_SEARCH):
-                DisplayMsg.show(Message.SEARCH_STOPPED())
+                        time.sleep(0.5)
+                        DisplayMsg.show(Message.COMPUTER_MOVE_DONE())
 
-            elif isinstance(event, Event.SET_INTERACTION_MODE):
-                if event.mode not in (Mode.NORMAL, Mode.REMOTE, Mode.TRAINING) and state.done_computer_fen:  # @todo check why still needed
-                    state.dgtmenu.set_mode(state.interaction_mode)  # undo the button4 stuff
-                    logging.warning('mode cant be changed to a pondering mode as long as a move is displayed')
-                    mode_text = state.dgttranslate.text('Y10_errormode')
-                    msg = Message.INTERACTION_MODE(mode=state.interaction_mode, mode_text=mode_text, show_ok=False)
-                    DisplayMsg.show(msg)
-                else:
-                    if event.mode == Mode.PONDER:
-                        newgame_happened = False
-                    stop_search_and_clock()
-                    state.interaction_mode = event.mode
-                    engine_mode()
-                    msg = Message.INTERACTION_MODE(mode=event.mode, mode_text=event.mode_text, show_ok=event.show_ok)
-                    set_wait_state(msg, state)  # dont clear searchmoves here
-
-            elif isinstance(event, Event.SET_OPENING_BOOK):
-                write_picochess_ini('book', event.book['file'])
-                logging.debug('changing opening book [%s]', event.book['file'])
-                bookreader = chess.polyglot.open_reader(event.book['file'])
-                DisplayMsg.show(Message.OPENING_BOOK(book_text=event.book_text, show_ok=event.show_ok))
-                state.book_in_use = event.book['file']
-                state.stop_fen_timer()
+                        state.best_move_posted = False
+                        state.game.push(state.done_move)
+                        state.done_computer_fen = None
+                        state.done_move = chess.Move.null()
+
+                        if online_mode() or emulation_mode():
+                            # for online or emulation engine the user time alraedy runs with move announcement
+                            # => subtract time between announcement and execution
+                            end_time_cmove_done = time.time()
+                            cmove_time = math.floor(end_time_cmove_done - start_time_cmove_done)
+                            if cmove_time > 0:
+                                state.time_control.sub_online_time(state.game.turn, cmove_time)
+                            cmove_time = 0
+                            start_time_cmove_done = 0
+
+                        game_end = state.check_game_state()
+                        if game_end:
+                            update_elo(state, game_end.result)
+                            state.legal_fens = FenResolver()
+                            state.legal_fens_after_cmove = FenResolver()
+                            if online_mode():
+                                stop_search_and_clock()
+                                state.stop_fen_timer()
+                            stop_search_and_clock()
+                            if not pgn_mode():
+                                DisplayMsg.show(game_end)
+                        else:
+                            state.searchmoves.reset()
 
-            elif isinstance(event, Event.SHOW_ENGINENAME):
-                DisplayMsg.show(Message.SHOW_ENGINENAME(show_enginename=event.show_enginename))
+                            state.time_control.add_time(not state.game.turn)
 
-            elif isinstance(event, Event.SAVE_GAME):
-                if event.pgn_filename:
-                    state.stop_clock()
-                    DisplayMsg.show(Message.SAVE_GAME(tc_init=state.time_control.get_parameters(), play_mode=state.play_mode, game=state.game.copy(), pgn_filename=event.pgn_filename))
+                            # molli new tournament time control
+                            if state.time_control.moves_to_go_orig > 0 and (state.game.fullmove_number - 1) == state.time_control.moves_to_go_orig:
+                                state.time_control.add_game2(not state.game.turn)
+                                t_player = False
+                                msg = Message.TIMECONTROL_CHECK(player=t_player, movestogo=state.time_control.moves_to_go_orig, time1=state.time_control.game_time, time2=state.time_control.game_time2)
+                                DisplayMsg.show(msg)
 
-            elif isinstance(event, Event.READ_GAME):
-                if event.pgn_filename:
-                    DisplayMsg.show(Message.READ_GAME(pgn_filename=event.pgn_filename))
-                    read_pgn_file(event.pgn_filename, state)
+                            if not online_mode() or state.game.fullmove_number > 1:
+                                state.start_clock()
+                            else:
+                                DisplayMsg.show(Message.EXIT_MENU())  # show clock
+                                end_time_cmove_done = 0
 
-            elif isinstance(event, Event.CONTLAST):
-                DisplayMsg.show(Message.CONTLAST(contlast=event.contlast))
+                            if state.interaction_mode == Mode.BRAIN:
+                                brain(state.game, state.time_control, state)
 
-            elif isinstance(event, Event.ALTMOVES):
-                DisplayMsg.show(Message.ALTMOVES(altmoves=event.altmoves))
+                            state.legal_fens = compute_legal_fens(state.game.copy())
 
-            elif isinstance(event, Event.PICOWATCHER):
-                if (state.dgtmenu.get_picowatcher() or state.dgtmenu.get_picocoach()):
-                    pico_calc = True
-                else:
-                    pico_calc = False
-                state.picotutor.set_status(state.dgtmenu.get_picowatcher(), state.dgtmenu.get_picocoach(), state.dgtmenu.get_picoexplorer(), state.dgtmenu.get_picocomment())
-                if event.picowatcher:
-                    state.flag_picotutor = True
-                    state.picotutor.set_position(state.game.fen(), i_turn=state.game.turn)
-                    if state.play_mode == PlayMode.USER_BLACK:
-                        state.picotutor.set_user_color(chess.BLACK)
-                    else:
-                        state.picotutor.set_user_color(chess.WHITE)
-                elif state.dgtmenu.get_picocoach():
-                    state.flag_picotutor = True
-                elif state.dgtmenu.get_picoexplorer():
-                    state.flag_picotutor = True
-                else:
-                    state.flag_picotutor = False
-                    if pico_calc:
-                        state.picotutor.stop()
-                DisplayMsg.show(Message.PICOWATCHER(picowatcher=event.picowatcher))
+                            if pgn_mode():
+                                log_pgn(state)
+                                if state.game.turn == chess.WHITE:
+                                    if state.max_guess_white > 0:
+                                        if state.no_guess_white > state.max_guess_white:
+                                            state.last_legal_fens = FenResolver()
+                                            get_next_pgn_move(state)
+                                    else:
+                                        state.last_legal_fens = FenResolver()
+                                        get_next_pgn_move(state)
+                                elif state.game.turn == chess.BLACK:
+                                    if state.max_guess_black > 0:
+                                        if state.no_guess_black > state.max_guess_black:
+                                            state.last_legal_fens = FenResolver()
+                                            get_next_pgn_move(state)
+                                    else:
+                                        state.last_legal_fens = FenResolver()
+                                        get_next_pgn_move(state)
 
-            elif isinstance(event, Event.PICOCOACH):
+                        state.last_legal_fens = FenResolver()
+                        newgame_happened = False
 
-                if (state.dgtmenu.get_picowatcher() or state.dgtmenu.get_picocoach()):
-                    pico_calc = True
-                else:
-                    pico_calc = False
+                        if state.game.fullmove_number < 1:
+                            ModeInfo.reset_opening()
+                        if picotutor_mode(state) and state.dgtmenu.get_picoexplorer():
+                            op_eco, op_name, op_moves, op_in_book = state.picotutor.get_opening()
+                            if op_in_book and op_name:
+                                ModeInfo.set_opening(state.book_in_use, str(op_name), op_eco)
+                                DisplayMsg.show(Message.SHOW_TEXT(text_string=op_name))
+                    # molli end noeboard/Web-Play
+            else:
+                logging.warning('wrong function call [best]! mode: %s turn: %s', state.interaction_mode, state.game.turn)
+        else:
+            logging.warning('wrong function call [best]! mode: %s turn: %s', state.interaction_mode, state.game.turn)
 
-                pico_calc = False
-                state.picotutor.set_status(state.dgtmenu.get_picowatcher(), state.dgtmenu.get_picocoach(), state.dgtmenu.get_picoexplorer(), state.dgtmenu.get_picocomment())
+    @event_handlers.register(Event.SET_INTERACTION_MODE)
+    def _set_interaction_mode(event):
+        global newgame_happened
+        if event.mode not in (Mode.NORMAL, Mode.REMOTE, Mode.TRAINING) and state.done_computer_fen:  # @todo check why still needed
+            state.dgtmenu.set_mode(state.interaction_mode)  # undo the button4 stuff
+            logging.warning('mode cant be changed to a pondering mode as long as a move is displayed')
+            mode_text = state.dgttranslate.text('Y10_errormode')
+            msg = Message.INTERACTION_MODE(mode=state.interaction_mode, mode_text=mode_text, show_ok=False)
+            DisplayMsg.show(msg)
+        else:
+            if event.mode == Mode.PONDER:
+                newgame_happened = False
+            stop_search_and_clock()
+            state.interaction_mode = event.mode
+            engine_mode()
+            msg = Message.INTERACTION_MODE(mode=event.mode, mode_text=event.mode_text, show_ok=event.show_ok)
+            set_wait_state(msg, state)  # dont clear searchmoves here
+
+    @event_handlers.register(Event.SET_OPENING_BOOK)
+    def _set_opening_book(event):
+        write_picochess_ini('book', event.book['file'])
+        logging.debug('changing opening book [%s]', event.book['file'])
+        book_service.select(event.book['file'])
+        DisplayMsg.show(Message.OPENING_BOOK(book_text=event.book_text, show_ok=event.show_ok))
+        state.book_in_use = event.book['file']
+        state.stop_fen_timer()
 
-                if event.picocoach:
-                    state.flag_picotutor = True
-                    state.picotutor.set_position(state.game.fen(), i_turn=state.game.turn)
-                    if state.play_mode == PlayMode.USER_BLACK:
-                        state.picotutor.set_user_color(chess.BLACK)
-                    else:
-                        state.picotutor.set_user_color(chess.WHITE)
-                elif state.dgtmenu.get_picowatcher():
-                    state.flag_picotutor = True
-                elif state.dgtmenu.get_picoexplorer():
-                    state.flag_picotutor = True
-                else:
-                    state.flag_picotutor = False
-                    if pico_calc:
-                        state.picotutor.stop()
+    @event_handlers.register(Event.SHOW_ENGINENAME)
+    def _show_enginename(event):
+        DisplayMsg.show(Message.SHOW_ENGINENAME(show_enginename=event.show_enginename))
 
-                DisplayMsg.show(Message.PICOCOACH(picocoach=event.picocoach))
+    @event_handlers.register(Event.SAVE_GAME)
+    def _save_game(event):
+        if event.pgn_filename:
+            state.stop_clock()
+            DisplayMsg.show(Message.SAVE_GAME(tc_init=state.time_control.get_parameters(), play_mode=state.play_mode, game=state.game.copy(), pgn_filename=event.pgn_filename))
+
+    @event_handlers.register(Event.READ_GAME)
+    def _read_game(event):
+        if event.pgn_filename:
+            DisplayMsg.show(Message.READ_GAME(pgn_filename=event.pgn_filename))
+            read_pgn_file(event.pgn_filename, state, event.game_number)
+
+    @event_handlers.register(Event.CONTLAST)
+    def _contlast(event):
+        DisplayMsg.show(Message.CONTLAST(contlast=event.contlast))
+
+    @event_handlers.register(Event.ALTMOVES)
+    def _altmoves(event):
+        DisplayMsg.show(Message.ALTMOVES(altmoves=event.altmoves))
+
+    @event_handlers.register(Event.PICOWATCHER)
+    def _picowatcher(event):
+        if (state.dgtmenu.get_picowatcher() or state.dgtmenu.get_picocoach()):
+            pico_calc = True
+        else:
+            pico_calc = False
+        state.picotutor.set_status(state.dgtmenu.get_picowatcher(), state.dgtmenu.get_picocoach(), state.dgtmenu.get_picoexplorer(), state.dgtmenu.get_picocomment())
+        if event.picowatcher:
+            state.flag_picotutor = True
+            state.picotutor.set_position(state.game.fen(), i_turn=state.game.turn)
+            if state.play_mode == PlayMode.USER_BLACK:
+                state.picotutor.set_user_color(chess.BLACK)
+            else:
+                state.picotutor.set_user_color(chess.WHITE)
+        elif state.dgtmenu.get_picocoach():
+            state.flag_picotutor = True
+        elif state.dgtmenu.get_picoexplorer():
+            state.flag_picotutor = True
+        else:
+            state.flag_picotutor = False
+            if pico_calc:
+                state.picotutor.stop()
+        DisplayMsg.show(Message.PICOWATCHER(picowatcher=event.picowatcher))
 
-            elif isinstance(event, Event.PICOEXPLORER):
-                if (state.dgtmenu.get_picowatcher() or state.dgtmenu.get_picocoach()):
-                    pico_calc = True
-                else:
-                    pico_calc = False
-                state.picotutor.set_status(state.dgtmenu.get_picowatcher(), state.dgtmenu.get_picocoach(), state.dgtmenu.get_picoexplorer(), state.dgtmenu.get_picocomment())
-                if event.picoexplorer:
-                    state.flag_picotutor = True
-                else:
-                    if state.dgtmenu.get_picowatcher() or state.dgtmenu.get_picocoach():
-                        state.flag_picotutor = True
-                    else:
-                        state.flag_picotutor = False
-                        if pico_calc:
-                            state.picotutor.stop()
-                DisplayMsg.show(Message.PICOEXPLORER(picoexplorer=event.picoexplorer))
-
-            elif isinstance(event, Event.RSPEED):
-                if emulation_mode():
-                    # restart engine with new retro speed
-                    old_options = engine.get_pgn_options()
-                    DisplayMsg.show(Message.ENGINE_SETUP())
-                    if engine.quit():
-                        engine = UciEngine(file=engine_file, uci_shell=uci_local_shell,
-                                           mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
-                        engine.startup(old_options, state.rating)
-                        stop_search_and_clock()
-                        state.game = chess.Board()
-                        state.game.turn = chess.WHITE
-                        state.play_mode = PlayMode.USER_WHITE
-                        engine.newgame(state.game.copy())
-                        state.done_computer_fen = None
-                        state.done_move = state.pb_move = chess.Move.null()
-                        state.searchmoves.reset()
-                        state.game_declared = False
-                        state.legal_fens = compute_legal_fens(state.game.copy())
-                        state.last_legal_fens = []
-                        state.legal_fens_after_cmove = []
-                        is_out_of_time_already = False
-                        engine_mode()
-                        DisplayMsg.show(Message.RSPEED(rspeed=event.rspeed))
-                        update_elo_display(state)
-                    else:
-                        logging.error('engine shutdown failure')
-                        DisplayMsg.show(Message.ENGINE_FAIL())
+    @event_handlers.register(Event.PICOCOACH)
+    def _picocoach(event):
 
-            elif isinstance(event, Event.TAKE_BACK):
-                if not (state.take_back_locked or online_mode() or (emulation_mode() and not state.automatic_takeback)) and state.game.move_stack:
-                    stop_search_and_clock()
-                    l_error = False
-                    try:
-                        state.game.pop()
-                        l_error = False
-                    except Exception:
-                        l_error = True
-                        logging.debug('takeback not possible!')
+        if (state.dgtmenu.get_picowatcher() or state.dgtmenu.get_picocoach()):
+            pico_calc = True
+        else:
+            pico_calc = False
 
-                    if not l_error:
-                        if picotutor_mode(state):
-                            if state.best_move_posted:
-                                state.picotutor.pop_last_move()
-                                state.best_move_posted = False
-                            state.picotutor.pop_last_move()
-                        state.done_computer_fen = None
-                        state.done_move = state.pb_move = chess.Move.null()
-                        state.searchmoves.reset()
-                        state.takeback_active = True
-                        set_wait_state(Message.TAKE_BACK(game=state.game.copy()), state)
+        pico_calc = False
+        state.picotutor.set_status(state.dgtmenu.get_picowatcher(), state.dgtmenu.get_picocoach(), state.dgtmenu.get_picoexplorer(), state.dgtmenu.get_picocomment())
 
-                        if pgn_mode():  # molli pgn
-                            log_pgn(state)
-                            if state.max_guess_white > 0:
-                                if state.game.turn == chess.WHITE:
-                                    if state.no_guess_white > state.max_guess_white:
-                                        get_next_pgn_move(state)
-                            elif state.max_guess_black > 0:
-                                if state.game.turn == chess.BLACK:
-                                    if state.no_guess_black > state.max_guess_black:
-                                        get_next_pgn_move(state)
+        if event.picocoach:
+            state.flag_picotutor = True
+            state.picotutor.set_position(state.game.fen(), i_turn=state.game.turn)
+            if state.play_mode == PlayMode.USER_BLACK:
+                state.picotutor.set_user_color(chess.BLACK)
+            else:
+                state.picotutor.set_user_color(chess.WHITE)
+        elif state.dgtmenu.get_picowatcher():
+            state.flag_picotutor = True
+        elif state.dgtmenu.get_picoexplorer():
+            state.flag_picotutor = True
+        else:
+            state.flag_picotutor = False
+            if pico_calc:
+                state.picotutor.stop()
 
-                        if (state.game.board_fen() == chess.STARTING_BOARD_FEN):
-                            pos960 = 518
-                            Observable.fire(Event.NEW_GAME(pos960=pos960))
-
-            elif isinstance(event, Event.PICOCOMMENT):
-                DisplayMsg.show(Message.PICOCOMMENT(picocomment=event.picocomment))
-
-            elif isinstance(event, Event.SET_TIME_CONTROL):
-                state.time_control.stop_internal(log=False)
-                tc_init = event.tc_init
-
-                state.time_control = TimeControl(**tc_init)
-
-                if not pgn_mode() and not online_mode():
-                    if tc_init['moves_to_go'] > 0:
-                        if state.time_control.mode == TimeMode.BLITZ:
-                            write_picochess_ini('time', '{:d} {:d} 0 {:d}'.format(tc_init['moves_to_go'], tc_init['blitz'], tc_init['blitz2']))
-                        elif state.time_control.mode == TimeMode.FISCHER:
-                            write_picochess_ini('time', '{:d} {:d} {:d} {:d}'.format(tc_init['moves_to_go'], tc_init['blitz'], tc_init['fischer'], tc_init['blitz2']))
-                    elif state.time_control.mode == TimeMode.BLITZ:
-                        write_picochess_ini('time', '{:d} 0'.format(tc_init['blitz']))
-                    elif state.time_control.mode == TimeMode.FISCHER:
-                        write_picochess_ini('time', '{:d} {:d}'.format(tc_init['blitz'], tc_init['fischer']))
-                    elif state.time_control.mode == TimeMode.FIXED:
-                        write_picochess_ini('time', '{:d}'.format(tc_init['fixed']))
-
-                    if state.time_control.depth > 0:
-                        write_picochess_ini('depth', '{:d}'.format(tc_init['depth']))
-                    else:
-                        write_picochess_ini('depth', '{:d}'.format(0))
+        DisplayMsg.show(Message.PICOCOACH(picocoach=event.picocoach))
 
-                    if state.time_control.node > 0:
-                        write_picochess_ini('node', '{:d}'.format(tc_init['node']))
-                    else:
-                        write_picochess_ini('node', '{:d}'.format(0))
+    @event_handlers.register(Event.PICOEXPLORER)
+    def _picoexplorer(event):
+        if (state.dgtmenu.get_picowatcher() or state.dgtmenu.get_picocoach()):
+            pico_calc = True
+        else:
+            pico_calc = False
+        state.picotutor.set_status(state.dgtmenu.get_picowatcher(), state.dgtmenu.get_picocoach(), state.dgtmenu.get_picoexplorer(), state.dgtmenu.get_picocomment())
+        if event.picoexplorer:
+            state.flag_picotutor = True
+        else:
+            if state.dgtmenu.get_picowatcher() or state.dgtmenu.get_picocoach():
+                state.flag_picotutor = True
+            else:
+                state.flag_picotutor = False
+                if pico_calc:
+                    state.picotutor.stop()
+        DisplayMsg.show(Message.PICOEXPLORER(picoexplorer=event.picoexplorer))
+
+    @event_handlers.register(Event.RSPEED)
+    def _rspeed(event):
+        nonlocal engine, is_out_of_time_already
+        if emulation_mode():
+            # restart engine with new retro speed
+            old_options = engine.get_pgn_options()
+            DisplayMsg.show(Message.ENGINE_SETUP())
+            if engine.quit():
+                engine = UciEngine(file=engine_file, uci_shell=uci_local_shell,
+                                   mame_par=get_engine_mame_par(state.dgtmenu.get_engine_rspeed(), state.dgtmenu.get_engine_rsound()))
+                engine.startup(old_options, state.rating)
+                stop_search_and_clock()
+                state.game = chess.Board()
+                state.game.turn = chess.WHITE
+                state.play_mode = PlayMode.USER_WHITE
+                engine.newgame(state.game.copy())
+                state.done_computer_fen = None
+                state.done_move = state.pb_move = chess.Move.null()
+                state.searchmoves.reset()
+                state.game_declared = False
+                state.legal_fens = compute_legal_fens(state.game.copy())
+                state.last_legal_fens = FenResolver()
+                state.legal_fens_after_cmove = FenResolver()
+                is_out_of_time_already = False
+                engine_mode()
+                DisplayMsg.show(Message.RSPEED(rspeed=event.rspeed))
+                update_elo_display(state)
+            else:
+                logging.error('engine shutdown failure')
+                DisplayMsg.show(Message.ENGINE_FAIL())
 
-                text = Message.TIME_CONTROL(time_text=event.time_text, show_ok=event.show_ok, tc_init=tc_init)
-                DisplayMsg.show(text)
-                state.stop_fen_timer()
+    @event_handlers.register(Event.TAKE_BACK)
+    def _take_back(_):
+        if not (state.take_back_locked or online_mode() or (emulation_mode() and not state.automatic_takeback)) and state.game.move_stack:
+            stop_search_and_clock()
+            l_error = False
+            try:
+                state.game.pop()
+                l_error = False
+            except Exception:
+                l_error = True
+                logging.debug('takeback not possible!')
 
-            elif isinstance(event, Event.CLOCK_TIME):
-                if dgtdispatcher.is_prio_device(event.dev, event.connect):  # transfer only the most prio clock's time
-                    logging.debug('setting tc clock time - prio: %s w:%s b:%s', event.dev,
-                                  hms_time(event.time_white), hms_time(event.time_black))
+            if not l_error:
+                if picotutor_mode(state):
+                    if state.best_move_posted:
+                        state.picotutor.pop_last_move()
+                        state.best_move_posted = False
+                    state.picotutor.pop_last_move()
+                state.done_computer_fen = None
+                state.done_move = state.pb_move = chess.Move.null()
+                state.searchmoves.reset()
+                state.takeback_active = True
+                set_wait_state(Message.TAKE_BACK(game=state.game.copy()), state)
 
-                    if state.time_control.mode != TimeMode.FIXED and (event.time_white == state.time_control.game_time and event.time_black == state.time_control.game_time):
-                        pass
-                    else:
-                        moves_to_go = state.time_control.moves_to_go_orig - state.game.fullmove_number + 1
-                        if moves_to_go < 0:
-                            moves_to_go = 0
-                        state.time_control.set_clock_times(white_time=event.time_white, black_time=event.time_black, moves_to_go=moves_to_go)
-
-                    # find out, if we are in bullet time (<=60secs on users clock or lowest time if user side unknown)
-                    time_u = event.time_white
-                    time_c = event.time_black
-                    if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.TRAINING):   # @todo handle Mode.REMOTE too
-                        if state.play_mode == PlayMode.USER_BLACK:
-                            time_u, time_c = time_c, time_u
-                    else:  # here, we use the lowest time
-                        if time_c < time_u:
-                            time_u, time_c = time_c, time_u
-                    low_time = False  # molli allow the speech output even for less than 60 seconds
-                    dgtboard.low_time = low_time
-                    if state.interaction_mode == Mode.TRAINING or position_mode:
-                        pass
-                    else:
-                        DisplayMsg.show(Message.CLOCK_TIME(time_white=event.time_white, time_black=event.time_black,
-                                                           low_time=low_time))
-                else:
-                    logging.debug('ignore clock time - too low prio: %s', event.dev)
-            elif isinstance(event, Event.OUT_OF_TIME):
-                # molli: allow further playing even when run out of time
-                if not is_out_of_time_already and not online_mode():  # molli in online mode the server decides
-                    state.stop_clock()
-                    result = GameResult.OUT_OF_TIME
-                    DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=result, play_mode=state.play_mode, game=state.game.copy()))
-                    is_out_of_time_already = True
-                    update_elo(state, result)
+                if pgn_mode():  # molli pgn
+                    log_pgn(state)
+                    if state.max_guess_white > 0:
+                        if state.game.turn == chess.WHITE:
+                            if state.no_guess_white > state.max_guess_white:
+                                get_next_pgn_move(state)
+                    elif state.max_guess_black > 0:
+                        if state.game.turn == chess.BLACK:
+                            if state.no_guess_black > state.max_guess_black:
+                                get_next_pgn_move(state)
 
-            elif isinstance(event, Event.SHUTDOWN):
-                stop_search()
-                state.stop_clock()
-                engine.quit()
+                if (state.game.board_fen() == chess.STARTING_BOARD_FEN):
+                    pos960 = 518
+                    Observable.fire(Event.NEW_GAME(pos960=pos960))
 
-                try:
-                    if uci_remote_shell:
-                        if uci_remote_shell.get():
-                            try:
-                                uci_remote_shell.get().__exit__(None, None, None)  # force to call __exit__ (close shell connection)
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
+    @event_handlers.register(Event.PICOCOMMENT)
+    def _picocomment(event):
+        DisplayMsg.show(Message.PICOCOMMENT(picocomment=event.picocomment))
+
+    @event_handlers.register(Event.SET_TIME_CONTROL)
+    def _set_time_control(event):
+        nonlocal text
+        state.time_control.stop_internal(log=False)
+        tc_init = event.tc_init
+
+        state.time_control = TimeControl(**tc_init)
+
+        if not pgn_mode() and not online_mode():
+            if tc_init['moves_to_go'] > 0:
+                if state.time_control.mode == TimeMode.BLITZ:
+                    write_picochess_ini('time', '{:d} {:d} 0 {:d}'.format(tc_init['moves_to_go'], tc_init['blitz'], tc_init['blitz2']))
+                elif state.time_control.mode == TimeMode.FISCHER:
+                    write_picochess_ini('time', '{:d} {:d} {:d} {:d}'.format(tc_init['moves_to_go'], tc_init['blitz'], tc_init['fischer'], tc_init['blitz2']))
+            elif state.time_control.mode == TimeMode.BLITZ:
+                write_picochess_ini('time', '{:d} 0'.format(tc_init['blitz']))
+            elif state.time_control.mode == TimeMode.FISCHER:
+                write_picochess_ini('time', '{:d} {:d}'.format(tc_init['blitz'], tc_init['fischer']))
+            elif state.time_control.mode == TimeMode.FIXED:
+                write_picochess_ini('time', '{:d}'.format(tc_init['fixed']))
+
+            if state.time_control.depth > 0:
+                write_picochess_ini('depth', '{:d}'.format(tc_init['depth']))
+            else:
+                write_picochess_ini('depth', '{:d}'.format(0))
 
-                result = GameResult.ABORT
-                DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=result, play_mode=state.play_mode, game=state.game.copy()))
-                DisplayMsg.show(Message.SYSTEM_SHUTDOWN())
-                time.sleep(5)  # molli allow more time for commentary chat
-                shutdown(args.dgtpi, dev=event.dev)  # @todo make independant of remote eng
+            if state.time_control.node > 0:
+                write_picochess_ini('node', '{:d}'.format(tc_init['node']))
+            else:
+                write_picochess_ini('node', '{:d}'.format(0))
 
-            elif isinstance(event, Event.REBOOT):
-                stop_search()
-                state.stop_clock()
-                engine.quit()
-                result = GameResult.ABORT
-                DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=result, play_mode=state.play_mode, game=state.game.copy()))
-                DisplayMsg.show(Message.SYSTEM_REBOOT())
-                time.sleep(5)  # molli allow more time for commentary chat
-                reboot(args.dgtpi and uci_local_shell.get() is None, dev=event.dev)  # @todo make independant of remote eng
+        text = Message.TIME_CONTROL(time_text=event.time_text, show_ok=event.show_ok, tc_init=tc_init)
+        DisplayMsg.show(text)
+        state.stop_fen_timer()
 
-            elif isinstance(event, Event.EMAIL_LOG):
-                email_logger = Emailer(email=args.email, mailgun_key=args.mailgun_key)
-                email_logger.set_smtp(sserver=args.smtp_server, suser=args.smtp_user, spass=args.smtp_pass,
-                                      sencryption=args.smtp_encryption, sfrom=args.smtp_from)
-                body = 'You probably want to forward this file to a picochess developer ;-)'
-                email_logger.send('Picochess LOG', body, '/opt/picochess/logs/{}'.format(args.log_file))
+    @event_handlers.register(Event.CLOCK_TIME)
+    def _clock_time(event):
+        if dgtdispatcher.is_prio_device(event.dev, event.connect):  # transfer only the most prio clock's time
+            logging.debug('setting tc clock time - prio: %s w:%s b:%s', event.dev,
+                          hms_time(event.time_white), hms_time(event.time_black))
 
-            elif isinstance(event, Event.SET_VOICE):
-                DisplayMsg.show(Message.SET_VOICE(type=event.type, lang=event.lang, speaker=event.speaker,
-                                                  speed=event.speed))
+            if state.time_control.mode != TimeMode.FIXED and (event.time_white == state.time_control.game_time and event.time_black == state.time_control.game_time):
+                pass
+            else:
+                moves_to_go = state.time_control.moves_to_go_orig - state.game.fullmove_number + 1
+                if moves_to_go < 0:
+                    moves_to_go = 0
+                state.time_control.set_clock_times(white_time=event.time_white, black_time=event.time_black, moves_to_go=moves_to_go)
+
+            # find out, if we are in bullet time (<=60secs on users clock or lowest time if user side unknown)
+            time_u = event.time_white
+            time_c = event.time_black
+            if state.interaction_mode in (Mode.NORMAL, Mode.BRAIN, Mode.TRAINING):   # @todo handle Mode.REMOTE too
+                if state.play_mode == PlayMode.USER_BLACK:
+                    time_u, time_c = time_c, time_u
+            else:  # here, we use the lowest time
+                if time_c < time_u:
+                    time_u, time_c = time_c, time_u
+            low_time = False  # molli allow the speech output even for less than 60 seconds
+            dgtboard.low_time = low_time
+            if state.interaction_mode == Mode.TRAINING or position_mode:
+                pass
+            else:
+                DisplayMsg.show(Message.CLOCK_TIME(time_white=event.time_white, time_black=event.time_black,
+                                                   low_time=low_time))
+        else:
+            logging.debug('ignore clock time - too low prio: %s', event.dev)
 
-            elif isinstance(event, Event.KEYBOARD_BUTTON):
-                DisplayMsg.show(Message.DGT_BUTTON(button=event.button, dev=event.dev))
+    @event_handlers.register(Event.OUT_OF_TIME)
+    def _out_of_time(_):
+        nonlocal is_out_of_time_already
+        # molli: allow further playing even when run out of time
+        if not is_out_of_time_already and not online_mode():  # molli in online mode the server decides
+            state.stop_clock()
+            result = GameResult.OUT_OF_TIME
+            DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=result, play_mode=state.play_mode, game=state.game.copy()))
+            is_out_of_time_already = True
+            update_elo(state, result)
+
+    @event_handlers.register(Event.SHUTDOWN)
+    def _shutdown(event):
+        stop_search()
+        state.stop_clock()
+        engine.quit()
+        engine_pool.close()
 
-            elif isinstance(event, Event.KEYBOARD_FEN):
-                DisplayMsg.show(Message.DGT_FEN(fen=event.fen, raw=False))
+        ssh_connections.close()
 
-            elif isinstance(event, Event.EXIT_MENU):
-                DisplayMsg.show(Message.EXIT_MENU())
+        result = GameResult.ABORT
+        DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=result, play_mode=state.play_mode, game=state.game.copy()))
+        DisplayMsg.show(Message.SYSTEM_SHUTDOWN())
+        time.sleep(5)  # molli allow more time for commentary chat
+        shutdown(args.dgtpi, dev=event.dev)  # @todo make independant of remote eng
 
-            elif isinstance(event, Event.UPDATE_PICO):
-                DisplayMsg.show(Message.UPDATE_PICO())
-                checkout_tag(event.tag)
-                DisplayMsg.show(Message.EXIT_MENU())
+    @event_handlers.register(Event.REBOOT)
+    def _reboot(event):
+        stop_search()
+        state.stop_clock()
+        engine.quit()
+        engine_pool.close()
+        result = GameResult.ABORT
+        DisplayMsg.show(Message.GAME_ENDS(tc_init=state.time_control.get_parameters(), result=result, play_mode=state.play_mode, game=state.game.copy()))
+        DisplayMsg.show(Message.SYSTEM_REBOOT())
+        time.sleep(5)  # molli allow more time for commentary chat
+        reboot(args.dgtpi and uci_local_shell.get() is None, dev=event.dev)  # @todo make independant of remote eng
+
+    @event_handlers.register(Event.EMAIL_LOG)
+    def _email_log(_):
+        email_logger = Emailer(email=args.email, mailgun_key=args.mailgun_key)
+        email_logger.set_smtp(sserver=args.smtp_server, suser=args.smtp_user, spass=args.smtp_pass,
+                              sencryption=args.smtp_encryption, sfrom=args.smtp_from)
+        body = 'You probably want to forward this file to a picochess developer ;-)'
+        email_logger.send('Picochess LOG', body, '/opt/picochess/logs/{}'.format(args.log_file))
+
+    @event_handlers.register(Event.SET_VOICE)
+    def _set_voice(event):
+        DisplayMsg.show(Message.SET_VOICE(type=event.type, lang=event.lang, speaker=event.speaker,
+                                          speed=event.speed))
+
+    @event_handlers.register(Event.KEYBOARD_BUTTON)
+    def _keyboard_button(event):
+        DisplayMsg.show(Message.DGT_BUTTON(button=event.button, dev=event.dev))
+
+    @event_handlers.register(Event.KEYBOARD_FEN)
+    def _keyboard_fen(event):
+        DisplayMsg.show(Message.DGT_FEN(fen=event.fen, raw=False))
+
+    @event_handlers.register(Event.EXIT_MENU)
+    def _exit_menu(_):
+        DisplayMsg.show(Message.EXIT_MENU())
 
-            elif isinstance(event, Event.REMOTE_ROOM):
-                DisplayMsg.show(Message.REMOTE_ROOM(inside=event.inside))
+    @event_handlers.register(Event.UPDATE_PICO)
+    def _update_pico(event):
+        DisplayMsg.show(Message.UPDATE_PICO())
+        checkout_tag(event.tag)
+        DisplayMsg.show(Message.EXIT_MENU())
 
-            elif isinstance(event, Event.PROMOTION):
-                DisplayMsg.show(Message.PROMOTION_DONE(move=event.move))
+    @event_handlers.register(Event.REMOTE_ROOM)
+    def _remote_room(event):
+        DisplayMsg.show(Message.REMOTE_ROOM(inside=event.inside))
 
+    # Event loop
+    logging.info('evt_queue ready')
+    while True:
+        try:
+            event = evt_queue.get()
+        except queue.Empty:
+            pass
+        else:
+            logging.debug('received event from evt_queue: %s', event)
+            event_start = time.perf_counter()
+            handler = event_handlers.get(event)
+            if handler:
+                handler(event)
             else:  # Default
                 logging.warning('event not handled : [%s]', event)
 
+            event_handlers.record(event, time.perf_counter() - event_start)
             evt_queue.task_done()
 
 
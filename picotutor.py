@@ -18,40 +18,129 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-import csv
+import logging
+import os
+import threading
 import chess  # type: ignore
 import chess.uci  # type: ignore
 import chess.engine  # type: ignore
 from random import randint
 from dgt.util import PicoComment
 from typing import Tuple
+from opening_index import get_opening_index
+from eval_cache import EvalCache, eval_key
+from tablebase import tablebases
 
 # PicoTutor Constants
 import picotutor_constants as c
 
 
+class StagedInfoHandler(chess.uci.InfoHandler):
+
+    """Info handler which also keeps the lines of its search as they were at low_depth (in self.low)."""
+
+    def __init__(self, low_depth: int):
+        super(StagedInfoHandler, self).__init__()
+        self.low_depth = low_depth
+        self.low = chess.uci.InfoHandler()
+
+    def post_info(self):
+        """Copy the current line as long as the search didnt pass low_depth."""
+        depth = self.info.get('depth')
+        if depth is not None and depth <= self.low_depth:
+            num = self.info.get('multipv', 1)
+            with self.low:
+                self.low.info['depth'] = depth
+                if num in self.info['pv']:
+                    self.low.info['pv'][num] = self.info['pv'][num]
+                if num in self.info['score']:
+                    self.low.info['score'][num] = self.info['score'][num]
+        super(StagedInfoHandler, self).post_info()
+
+    def on_go(self):
+        """Clear both the current and the low depth lines."""
+        super(StagedInfoHandler, self).on_go()
+        self.low.on_go()
+
+
+def classify_move(best_score, best_mate, current_score, current_mate, before_score, low_score, legal_no) -> str:
+    """
+    Return the annotation (??, ?, ?!, !!, !, !? or empty) of a move.
+
+    Scores are in pawns from the view of the moving side: best_score/best_mate of the best move, current_score/current_mate
+    of the played move (both at deep depth), before_score of the previous move of that side and low_score of the played
+    move at low depth. legal_no is the number of legal moves in the position.
+    """
+    best_deep_diff = best_score - current_score
+    deep_low_diff = current_score - low_score
+    score_hist_diff = current_score - before_score
+
+    ###############################################################
+    # 1. bad moves
+    ##############################################################
+    eval_string = ''
+
+    # Blunder ??
+    if best_deep_diff > c.VERY_BAD_MOVE_TH and legal_no:
+        eval_string = '??'
+
+    # Mistake ?
+    elif best_deep_diff > c.BAD_MOVE_TH:
+        eval_string = '?'
+
+    # Dubious
+    elif best_deep_diff > c.DUBIOUS_TH and abs(deep_low_diff) > c.UNCLEAR_DIFF and score_hist_diff > c.POS_INCREASE:
+        eval_string = '?!'
+
+    ###############################################################
+    # 2. good moves
+    ##############################################################
+    eval_string2 = ''
+
+    # very good moves
+    if best_deep_diff <= c.VERY_GOOD_MOVE_TH and deep_low_diff > c.VERY_GOOD_IMPROVE_TH:
+        if (best_score == 999 and (best_mate == current_mate)) and legal_no <= 2:
+            pass
+        else:
+            eval_string2 = '!!'
+
+    # good move
+    elif best_deep_diff <= c.GOOD_MOVE_TH and deep_low_diff > c.GOOD_IMPROVE_TH and legal_no > 1:
+        eval_string2 = '!'
+
+    # interesting move
+    elif best_deep_diff < c.INTERESTING_TH and abs(
+            deep_low_diff) > c.UNCLEAR_DIFF and score_hist_diff < c.POS_DECREASE:
+        eval_string2 = '!?'
+
+    if eval_string2 != '':
+        if eval_string == '':
+            eval_string = eval_string2
+
+    return eval_string
+
+
 class PicoTutor:
 
-    def __init__(self, i_engine_path='/opt/picochess/engines/armv7l/a-stockf', i_player_color=chess.WHITE, i_fen='', i_comment_file='', i_lang='en'):
+    def __init__(self, i_engine_path='/opt/picochess/engines/armv7l/a-stockf', i_player_color=chess.WHITE, i_fen='', i_comment_file='', i_lang='en', i_single_engine=False,
+                 i_adaptive_multipv=False, i_persist_evals=False):
         self.user_color = i_player_color
         self.max_valid_moves = 200
         self.engine_path = i_engine_path
-        self.engine = chess.uci.popen_engine(i_engine_path)
-        self.engine2 = chess.uci.popen_engine(i_engine_path)
-        self.engine.uci()
-        self.engine2.uci()
-        self.engine.setoption({"MultiPV": self.max_valid_moves})
-        self.engine.setoption({"Contempt": 0})
-        self.engine.setoption({"Threads": c.NUM_THREADS})
-        self.engine2.setoption({"MultiPV": self.max_valid_moves})
-        self.engine2.setoption({"Contempt": 0})
-        self.engine2.setoption({"Threads": c.NUM_THREADS})
-        self.engine.isready()
-        self.engine2.isready()
-        self.info_handler = chess.uci.InfoHandler()
-        self.info_handler2 = chess.uci.InfoHandler()
-        self.engine.info_handlers.append(self.info_handler)
-        self.engine2.info_handlers.append(self.info_handler2)
+        self.single_engine = i_single_engine
+        self.adaptive_multipv = i_adaptive_multipv
+        self.multipv = c.ADAPTIVE_MULTIPV if i_adaptive_multipv else self.max_valid_moves
+        self.engine_multipv = self.multipv
+        self.engine_options = {"Contempt": 0, "Threads": c.NUM_THREADS}
+        self.engine_id = ''
+        self.eval_cache = EvalCache(c.EVAL_CACHE_SIZE, path=c.EVAL_CACHE_FILE if i_persist_evals else None)
+        self.search_key = self.search_key2 = None
+        # the running searchmoves verification of the last user move (see _verify_user_move)
+        self.verification = None
+        self.evaluated_callback = None
+        self.verify_lock = threading.Lock()
+        self.verified = threading.Event()
+        self._start_engines()
         self.history = []
         self.history2 = []
         self.history.append((0, chess.Move.null(), 0.00, 0))
@@ -64,6 +153,9 @@ class PicoTutor:
         self.mate = 0
         self.legal_moves = []
         self.legal_moves2 = []
+        self.legal_pvs = {}
+        self.legal_pvs2 = {}
+        self.search_depth = 0
         self.op = []
         self.last_inside_book_moveno = 0
         self.alt_best_moves = []
@@ -78,22 +170,48 @@ class PicoTutor:
         self.explorer_on = False
         self.comments_on = False
 
-        try:
-            with open("chess-eco_pos.txt") as fp:
-                self.book_data = list(csv.DictReader(filter(lambda row: row[0] != '#', fp.readlines()), delimiter='|'))
-        except EnvironmentError:
-            self.book_data = []
-
-        try:
-            with open("opening_name_fen.txt") as fp:
-                self.book_fen_data = fp.readlines()
-        except Exception:
-            self.book_fen_data = []
+        self.opening_index = get_opening_index('chess-eco_pos.txt', 'opening_name_fen.txt')
 
         self._setup_comments(i_lang, i_comment_file)
 
         self._setup_board(i_fen)
 
+    def _popen_engine(self, info_handler):
+        engine = chess.uci.popen_engine(self.engine_path)
+        engine.uci()
+        engine.setoption({"MultiPV": self.multipv})
+        engine.setoption(self.engine_options)
+        engine.isready()
+        engine.info_handlers.append(info_handler)
+        return engine
+
+    def _start_engines(self):
+        self.engine_multipv = self.multipv
+        if self.single_engine:
+            # one deep search - the low depth lines are taken from its info stream
+            self.info_handler = StagedInfoHandler(c.LOW_DEPTH)
+            self.info_handler2 = self.info_handler.low
+            self.engine = self._popen_engine(self.info_handler)
+            self.engine2 = None
+        else:
+            self.info_handler = chess.uci.InfoHandler()
+            self.info_handler2 = chess.uci.InfoHandler()
+            self.engine = self._popen_engine(self.info_handler)
+            self.engine2 = self._popen_engine(self.info_handler2)
+        # MultiPV isn't part of it - the cache entries keep their lines
+        self.engine_id = '{}|{}|{}'.format(os.path.basename(self.engine_path), self.engine.name,
+                                           ','.join('{}={}'.format(*option) for option in sorted(self.engine_options.items())))
+        # the handlers evaluated - the engine ones or filled from the evaluation cache
+        self.eval_handler = self.info_handler
+        self.eval_handler2 = self.info_handler2
+
+    def _set_engine_position(self, isready=False):
+        for engine in (self.engine, self.engine2):
+            if engine:
+                engine.position(self.board)
+                if isready:
+                    engine.isready()
+
     def _setup_comments(self, i_lang, i_comment_file):
         if i_comment_file:
             try:
@@ -123,6 +241,7 @@ class PicoTutor:
 
     def set_status(self, watcher=False, coach=False, explorer=False, comments=False):
 
+        self._finish_verification()
         if (self.watcher_on or self.coach_on):
             self.watcher_on = watcher
             self.coach_on = coach
@@ -194,15 +313,7 @@ class PicoTutor:
             self.comments = []
 
     def _find_longest_matching_opening(self, played: str) -> Tuple[str, str, str]:
-        opening_name = moves = eco = ''
-        for opening in self.book_data:
-            # if len(opening.get('moves')) > 5:
-            if played[:len(opening.get('moves'))] == opening.get('moves'):
-                if len(opening.get('moves')) > len(moves):
-                    opening_name = opening.get('opening_name')
-                    moves = opening.get('moves')
-                    eco = opening.get('eco')
-        return opening_name, moves, eco
+        return self.opening_index.longest_match(played)
 
     def get_opening(self) -> Tuple[str, str, str, bool]:
 
@@ -249,15 +360,7 @@ class PicoTutor:
         if not fen:
             return "", False
 
-        index = 0
-        opening_name = ''
-
-        for line in self.book_fen_data:
-            line_list = line.split()
-            if line_list[0] == fen:
-                opening_name = self.book_fen_data[index + 1]
-                break
-            index = index + 1
+        opening_name = self.opening_index.fen_opening(fen)
 
         if opening_name:
             return opening_name, True
@@ -265,33 +368,20 @@ class PicoTutor:
             return "", False
 
     def reset(self):
+        self._finish_verification()
         self.pos = False
         self.legal_moves = []
         self.legal_moves2 = []
+        self.legal_pvs = {}
+        self.legal_pvs2 = {}
         self.op = []
         self.user_color = chess.WHITE
         self.board = chess.Board()
 
         self.stop()
 
-        self.engine = chess.uci.popen_engine(self.engine_path)
-        self.engine2 = chess.uci.popen_engine(self.engine_path)
-        self.engine.uci()
-        self.engine2.uci()
-        self.engine.setoption({"MultiPV": self.max_valid_moves})
-        self.engine.setoption({"Contempt": 0})
-        self.engine.setoption({"Threads": c.NUM_THREADS})
-        self.engine2.setoption({"MultiPV": self.max_valid_moves})
-        self.engine2.setoption({"Contempt": 0})
-        self.engine2.setoption({"Threads": c.NUM_THREADS})
-        self.engine.isready()
-        self.engine2.isready()
-        self.info_handler = chess.uci.InfoHandler()
-        self.info_handler2 = chess.uci.InfoHandler()
-        self.engine.info_handlers.append(self.info_handler)
-        self.engine2.info_handlers.append(self.info_handler2)
-        self.engine.position(self.board)
-        self.engine2.position(self.board)
+        self._start_engines()
+        self._set_engine_position()
 
         self.history = []
         self.history2 = []
@@ -306,6 +396,7 @@ class PicoTutor:
 
     def set_user_color(self, i_user_color):
 
+        self._finish_verification()
         self.pause()
         self.history = []
         self.history2 = []
@@ -334,8 +425,7 @@ class PicoTutor:
 
         self.board = chess.Board(i_fen)
         chess.Board.turn = i_turn
-        self.engine.position(self.board)
-        self.engine2.position(self.board)
+        self._set_engine_position()
         self.pos = True
 
         if self.board.turn == self.user_color:
@@ -349,6 +439,7 @@ class PicoTutor:
     def push_move(self, i_uci_move):
         if i_uci_move not in self.board.legal_moves:
             return False
+        self._finish_verification()
 
         self.op.append(self.board.san(i_uci_move))
         self.board.push(i_uci_move)
@@ -357,10 +448,7 @@ class PicoTutor:
             return True
 
         self.pause()
-        self.engine.position(self.board)
-        self.engine.isready()
-        self.engine2.position(self.board)
-        self.engine2.isready()
+        self._set_engine_position(isready=True)
 
         if self.board.turn == self.user_color:
             # if it is user player's turn then start analyse engine
@@ -372,6 +460,8 @@ class PicoTutor:
             self.eval_legal_moves2()
             self.eval_user_move(i_uci_move)  # determine & save evaluation of user move
             self.eval_user_move2(i_uci_move)  # determine & save evaluation of user move
+            if self.adaptive_multipv:
+                self._verify_user_move(i_uci_move)  # completes the evaluation later - see when_evaluated()
 
         return True
 
@@ -399,10 +489,7 @@ class PicoTutor:
             return chess.Move.null()
 
         self.pause()
-        self.engine.position(self.board)
-        self.engine.isready()
-        self.engine2.position(self.board)
-        self.engine2.isready()
+        self._set_engine_position(isready=True)
 
         if self.board.turn == self.user_color:
             # if it is user player's turn then start analyse engine
@@ -414,6 +501,7 @@ class PicoTutor:
             self.eval_legal_moves2()
 
     def pop_last_move(self):
+        self._finish_verification()
         poped_move = chess.Move.null()
         self.legal_moves = []
         self.legal_moves2 = []
@@ -432,13 +520,50 @@ class PicoTutor:
 
     def start(self):
         # after newgame event
-        if self.engine2:
+        if self.engine_multipv != self.multipv:
+            self.engine_multipv = self.multipv
+            for engine in (self.engine, self.engine2):
+                if engine:
+                    engine.setoption({"MultiPV": self.multipv})
+
+        self.search_key = eval_key(self.board, 'deep', self.engine_id)
+        self.search_key2 = eval_key(self.board, 'low', self.engine_id)
+        tablebase_handler = self._tablebase_handler()
+        if tablebase_handler:
+            # solved position - the exact scores of all moves, no search needed
+            self.eval_handler = self.eval_handler2 = tablebase_handler
+            return
+        self.eval_handler = self._cached_handler(self.search_key, c.DEEP_DEPTH) or self.info_handler
+        self.eval_handler2 = self._cached_handler(self.search_key2, c.LOW_DEPTH) or self.info_handler2
+        deep_search = self.eval_handler is self.info_handler
+        low_search = self.eval_handler2 is self.info_handler2
+
+        if self.engine2 and low_search:
             self.engine2.position(self.board)
             self.engine2.go(depth=c.LOW_DEPTH, async_callback=True)
 
-        if self.engine:
+        if self.engine and (deep_search or (low_search and self.single_engine)):
             self.engine.position(self.board)
-            self.engine.go(depth=c.DEEP_DEPTH, async_callback=True)
+            self.engine.go(depth=c.DEEP_DEPTH if deep_search else c.LOW_DEPTH, async_callback=True)
+
+    def _cached_handler(self, key, depth):
+        # an InfoHandler filled from the evaluation cache if it has this position deep (and wide) enough
+        entry = self.eval_cache.get(key, min_depth=depth)
+        if entry is None:
+            return None
+        if entry['lines'] < self.multipv and len(entry['pv']) < self.board.legal_moves.count():
+            return None
+        return EvalCache.to_info_handler(entry, self.board)
+
+    def _tablebase_handler(self):
+        # an InfoHandler with the tablebase score of every legal move (best first)
+        move_scores = tablebases.move_scores(self.board)
+        if not move_scores:
+            return None
+        entry = {'depth': c.DEEP_DEPTH, 'lines': len(move_scores),
+                 'pv': {str(num): [move.uci()] for num, (move, _) in enumerate(move_scores, 1)},
+                 'score': {str(num): [score, None] for num, (_, score) in enumerate(move_scores, 1)}}
+        return EvalCache.to_info_handler(entry, self.board)
 
     def pause(self):
         # during thinking time of opponent tutor should be paused
@@ -449,24 +574,27 @@ class PicoTutor:
             self.engine2.stop()
 
     def stop(self):
+        self._finish_verification()
         if self.engine:
             self.engine.stop()
             self.engine.quit()
             self.engine = None
             self.info_handler = None
+            self.eval_handler = None
         if self.engine2:
             self.engine2.stop()
             self.engine2.quit()
             self.engine2 = None
-            self.info_handler2 = None
+        self.info_handler2 = None
+        self.eval_handler2 = None
 
     def print_score(self):
         if self.board.turn:
             print('White to move...')
         else:
             print('Black to move...')
-            print(self.info_handler.info["pv"])
-            print(self.info_handler.info["score"])
+            print(self.eval_handler.info["pv"])
+            print(self.eval_handler.info["score"])
 
     def eval_user_move(self, user_move):
         if not (self.coach_on or self.watcher_on):
@@ -486,8 +614,8 @@ class PicoTutor:
         else:
             self.history.append((pv_no, loop_move, eval, mate))
         if j > 0 and pv_no > 0:
-            self.pv_best_move = self.info_handler.info["pv"][1]
-            self.pv_user_move = self.info_handler.info["pv"][pv_no]
+            self.pv_best_move = self.legal_pvs[1]
+            self.pv_user_move = self.legal_pvs[pv_no]
         else:
             self.pv_best_move = []
             self.pv_user_move = []
@@ -511,8 +639,8 @@ class PicoTutor:
             self.history2.append((pv_no, loop_move, eval, mate))
 
         if j > 0 and pv_no > 0:
-            self.pv_best_move2 = self.info_handler2.info["pv"][1]
-            self.pv_user_move2 = self.info_handler2.info["pv"][pv_no]
+            self.pv_best_move2 = self.legal_pvs2[1]
+            self.pv_user_move2 = self.legal_pvs2[pv_no]
         else:
             self.pv_best_move2 = []
             self.pv_user_move2 = []
@@ -520,6 +648,20 @@ class PicoTutor:
     def sort_score(self, tupel):
         return tupel[2]
 
+    @staticmethod
+    def _eval_score(score_val):
+        score = 0
+        mate = 0
+        if score_val.cp:
+            score = score_val.cp / 100
+        if score_val.mate:
+            mate = int(score_val.mate)
+            if mate < 0:
+                score = -999
+            elif mate > 0:
+                score = 999
+        return score, mate
+
     @staticmethod
     def _eval_pv_list(pv_list, info_handler, legal_moves):
         best_score = -999
@@ -529,18 +671,9 @@ class PicoTutor:
                 score_val = info_handler.info["score"][pv_key]
                 move = chess.Move.null()
 
-                score = 0
-                mate = 0
-                if score_val.cp:
-                    score = score_val.cp / 100
+                score, mate = PicoTutor._eval_score(score_val)
                 if pv_list[0]:
                     move = pv_list[0]
-                if score_val.mate:
-                    mate = int(score_val.mate)
-                    if mate < 0:
-                        score = -999
-                    elif mate > 0:
-                        score = 999
                 legal_moves.append((pv_key, move, score, mate))
                 if score >= best_score:
                     best_score = score
@@ -553,31 +686,139 @@ class PicoTutor:
         self.legal_moves = []
         self.alt_best_moves = []
 
-        pv_list = self.info_handler.info["pv"]
+        pv_list = self.eval_handler.info["pv"]
+        self.legal_pvs = dict(pv_list)
+        self.search_depth = self.eval_handler.info.get("depth", 0)
+        if self.search_key and self.eval_handler is self.info_handler:
+            self.eval_cache.put(self.search_key, self.info_handler.info, self.engine_multipv, c.DEEP_DEPTH)
 
         if pv_list:
-            best_score = PicoTutor._eval_pv_list(pv_list, self.info_handler, self.legal_moves)
+            best_score = PicoTutor._eval_pv_list(pv_list, self.eval_handler, self.legal_moves)
 
             # collect possible good alternative moves
             self.legal_moves.sort(key=self.sort_score, reverse=True)
             for (pv_key, move, score, mate) in self.legal_moves:
                 if move:
                     diff = abs(best_score - score)
-                    if diff <= 0.2:
+                    if diff <= c.ALT_BEST_TH:
                         self.alt_best_moves.append(move)
 
+            if self.adaptive_multipv:
+                self._adapt_multipv(best_score)
+
+    def _adapt_multipv(self, best_score):
+        # widen the next search if even the last line could be an alternative - otherwise narrow it again
+        if len(self.legal_moves) < self.multipv:
+            return
+        worst_diff = abs(best_score - self.legal_moves[-1][2])
+        if worst_diff <= c.ALT_BEST_TH:
+            self.multipv = min(2 * self.multipv, self.max_valid_moves)
+        elif worst_diff > 2 * c.ALT_BEST_TH:
+            self.multipv = max(self.multipv // 2, c.ADAPTIVE_MULTIPV)
+
     def eval_legal_moves2(self):
         if not (self.coach_on or self.watcher_on):
             return
         self.legal_moves2 = []
 
-        pv_list = self.info_handler2.info["pv"]
+        pv_list = self.eval_handler2.info["pv"]
+        self.legal_pvs2 = dict(pv_list)
+        if self.search_key2 and self.eval_handler2 is self.info_handler2:
+            self.eval_cache.put(self.search_key2, self.info_handler2.info, self.engine_multipv, c.LOW_DEPTH)
 
         if pv_list:
-            PicoTutor._eval_pv_list(pv_list, self.info_handler2, self.legal_moves2)
+            PicoTutor._eval_pv_list(pv_list, self.eval_handler2, self.legal_moves2)
 
         self.legal_moves2.sort(key=self.sort_score, reverse=True)
 
+    def _verify_user_move(self, user_move):
+        # the narrow multipv search might have missed the user move - search it alone (with searchmoves)
+        # in the background, the opponent is thinking now anyway
+        board = self.board.copy()
+        board.pop()
+        verify_low = user_move not in [move for (_, move, _, _) in self.legal_moves2]
+        targets = []
+        if user_move not in [move for (_, move, _, _) in self.legal_moves]:
+            low_targets = []
+            if self.single_engine and verify_low:
+                # this search passes LOW_DEPTH as well
+                low_targets.append((self.info_handler2, self.legal_moves2, self.legal_pvs2))
+                verify_low = False
+            depth = max(self.search_depth, c.LOW_DEPTH)
+            targets.append((self._search_move(self.engine, board, user_move, depth),
+                            [(self.info_handler, self.legal_moves, self.legal_pvs)] + low_targets))
+        if verify_low:
+            targets.append((self._search_move(self.engine if self.single_engine else self.engine2, board, user_move, c.LOW_DEPTH),
+                            [(self.info_handler2, self.legal_moves2, self.legal_pvs2)]))
+        if not targets:
+            return
+        # the engine handlers dont hold the search of self.board anymore
+        self.search_key = self.search_key2 = None
+        verification = (user_move, targets)
+        with self.verify_lock:
+            self.verification = verification
+            self.verified.clear()
+        for future, _ in targets:
+            future.add_done_callback(lambda _: self._verification_done(verification))
+
+    @staticmethod
+    def _search_move(engine, board, move, depth):
+        engine.position(board)
+        return engine.go(searchmoves=[move], depth=depth, movetime=c.VERIFY_MOVETIME, async_callback=True)
+
+    def _verification_done(self, verification):
+        # called by the engine threads - once all searches are done the user move evaluation is complete
+        user_move, targets = verification
+        with self.verify_lock:
+            if verification is not self.verification or not all(future.done() for future, _ in targets):
+                return
+            for future, handlers in targets:
+                if future.cancelled() or future.exception() is not None:
+                    continue
+                for info_handler, legal_moves, legal_pvs in handlers:
+                    self._add_search_result(info_handler, user_move, legal_moves, legal_pvs)
+            # evaluate the user move again (with its search result)
+            self.history.pop()
+            self.history2.pop()
+            self.eval_user_move(user_move)
+            self.eval_user_move2(user_move)
+            self.verification = None
+            callback, self.evaluated_callback = self.evaluated_callback, None
+        if callback:
+            callback()
+        self.verified.set()
+
+    def _finish_verification(self):
+        # stop a running verification search and wait for its (partial) result
+        if self.verification is None:
+            return
+        self.pause()
+        if not self.verified.wait(c.VERIFY_MOVETIME / 1000 + 5):
+            logging.warning('user move verification didnt finish')
+            with self.verify_lock:
+                self.verification = None
+                self.evaluated_callback = None
+
+    def when_evaluated(self, callback):
+        """Call callback once the evaluation of the last user move is complete - now or after its verification."""
+        with self.verify_lock:
+            if self.verification is not None:
+                self.evaluated_callback = callback
+                return
+        callback()
+
+    def _add_search_result(self, info_handler, move, legal_moves, legal_pvs):
+        with info_handler as info:
+            pv = info["pv"].get(1)
+            score_val = info["score"].get(1)
+        if not pv or score_val is None:
+            return
+        pv_no = max(legal_pvs, default=0) + 1
+        legal_pvs[pv_no] = pv
+        score, mate = PicoTutor._eval_score(score_val)
+        legal_moves.append((pv_no, move, score, mate))
+        legal_moves.sort(key=self.sort_score, reverse=True)
+
     def get_user_move_eval(self):
         if not (self.coach_on or self.watcher_on):
             return
@@ -629,56 +870,12 @@ class PicoTutor:
             eval_string = ''
             return eval_string, self.mate, self.hint_move
 
-        best_deep_diff = best_score - current_score
-        deep_low_diff = current_score - low_score
-        score_hist_diff = current_score - before_score
-
         # count legal moves in current position (for this we have to undo the user move)
         board_copy = self.board.copy()
         board_copy.pop()
         legal_no = len(list(board_copy.legal_moves))
 
-        ###############################################################
-        # 1. bad moves
-        ##############################################################
-        eval_string = ''
-
-        # Blunder ??
-        if best_deep_diff > c.VERY_BAD_MOVE_TH and legal_no:
-            eval_string = '??'
-
-        # Mistake ?
-        elif best_deep_diff > c.BAD_MOVE_TH:
-            eval_string = '?'
-
-        # Dubious
-        elif best_deep_diff > c.DUBIOUS_TH and abs(deep_low_diff) > c.UNCLEAR_DIFF and score_hist_diff > c.POS_INCREASE:
-            eval_string = '?!'
-
-        ###############################################################
-        # 2. good moves
-        ##############################################################
-        eval_string2 = ''
-
-        # very good moves
-        if best_deep_diff <= c.VERY_GOOD_MOVE_TH and deep_low_diff > c.VERY_GOOD_IMPROVE_TH:
-            if (best_score == 999 and (best_mate == current_mate)) and legal_no <= 2:
-                pass
-            else:
-                eval_string2 = '!!'
-
-        # good move
-        elif best_deep_diff <= c.GOOD_MOVE_TH and deep_low_diff > c.GOOD_IMPROVE_TH and legal_no > 1:
-            eval_string2 = '!'
-
-        # interesting move
-        elif best_deep_diff < c.INTERESTING_TH and abs(
-                deep_low_diff) > c.UNCLEAR_DIFF and score_hist_diff < c.POS_DECREASE:
-            eval_string2 = '!?'
-
-        if eval_string2 != '':
-            if eval_string == '':
-                eval_string = eval_string2
+        eval_string = classify_move(best_score, best_mate, current_score, current_mate, before_score, low_score, legal_no)
 
         # information return in addition:
         # threat move / bestmove/ pv line of user and best pv line so picochess can comment on that as well
@@ -705,12 +902,12 @@ class PicoTutor:
         self.eval_legal_moves2()  # take snapshot of current evaluation
 
         try:
-            best_move = self.info_handler.info["pv"][1][0]
+            best_move = self.eval_handler.info["pv"][1][0]
         except IndexError:
             best_move = ''
 
         try:
-            best_score = self.info_handler.info["score"][1]
+            best_score = self.eval_handler.info["score"][1]
         except IndexError:
             best_score = 0
 
@@ -720,7 +917,7 @@ class PicoTutor:
             mate = best_score.mate
 
         try:
-            pv_best_move = self.info_handler.info["pv"][1]
+            pv_best_move = self.eval_handler.info["pv"][1]
         except IndexError:
             pv_best_move = []
 
@@ -4,6 +4,13 @@ LOW_DEPTH = 5  # for 'obvious moves' calculation
 DEEP_DEPTH = 17  # for best move calculation
 NUM_THREADS = 1  # number of parallel threads (should not be higher)
 
+ADAPTIVE_MULTIPV = 4  # start value of the lines searched in adaptive mode
+ALT_BEST_TH = 0.2  # difference alternative to best move (alt_best_moves)
+VERIFY_MOVETIME = 2000  # max. ms for the searchmoves verification of a user move
+
+EVAL_CACHE_SIZE = 256  # positions kept in memory by the evaluation cache
+EVAL_CACHE_FILE = 'games/tutor_evals.db'  # on-disk store of the evaluation cache (if enabled)
+
 VERY_BAD_MOVE_TH = 2.5  # difference user to best move ??
 BAD_MOVE_TH = 1.5  # difference user to best move ?
 DUBIOUS_TH = 0.3  # difference user to best move ?!
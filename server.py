@@ -19,20 +19,28 @@ import datetime
 import threading
 import logging
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Set
 
 import chess  # type: ignore
 import chess.pgn as pgn  # type: ignore
 
+import tornado.gen  # type: ignore
 import tornado.web  # type: ignore
 import tornado.wsgi  # type: ignore
 from tornado.ioloop import IOLoop  # type: ignore
 from tornado.websocket import WebSocketHandler  # type: ignore
 
 from utilities import Observable, DisplayMsg, hms_time, RepeatedTimer
+from metrics import queue_metrics
+from legal_fens import legal_fen_cache
+from opening_stats import opening_stats
+from game_db import game_db
+from tablebase import tablebases
+from game_archive import GameArchive, get_archive
 from web.picoweb import picoweb as pw
 
-from dgt.api import Dgt, Event, Message
+from dgt.api import Dgt, Event, Message, HandlerRegistry, handler_registries
 from dgt.util import PlayMode, Mode, ClockSide
 from dgt.iface import DgtIface
 from eboard import EBoard
@@ -99,6 +107,12 @@ class ChannelHandler(ServerRequestHandler):
             Observable.fire(Event.REMOTE_ROOM(inside=inside))
         elif action == 'command':
             self.process_console_command(self.get_argument('command'))
+        elif action == 'read_game':
+            try:
+                number = int(self.get_argument('number'))
+            except ValueError:
+                raise tornado.web.HTTPError(400)
+            Observable.fire(Event.READ_GAME(pgn_filename=GameArchive.default_name, game_number=number))
 
 
 class EventHandler(WebSocketHandler):
@@ -155,6 +169,64 @@ class InfoHandler(ServerRequestHandler):
         if action == 'get_clock_text':
             if 'clock_text' in self.shared:
                 self.write(self.shared['clock_text'])
+        if action == 'get_handler_stats':
+            self.write({registry.name: registry.stats() for registry in handler_registries})
+
+
+class MetricsHandler(ServerRequestHandler):
+    def get(self, *args, **kwargs):
+        self.write({'queues': queue_metrics(),
+                    'handlers': {registry.name: registry.stats() for registry in handler_registries},
+                    'legal_fen_cache': legal_fen_cache.stats(),
+                    'opening_stats': opening_stats.stats(),
+                    'game_db': game_db.stats(),
+                    'tablebases': tablebases.stats()})
+
+
+class QueryHandler(ServerRequestHandler):
+    executor = ThreadPoolExecutor(max_workers=1)  # the games & archive lookups (ranking, indexing) run off the IOLoop
+
+    @tornado.gen.coroutine
+    def get(self, *args, **kwargs):
+        action = self.get_argument('action')
+        if action == 'get_book_moves':
+            fen = self.get_argument('fen')
+            self.write({'data': opening_stats.query([fen])[fen]})
+        elif action == 'get_book_moves_batch':
+            self.write({'data': opening_stats.query(self.get_arguments('fen'))})
+        elif action == 'get_games':
+            try:
+                start = int(self.get_argument('start', '0'))
+                length = int(self.get_argument('length', '5'))
+            except ValueError:
+                raise tornado.web.HTTPError(400)
+            result = yield self.executor.submit(game_db.query, self.get_argument('fen'), self.get_argument('sort', 'elo'),
+                                                max(start, 0), max(min(length, 100), 1))
+            self.write(result)
+        elif action == 'get_archive':
+            try:
+                start = int(self.get_argument('start', '0'))
+                length = int(self.get_argument('length', '20'))
+            except ValueError:
+                raise tornado.web.HTTPError(400)
+            archive = get_archive()
+            games = yield self.executor.submit(archive.games, player=self.get_argument('player', ''),
+                                               result=self.get_argument('result', ''), text=self.get_argument('text', ''))
+            length = max(min(length, 100), 1)
+            self.write({'recordsTotal': archive.count(), 'recordsFiltered': len(games),
+                        'data': [{'number': game['number'], 'headers': game['headers'], 'result': game['result'],
+                                  'plies': game['plies']} for game in games[max(start, 0):max(start, 0) + length]]})
+        elif action == 'get_archive_game':
+            try:
+                number = int(self.get_argument('number'))
+                pgn_text = yield self.executor.submit(get_archive().pgn, number)
+                self.write({'pgn': pgn_text})
+            except ValueError:
+                raise tornado.web.HTTPError(400)
+            except IndexError:
+                raise tornado.web.HTTPError(404)
+
+    post = get
 
 
 class ChessBoardHandler(ServerRequestHandler):
@@ -187,6 +259,8 @@ class WebServer(threading.Thread):
             (r'/event', EventHandler, dict(shared=shared)),
             (r'/dgt', DGTHandler, dict(shared=shared)),
             (r'/info', InfoHandler, dict(shared=shared)),
+            (r'/metrics', MetricsHandler, dict(shared=shared)),
+            (r'/query', QueryHandler, dict(shared=shared)),
             (r'/help', HelpHandler, dict(theme=theme)),
 
             (r'/channel', ChannelHandler, dict(shared=shared)),
@@ -469,247 +543,238 @@ class WebDisplay(DisplayMsg, threading.Thread):
 
         pgn_game.headers['Time'] = self.starttime
 
-    def task(self, message):
-        def _oldstyle_fen(game: chess.Board):
-            builder = []
-            builder.append(game.board_fen())
-            builder.append('w' if game.turn == chess.WHITE else 'b')
-            builder.append(game.castling_xfen())
-            builder.append(chess.SQUARE_NAMES[game.ep_square] if game.ep_square else '-')
-            builder.append(str(game.halfmove_clock))
-            builder.append(str(game.fullmove_number))
-            return ' '.join(builder)
-
-        def _build_headers():
-            self._create_headers()
-            pgn_game = pgn.Game()
-            self._build_game_header(pgn_game)
-            self.shared['headers'].update(pgn_game.headers)
-
-        def _send_headers():
-            EventHandler.write_to_clients({'event': 'Header', 'headers': self.shared['headers']})
-
-        def _send_title():
-            if 'ip_info' in self.shared:
-                EventHandler.write_to_clients({'event': 'Title', 'ip_info': self.shared['ip_info']})
+    @staticmethod
+    def _oldstyle_fen(game: chess.Board):
+        builder = []
+        builder.append(game.board_fen())
+        builder.append('w' if game.turn == chess.WHITE else 'b')
+        builder.append(game.castling_xfen())
+        builder.append(chess.SQUARE_NAMES[game.ep_square] if game.ep_square else '-')
+        builder.append(str(game.halfmove_clock))
+        builder.append(str(game.fullmove_number))
+        return ' '.join(builder)
+
+    @staticmethod
+    def _peek_uci(game: chess.Board):
+        """Return last move in uci format."""
+        try:
+            return game.peek().uci()
+        except IndexError:
+            return chess.Move.null().uci()
 
-        def _transfer(game: chess.Board):
-            pgn_game = pgn.Game().from_board(game)
-            self._build_game_header(pgn_game)
-            self.shared['headers'] = pgn_game.headers
-            return pgn_game.accept(pgn.StringExporter(headers=True, comments=False, variations=False))
+    def _build_headers(self):
+        self._create_headers()
+        pgn_game = pgn.Game()
+        self._build_game_header(pgn_game)
+        self.shared['headers'].update(pgn_game.headers)
 
-        def peek_uci(game: chess.Board):
-            """Return last move in uci format."""
-            try:
-                return game.peek().uci()
-            except IndexError:
-                return chess.Move.null().uci()
-
-        if False:  # switch-case
-            pass
-        elif isinstance(message, Message.START_NEW_GAME):
-            self.starttime = datetime.datetime.now().strftime('%H:%M:%S')
-            pgn_str = _transfer(message.game)
-            fen = message.game.fen()
-            result = {'pgn': pgn_str, 'fen': fen, 'event': 'Game', 'move': '0000', 'play': 'newgame'}
-            self.shared['last_dgt_move_msg'] = result
-            EventHandler.write_to_clients(result)
-            _build_headers()
-            _send_headers()
-            _send_title()
-
-        elif isinstance(message, Message.IP_INFO):
-            self.shared['ip_info'] = message.info
-            _build_headers()
-            _send_headers()
-            _send_title()
-
-        elif isinstance(message, Message.SYSTEM_INFO):
-            self._create_system_info()
-            self.shared['system_info'].update(message.info)
-            if 'engine_name' in self.shared['system_info']:
-                self.shared['system_info']['old_engine'] = self.shared['system_info']['engine_name']
-            if 'rspeed' in self.shared['system_info']:
-                self.shared['system_info']['rspeed_orig'] = self.shared['system_info']['rspeed']
-            if 'user_name' in self.shared['system_info']:
-                self.shared['system_info']['user_name_orig'] = self.shared['system_info']['user_name']
-            _build_headers()
-            _send_headers()
-
-        elif isinstance(message, Message.ENGINE_STARTUP):
-            for index in range(0, len(message.installed_engines)):
-                eng = message.installed_engines[index]
-                if eng['file'] == message.file:
-                    self.shared['system_info']['engine_elo'] = eng['elo']
-                    break
-            _build_headers()
-            _send_headers()
-
-        elif isinstance(message, Message.ENGINE_READY):
-            self._create_system_info()
-            self.shared['system_info']['old_engine'] = self.shared['system_info']['engine_name'] = message.engine_name
-            self.shared['system_info']['engine_elo'] = message.eng['elo']
-            if not message.has_levels:
-                if 'level_text' in self.shared['game_info']:
-                    del self.shared['game_info']['level_text']
-                if 'level_name' in self.shared['game_info']:
-                    del self.shared['game_info']['level_name']
-            _build_headers()
-            _send_headers()
-
-        elif isinstance(message, Message.STARTUP_INFO):
-            self.shared['game_info'] = message.info.copy()
-            # change book_index to book_text
-            books = message.info['books']
-            book_index = message.info['book_index']
-            self.shared['game_info']['book_text'] = books[book_index]['text']
-            del self.shared['game_info']['book_index']
-
-            if message.info['level_text'] is None:
-                del self.shared['game_info']['level_text']
-            if message.info['level_name'] is None:
-                del self.shared['game_info']['level_name']
+    def _send_headers(self):
+        EventHandler.write_to_clients({'event': 'Header', 'headers': self.shared['headers']})
 
-        elif isinstance(message, Message.OPENING_BOOK):
-            self._create_game_info()
-            self.shared['game_info']['book_text'] = message.book_text
-
-        elif isinstance(message, Message.INTERACTION_MODE):
-            self._create_game_info()
-            self.shared['game_info']['interaction_mode'] = message.mode
-            if self.shared['game_info']['interaction_mode'] == Mode.REMOTE:
-                self.shared['system_info']['engine_name'] = 'Remote Player'
-                if self.shared['system_info']['engine_elo'] != '':
-                    WebDisplay.engine_elo_sav = self.shared['system_info']['engine_elo']
-                self.shared['system_info']['engine_elo'] = '?'
-                if self.shared['game_info']['level_text'] != '':
-                    WebDisplay.level_text_sav = self.shared['game_info']['level_text']
-                if self.shared['game_info']['level_name'] != '':
-                    WebDisplay.level_name_sav = self.shared['game_info']['level_name']
-                del self.shared['game_info']['level_text']
-                del self.shared['game_info']['level_name']
+    def _send_title(self):
+        if 'ip_info' in self.shared:
+            EventHandler.write_to_clients({'event': 'Title', 'ip_info': self.shared['ip_info']})
+
+    def _transfer(self, game: chess.Board):
+        pgn_game = pgn.Game().from_board(game.copy())  # from_board pops & replays - the message board is shared
+        self._build_game_header(pgn_game)
+        self.shared['headers'] = pgn_game.headers
+        return pgn_game.accept(pgn.StringExporter(headers=True, comments=False, variations=False))
+
+    def _send_fen(self, game: chess.Board, mov: str, play: str):
+        pgn_str = self._transfer(game)
+        fen = self._oldstyle_fen(game)
+        result = {'pgn': pgn_str, 'fen': fen, 'event': 'Fen', 'move': mov, 'play': play}
+        self.shared['last_dgt_move_msg'] = result
+        EventHandler.write_to_clients(result)
+
+    _handlers = HandlerRegistry('web')
 
-            elif self.shared['game_info']['interaction_mode'] == Mode.OBSERVE:
-                self.shared['system_info']['engine_name'] = 'Player B'
-                self.shared['system_info']['user_name'] = 'Player A'
-                if self.shared['system_info']['engine_elo'] != '':
-                    WebDisplay.engine_elo_sav = self.shared['system_info']['engine_elo']
-                self.shared['system_info']['engine_elo'] = '?'
-                if self.shared['game_info']['level_text'] != '':
-                    WebDisplay.level_text_sav = self.shared['game_info']['level_text']
-                if self.shared['game_info']['level_name'] != '':
-                    WebDisplay.level_name_sav = self.shared['game_info']['level_name']
+    @_handlers.register(Message.START_NEW_GAME)
+    def _start_new_game(self, message):
+        self.starttime = datetime.datetime.now().strftime('%H:%M:%S')
+        pgn_str = self._transfer(message.game)
+        fen = message.game.fen()
+        result = {'pgn': pgn_str, 'fen': fen, 'event': 'Game', 'move': '0000', 'play': 'newgame'}
+        self.shared['last_dgt_move_msg'] = result
+        EventHandler.write_to_clients(result)
+        self._build_headers()
+        self._send_headers()
+        self._send_title()
+
+    @_handlers.register(Message.IP_INFO)
+    def _ip_info(self, message):
+        self.shared['ip_info'] = message.info
+        self._build_headers()
+        self._send_headers()
+        self._send_title()
+
+    @_handlers.register(Message.SYSTEM_INFO)
+    def _system_info(self, message):
+        self._create_system_info()
+        self.shared['system_info'].update(message.info)
+        if 'engine_name' in self.shared['system_info']:
+            self.shared['system_info']['old_engine'] = self.shared['system_info']['engine_name']
+        if 'rspeed' in self.shared['system_info']:
+            self.shared['system_info']['rspeed_orig'] = self.shared['system_info']['rspeed']
+        if 'user_name' in self.shared['system_info']:
+            self.shared['system_info']['user_name_orig'] = self.shared['system_info']['user_name']
+        self._build_headers()
+        self._send_headers()
+
+    @_handlers.register(Message.ENGINE_STARTUP)
+    def _engine_startup(self, message):
+        for index in range(0, len(message.installed_engines)):
+            eng = message.installed_engines[index]
+            if eng['file'] == message.file:
+                self.shared['system_info']['engine_elo'] = eng['elo']
+                break
+        self._build_headers()
+        self._send_headers()
+
+    @_handlers.register(Message.ENGINE_READY)
+    def _engine_ready(self, message):
+        self._create_system_info()
+        self.shared['system_info']['old_engine'] = self.shared['system_info']['engine_name'] = message.engine_name
+        self.shared['system_info']['engine_elo'] = message.eng['elo']
+        if not message.has_levels:
+            if 'level_text' in self.shared['game_info']:
                 del self.shared['game_info']['level_text']
+            if 'level_name' in self.shared['game_info']:
                 del self.shared['game_info']['level_name']
-            else:
-                self.shared['system_info']['engine_name'] = self.shared['system_info']['old_engine']
-                self.shared['system_info']['user_name'] = self.shared['system_info']['user_name_orig']
-                if WebDisplay.engine_elo_sav != '':
-                    self.shared['system_info']['engine_elo'] = WebDisplay.engine_elo_sav
-                if WebDisplay.level_text_sav != '':
-                    self.shared['game_info']['level_text'] = WebDisplay.level_text_sav
-                if WebDisplay.level_name_sav != '':
-                    self.shared['game_info']['level_name'] = WebDisplay.level_name_sav
-
-            _build_headers()
-            _send_headers()
-
-        elif isinstance(message, Message.PLAY_MODE):
-            self._create_game_info()
-            self.shared['game_info']['play_mode'] = message.play_mode
-            _build_headers()
-            _send_headers()
-
-        elif isinstance(message, Message.TIME_CONTROL):
-            self._create_game_info()
-            self.shared['game_info']['time_text'] = message.time_text
-            self.shared['game_info']['tc_init'] = message.tc_init
-
-        elif isinstance(message, Message.LEVEL):
-            self._create_game_info()
-            self.shared['game_info']['level_text'] = message.level_text
-            self.shared['game_info']['level_name'] = message.level_name
-            _build_headers()
-            _send_headers()
-
-        elif isinstance(message, Message.DGT_NO_CLOCK_ERROR):
-            # result = {'event': 'Status', 'msg': 'Error clock'}
-            # EventHandler.write_to_clients(result)
-            pass
-
-        elif isinstance(message, Message.DGT_CLOCK_VERSION):
-            if message.dev == 'ser':
-                attached = 'serial'
-            elif message.dev == 'i2c':
-                attached = 'i2c-pi'
-            else:
-                attached = 'server'
-            result = {'event': 'Status', 'msg': 'Ok clock ' + attached}
-            EventHandler.write_to_clients(result)
-
-        elif isinstance(message, Message.COMPUTER_MOVE):
-            game_copy = message.game.copy()
-            game_copy.push(message.move)
-            pgn_str = _transfer(game_copy)
-            fen = _oldstyle_fen(game_copy)
-            mov = message.move.uci()
-            result = {'pgn': pgn_str, 'fen': fen, 'event': 'Fen', 'move': mov, 'play': 'computer'}
-            self.shared['last_dgt_move_msg'] = result  # not send => keep it for COMPUTER_MOVE_DONE
-
-        elif isinstance(message, Message.COMPUTER_MOVE_DONE):
-            result = self.shared['last_dgt_move_msg']
-            EventHandler.write_to_clients(result)
+        self._build_headers()
+        self._send_headers()
+
+    @_handlers.register(Message.STARTUP_INFO)
+    def _startup_info(self, message):
+        self.shared['game_info'] = message.info.copy()
+        # change book_index to book_text
+        books = message.info['books']
+        book_index = message.info['book_index']
+        self.shared['game_info']['book_text'] = books[book_index]['text']
+        del self.shared['game_info']['book_index']
+
+        if message.info['level_text'] is None:
+            del self.shared['game_info']['level_text']
+        if message.info['level_name'] is None:
+            del self.shared['game_info']['level_name']
+
+    @_handlers.register(Message.OPENING_BOOK)
+    def _opening_book(self, message):
+        self._create_game_info()
+        self.shared['game_info']['book_text'] = message.book_text
+
+    @_handlers.register(Message.INTERACTION_MODE)
+    def _interaction_mode(self, message):
+        self._create_game_info()
+        self.shared['game_info']['interaction_mode'] = message.mode
+        if self.shared['game_info']['interaction_mode'] == Mode.REMOTE:
+            self.shared['system_info']['engine_name'] = 'Remote Player'
+            if self.shared['system_info']['engine_elo'] != '':
+                WebDisplay.engine_elo_sav = self.shared['system_info']['engine_elo']
+            self.shared['system_info']['engine_elo'] = '?'
+            if self.shared['game_info']['level_text'] != '':
+                WebDisplay.level_text_sav = self.shared['game_info']['level_text']
+            if self.shared['game_info']['level_name'] != '':
+                WebDisplay.level_name_sav = self.shared['game_info']['level_name']
+            del self.shared['game_info']['level_text']
+            del self.shared['game_info']['level_name']
+
+        elif self.shared['game_info']['interaction_mode'] == Mode.OBSERVE:
+            self.shared['system_info']['engine_name'] = 'Player B'
+            self.shared['system_info']['user_name'] = 'Player A'
+            if self.shared['system_info']['engine_elo'] != '':
+                WebDisplay.engine_elo_sav = self.shared['system_info']['engine_elo']
+            self.shared['system_info']['engine_elo'] = '?'
+            if self.shared['game_info']['level_text'] != '':
+                WebDisplay.level_text_sav = self.shared['game_info']['level_text']
+            if self.shared['game_info']['level_name'] != '':
+                WebDisplay.level_name_sav = self.shared['game_info']['level_name']
+            del self.shared['game_info']['level_text']
+            del self.shared['game_info']['level_name']
+        else:
+            self.shared['system_info']['engine_name'] = self.shared['system_info']['old_engine']
+            self.shared['system_info']['user_name'] = self.shared['system_info']['user_name_orig']
+            if WebDisplay.engine_elo_sav != '':
+                self.shared['system_info']['engine_elo'] = WebDisplay.engine_elo_sav
+            if WebDisplay.level_text_sav != '':
+                self.shared['game_info']['level_text'] = WebDisplay.level_text_sav
+            if WebDisplay.level_name_sav != '':
+                self.shared['game_info']['level_name'] = WebDisplay.level_name_sav
+
+        self._build_headers()
+        self._send_headers()
+
+    @_handlers.register(Message.PLAY_MODE)
+    def _play_mode(self, message):
+        self._create_game_info()
+        self.shared['game_info']['play_mode'] = message.play_mode
+        self._build_headers()
+        self._send_headers()
+
+    @_handlers.register(Message.TIME_CONTROL)
+    def _time_control(self, message):
+        self._create_game_info()
+        self.shared['game_info']['time_text'] = message.time_text
+        self.shared['game_info']['tc_init'] = message.tc_init
+
+    @_handlers.register(Message.LEVEL)
+    def _level(self, message):
+        self._create_game_info()
+        self.shared['game_info']['level_text'] = message.level_text
+        self.shared['game_info']['level_name'] = message.level_name
+        self._build_headers()
+        self._send_headers()
+
+    @_handlers.register(Message.DGT_CLOCK_VERSION)
+    def _clock_version(self, message):
+        if message.dev == 'ser':
+            attached = 'serial'
+        elif message.dev == 'i2c':
+            attached = 'i2c-pi'
+        else:
+            attached = 'server'
+        result = {'event': 'Status', 'msg': 'Ok clock ' + attached}
+        EventHandler.write_to_clients(result)
 
-        elif isinstance(message, Message.USER_MOVE_DONE):
-            pgn_str = _transfer(message.game)
-            fen = _oldstyle_fen(message.game)
-            mov = message.move.uci()
-            result = {'pgn': pgn_str, 'fen': fen, 'event': 'Fen', 'move': mov, 'play': 'user'}
-            self.shared['last_dgt_move_msg'] = result
-            EventHandler.write_to_clients(result)
+    @_handlers.register(Message.COMPUTER_MOVE)
+    def _computer_move(self, message):
+        game_copy = message.game.copy()
+        game_copy.push(message.move)
+        pgn_str = self._transfer(game_copy)
+        fen = self._oldstyle_fen(game_copy)
+        mov = message.move.uci()
+        result = {'pgn': pgn_str, 'fen': fen, 'event': 'Fen', 'move': mov, 'play': 'computer'}
+        self.shared['last_dgt_move_msg'] = result  # not send => keep it for COMPUTER_MOVE_DONE
+
+    @_handlers.register(Message.COMPUTER_MOVE_DONE)
+    def _computer_move_done(self, _):
+        result = self.shared['last_dgt_move_msg']
+        EventHandler.write_to_clients(result)
 
-        elif isinstance(message, Message.REVIEW_MOVE_DONE):
-            pgn_str = _transfer(message.game)
-            fen = _oldstyle_fen(message.game)
-            mov = message.move.uci()
-            result = {'pgn': pgn_str, 'fen': fen, 'event': 'Fen', 'move': mov, 'play': 'review'}
-            self.shared['last_dgt_move_msg'] = result
-            EventHandler.write_to_clients(result)
+    @_handlers.register(Message.USER_MOVE_DONE)
+    def _user_move_done(self, message):
+        self._send_fen(message.game, message.move.uci(), 'user')
 
-        elif isinstance(message, Message.ALTERNATIVE_MOVE):
-            pgn_str = _transfer(message.game)
-            fen = _oldstyle_fen(message.game)
-            mov = peek_uci(message.game)
-            result = {'pgn': pgn_str, 'fen': fen, 'event': 'Fen', 'move': mov, 'play': 'reload'}
-            self.shared['last_dgt_move_msg'] = result
-            EventHandler.write_to_clients(result)
+    @_handlers.register(Message.REVIEW_MOVE_DONE)
+    def _review_move_done(self, message):
+        self._send_fen(message.game, message.move.uci(), 'review')
 
-        elif isinstance(message, Message.SWITCH_SIDES):
-            pgn_str = _transfer(message.game)
-            fen = _oldstyle_fen(message.game)
-            mov = message.move.uci()
-            result = {'pgn': pgn_str, 'fen': fen, 'event': 'Fen', 'move': mov, 'play': 'reload'}
-            self.shared['last_dgt_move_msg'] = result
-            EventHandler.write_to_clients(result)
-
-        elif isinstance(message, Message.TAKE_BACK):
-            pgn_str = _transfer(message.game)
-            fen = _oldstyle_fen(message.game)
-            mov = peek_uci(message.game)
-            result = {'pgn': pgn_str, 'fen': fen, 'event': 'Fen', 'move': mov, 'play': 'reload'}
-            self.shared['last_dgt_move_msg'] = result
-            EventHandler.write_to_clients(result)
+    @_handlers.register(Message.SWITCH_SIDES)
+    def _switch_sides(self, message):
+        self._send_fen(message.game, message.move.uci(), 'reload')
 
-        elif isinstance(message, Message.PROMOTION_DIALOG):
-            result = {'event': 'PromotionDlg', 'move': message.move}
-            EventHandler.write_to_clients(result)
+    @_handlers.register(Message.ALTERNATIVE_MOVE, Message.TAKE_BACK)
+    def _reload(self, message):
+        self._send_fen(message.game, self._peek_uci(message.game), 'reload')
 
-        elif isinstance(message, Message.GAME_ENDS):
-            pass
+    @_handlers.register(Message.PROMOTION_DIALOG)
+    def _promotion_dialog(self, message):
+        result = {'event': 'PromotionDlg', 'move': message.move}
+        EventHandler.write_to_clients(result)
 
-        else:  # Default
-            pass
+    def task(self, message):
+        self._handlers.dispatch(message, self)
 
     def _create_task(self, msg):
         IOLoop.instance().add_callback(callback=lambda: self.task(msg))
@@ -0,0 +1,158 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import chess  # type: ignore
+import chess.polyglot  # type: ignore
+import chess.syzygy  # type: ignore
+import chess.uci  # type: ignore
+
+TB_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'tablebases', 'syzygy')
+TB_WIN_SCORE = 9000  # centipawns of a tablebase win, minus the plies to the next zeroing move
+
+
+class TablebaseService(object):
+
+    """Shared syzygy probe handle with a LRU cache of the (wdl, dtz) results - all methods return None outside the tablebases."""
+
+    def __init__(self, path=TB_PATH, maxsize=4096):
+        self.path = path
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.max_pieces = 0
+        self._tablebases: Optional[chess.syzygy.Tablebases] = None
+        self._opened = False
+        self._cache: 'OrderedDict[int, Optional[Tuple[int, int]]]' = OrderedDict()
+        self._lock = threading.RLock()
+
+    def open(self, path: str):
+        """Use the tables of this folder (opened with the next probe)."""
+        with self._lock:
+            self.close()
+            self.path = path
+
+    def _open(self) -> bool:
+        if not self._opened:
+            self._opened = True
+            names = [name.split('.')[0] for name in os.listdir(self.path)] if os.path.isdir(self.path) else []
+            names = [name for name in names if 'v' in name]
+            if not names:
+                logging.info('no syzygy tablebases found in %s', self.path)
+                return False
+            self._tablebases = chess.syzygy.open_tablebases(self.path)
+            self.max_pieces = max(len(name) - 1 for name in names)
+            logging.debug('syzygy tablebases up to %i pieces opened from %s', self.max_pieces, self.path)
+        return self._tablebases is not None
+
+    def available(self, board: chess.Board) -> bool:
+        """Return True if the position can be probed (few enough pieces, no castling rights & valid)."""
+        with self._lock:
+            if not self._open():
+                return False
+        return chess.popcount(board.occupied) <= self.max_pieces and not board.castling_rights and board.is_valid()
+
+    def probe(self, board: chess.Board) -> Optional[Tuple[int, int]]:
+        """Return (wdl, dtz) for the side to move."""
+        if not self.available(board):
+            return None
+        key = chess.polyglot.zobrist_hash(board)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+            try:
+                result: Optional[Tuple[int, int]] = (self._tablebases.probe_wdl(board), self._tablebases.probe_dtz(board))
+            except KeyError:  # MissingTableError
+                result = None
+            self._cache[key] = result
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            return result
+
+    def score(self, board: chess.Board) -> Optional[int]:
+        """Return the exact score in centipawns for the side to move - a cursed win (50 moves rule) is a draw."""
+        result = self.probe(board)
+        if result is None:
+            return None
+        wdl, dtz = result
+        if abs(wdl) < 2:
+            return 0
+        return (TB_WIN_SCORE - abs(dtz)) * (1 if wdl > 0 else -1)
+
+    def move_scores(self, board: chess.Board) -> Optional[List[Tuple[chess.Move, int]]]:
+        """Return (move, score) of all legal moves - the best move first (fastest win or longest defence)."""
+        if not self.available(board):
+            return None
+        ranked = []
+        board = board.copy(stack=False)
+        for move in board.legal_moves:
+            zeroing = board.is_zeroing(move)
+            board.push(move)
+            if board.is_checkmate():
+                score, rank = TB_WIN_SCORE, (3, 0)
+            else:
+                result = self.probe(board)
+                if result is None:
+                    return None
+                wdl, dtz = -result[0], -result[1]
+                score = -self.score(board)
+                if wdl > 0:
+                    rank = (wdl, -1 if zeroing else -abs(dtz))
+                else:
+                    rank = (wdl, abs(dtz))
+            board.pop()
+            ranked.append((rank, move, score))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return [(move, score) for _, move, score in ranked]
+
+    def best_move(self, board: chess.Board) -> Optional[chess.uci.BestMove]:
+        """Return the tablebase move and the best answer as ponder move."""
+        scores = self.move_scores(board)
+        if not scores:
+            return None
+        move = scores[0][0]
+        board = board.copy(stack=False)
+        board.push(move)
+        answers = self.move_scores(board)
+        return chess.uci.BestMove(move, answers[0][0] if answers else None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit/miss counters, the current size and the max. pieces of the tables."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache), 'maxsize': self.maxsize,
+                    'max_pieces': self.max_pieces}
+
+    def close(self):
+        """Close the tables and clear the cache."""
+        with self._lock:
+            if self._tablebases is not None:
+                self._tablebases.close()
+            self._tablebases = None
+            self._opened = False
+            self.max_pieces = 0
+            self._cache.clear()
+
+
+tablebases = TablebaseService()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmark the DisplayMsg fan out (not part of the unittest run).
+
+Run from the picochess folder: python3 -m tests.bench_display_bus
+"""
+
+import copy
+import os
+import sys
+import time
+import tracemalloc
+
+import chess  # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from dgt.api import Message  # noqa: E402
+from utilities import DisplayMsg, msgdisplay_devices  # noqa: E402
+
+DEVICES = 5  # web, pgn, talker, dgt display, ...
+MOVES = 200
+PLIES = 80
+
+
+def show_deepcopy_per_device(message):
+    """The former fan out: one deepcopy for each device."""
+    for display in msgdisplay_devices:
+        display.msg_queue.put(copy.deepcopy(message))
+
+
+def measure(show, game):
+    """Return (seconds, allocated bytes) per published move."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(MOVES):
+        show(Message.COMPUTER_MOVE(move=game.peek(), ponder=chess.Move.null(), game=game, wait=False))
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for display in msgdisplay_devices:
+        display.msg_queue.queue.clear()
+    return duration / MOVES, peak / MOVES
+
+
+def main():
+    displays = [DisplayMsg() for _ in range(DEVICES)]
+    game = chess.Board()
+    while len(game.move_stack) < PLIES and not game.is_game_over():
+        game.push(list(game.legal_moves)[len(game.move_stack) % game.legal_moves.count()])
+
+    before = measure(show_deepcopy_per_device, game)
+    after = measure(DisplayMsg.show, game)
+    print('{} devices, game with {} plies'.format(len(displays), len(game.move_stack)))
+    print('deepcopy per device : {:8.3f} ms {:10.0f} bytes per move'.format(before[0] * 1000, before[1]))
+    print('one copy per publish: {:8.3f} ms {:10.0f} bytes per move'.format(after[0] * 1000, after[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmark the PicoTutor full width (MultiPV=200) against the adaptive MultiPV search (not part of the unittest run).
+
+Run from the picochess folder: python3 -m tests.bench_tutor_multipv [engine] [depth]
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+
+import chess  # type: ignore
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from picotutor import PicoTutor  # noqa: E402
+
+ENGINE = 'engines/x86_64/a-stock8'
+DEPTH = 12  # the user move is played as soon as the tutor search reaches this depth
+TIMEOUT = 60  # max. secs to wait for DEPTH
+
+# (fen, user move)
+POSITIONS = [
+    (chess.STARTING_FEN, 'e2e4'),
+    (chess.STARTING_FEN, 'g2g4'),
+    ('r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3', 'f1c4'),
+    ('r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3', 'f3e5'),
+    ('r1bqkbnr/pppp1ppp/2n5/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 3 3', 'g8f6'),
+    ('r1bqkbnr/pppp1ppp/2n5/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 3 3', 'd8e7'),
+    ('rnbqkbnr/ppp2ppp/8/3pp3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 0 3', 'e4d5'),
+    ('r2qkbnr/ppp2ppp/2np4/4p3/2B1P1b1/2N2N2/PPPP1PPP/R1BQK2R w KQkq - 2 5', 'f3e5'),
+    ('r2qkbnr/ppp2ppp/2np4/4p3/2B1P1b1/2N2N2/PPPP1PPP/R1BQK2R w KQkq - 2 5', 'h2h3'),
+    ('8/8/8/4k3/8/8/4PK2/8 w - - 0 1', 'f2e3'),
+    ('8/8/8/4k3/8/8/4PK2/8 w - - 0 1', 'e2e4'),
+    ('r3k2r/ppp2ppp/2n1bn2/2bqp3/8/2NP1NP1/PPP1PBBP/R2Q1RK1 b kq - 0 10', 'e8c8'),
+]
+
+
+def evaluate(tutor: PicoTutor, fen: str, user_move: str):
+    """Return (secs to DEPTH, verdict) of the user move."""
+    tutor.set_position(fen)
+    tutor.pause()
+    tutor.user_color = tutor.board.turn
+    start = time.perf_counter()
+    tutor.start()
+    # the eval handler - tablebase or cached positions dont start a search
+    while tutor.eval_handler.info.get('depth', 0) < DEPTH and time.perf_counter() - start < TIMEOUT:
+        time.sleep(0.005)
+    duration = time.perf_counter() - start
+    tutor.push_move(chess.Move.from_uci(user_move))
+    evaluated = threading.Event()
+    tutor.when_evaluated(evaluated.set)  # the verification of a user move outside the adaptive lines
+    evaluated.wait(TIMEOUT)
+    eval_string, _, _ = tutor.get_user_move_eval()
+    return duration, eval_string
+
+
+def main():
+    logging.getLogger('chess.engine').setLevel(logging.CRITICAL)  # info lines of stopped searches
+    engine = sys.argv[1] if len(sys.argv) > 1 else ENGINE
+    global DEPTH
+    if len(sys.argv) > 2:
+        DEPTH = int(sys.argv[2])
+
+    results = {}
+    for adaptive in (False, True):
+        tutor = PicoTutor(i_engine_path=engine, i_adaptive_multipv=adaptive)
+        results[adaptive] = [evaluate(tutor, fen, move) for fen, move in POSITIONS]
+        tutor.stop()
+
+    print('{:<70} {:>5} {:>9} {:>4} {:>9} {:>4}'.format('position', 'move', 'full', '', 'adaptive', ''))
+    agree = 0
+    for (fen, move), full, adaptive in zip(POSITIONS, results[False], results[True]):
+        agree += full[1] == adaptive[1]
+        print('{:<70} {:>5} {:8.3f}s {:>4} {:8.3f}s {:>4}'.format(fen, move, full[0], full[1] or '-', adaptive[0], adaptive[1] or '-'))
+    total_full = sum(duration for duration, _ in results[False])
+    total_adaptive = sum(duration for duration, _ in results[True])
+    print('time to depth {}: full {:.3f}s adaptive {:.3f}s (x{:.1f})'.format(DEPTH, total_full, total_adaptive, total_full / max(total_adaptive, 1e-6)))
+    print('verdict agreement: {}/{}'.format(agree, len(POSITIONS)))
+
+
+if __name__ == '__main__':
+    main()
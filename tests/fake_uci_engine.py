@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""Minimal uci engine for the transport tests: answers with info lines and the first legal-looking move."""
+
+import sys
+import threading
+import time
+
+BESTMOVE = {'startpos': 'e2e4', 'after_e4': 'e7e5'}
+stop = threading.Event()
+search = None
+
+
+def send(line):
+    sys.stdout.write(line + '\n')
+    sys.stdout.flush()
+
+
+def think(infinite, movetime, max_depth, bestmove):
+    depth = 0
+    start = time.monotonic()
+    while True:
+        depth += 1
+        send('info depth {} seldepth {} multipv 1 score cp {} nodes {} nps 1000 time {} pv {}'.format(
+            depth, depth + 2, 10 + depth, depth * 100, int((time.monotonic() - start) * 1000), bestmove))
+        if stop.wait(0.01):
+            break
+        if not infinite and ((time.monotonic() - start) * 1000 >= movetime or depth >= max_depth):
+            break
+    send('bestmove {} ponder e7e5'.format(bestmove) if bestmove == 'e2e4' else 'bestmove ' + bestmove)
+
+
+def main():
+    global search
+    bestmove = BESTMOVE['startpos']
+    for line in sys.stdin:
+        tokens = line.split()
+        if not tokens:
+            continue
+        if tokens[0] == 'uci':
+            send('id name Fake Engine')
+            send('id author picochess')
+            send('option name Hash type spin default 16 min 1 max 1024')
+            send('option name MultiPV type spin default 1 min 1 max 10')
+            send('option name Ponder type check default false')
+            send('uciok')
+        elif tokens[0] == 'isready':
+            send('readyok')
+        elif tokens[0] == 'position':
+            bestmove = BESTMOVE['after_e4'] if 'e2e4' in tokens else BESTMOVE['startpos']
+        elif tokens[0] == 'go':
+            infinite = 'infinite' in tokens or 'ponder' in tokens
+            movetime = int(tokens[tokens.index('movetime') + 1]) if 'movetime' in tokens else 100
+            max_depth = int(tokens[tokens.index('depth') + 1]) if 'depth' in tokens else 99
+            stop.clear()
+            search = threading.Thread(target=think, args=(infinite, movetime, max_depth, bestmove))
+            search.start()
+        elif tokens[0] == 'stop':
+            stop.set()
+            if search:
+                search.join()
+        elif tokens[0] == 'quit':
+            stop.set()
+            break
+
+
+if __name__ == '__main__':
+    main()
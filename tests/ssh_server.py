@@ -0,0 +1,121 @@
+"""Loopback ssh server (paramiko) for the remote engine tests: runs commands locally and serves the local files."""
+
+import os
+import socket
+import subprocess
+import threading
+
+import paramiko
+
+USER = 'pico'
+PASSWORD = 'chess'
+
+
+class _SftpHandle(paramiko.SFTPHandle):
+
+    def stat(self):
+        return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+
+
+class _LocalSftp(paramiko.SFTPServerInterface):
+
+    def open(self, path, flags, attr):
+        try:
+            file = open(path, 'rb')
+        except OSError as exc:
+            return paramiko.SFTPServer.convert_errno(exc.errno)
+        handle = _SftpHandle(flags)
+        handle.readfile = file
+        return handle
+
+    def stat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(path))
+        except OSError as exc:
+            return paramiko.SFTPServer.convert_errno(exc.errno)
+
+    lstat = stat
+
+
+class _Interface(paramiko.ServerInterface):
+
+    def __init__(self, server: 'LoopbackSshServer'):
+        self.server = server
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL if (username, password) == (USER, PASSWORD) else paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED if kind == 'session' else paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel, command):
+        self.server.commands.append(command.decode('utf-8'))
+        threading.Thread(target=self._run, args=(channel, command), daemon=True).start()
+        return True
+
+    @staticmethod
+    def _run(channel, command):
+        with subprocess.Popen(['sh', '-c', command], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as process:
+
+            def _stdin():
+                while True:
+                    data = channel.recv(4096)
+                    if not data:
+                        break
+                    try:
+                        process.stdin.write(data)
+                        process.stdin.flush()
+                    except (OSError, ValueError):
+                        break
+
+            threading.Thread(target=_stdin, daemon=True).start()
+            while True:
+                data = process.stdout.read1(4096)
+                if not data:
+                    break
+                channel.sendall(data)
+            channel.sendall_stderr(process.stderr.read())
+            channel.send_exit_status(process.wait())
+        channel.close()
+
+
+class LoopbackSshServer(object):
+
+    """Ssh server on 127.0.0.1 (random port) - counts the handshakes and can drop all connections."""
+
+    def __init__(self):
+        self.host_key = paramiko.RSAKey.generate(1024)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(5)
+        self.port = self.sock.getsockname()[1]
+        self.handshakes = 0
+        self.commands = []
+        self.transports = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                break
+            transport = paramiko.Transport(client)
+            transport.add_server_key(self.host_key)
+            transport.set_subsystem_handler('sftp', paramiko.SFTPServer, _LocalSftp)
+            transport.start_server(server=_Interface(self))
+            self.handshakes += 1
+            self.transports.append(transport)
+
+    def drop_connections(self):
+        for transport in self.transports:
+            transport.close()
+        self.transports = []
+
+    def close(self):
+        self.drop_connections()
+        self.sock.close()
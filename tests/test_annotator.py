@@ -0,0 +1,56 @@
+import io
+import threading
+import time
+import unittest
+
+import chess.pgn  # type: ignore
+
+from annotator import Annotator
+
+GAME = '1. e4 e5 2. Nf3 Nc6 3. Bc4 Nd4 4. Nxe5 Qg5 5. Nxf7 Qxg2 *'
+
+
+class TestAnnotator(unittest.TestCase):
+
+    def test_annotate_games(self):
+        game = chess.pgn.read_game(io.StringIO(GAME))
+        annotator = Annotator('engines/x86_64/a-stock8', processes=2, deep_depth=8, low_depth=3)
+        progress = []
+        annotator.annotate_games([game], progress.append)
+
+        self.assertEqual([entry['done'] for entry in progress], list(range(1, 11)))
+        self.assertEqual(annotator.progress()['percent'], 100.0)
+        nodes = []
+        node = game
+        while node.variations:
+            node = node.variations[0]
+            nodes.append(node)
+        self.assertTrue(all('[%eval ' in node.comment for node in nodes))
+        blunder = nodes[8]  # 5. Nxf7
+        self.assertIn(chess.pgn.NAG_BLUNDER, blunder.nags)
+        self.assertEqual(len(blunder.parent.variations), 2)  # the best line was added
+
+    def test_cancel(self):
+        games = [chess.pgn.read_game(io.StringIO(GAME)) for _ in range(5)]
+        annotator = Annotator('engines/x86_64/a-stock8', processes=2, deep_depth=14, low_depth=3)
+
+        def cancel_after_first(progress):
+            if progress['done'] == 1:
+                threading.Thread(target=annotator.cancel).start()
+
+        start = time.monotonic()
+        annotator.annotate_games(games, cancel_after_first)
+        self.assertLess(time.monotonic() - start, 15)
+        done = annotator.progress()['done']
+        self.assertLess(done, annotator.progress()['total'])
+        annotated = 0
+        for game in games:
+            node = game
+            while node.variations:
+                node = node.variations[0]
+                annotated += '[%eval ' in node.comment
+        self.assertTrue(1 <= annotated <= done)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import gc
+import unittest
+from unittest.mock import patch
+
+import chess  # type: ignore
+
+from dgt.api import Event, HandlerRegistry, Message, handler_registries
+from dgt.display import DgtDisplay
+from server import EventHandler, WebDisplay
+from utilities import msgdisplay_devices
+
+
+class TestHandlerRegistry(unittest.TestCase):
+
+    def test_dispatch_calls_registered_handler(self):
+        registry = HandlerRegistry('test')
+        received = []
+
+        @registry.register(Event.FEN, Event.KEYBOARD_FEN)
+        def _fen(prefix, event):
+            received.append((prefix, event.fen))
+
+        self.assertTrue(registry.dispatch(Event.FEN(fen='8/8/8/8/8/8/8/8'), 'board'))
+        self.assertTrue(registry.dispatch(Event.KEYBOARD_FEN(fen='k7/8/8/8/8/8/8/K7'), 'keyboard'))
+        self.assertFalse(registry.dispatch(Event.EXIT_MENU(), 'board'))
+        self.assertEqual(received, [('board', '8/8/8/8/8/8/8/8'), ('keyboard', 'k7/8/8/8/8/8/8/K7')])
+        self.assertIsNone(registry.get(Message.SEARCH_STARTED()))
+
+    def test_stats(self):
+        registry = HandlerRegistry('test')
+        registry.record(Event.FEN(fen=''), 0.002)
+        registry.record(Event.FEN(fen=''), 0.004)
+        stats = registry.stats()
+        self.assertEqual(stats['EVT_FEN']['count'], 2)
+        self.assertEqual(stats['EVT_FEN']['avg_ms'], 3.0)
+        self.assertEqual(stats['EVT_FEN']['max_ms'], 4.0)
+        self.assertEqual(stats['EVT_FEN']['buckets']['<=5ms'], 2)
+
+    def test_registries_are_dropped(self):
+        registry = HandlerRegistry('test')
+        self.assertIn(registry, handler_registries)
+        del registry
+        gc.collect()
+        self.assertNotIn('test', [registry.name for registry in handler_registries])
+
+
+class TestDisplayHandlers(unittest.TestCase):
+
+    def setUp(self):
+        self.devices = list(msgdisplay_devices)
+
+    def tearDown(self):
+        msgdisplay_devices.clear()
+        msgdisplay_devices.extend(self.devices)
+
+    def test_dgt_display(self):
+        game = chess.Board()
+        self.assertIs(DgtDisplay._handlers.get(Message.NEW_PV(pv=[], mode=None, game=game)), DgtDisplay._process_new_pv)
+        self.assertIsNotNone(DgtDisplay._handlers.get(Message.TAKE_BACK(game=game)))
+        self.assertIsNone(DgtDisplay._handlers.get(Message.RSPEED(rspeed='1.0')))
+
+    def test_web_display(self):
+        display = WebDisplay({})
+        game = chess.Board()
+        game.push_san('e4')
+        with patch.object(EventHandler, 'write_to_clients') as write_to_clients:
+            display.task(Message.USER_MOVE_DONE(move=game.peek(), fen=game.fen(), turn=game.turn, game=game))
+            display.task(Message.TAKE_BACK(game=game))
+        results = [call[0][0] for call in write_to_clients.call_args_list]
+        self.assertEqual([(result['move'], result['play']) for result in results], [('e2e4', 'user'), ('e2e4', 'reload')])
+        self.assertIn('1. e4', results[0]['pgn'])
+        self.assertEqual(display.shared['last_dgt_move_msg'], results[1])
+        self.assertIn('web', [registry.name for registry in handler_registries])
+
+    def test_web_display_keeps_shared_board(self):
+        display = WebDisplay({})
+        game = chess.Board()
+        game.push_san('e4')
+        with patch.object(EventHandler, 'write_to_clients'), patch('chess.pgn.Game.from_board', wraps=chess.pgn.Game.from_board) as from_board:
+            display.task(Message.TAKE_BACK(game=game))
+        self.assertIsNot(from_board.call_args[0][0], game)  # other displays read the same board meanwhile
+
+
+if __name__ == '__main__':
+    unittest.main()
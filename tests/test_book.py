@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import random
+import unittest
+
+import chess  # type: ignore
+import chess.polyglot  # type: ignore
+
+from book import BookService
+from utilities import get_opening_books
+
+BOOK = 'books/d-open.bin'
+
+
+class TestBookService(unittest.TestCase):
+
+    def setUp(self):
+        self.books = BookService(get_opening_books(), maxsize=2)
+        self.assertTrue(self.books.select(BOOK))
+
+    def tearDown(self):
+        self.books.close()
+
+    def test_entries(self):
+        board = chess.Board()
+        with chess.polyglot.open_reader(BOOK) as reader:
+            expected = list(reader.find_all(board))
+        self.assertTrue(expected)
+        self.assertEqual(list(self.books.entries(board)), expected)
+        self.assertEqual(list(self.books.entries(board)), expected)
+        self.assertEqual((self.books.hits, self.books.misses), (1, 1))
+        moves = self.books.all_moves(board)
+        self.assertEqual(moves[0], max(expected, key=lambda entry: entry.weight).move())
+        self.assertEqual(set(moves), {entry.move() for entry in expected})
+
+    def test_cache_size(self):
+        board = chess.Board()
+        self.books.entries(board)
+        board.push_san('e4')
+        self.books.entries(board)
+        board.push_san('e5')
+        self.books.entries(board)
+        self.assertEqual(len(self.books._cache), 2)
+
+    def test_weighted_choice(self):
+        board = chess.Board()
+        moves = set(self.books.all_moves(board))
+        self.assertIn(self.books.weighted_choice(board, random=random.Random(1)).move(), moves)
+        excluded = moves - {chess.Move.from_uci('d2d4')}
+        self.assertEqual(self.books.weighted_choice(board, excluded).move(), chess.Move.from_uci('d2d4'))
+        with self.assertRaises(IndexError):
+            self.books.weighted_choice(board, moves)
+        with self.assertRaises(IndexError):
+            self.books.weighted_choice(chess.Board('8/8/8/4k3/8/8/8/4K3 w - - 0 1'))
+
+    def test_select(self):
+        board = chess.Board()
+        board.push_san('b3')
+        self.assertEqual(self.books.all_moves(board), [])
+        self.assertTrue(self.books.select('books/b-flank.bin'))
+        self.assertTrue(self.books.all_moves(board))
+        self.assertFalse(self.books.select('books/missing.bin'))
+        self.assertEqual(self.books.book_file, 'books/b-flank.bin')
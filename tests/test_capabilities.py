@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from uci.capabilities import CapabilityCache, level_sections
+from uci.read import read_engine_ini
+from uci.write import write_engine_ini
+
+ENGINES = 'engines/x86_64'
+
+
+class TestCapabilities(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        for name in ('a-stock8', 'b-texel7'):
+            shutil.copy2(os.path.join(ENGINES, name), self.folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_level_sections(self):
+        levels = level_sections({'Skill Level': {'min': 0, 'max': 2}, 'Hash': {'min': 1, 'max': 1024}})
+        self.assertEqual(levels, {'Level@00': {'Skill Level': '0'}, 'Level@01': {'Skill Level': '1'},
+                                  'Level@02': {'Skill Level': '2'}})
+
+    def test_discovery_is_cached(self):
+        paths = [os.path.join(self.folder, name) for name in ('a-stock8', 'b-texel7')]
+        cache = CapabilityCache(self.folder)
+        capabilities = cache.capabilities(paths)
+        self.assertTrue(capabilities[paths[0]]['name'].startswith('Stockfish'))
+        self.assertIn('Skill Level', capabilities[paths[0]]['options'])
+        self.assertIn('Level@20', capabilities[paths[0]]['levels'])
+        cache.save()
+
+        os.utime(paths[1])  # same content, new mtime - the hash keeps the entry valid
+        with patch('uci.capabilities.Pool') as pool:
+            cached = CapabilityCache(self.folder).capabilities(paths)
+            pool.assert_not_called()
+        self.assertEqual(cached, capabilities)
+
+    def test_write_and_read_engine_ini(self):
+        write_engine_ini(self.folder)
+        self.assertTrue(os.path.isfile(os.path.join(self.folder, 'a-stock8.uci')))
+        library = read_engine_ini(engine_path=self.folder)
+        self.assertEqual([eng['name'][:9] for eng in library], ['Stockfish', 'Texel 1.0'])
+        self.assertEqual(library[0]['level_dict']['Level@05'], {'Skill Level': '5'})
+
+        with open(os.path.join(self.folder, 'a-stock8.uci'), 'a') as file:
+            file.write('\n[Level@99]\nSkill Level = 20\n')
+        library = read_engine_ini(engine_path=self.folder)
+        self.assertEqual(library[0]['level_dict']['Level@99'], {'Skill Level': '20'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,8 +13,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import tempfile
 import unittest
 
+from configobj import ConfigObj  # type: ignore
+from chess.engine import Option  # type: ignore
+
 from uci.engine import UciEngine, UciShell
 from uci.rating import Rating, Result
 
@@ -36,6 +41,16 @@ class MockEngine(object):
 
 class TestEngine(unittest.TestCase):
 
+    def setUp(self):
+        # update_rating writes the new rating to the picochess.ini of the working folder - use a temporary one
+        self.cwd = os.getcwd()
+        self.folder = tempfile.TemporaryDirectory()
+        os.chdir(self.folder.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+
     def test_engine_uses_elo(self):
         eng = UciEngine('some_test_engine', UciShell(), '')
         eng.engine = MockEngine()
@@ -43,6 +58,15 @@ class TestEngine(unittest.TestCase):
         self.assertEqual('1400', eng.engine.get_elo())
         self.assertEqual(1400, eng.engine_rating)
 
+    def test_set_multipv(self):
+        eng = UciEngine('some_test_engine', UciShell(), '')
+        eng.engine = MockEngine()
+        self.assertEqual(1, eng.set_multipv(4))
+        eng.engine.options = {'MultiPV': Option('MultiPV', 'spin', 1, 1, 3, [])}
+        self.assertEqual(3, eng.set_multipv(4))
+        self.assertEqual({'MultiPV': 3}, eng.engine.options)
+        self.assertEqual([], eng.get_analysis())
+
     def test_engine_uses_rating(self):
         eng = UciEngine('some_engine', UciShell(), '')
         eng.engine = MockEngine()
@@ -151,3 +175,4 @@ class TestEngine(unittest.TestCase):
         self.assertEqual(890, int(new_rating.rating))
         self.assertEqual('901', eng.engine.get_elo())
         self.assertEqual(901, eng.engine_rating)
+        self.assertEqual(ConfigObj('picochess.ini')['pgn-elo'], '890')
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import chess  # type: ignore
+
+from engine_bench import BENCH_EPD, EngineBench, read_epd
+from tests.test_transport import FAKE_ENGINE
+from uci.read import read_engine_ini
+
+ENGINES_INI = '''[a-fake]
+name = Fake Engine
+small = fake
+medium = Fake
+large = Fake Engine
+elo = 1000
+'''
+FAKE_UCI = '[Level@00]\nHash = 1\n\n[Level@01]\nHash = 2\n'
+
+
+class TestEngineBench(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        shutil.copy(FAKE_ENGINE, os.path.join(self.folder, 'a-fake'))
+        with open(os.path.join(self.folder, 'engines.ini'), 'w') as file:
+            file.write(ENGINES_INI)
+        with open(os.path.join(self.folder, 'a-fake.uci'), 'w') as file:
+            file.write(FAKE_UCI)
+        self.engines = read_engine_ini(engine_path=self.folder)
+        self.positions = read_epd([chess.STARTING_BOARD_FEN + ' w KQkq - id "start";', '', '# comment',
+                                   chess.STARTING_BOARD_FEN + ' w KQkq -'])
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_read_epd(self):
+        self.assertEqual([position for position, _ in self.positions], ['start', '4'])
+        self.assertEqual(len(read_epd(BENCH_EPD)), 18)
+
+    def test_run(self):
+        bench = EngineBench(self.positions, depth=3, movetime=5000)
+        rows = []
+        bench.run(self.engines, callback=rows.append)
+        self.assertEqual([(row['level'], row['position']) for row in rows],
+                         [('Level@00', 'start'), ('Level@00', '4'), ('Level@01', 'start'), ('Level@01', '4')])
+        for row in rows:
+            self.assertEqual(row['engine'], 'a-fake')
+            self.assertEqual(row['depth'], 3)
+            self.assertEqual(row['bestmove'], 'e2e4')
+            self.assertEqual(row['nps'], 1000)
+            self.assertLessEqual(row['time_to_depth'], row['time_to_bestmove'])
+            self.assertLess(row['time_to_bestmove'], 2)
+            self.assertGreater(row['rss_mb'], 0)
+        summary = bench.summary()
+        self.assertEqual([(line['level'], line['positions'], line['reached_depth']) for line in summary],
+                         [('Level@00', 2, 2), ('Level@01', 2, 2)])
+
+        bench.write_csv(os.path.join(self.folder, 'report.csv'))
+        with open(os.path.join(self.folder, 'report.csv')) as file:
+            self.assertEqual(len(list(csv.DictReader(file))), 4)
+        bench.write_json(os.path.join(self.folder, 'report.json'))
+        with open(os.path.join(self.folder, 'report.json')) as file:
+            report = json.load(file)
+        self.assertEqual(report['depth'], 3)
+        self.assertEqual(len(report['summary']), 2)
+
+    def test_no_levels_and_cancel(self):
+        bench = EngineBench(self.positions, depth=2, movetime=5000)
+        bench.run(self.engines, with_levels=False, callback=lambda row: bench.cancel())
+        self.assertEqual([(row['level'], row['position']) for row in bench.rows], [('', 'start')])
+
+    def test_missing_engine(self):
+        bench = EngineBench(self.positions)
+        bench.run([{'file': os.path.join(self.folder, 'missing'), 'name': 'Missing', 'level_dict': {}}])
+        self.assertEqual(bench.rows, [])
@@ -0,0 +1,63 @@
+import time
+import unittest
+
+from uci.engine import UciShell
+from uci.engine_pool import EnginePool
+
+STOCKFISH = 'engines/x86_64/a-stock8'
+TEXEL = 'engines/x86_64/b-texel7'
+
+
+class TestEnginePool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = EnginePool(size=1, max_memory=1024)
+        self.shell = UciShell()
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_reuse_after_release(self):
+        engine = self.pool.acquire(STOCKFISH, self.shell, '')
+        engine.startup({'Skill Level': '3'})
+        self.assertTrue(self.pool.release(engine))
+        self.assertEqual(self.pool.stats()['idle'], [STOCKFISH])
+
+        again = self.pool.acquire(STOCKFISH, self.shell, '')
+        self.assertIs(again, engine)
+        self.assertEqual(again.get_pgn_options(), {})  # options of the former use are gone
+        self.assertEqual(self.pool.stats()['hits'], 1)
+        again.quit()
+
+    def test_lru_eviction(self):
+        first = self.pool.acquire(STOCKFISH, self.shell, '')
+        second = self.pool.acquire(TEXEL, self.shell, '')
+        self.pool.release(first)
+        self.pool.release(second)
+        self.assertEqual(self.pool.stats()['idle'], [TEXEL])
+        time.sleep(0.5)
+        self.assertFalse(first.engine.is_alive())
+
+    def test_memory_limit(self):
+        self.pool.max_memory = 0.001
+        engine = self.pool.acquire(STOCKFISH, self.shell, '')
+        self.pool.release(engine)
+        self.assertEqual(self.pool.stats()['idle'], [])
+
+    def test_disabled(self):
+        self.pool.size = 0
+        engine = self.pool.acquire(STOCKFISH, self.shell, '')
+        self.pool.release(engine)
+        self.assertEqual(self.pool.stats()['idle'], [])
+
+    def test_mame_engine_quits(self):
+        engine = self.pool.acquire(STOCKFISH, self.shell, '')
+        engine.is_mame = True
+        self.pool.release(engine)
+        self.assertEqual(self.pool.stats()['idle'], [])
+        time.sleep(0.5)
+        self.assertFalse(engine.engine.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
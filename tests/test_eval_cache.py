@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+import chess  # type: ignore
+import chess.uci  # type: ignore
+
+from eval_cache import EvalCache, eval_key
+
+
+def _info(depth, lines):
+    """Return an InfoHandler info dict with lines of (uci move, cp, mate)."""
+    info = {'depth': depth, 'pv': {}, 'score': {}}
+    for num, (uci, cp, mate) in enumerate(lines, 1):
+        info['pv'][num] = [chess.Move.from_uci(uci)]
+        info['score'][num] = chess.uci.Score(cp, mate)
+    return info
+
+
+class TestEvalCache(unittest.TestCase):
+
+    def test_key(self):
+        board = chess.Board()
+        self.assertNotEqual(eval_key(board, 'deep'), eval_key(board, 'low'))
+        transposed = chess.Board()
+        for uci in ('g1f3', 'g8f6', 'f3g1', 'f6g8'):
+            transposed.push_uci(uci)
+        self.assertEqual(eval_key(board, 'deep'), eval_key(transposed, 'deep'))
+        self.assertNotEqual(eval_key(board, 'deep', 'a-stock8'), eval_key(board, 'deep', 'a-komodo'))
+
+    def test_partial_search_not_stored(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'evals.db')
+            cache = EvalCache(path=path)
+            cache.put('a', _info(9, [('e2e4', 30, None)]), 4, min_depth=17)
+            self.assertIsNone(cache.get('a'))
+            cache.put('a', _info(17, [('d2d4', 25, None)]), 4, min_depth=17)
+            cache.close()
+
+            cache = EvalCache(path=path)
+            self.assertEqual(cache.get('a')['pv']['1'], ['d2d4'])
+            cache.close()
+
+    def test_depth_and_lru(self):
+        cache = EvalCache(maxsize=2)
+        cache.put('a', _info(10, [('e2e4', 30, None), ('d2d4', 20, None)]), 200)
+        self.assertIsNone(cache.get('a', min_depth=11))
+        self.assertEqual(cache.get('a', min_depth=10)['score']['2'], [20, None])
+
+        cache.put('a', _info(5, [('g2g4', -50, None)]), 200)  # shallower search doesnt replace
+        self.assertEqual(cache.get('a')['depth'], 10)
+
+        cache.put('b', _info(3, [('e2e4', 1, None)]), 200)
+        cache.get('a')
+        cache.put('c', _info(3, [('e2e4', 1, None)]), 200)
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_to_info_handler(self):
+        cache = EvalCache()
+        cache.put('a', _info(12, [('e2e4', None, 3), ('d2d4', 20, None)]), 200)
+        handler = EvalCache.to_info_handler(cache.get('a'), chess.Board())
+        self.assertEqual(handler.info['depth'], 12)
+        self.assertEqual(handler.info['pv'][1], [chess.Move.from_uci('e2e4')])
+        self.assertEqual(handler.info['score'][1].mate, 3)
+        self.assertEqual(handler.info['score'][2].cp, 20)
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'games', 'evals.db')
+            cache = EvalCache(path=path)
+            cache.put('a', _info(17, [('e2e4', 30, None)]), 4)
+            cache.close()
+
+            cache = EvalCache(path=path)
+            self.assertEqual(cache.get('a', min_depth=17)['lines'], 4)
+            cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
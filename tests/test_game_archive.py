@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import chess  # type: ignore
+import chess.pgn  # type: ignore
+import chess.polyglot  # type: ignore
+import tornado.testing  # type: ignore
+import tornado.web  # type: ignore
+
+import server
+from game_archive import GameArchive
+
+OTHER_GAME = '''[Event "Club"]
+[White "Meier"]
+[Black "Müller"]
+[Result "0-1"]
+
+1. f3 e5 2. g4 Qh4# 0-1
+
+'''
+
+
+def _game(white: str, black: str, result: str, sans: str) -> chess.pgn.Game:
+    board = chess.Board()
+    for san in sans.split():
+        board.push_san(san)
+    game = chess.pgn.Game().from_board(board)
+    game.headers['White'] = white
+    game.headers['Black'] = black
+    game.headers['Result'] = result
+    return game
+
+
+class TestGameArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'games.pgn')
+        self.archive = GameArchive(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _fill(self):
+        self.archive.append(_game('Pico', 'Stockfish', '0-1', 'e4 e5 Nf3'))
+        self.archive.append(_game('Stockfish', 'Pico', '1-0', 'd4'))
+        self.archive.append(_game('Pico', 'Zurich', '1/2-1/2', 'c4 c5'))
+
+    def test_append_and_load(self):
+        self._fill()
+        self.assertEqual(self.archive.count(), 3)
+        entry = self.archive.games()[0]
+        self.assertEqual((entry['number'], entry['result'], entry['plies'], entry['offset']), (0, '0-1', 3, 0))
+        board = chess.Board()
+        for san in ('e4', 'e5', 'Nf3'):
+            board.push_san(san)
+        self.assertEqual(entry['key'], chess.polyglot.zobrist_hash(board))
+        game = self.archive.load(1)
+        self.assertEqual(game.headers['White'], 'Stockfish')
+        self.assertEqual([move.uci() for move in game.main_line()], ['d2d4'])
+        self.assertEqual(self.archive.load(-1).headers['Black'], 'Zurich')
+        with self.assertRaises(IndexError):
+            self.archive.load(3)
+        # the pgn file is readable as before
+        with open(self.path) as file:
+            self.assertEqual(chess.pgn.read_game(file).headers['Black'], 'Stockfish')
+
+    def test_filter(self):
+        self._fill()
+        self.assertEqual([game['number'] for game in self.archive.games(player='PICO')], [0, 1, 2])
+        self.assertEqual([game['number'] for game in self.archive.games(player='zurich')], [2])
+        self.assertEqual([game['number'] for game in self.archive.games(result='1-0')], [1])
+        self.assertEqual([game['number'] for game in self.archive.games(player='pico', start=1, length=1)], [1])
+        key = self.archive.games()[1]['key']
+        self.assertEqual([game['number'] for game in self.archive.games(key=key)], [1])
+
+    def test_index_reused(self):
+        self._fill()
+        archive = GameArchive(self.path)
+        with patch.object(archive, '_index_tail') as index_tail:
+            self.assertEqual(archive.count(), 3)
+        index_tail.assert_not_called()
+        self.assertEqual(archive.pgn(2), self.archive.pgn(2))
+
+    def test_external_append(self):
+        self._fill()
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(OTHER_GAME)
+        self.assertEqual(self.archive.count(), 4)
+        self.assertEqual(self.archive.load(3).headers['Black'], 'Müller')
+        self.assertEqual(self.archive.games(result='0-1')[1]['plies'], 4)
+        self.archive.append(_game('Pico', 'Pico', '*', 'e4'))
+        self.assertEqual(GameArchive(self.path).count(), 5)
+        self.assertEqual(self.archive.load(4).headers['White'], 'Pico')
+
+    def test_missing_blank_line(self):
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write('[Event "A"]\n[White "Meier"]\n\n1. e4 e5 1-0\n[Event "B"]\n[White "Müller"]\n\n1. d4 0-1\n\n1. c4 *\n')
+        self.assertEqual(self.archive.count(), 3)
+        self.assertEqual([self.archive.load(number).headers['Event'] for number in range(2)], ['A', 'B'])
+        self.assertEqual(self.archive.load(1).headers['White'], 'Müller')
+        self.assertEqual([move.uci() for move in self.archive.load(2).main_line()], ['c2c4'])
+
+    def test_rebuild(self):
+        self._fill()
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(OTHER_GAME)
+        self.assertEqual(self.archive.count(), 1)
+        with open(self.path + '.idx', 'w') as file:
+            file.write('damaged')
+        archive = GameArchive(self.path)
+        self.assertEqual(archive.load(0).headers['White'], 'Meier')
+        with open(self.path + '.idx') as file:
+            self.assertEqual(len(file.readlines()), 1)
+
+
+class TestArchiveQuery(tornado.testing.AsyncHTTPTestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.archive = GameArchive(os.path.join(self.folder, 'games.pgn'))
+        for number in range(30):
+            self.archive.append(_game('Pico', 'Engine {}'.format(number), '1-0', 'e4'))
+        patcher = patch('server.get_archive', lambda: self.archive)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super(TestArchiveQuery, self).setUp()
+
+    def tearDown(self):
+        super(TestArchiveQuery, self).tearDown()
+        shutil.rmtree(self.folder)
+
+    def get_app(self):
+        return tornado.web.Application([(r'/query', server.QueryHandler, dict(shared={})),
+                                        (r'/channel', server.ChannelHandler, dict(shared={}))])
+
+    def test_get_archive(self):
+        data = json.loads(self.fetch('/query?action=get_archive&start=25').body)
+        self.assertEqual((data['recordsTotal'], data['recordsFiltered']), (30, 30))
+        self.assertEqual([game['number'] for game in data['data']], [25, 26, 27, 28, 29])
+        data = json.loads(self.fetch('/query?action=get_archive&player=engine%2012').body)
+        self.assertEqual([game['headers']['Black'] for game in data['data']], ['Engine 12'])
+        self.assertEqual(self.fetch('/query?action=get_archive&start=x').code, 400)
+
+    def test_get_archive_game(self):
+        pgn = json.loads(self.fetch('/query?action=get_archive_game&number=-1').body)['pgn']
+        self.assertIn('[Black "Engine 29"]', pgn)
+        self.assertEqual(self.fetch('/query?action=get_archive_game&number=30').code, 404)
+
+    def test_read_game(self):
+        with patch('server.Observable.fire') as fire:
+            self.assertEqual(self.fetch('/channel', method='POST', body='action=read_game&number=x').code, 400)
+            fire.assert_not_called()
+            self.assertEqual(self.fetch('/channel', method='POST', body='action=read_game&number=2').code, 200)
+        self.assertEqual(fire.call_args[0][0].game_number, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import chess  # type: ignore
+import chess.pgn  # type: ignore
+import tornado.testing  # type: ignore
+import tornado.web  # type: ignore
+
+import server
+from game_db import GameDb, decode_move, encode_move
+
+GAMES = '''[Event "Open"]
+[Date "2001.05.01"]
+[White "Alpha"]
+[Black "Beta"]
+[Result "1-0"]
+[WhiteElo "2400"]
+[BlackElo "2300"]
+
+1. e4 e5 2. Nf3 (2. f4 exf4) 2... Nc6 3. Bb5 {Ruy} a6 1-0
+
+[Event "Club"]
+[Date "1999.??.??"]
+[White "Gamma"]
+[Black "Delta"]
+[Result "0-1"]
+
+1. e4 c5 2. Nf3 d6 0-1
+
+[Event "Final"]
+[Date "2010.01.01"]
+[White "Eps"]
+[Black "Zeta"]
+[Result "1/2-1/2"]
+[WhiteElo "2700"]
+[BlackElo "2650"]
+
+1. e4 e5 2. Nf3 Nc6 1/2-1/2
+
+[Event "Study"]
+[White "White"]
+[Black "Black"]
+[Result "*"]
+[SetUp "1"]
+[FEN "4k3/P7/8/8/8/8/8/4K3 w - - 0 1"]
+
+1. a8=Q+ *
+
+'''
+MORE = '''[Event "Later"]
+[Date "2020.01.01"]
+[White "Eta"]
+[Black "Theta"]
+[Result "1-0"]
+[WhiteElo "2000"]
+[BlackElo "2000"]
+
+1. e4 e5 2. Nf3 Nc6 3. Bc4 1-0
+
+'''
+
+
+def _fen(*sans):
+    board = chess.Board()
+    for san in sans:
+        board.push_san(san)
+    return board.fen()
+
+
+class TestGameDb(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.pgn = os.path.join(self.folder, 'games.pgn')
+        with open(self.pgn, 'w') as file:
+            file.write(GAMES)
+        self.db = GameDb(os.path.join(self.folder, 'db'))
+        self.assertEqual(self.db.ingest([self.folder]), 4)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.folder)
+
+    def test_move_encoding(self):
+        for uci in ('e2e4', 'a7a8q', 'h2h1n', 'e1g1'):
+            self.assertEqual(decode_move(encode_move(chess.Move.from_uci(uci))).uci(), uci)
+
+    def test_query(self):
+        result = self.db.query(_fen('e4', 'e5', 'Nf3', 'Nc6'))
+        self.assertEqual(result['recordsTotal'], 2)
+        self.assertEqual([(row['white'], row['black'], row['result'], row['event']) for row in result['data']],
+                         [('Eps (2700)', 'Zeta (2650)', '1/2-1/2', '2010, Final'), ('Alpha (2400)', 'Beta (2300)', '1-0', '2001, Open')])
+        game = chess.pgn.read_game(io.StringIO(result['data'][1]['pgn']))
+        self.assertEqual(game.headers['White'], 'Alpha')
+        self.assertEqual(' '.join(move.uci() for move in game.main_line()), 'e2e4 e7e5 g1f3 b8c6 f1b5 a7a6')
+        self.assertEqual(self.db.query(_fen('e4', 'e5', 'f4', 'exf4'))['recordsTotal'], 0)  # variations arent indexed
+        self.assertEqual(self.db.query('no fen'), {'data': [], 'recordsTotal': 0})
+
+    def test_setup_position(self):
+        result = self.db.query('Q3k3/8/8/8/8/8/8/4K3 b - - 0 1')
+        self.assertEqual(result['recordsTotal'], 1)
+        self.assertIn('a8=Q+', result['data'][0]['pgn'])
+
+    def test_sort_and_page(self):
+        fen = _fen('e4')
+        rows = self.db.query(fen, 'elo', 0, 5)['data']
+        self.assertEqual([row['white'] for row in rows], ['Eps (2700)', 'Alpha (2400)', 'Gamma'])
+        rows = self.db.query(fen, 'date', 0, 5)['data']
+        self.assertEqual([row['event'] for row in rows], ['2010, Final', '2001, Open', '1999, Club'])
+        rows = self.db.query(fen, 'number', 1, 1)['data']
+        self.assertEqual([row['white'] for row in rows], ['Gamma'])
+        result = self.db.query(fen, 'elo', 1, 1)
+        self.assertEqual((result['recordsTotal'], [row['white'] for row in result['data']]), (3, ['Alpha (2400)']))
+        self.db.query(fen, 'elo', 1, 1)
+        self.assertEqual(self.db.stats()['hits'], 1)
+        self.assertEqual([row['white'] for row in self.db.query(fen, 'elo', 2, 1)['data']], ['Gamma'])
+        self.assertEqual(self.db.stats()['ranked'], 2)  # elo & date - the third elo page is a slice of the first ranking
+
+    def test_ingest_grown_file(self):
+        self.assertEqual(self.db.ingest([self.folder]), 0)
+        with open(self.pgn, 'a') as file:
+            file.write(MORE)
+        self.assertEqual(self.db.ingest([self.pgn]), 1)
+        self.assertEqual(self.db.count(), 5)
+        fen = _fen('e4', 'e5', 'Nf3', 'Nc6')
+        self.assertEqual(self.db.query(fen)['recordsTotal'], 3)
+        self.assertEqual(self.db.stats()['segments'], 2)
+        self.db.clear()
+        self.assertEqual(self.db.count(), 0)
+        self.assertEqual(self.db.query(fen)['recordsTotal'], 0)
+
+    def test_lookup_during_ingest(self):
+        with open(self.pgn, 'a') as file:
+            file.write(MORE)
+        database = GameDb(self.db.folder)  # eg. the command line ingest
+        merge_runs = database._merge_runs
+
+        def lookup_and_merge(runs):
+            self.assertEqual(self.db.count(), 4)  # games.bin grew already, but the segment isnt there yet
+            merge_runs(runs)
+        with patch.object(database, '_merge_runs', lookup_and_merge):
+            self.assertEqual(database.ingest([self.pgn]), 1)
+        self.assertEqual(self.db.count(), 5)
+        self.assertEqual(self.db.query(_fen('e4', 'e5', 'Nf3', 'Nc6'))['recordsTotal'], 3)
+        database.close()
+
+    def test_runs(self):
+        database = GameDb(os.path.join(self.folder, 'runs'))
+        with patch('game_db.RUN_SIZE', 5):
+            self.assertEqual(database.ingest([self.pgn]), 4)
+        self.assertEqual(sorted(os.listdir(database.folder)), ['games.bin', 'headers.bin', 'manifest.json', 'moves.bin', 'positions-000.bin', 'sources.json'])
+        for fen in (_fen('e4'), _fen('e4', 'e5', 'Nf3', 'Nc6'), _fen('e4', 'c5')):
+            self.assertEqual(database.query(fen, 'number'), self.db.query(fen, 'number'))
+        database.close()
+
+
+class TestGamesQuery(tornado.testing.AsyncHTTPTestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        with open(os.path.join(self.folder, 'games.pgn'), 'w') as file:
+            file.write(GAMES)
+        self.db = GameDb(os.path.join(self.folder, 'db'))
+        self.db.ingest([self.folder])
+        patcher = patch('server.game_db', self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super(TestGamesQuery, self).setUp()
+
+    def tearDown(self):
+        super(TestGamesQuery, self).tearDown()
+        self.db.close()
+        shutil.rmtree(self.folder)
+
+    def get_app(self):
+        return tornado.web.Application([(r'/query', server.QueryHandler, dict(shared={}))])
+
+    def test_get_games(self):
+        response = self.fetch('/query?action=get_games&fen=' + _fen('e4').replace(' ', '%20'))
+        self.assertEqual(response.code, 200)
+        self.assertEqual(json.loads(response.body)['recordsTotal'], 3)
+        response = self.fetch('/query?action=get_games&sort=date&length=1&fen=' + _fen('e4').replace(' ', '%20'))
+        self.assertEqual([row['white'] for row in json.loads(response.body)['data']], ['Eps (2700)'])
+        self.assertEqual(self.fetch('/query?action=get_games&start=x&fen=x').code, 400)
@@ -0,0 +1,77 @@
+import unittest
+
+import chess  # type: ignore
+
+from dgt.api import Event
+from uci.informer import Informer
+from utilities import evt_queue
+
+
+class TestInformer(unittest.TestCase):
+
+    def setUp(self):
+        while not evt_queue.empty():
+            evt_queue.get_nowait()
+
+    def _info_line(self, informer, depth=None, score=None, pv=None, multipv=None, nodes=None):
+        informer.pre_info('')
+        if multipv:
+            informer.multipv(multipv)
+        if depth is not None:
+            informer.depth(depth)
+        if nodes is not None:
+            informer.nodes(nodes)
+        if score is not None:
+            informer.score(score, None, False, False)
+        if pv is not None:
+            informer.pv(pv)
+        informer.post_info()
+
+    def _events(self):
+        events = []
+        while not evt_queue.empty():
+            events.append(evt_queue.get_nowait())
+        return events
+
+    def test_coalesces_until_interval(self):
+        informer = Informer(interval=60)
+        move = chess.Move.from_uci('e2e4')
+        self._info_line(informer, depth=1, score=10, pv=[move])
+        self._info_line(informer, depth=2, score=20)
+        self._info_line(informer, depth=3, score=30, pv=[move], multipv=2)
+        events = self._events()
+        self.assertEqual(len(events), 1)
+        self.assertIsInstance(events[0], Event.NEW_INFO)
+        self.assertEqual((events[0].depth, events[0].score, events[0].pv), (1, 10, [move]))
+
+        informer.on_bestmove(move, None)
+        events = self._events()
+        self.assertEqual([repr(event) for event in events], ['EVT_NEW_INFO', 'EVT_STOP_SEARCH'])
+        self.assertEqual((events[0].depth, events[0].score, events[0].pv), (3, 20, None))
+
+    def test_no_interval(self):
+        informer = Informer(interval=0)
+        for depth in range(1, 4):
+            self._info_line(informer, depth=depth)
+        self.assertEqual([event.depth for event in self._events()], [1, 2, 3])
+
+    def test_analysis_snapshot(self):
+        informer = Informer(interval=60)
+        e2e4, d2d4 = chess.Move.from_uci('e2e4'), chess.Move.from_uci('d2d4')
+        self.assertEqual(informer.analysis(), [])
+        self._info_line(informer, depth=1, score=10, pv=[e2e4], multipv=1, nodes=20)
+        self._info_line(informer, depth=1, score=5, pv=[d2d4], multipv=2, nodes=40)
+        self._info_line(informer, depth=2, score=15, pv=[e2e4], multipv=1, nodes=100)
+        self._info_line(informer, depth=2, nodes=120)  # no pv - doesnt change the lines
+        lines = informer.analysis()
+        self.assertEqual([(line.multipv, line.depth, line.score, line.nodes, line.pv) for line in lines],
+                         [(1, 2, 15, 100, [e2e4]), (2, 1, 5, 40, [d2d4])])
+        self.assertEqual(lines[1].as_dict()['pv'], ['d2d4'])
+
+        informer.on_go()
+        self.assertEqual(informer.analysis(), [])
+        self.assertEqual(informer.info['pv'], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
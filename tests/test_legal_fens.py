@@ -0,0 +1,67 @@
+import unittest
+
+import chess  # type: ignore
+
+from legal_fens import FenResolver, LegalFenCache, takeback_plies
+
+
+class TestLegalFenCache(unittest.TestCase):
+
+    def test_fens_map_to_legal_moves(self):
+        cache = LegalFenCache()
+        board = chess.Board()
+        fen_moves = cache.get(board)
+        self.assertEqual(list(fen_moves.values()), list(board.legal_moves))
+        self.assertEqual(fen_moves['rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR'], chess.Move.from_uci('e2e4'))
+
+    def test_hits_and_misses(self):
+        cache = LegalFenCache()
+        board = chess.Board()
+        first = cache.get(board)
+        board.push_san('e4')
+        cache.get(board)
+        board.pop()
+        self.assertIs(cache.get(board), first)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 2)
+
+    def test_side_to_move_is_part_of_the_key(self):
+        cache = LegalFenCache()
+        white = cache.get(chess.Board('8/8/8/8/8/8/4K3/4k3 w - - 0 1'))
+        black = cache.get(chess.Board('8/8/8/8/8/8/4K3/4k3 b - - 0 1'))
+        self.assertNotEqual(white, black)
+
+    def test_lru_eviction(self):
+        cache = LegalFenCache(maxsize=2)
+        board = chess.Board()
+        cache.get(board)
+        for san in ('e4', 'e5'):
+            board.push_san(san)
+            cache.get(board)
+        self.assertEqual(cache.stats()['size'], 2)
+        cache.get(chess.Board())
+        self.assertEqual(cache.stats()['misses'], 4)
+
+
+class TestFenResolver(unittest.TestCase):
+
+    def test_move(self):
+        resolver = FenResolver(chess.Board())
+        self.assertIn('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR', resolver)
+        self.assertEqual(resolver.move('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR'), chess.Move.from_uci('e2e4'))
+        self.assertIsNone(resolver.move(chess.STARTING_BOARD_FEN))
+        self.assertEqual(len(resolver), 20)
+
+    def test_empty(self):
+        resolver = FenResolver()
+        self.assertFalse(resolver)
+        self.assertNotIn(chess.STARTING_BOARD_FEN, resolver)
+
+    def test_takeback_plies(self):
+        board = chess.Board()
+        for san in ('e4', 'e5', 'Nf3'):
+            board.push_san(san)
+        self.assertEqual(takeback_plies(board, chess.STARTING_BOARD_FEN), 3)
+        self.assertEqual(takeback_plies(board, 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR'), 2)
+        self.assertEqual(takeback_plies(board, board.board_fen()), 0)
+        self.assertEqual(len(board.move_stack), 3)
@@ -0,0 +1,42 @@
+import gc
+import unittest
+
+from metrics import Histogram, TimedQueue, queue_metrics
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_histogram(self):
+        histogram = Histogram()
+        for duration in (0.0005, 0.003, 0.2, 9.0):
+            histogram.add(duration)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['count'], 4)
+        self.assertEqual(snapshot['max_ms'], 9000.0)
+        self.assertEqual(snapshot['buckets']['<=1ms'], 1)
+        self.assertEqual(snapshot['buckets']['<=5ms'], 1)
+        self.assertEqual(snapshot['buckets']['<=500ms'], 1)
+        self.assertEqual(snapshot['buckets']['>5000ms'], 1)
+
+    def test_timed_queue(self):
+        timed_queue = TimedQueue('test_queue')
+        timed_queue.put('a')
+        timed_queue.put('b')
+        self.assertEqual(timed_queue.snapshot()['depth'], 2)
+        self.assertEqual(timed_queue.get(), 'a')
+        self.assertEqual(timed_queue.get_nowait(), 'b')
+        snapshot = queue_metrics()['test_queue']
+        self.assertEqual(snapshot['depth'], 0)
+        self.assertEqual(snapshot['max_depth'], 2)
+        self.assertEqual(snapshot['wait']['count'], 2)
+
+    def test_dropped_queue(self):
+        timed_queue = TimedQueue('dropped_queue')
+        self.assertIn('dropped_queue', queue_metrics())
+        del timed_queue
+        gc.collect()
+        self.assertNotIn('dropped_queue', queue_metrics())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+import opening_index
+from opening_index import OpeningIndex, get_opening_index
+
+
+class TestOpeningIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = OpeningIndex()
+        self.index.add_opening('A00a', 'Start position', '')
+        self.index.add_opening('B00a', 'Kings Pawn', 'e4')
+        self.index.add_opening('C20a', 'Open Game', 'e4 e5')
+        self.index.add_opening('C20b', 'Duplicate', 'e4 e5')
+        self.index.add_opening('C50a', 'Italian Game', 'e4 e5 Nf3 Nc6 Bc4')
+        self.index.add_fen_lines(['rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq -\n', 'Kings Pawn  \n'])
+
+    def test_longest_match(self):
+        self.assertEqual(self.index.longest_match('e4'), ('Kings Pawn', 'e4', 'B00a'))
+        self.assertEqual(self.index.longest_match('e4 e5 Nf3 Nc6'), ('Open Game', 'e4 e5', 'C20a'))
+        self.assertEqual(self.index.longest_match('e4 e5 Nf3 Nc6 Bc4 Bc5'), ('Italian Game', 'e4 e5 Nf3 Nc6 Bc4', 'C50a'))
+
+    def test_no_match(self):
+        self.assertEqual(self.index.longest_match(''), ('', '', ''))
+        self.assertEqual(self.index.longest_match('d4 d5'), ('', '', ''))
+
+    def test_fen_opening(self):
+        self.assertEqual(self.index.fen_opening('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR'), 'Kings Pawn  \n')
+        self.assertEqual(self.index.fen_opening('8/8/8/8/8/8/8/8'), '')
+
+    def test_from_files(self):
+        index = OpeningIndex.from_files('chess-eco_pos.txt', 'opening_name_fen.txt')
+        self.assertEqual(index.longest_match('e4 e5 Nf3 Nc6 Bc4')[0], 'Italian Game')
+
+
+class TestSharedOpeningIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.eco_file = os.path.join(self.tmp.name, 'eco.txt')
+        self.fen_file = os.path.join(self.tmp.name, 'fen.txt')
+        self.cache_file = os.path.join(self.tmp.name, 'index.json')
+        with open(self.eco_file, 'w') as fp:
+            fp.write('## comment\n"eco"|"opening_name"|"moves"\n"B00a"|"Kings Pawn"|"e4"\n')
+        with open(self.fen_file, 'w') as fp:
+            fp.write('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq -\nKings Pawn\n')
+
+    def tearDown(self):
+        opening_index._shared_index = None
+        self.tmp.cleanup()
+
+    def test_index_is_shared(self):
+        first = get_opening_index(self.eco_file, self.fen_file, self.cache_file)
+        second = get_opening_index(self.eco_file, self.fen_file, self.cache_file)
+        self.assertIs(first, second)
+        self.assertTrue(os.path.exists(self.cache_file))
+
+    def test_cache_is_used_and_refreshed(self):
+        get_opening_index(self.eco_file, self.fen_file, self.cache_file)
+        opening_index._shared_index = None
+        index = get_opening_index(self.eco_file, self.fen_file, self.cache_file)
+        self.assertEqual(index.longest_match('e4 e5'), ('Kings Pawn', 'e4', 'B00a'))
+        self.assertEqual(index.fen_opening('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR'), 'Kings Pawn\n')
+
+        with open(self.eco_file, 'a') as fp:
+            fp.write('"C20a"|"Open Game"|"e4 e5"\n')
+        os.utime(self.eco_file, ns=(0, 1))
+        changed = get_opening_index(self.eco_file, self.fen_file, self.cache_file)
+        self.assertIsNot(changed, index)
+        self.assertEqual(changed.longest_match('e4 e5')[0], 'Open Game')
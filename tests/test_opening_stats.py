@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import chess  # type: ignore
+import chess.polyglot  # type: ignore
+import tornado.testing  # type: ignore
+import tornado.web  # type: ignore
+
+import server
+from opening_stats import ENTRY_STRUCT, OpeningStats
+
+START_FEN = chess.STARTING_FEN
+CASTLE_FEN = 'r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4'
+
+
+def _raw_move(from_square, to_square):
+    return from_square << 6 | to_square
+
+
+def write_data(path: str):
+    """Write a small opening.data - the start position and a position with castling (encoded as king takes rook)."""
+    start = chess.polyglot.zobrist_hash(chess.Board())
+    castle = chess.polyglot.zobrist_hash(chess.Board(CASTLE_FEN))
+    entries = [(start, _raw_move(chess.G1, chess.F3), 30, 49, 53980),
+               (start, _raw_move(chess.E2, chess.E4), 32, 44, 218543),
+               (castle, _raw_move(chess.E1, chess.H1), 35, 40, 1200)]
+    with open(path, 'wb') as file:
+        for entry in sorted(entries, key=lambda entry: entry[0]):
+            file.write(ENTRY_STRUCT.pack(*entry))
+
+
+class TestOpeningStats(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'opening.data')
+        write_data(self.path)
+        self.stats = OpeningStats(self.path, maxsize=1)
+
+    def tearDown(self):
+        self.stats.close()
+        shutil.rmtree(self.folder)
+
+    def test_moves(self):
+        self.assertEqual(self.stats.moves(chess.Board()), [
+            {'move': 'g1f3', 'whitewins': 30, 'draws': 49, 'blackwins': 21, 'count': 53980},
+            {'move': 'e2e4', 'whitewins': 32, 'draws': 44, 'blackwins': 24, 'count': 218543}])
+        self.assertEqual([move['move'] for move in self.stats.moves(chess.Board(CASTLE_FEN))], ['e1g1'])
+        board = chess.Board()
+        board.push_san('e4')
+        self.assertEqual(self.stats.moves(board), [])
+        self.assertEqual(self.stats.stats()['entries'], 3)
+
+    def test_cache(self):
+        self.stats.moves(chess.Board())
+        self.stats.moves(chess.Board())
+        self.stats.moves(chess.Board(CASTLE_FEN))
+        self.assertEqual({key: self.stats.stats()[key] for key in ('hits', 'misses', 'size')}, {'hits': 1, 'misses': 2, 'size': 1})
+
+    def test_query(self):
+        result = self.stats.query([START_FEN, CASTLE_FEN, 'invalid fen'])
+        self.assertEqual(len(result[START_FEN]), 2)
+        self.assertEqual(len(result[CASTLE_FEN]), 1)
+        self.assertEqual(result['invalid fen'], [])
+
+    def test_missing_file(self):
+        stats = OpeningStats(os.path.join(self.folder, 'missing.data'))
+        self.assertEqual(stats.moves(chess.Board()), [])
+        shutil.copy(self.path, os.path.join(self.folder, 'missing.data'))
+        stats.close()
+        self.assertEqual(len(stats.moves(chess.Board())), 2)
+        stats.close()
+
+
+class TestQueryHandler(tornado.testing.AsyncHTTPTestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        write_data(os.path.join(self.folder, 'opening.data'))
+        self.stats = OpeningStats(os.path.join(self.folder, 'opening.data'))
+        patcher = patch('server.opening_stats', self.stats)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super(TestQueryHandler, self).setUp()
+
+    def tearDown(self):
+        super(TestQueryHandler, self).tearDown()
+        self.stats.close()
+        shutil.rmtree(self.folder)
+
+    def get_app(self):
+        return tornado.web.Application([(r'/query', server.QueryHandler, dict(shared={}))])
+
+    def test_get_book_moves(self):
+        response = self.fetch('/query?action=get_book_moves&fen=' + START_FEN.replace(' ', '%20'))
+        self.assertEqual(response.code, 200)
+        self.assertEqual([move['move'] for move in json.loads(response.body)['data']], ['g1f3', 'e2e4'])
+
+    def test_batch(self):
+        body = 'action=get_book_moves_batch&fen={}&fen={}'.format(START_FEN, CASTLE_FEN).replace(' ', '+')
+        response = self.fetch('/query', method='POST', body=body)
+        data = json.loads(response.body)['data']
+        self.assertEqual({fen: len(moves) for fen, moves in data.items()}, {START_FEN: 2, CASTLE_FEN: 1})
@@ -1,6 +1,13 @@
+import threading
+import time
 import unittest
 
-from picotutor import PicoTutor
+import chess  # type: ignore
+import chess.uci  # type: ignore
+
+from eval_cache import eval_key
+import picotutor_constants as c
+from picotutor import PicoTutor, StagedInfoHandler, classify_move
 
 
 class TestPicotutor(unittest.TestCase):
@@ -27,3 +34,120 @@ class TestPicotutor(unittest.TestCase):
 
         opening_name, _, _ = tutor._find_longest_matching_opening("e4 e5")
         self.assertEqual(opening_name, "Open Game")
+
+
+class TestClassifyMove(unittest.TestCase):
+
+    def test_classify_move(self):
+        # best score, best mate, played score, played mate, before score, low score, legal moves
+        self.assertEqual(classify_move(0.3, 0, -3.0, 0, 0.2, -3.0, 20), '??')
+        self.assertEqual(classify_move(0.3, 0, -1.5, 0, 0.2, -1.5, 20), '?')
+        self.assertEqual(classify_move(0.3, 0, 0.3, 0, 0.2, 0.2, 20), '')
+        self.assertEqual(classify_move(3.0, 0, 3.0, 0, 0.2, -1.0, 20), '!!')
+        self.assertEqual(classify_move(3.0, 0, 2.9, 0, 0.2, 0.0, 20), '!')
+
+
+class TestStagedInfoHandler(unittest.TestCase):
+
+    def _info_line(self, handler, depth, multipv, score, move):
+        handler.pre_info('')
+        handler.depth(depth)
+        handler.multipv(multipv)
+        handler.score(score, None, False, False)
+        handler.pv([chess.Move.from_uci(move)])
+        handler.post_info()
+
+    def test_keeps_low_depth_lines(self):
+        handler = StagedInfoHandler(low_depth=2)
+        for depth in range(1, 5):
+            self._info_line(handler, depth, 1, 10 * depth, 'e2e4')
+            self._info_line(handler, depth, 2, depth, 'd2d4' if depth < 3 else 'c2c4')
+        self.assertEqual(handler.low.info['depth'], 2)
+        self.assertEqual(handler.low.info['score'][1].cp, 20)
+        self.assertEqual(handler.low.info['pv'][2], [chess.Move.from_uci('d2d4')])
+        self.assertEqual(handler.info['pv'][2], [chess.Move.from_uci('c2c4')])
+
+        handler.on_go()
+        self.assertEqual(handler.low.info['pv'], {})
+
+
+class TestSingleEngineTutor(unittest.TestCase):
+
+    def test_low_depth_history(self):
+        tutor = PicoTutor(i_engine_path='engines/x86_64/a-stock8', i_single_engine=True)
+        try:
+            self.assertIsNone(tutor.engine2)
+            tutor.set_user_color(chess.WHITE)
+            tutor.start()
+            time.sleep(1)
+            tutor.push_move(chess.Move.from_uci('e2e4'))
+            self.assertTrue(tutor.legal_moves2)
+            self.assertEqual(len(tutor.history2), 2)
+            self.assertEqual(tutor.history2[-1][1], chess.Move.from_uci('e2e4'))
+            self.assertTrue(tutor.get_user_move_eval())
+        finally:
+            tutor.stop()
+
+    def test_adaptive_multipv_verifies_user_move(self):
+        tutor = PicoTutor(i_engine_path='engines/x86_64/a-stock8', i_single_engine=True, i_adaptive_multipv=True)
+        try:
+            tutor.set_user_color(chess.WHITE)
+            tutor.start()
+            time.sleep(1)
+            evaluated = threading.Event()
+            start = time.time()
+            tutor.push_move(chess.Move.from_uci('h2h4'))
+            tutor.when_evaluated(evaluated.set)
+            self.assertLess(time.time() - start, 0.5)  # the verification runs in the background
+            self.assertTrue(evaluated.wait(c.VERIFY_MOVETIME / 1000 + 5))
+            self.assertLess(tutor.multipv, tutor.max_valid_moves)
+            self.assertIn(chess.Move.from_uci('h2h4'), [move for (_, move, _, _) in tutor.legal_moves])
+            self.assertIn(chess.Move.from_uci('h2h4'), [move for (_, move, _, _) in tutor.legal_moves2])
+            self.assertEqual(tutor.history[-1][1], chess.Move.from_uci('h2h4'))
+            self.assertGreater(tutor.history[-1][0], 0)
+            self.assertEqual(tutor.pv_user_move[0], chess.Move.from_uci('h2h4'))
+            self.assertGreater(len(tutor.pv_user_move), 1)
+        finally:
+            tutor.stop()
+
+    def test_next_move_finishes_verification(self):
+        tutor = PicoTutor(i_engine_path='engines/x86_64/a-stock8', i_single_engine=True, i_adaptive_multipv=True)
+        try:
+            tutor.set_user_color(chess.WHITE)
+            tutor.start()
+            time.sleep(1)
+            evaluated = threading.Event()
+            tutor.push_move(chess.Move.from_uci('h2h4'))
+            tutor.when_evaluated(evaluated.set)
+            tutor.push_move(chess.Move.from_uci('e7e5'))  # the opponent was faster
+            self.assertTrue(evaluated.is_set())
+            self.assertEqual(tutor.history[-1][1], chess.Move.from_uci('h2h4'))
+        finally:
+            tutor.stop()
+
+    def test_eval_cache_skips_search(self):
+        tutor = PicoTutor(i_engine_path='engines/x86_64/a-stock8', i_single_engine=True)
+        try:
+            info = {'depth': 30, 'pv': {1: [chess.Move.from_uci('b2b3')]}, 'score': {1: chess.uci.Score(99, None)}}
+            for stage in ('deep', 'low'):
+                tutor.eval_cache.put(eval_key(tutor.board, stage, tutor.engine_id), info, tutor.multipv)
+            tutor.set_user_color(chess.WHITE)
+            tutor.start()
+            self.assertTrue(tutor.engine.idle)
+            best_move, score, _, _, _ = tutor.get_pos_analysis()
+            self.assertEqual((best_move, score), (chess.Move.from_uci('b2b3'), 0.99))
+        finally:
+            tutor.stop()
+
+    def test_eval_cache_of_other_engine(self):
+        tutor = PicoTutor(i_engine_path='engines/x86_64/a-stock8', i_single_engine=True)
+        try:
+            self.assertIn('a-stock8', tutor.engine_id)
+            info = {'depth': 30, 'pv': {1: [chess.Move.from_uci('b2b3')]}, 'score': {1: chess.uci.Score(99, None)}}
+            for stage in ('deep', 'low'):
+                tutor.eval_cache.put(eval_key(tutor.board, stage, 'other-engine'), info, tutor.multipv)
+            tutor.set_user_color(chess.WHITE)
+            tutor.start()
+            self.assertFalse(tutor.engine.idle)
+        finally:
+            tutor.stop()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+
+import chess  # type: ignore
+
+from tests.ssh_server import LoopbackSshServer, USER, PASSWORD
+from tests.test_transport import FAKE_ENGINE
+from uci.engine import UciEngine, UciShell
+from uci.read import read_engine_ini
+from uci.ssh_connection import SshConnectionPool
+
+ENGINES_INI = '''[fake]
+name = Fake Engine
+small = fake
+medium = Fake
+large = Fake Engine
+elo = 1000
+
+[other]
+name = Other
+small = other
+medium = Other
+large = Other
+elo = 1200
+'''
+
+
+class TestSshConnection(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LoopbackSshServer()
+        self.pool = SshConnectionPool()
+        self.shell = self.pool.shell('127.0.0.1', USER, password=PASSWORD, port=self.server.port)
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.close()
+        shutil.rmtree(self.folder)
+
+    def _write(self, name: str, text: str) -> str:
+        path = os.path.join(self.folder, name)
+        with open(path, 'w') as file:
+            file.write(text)
+        return path
+
+    def test_check(self):
+        self.assertFalse(self.pool.check(''))
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            closed_port = sock.getsockname()[1]
+        self.assertFalse(self.pool.check('127.0.0.1', USER, password=PASSWORD, port=closed_port))
+        self.assertFalse(self.pool.check('127.0.0.1', USER, password='wrong', port=self.server.port))
+        self.assertTrue(self.pool.check('127.0.0.1', USER, password=PASSWORD, port=self.server.port))
+        self.assertTrue(self.pool.check('127.0.0.1', USER, password=PASSWORD, port=self.server.port))
+        self.assertIs(self.pool.shell('127.0.0.1', USER, password=PASSWORD, port=self.server.port), self.shell)
+        self.assertEqual(self.server.handshakes, 2)  # the wrong password + one shared connection
+
+    def test_engines_share_connection(self):
+        uci_shell = UciShell()
+        uci_shell.shell = self.shell
+        engines = [UciEngine(FAKE_ENGINE, uci_shell, '') for _ in range(2)]
+        try:
+            for engine in engines:
+                self.assertEqual(engine.get_name(), 'Fake Engine')
+            engines[0].position(chess.Board())
+            self.assertEqual(engines[0].engine.go(movetime=10).bestmove, chess.Move.from_uci('e2e4'))
+        finally:
+            for engine in engines:
+                engine.quit()
+        self.assertEqual(self.server.handshakes, 1)
+        self.assertEqual(self.shell.connects, 1)
+
+    def test_read_files(self):
+        first = self._write('a.uci', '[Level@00]\nSkill Level = 0\n')
+        second = self._write('b.uci', 'x' * 100000)
+        missing = os.path.join(self.folder, 'missing.uci')
+        files = self.shell.read_files([first, missing, second])
+        self.assertEqual(files, {first: '[Level@00]\nSkill Level = 0\n', second: 'x' * 100000})
+        self.assertEqual(len(self.server.commands), 1)
+        self.assertEqual(self.shell.read_files([]), {})
+
+    def test_shared_sftp(self):
+        path = self._write('a.uci', 'text')
+        for _ in range(3):
+            with self.shell.open(path, 'r') as file:
+                self.assertEqual(file.read(), 'text')
+        sftp = self.shell._sftp
+        with self.shell.open(path, 'r') as file:
+            file.read()
+        self.assertIs(self.shell._sftp, sftp)
+        self.assertFalse(sftp.get_channel().closed)
+
+    def test_reconnect(self):
+        path = self._write('a.uci', 'text')
+        self.assertEqual(self.shell.read_files([path]), {path: 'text'})
+        self.server.drop_connections()
+        self.assertEqual(self.shell.read_files([path]), {path: 'text'})
+        with self.shell.open(path, 'r') as file:
+            self.assertEqual(file.read(), 'text')
+        self.assertEqual(self.server.handshakes, 2)
+        self.assertEqual(self.shell.connects, 2)
+
+    def test_read_engine_ini(self):
+        self._write('engines.ini', ENGINES_INI)
+        self._write('fake.uci', '[Level@00]\nSkill Level = 0\n\n[Level@01]\nSkill Level = 1\n')
+        library = read_engine_ini(engine_shell=self.shell, engine_path=self.folder)
+        self.assertEqual([eng['name'] for eng in library], ['Fake Engine', 'Other'])
+        self.assertEqual(library[0]['level_dict'], {'Level@00': {'Skill Level': '0'}, 'Level@01': {'Skill Level': '1'}})
+        self.assertEqual(library[1]['level_dict'], {})
+        self.assertEqual(len(self.server.commands), 1)  # all .uci files in one round trip
+        self.assertEqual(self.server.handshakes, 1)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import tempfile
+import unittest
+
+import chess  # type: ignore
+
+from picotutor import PicoTutor
+from tablebase import TablebaseService, TB_WIN_SCORE
+
+KQK = '8/8/8/4k3/8/8/3Q4/4K3 w - - 0 1'
+MATE_IN_ONE = '7k/8/6K1/8/8/8/8/1Q6 w - - 0 1'
+KK = '8/8/8/4k3/8/8/8/4K3 w - - 0 1'
+
+
+class TestTablebaseService(unittest.TestCase):
+
+    def setUp(self):
+        self.tablebases = TablebaseService()
+
+    def tearDown(self):
+        self.tablebases.close()
+
+    def test_score(self):
+        board = chess.Board(KQK)
+        score = self.tablebases.score(board)
+        self.assertGreater(score, TB_WIN_SCORE - 50)
+        board.turn = chess.BLACK
+        self.assertLess(self.tablebases.score(board), 0)
+        self.assertEqual(self.tablebases.score(chess.Board(KK)), 0)
+        self.assertEqual(self.tablebases.score(chess.Board(KQK)), score)
+        stats = self.tablebases.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 3, 3))
+        self.assertEqual(stats['max_pieces'], 4)
+
+    def test_best_move(self):
+        result = self.tablebases.best_move(chess.Board(MATE_IN_ONE))
+        self.assertEqual(result.bestmove, chess.Move.from_uci('b1b8'))
+        self.assertIsNone(result.ponder)
+
+        board = chess.Board(KQK)
+        move_scores = self.tablebases.move_scores(board)
+        self.assertEqual(len(move_scores), board.legal_moves.count())
+        self.assertEqual(move_scores[0][1], max(score for _, score in move_scores))
+        result = self.tablebases.best_move(board)
+        self.assertEqual(result.bestmove, move_scores[0][0])
+        board.push(result.bestmove)
+        self.assertIn(result.ponder, board.legal_moves)
+
+    def test_not_available(self):
+        self.assertIsNone(self.tablebases.probe(chess.Board()))
+        self.assertIsNone(self.tablebases.score(chess.Board('4k3/8/8/8/8/8/8/4K2R w K - 0 1')))
+        self.assertIsNone(self.tablebases.best_move(chess.Board('4k3/8/8/8/8/8/8/4K2R w K - 0 1')))
+        self.assertIsNotNone(self.tablebases.score(chess.Board('4k3/8/8/8/8/8/8/4K2R w - - 0 1')))
+
+    def test_no_tables(self):
+        with tempfile.TemporaryDirectory() as folder:
+            self.tablebases.open(folder)
+            self.assertIsNone(self.tablebases.score(chess.Board(KQK)))
+            self.assertEqual(self.tablebases.stats()['max_pieces'], 0)
+
+
+class TestTablebaseTutor(unittest.TestCase):
+
+    def test_tablebase_skips_search(self):
+        tutor = PicoTutor(i_engine_path='engines/x86_64/a-stock8', i_single_engine=True, i_fen=KQK)
+        try:
+            tutor.set_user_color(chess.WHITE)
+            tutor.start()
+            self.assertTrue(tutor.engine.idle)
+            best_move, score, mate, _, _ = tutor.get_pos_analysis()
+            self.assertEqual(best_move, TablebaseService().best_move(chess.Board(KQK)).bestmove)
+            self.assertGreater(score, 80)
+            self.assertEqual(len(tutor.legal_moves), chess.Board(KQK).legal_moves.count())
+        finally:
+            tutor.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
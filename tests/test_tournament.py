@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import chess.pgn  # type: ignore
+
+from tournament import OPENINGS, Tournament, play_game, players_of, rate_games, _quit, _worker
+from uci.write import update_engine_elo
+
+ENGINE = 'engines/x86_64/a-stock8'
+LIBRARY = [{'file': ENGINE, 'elo': '3360', 'level_dict': {'Level@00': {'Skill Level': '0'}, 'Level@20': {'Skill Level': '20'}}},
+           {'file': 'engines/x86_64/b-texel7', 'elo': '3050', 'level_dict': {'Elo@1500': {'UCI_Elo': '1500'}}}]
+
+
+def _game(number, white, black, result):
+    return {'number': number, 'white': white, 'black': black, 'result': result}
+
+
+class TestRateGames(unittest.TestCase):
+
+    def test_anchor(self):
+        games = [_game(0, 'a', 'b', '1-0'), _game(1, 'b', 'a', '0-1')]
+        ratings = rate_games(games, {'a': 1500, 'b': 1500}, {'b': 1500})
+        self.assertEqual((ratings['b'].rating, ratings['b'].rating_deviation), (1500, 0))
+        self.assertGreater(ratings['a'].rating, 1600)
+        self.assertLess(ratings['a'].rating_deviation, 350)
+
+    def test_game_order(self):
+        games = [_game(0, 'a', 'b', '1-0'), _game(1, 'c', 'a', '1/2-1/2'), _game(2, 'b', 'c', '0-1')]
+        priors = {'a': 1500, 'b': 1400, 'c': 1600}
+        first = rate_games(games, priors, {'a': 1500})
+        second = rate_games(list(reversed(games)), priors, {'a': 1500})
+        for name in priors:
+            self.assertTrue(first[name].is_similar_to(second[name]))
+        self.assertGreater(first['c'].rating, first['b'].rating)
+
+
+class TestTournament(unittest.TestCase):
+
+    def test_players_of(self):
+        players = players_of(LIBRARY, ['a-stock8:*', 'b-texel7', 'b-texel7:Elo@1500'])
+        self.assertEqual([(player.name, player.elo) for player in players],
+                         [('a-stock8:Level@00', 3360), ('a-stock8:Level@20', 3360), ('b-texel7', 3050), ('b-texel7:Elo@1500', 1500)])
+        self.assertEqual(players[0].options, {'Skill Level': '0'})
+        self.assertEqual(players[2].options, {})
+
+    def test_tasks(self):
+        players = players_of(LIBRARY, ['a-stock8:*', 'b-texel7'])
+        tasks = Tournament(players, {'b-texel7': 3050}, rounds=2).tasks()
+        self.assertEqual(len(tasks), 2 * 3 * 2)
+        self.assertEqual([task.number for task in tasks], list(range(12)))
+        for first, second in zip(tasks[::2], tasks[1::2]):
+            self.assertEqual((first.white, first.black), (second.black, second.white))
+            self.assertEqual(first.opening, second.opening)
+        self.assertEqual(len({task.opening for task in tasks}), min(6, len(OPENINGS)))
+
+    def test_play_game(self):
+        players = players_of(LIBRARY, ['a-stock8:Level@00', 'a-stock8:Level@20'])
+        tournament = Tournament(players, {'a-stock8:Level@20': 3000}, rounds=1, base=5000, increment=0, max_plies=6)
+        try:
+            game = play_game(tournament.tasks()[0])
+        finally:
+            for engine in _worker.pop('engines', {}).values():
+                _quit(engine)
+        self.assertEqual(len(game['moves']), 6)
+        self.assertEqual((game['result'], game['termination']), ('1/2-1/2', 'adjudication'))
+
+    def test_run(self):
+        players = players_of(LIBRARY, ['a-stock8:Level@00', 'a-stock8:Level@20'])
+        tournament = Tournament(players, {'a-stock8:Level@20': 3000}, rounds=1, base=5000, increment=0, processes=2, max_plies=4)
+        finished = []
+        tournament.run(finished.append)
+        self.assertEqual(sorted(game['number'] for game in finished), [0, 1])
+        standings = tournament.standings()
+        self.assertEqual([line['games'] for line in standings], [2, 2])
+        self.assertEqual(sum(line['score'] for line in standings), 2)
+
+        folder = tempfile.mkdtemp()
+        try:
+            tournament.write_pgn(os.path.join(folder, 'games.pgn'))
+            with open(os.path.join(folder, 'games.pgn')) as file:
+                pgn = chess.pgn.read_game(file)
+            self.assertEqual(pgn.headers['White'], 'a-stock8:Level@00')
+            self.assertEqual(len(pgn.end().board().move_stack), len(OPENINGS[0].split()) + 4)
+        finally:
+            shutil.rmtree(folder)
+
+    def test_cancel(self):
+        players = players_of(LIBRARY, ['a-stock8:Level@00', 'a-stock8:Level@20'])
+        tournament = Tournament(players, {'a-stock8:Level@20': 3000}, rounds=4, base=2000, increment=0, processes=2, max_plies=40)
+        start = time.monotonic()
+        tournament.run(lambda game: threading.Thread(target=tournament.cancel).start())
+        self.assertLess(time.monotonic() - start, 30)
+        self.assertGreaterEqual(len(tournament.games), 1)
+        self.assertLess(len(tournament.games), tournament.total)
+
+
+class TestUpdateEngineElo(unittest.TestCase):
+
+    def test_update(self):
+        folder = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(folder, 'engines.ini'), 'w') as file:
+                file.write('[a-stock8]\n;Hash = 16\nname = Stockfish\nelo = 3360\n\n[b-texel7]\nname = Texel\nelo = 3050\n')
+            update_engine_elo(folder, {'b-texel7': 2987, 'missing': 1})
+            with open(os.path.join(folder, 'engines.ini')) as file:
+                self.assertEqual(file.read(), '[a-stock8]\n;Hash = 16\nname = Stockfish\nelo = 3360\n\n[b-texel7]\nname = Texel\nelo = 2987\n')
+        finally:
+            shutil.rmtree(folder)
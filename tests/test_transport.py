@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+import chess  # type: ignore
+import chess.uci  # type: ignore
+
+from uci.engine import UciEngine, UciShell
+from uci.informer import Informer
+from uci.transport import AsyncUciEngine, SyncUciEngine, event_loop
+
+FAKE_ENGINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_uci_engine.py')
+
+
+class TestSyncUciEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = SyncUciEngine.popen([sys.executable, FAKE_ENGINE])
+        self.engine.uci()
+
+    def tearDown(self):
+        self.engine.quit()
+
+    def test_uci(self):
+        self.assertEqual(self.engine.name, 'Fake Engine')
+        self.assertEqual(self.engine.options['MultiPV'].max, 10)
+        self.assertFalse(self.engine.options['Ponder'].default)
+        self.assertTrue(self.engine.is_alive())
+
+    def test_go(self):
+        handler = chess.uci.InfoHandler()
+        self.engine.info_handlers.append(handler)
+        self.engine.position(chess.Board())
+        result = self.engine.go(movetime=50)
+        self.assertEqual(result.bestmove, chess.Move.from_uci('e2e4'))
+        self.assertEqual(result.ponder, chess.Move.from_uci('e7e5'))
+        self.assertTrue(self.engine.idle)
+        self.assertGreater(handler.info['depth'], 0)
+        self.assertEqual(handler.info['pv'][1], [chess.Move.from_uci('e2e4')])
+
+    def test_position_moves(self):
+        board = chess.Board()
+        board.push_uci('e2e4')
+        self.engine.position(board)
+        self.assertEqual(self.engine.go(movetime=10).bestmove, chess.Move.from_uci('e7e5'))
+
+    def test_async_callback_and_stop(self):
+        results = []
+        self.engine.position(chess.Board())
+        future = self.engine.go(infinite=True, async_callback=lambda command: results.append(command.result()))
+        self.assertFalse(self.engine.wait_idle(0.05))
+        start = time.monotonic()
+        self.assertEqual(self.engine.stop().bestmove, chess.Move.from_uci('e2e4'))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertTrue(self.engine.wait_idle(1))
+        self.assertEqual(future.result(1).bestmove, chess.Move.from_uci('e2e4'))
+        self.assertEqual(len(results), 1)
+
+    def test_ponderhit(self):
+        self.engine.position(chess.Board())
+        future = self.engine.go(ponder=True, infinite=True, async_callback=True)
+        self.assertTrue(self.engine.pondering)
+        self.engine.ponderhit()
+        self.assertFalse(self.engine.pondering)
+        self.assertFalse(self.engine.idle)
+        self.engine.stop()
+        self.assertTrue(future.result(1).bestmove)
+        with self.assertRaises(chess.uci.EngineStateException):
+            self.engine.ponderhit()
+
+    def test_busy(self):
+        self.engine.position(chess.Board())
+        self.engine.go(infinite=True, async_callback=True)
+        with self.assertRaises(chess.uci.EngineStateException):
+            self.engine.go(movetime=10)
+        self.engine.stop()
+
+    def test_quit(self):
+        self.engine.position(chess.Board())
+        future = self.engine.go(infinite=True, async_callback=True)
+        self.engine.stop()
+        future.result(1)
+        self.assertEqual(self.engine.quit(), 0)
+        self.assertFalse(self.engine.is_alive())
+        with self.assertRaises(chess.uci.EngineTerminatedException):
+            self.engine.position(chess.Board())
+
+
+class TestAsyncUciEngine(unittest.TestCase):
+
+    def test_coroutines(self):
+        async def play():
+            engine = AsyncUciEngine()
+            await engine.start([sys.executable, FAKE_ENGINE])
+            await engine.uci()
+            await engine.position(chess.Board())
+            search = asyncio.ensure_future(engine.go(infinite=True))
+            await asyncio.sleep(0.05)
+            stopped = await engine.stop()
+            result = await search
+            return_code = await engine.quit()
+            return stopped, result, return_code
+
+        stopped, result, return_code = asyncio.run_coroutine_threadsafe(play(), event_loop()).result(5)
+        self.assertEqual(stopped, result)
+        self.assertEqual(result.bestmove, chess.Move.from_uci('e2e4'))
+        self.assertEqual(return_code, 0)
+
+    def test_quit_timeout(self):
+        engine = SyncUciEngine.popen([sys.executable, '-c', 'import time; time.sleep(10)'])  # ignores quit
+        start = time.perf_counter()
+        self.assertEqual(engine.quit(timeout=0.2), -9)
+        self.assertLess(time.perf_counter() - start, 1.5)  # the kill is seen right away, not after another timeout
+        self.assertFalse(engine.is_alive())
+
+    def test_engine_died(self):
+        engine = SyncUciEngine.popen([sys.executable, '-c', 'print("id name dead")'])
+        with self.assertRaises(chess.uci.EngineTerminatedException):
+            engine.uci()
+        self.assertFalse(engine.is_alive())
+        self.assertTrue(engine.wait_idle(0))
+
+
+class TestUciEngineTransport(unittest.TestCase):
+
+    def setUp(self):
+        UciEngine.asyncio_transport = True
+        self.engine = UciEngine(FAKE_ENGINE, UciShell(), '')
+
+    def tearDown(self):
+        UciEngine.asyncio_transport = False
+        self.engine.quit()
+
+    def test_engine(self):
+        self.assertIsInstance(self.engine.engine, SyncUciEngine)
+        self.assertIsInstance(self.engine.informer, Informer)
+        self.assertEqual(self.engine.get_name(), 'Fake Engine')
+        self.assertEqual(self.engine.set_multipv(20), 10)
+        self.engine.position(chess.Board())
+        self.engine.ponder()
+        self.assertTrue(self.engine.is_pondering())
+        self.assertFalse(self.engine.wait_idle(0.05))
+        result = self.engine.stop()
+        self.assertEqual(result.bestmove, chess.Move.from_uci('e2e4'))
+        self.assertTrue(self.engine.wait_idle(0))
+        self.assertTrue(self.engine.get_analysis())
+
+    def test_wait_idle_popen(self):
+        UciEngine.asyncio_transport = False
+        engine = UciEngine(FAKE_ENGINE, UciShell(), '')
+        try:
+            self.assertIsInstance(engine.engine, chess.uci.Engine)
+            engine.position(chess.Board())
+            engine.ponder()
+            self.assertFalse(engine.wait_idle(0.05))
+            engine.stop()
+            self.assertTrue(engine.wait_idle(1))
+        finally:
+            engine.quit()
@@ -1,6 +1,13 @@
+import queue
+import threading
+import time
 import unittest
+from unittest.mock import patch
 
-from utilities import get_engine_mame_par
+import chess  # type: ignore
+
+from dgt.api import Event, Message
+from utilities import DisplayMsg, MessageScheduler, evt_queue, get_engine_mame_par, msgdisplay_devices
 
 
 class TestUtilities(unittest.TestCase):
@@ -12,5 +19,92 @@ class TestUtilities(unittest.TestCase):
         self.assertEqual('-nothrottle', get_engine_mame_par(0.009, True))
 
 
+class TestDisplayMsg(unittest.TestCase):
+
+    def setUp(self):
+        self.devices = list(msgdisplay_devices)
+        msgdisplay_devices.clear()
+
+    def tearDown(self):
+        msgdisplay_devices.clear()
+        msgdisplay_devices.extend(self.devices)
+
+    def test_show_copies_once_per_publish(self):
+        displays = [DisplayMsg(), DisplayMsg(), DisplayMsg()]
+        game = chess.Board()
+        game.push_san('e4')
+        DisplayMsg.show(Message.START_NEW_GAME(game=game, newgame=True))
+        game.push_san('e5')  # the snapshot doesn't follow the board of picochess
+
+        received = [display.msg_queue.get_nowait() for display in displays]
+        self.assertIs(received[0], received[1])
+        self.assertEqual(received[0].game.move_stack, [chess.Move.from_uci('e2e4')])
+
+
+class TestMessageScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.devices = list(msgdisplay_devices)
+        msgdisplay_devices.clear()
+        self.display = DisplayMsg()
+        while not evt_queue.empty():
+            evt_queue.get_nowait()
+
+    def tearDown(self):
+        msgdisplay_devices.clear()
+        msgdisplay_devices.extend(self.devices)
+
+    def test_sequence_keeps_order_and_hold_times(self):
+        scheduler = MessageScheduler()
+        scheduler.show_sequence([(Message.PICOTUTOR_MSG(eval_str='POS'), 0.05), (Message.PICOTUTOR_MSG(eval_str='BEST'), 0.05)],
+                                fire_after=Event.RESUME_CLOCK())
+        self.assertTrue(scheduler.is_busy())
+        first = self.display.msg_queue.get(timeout=1)
+        second = self.display.msg_queue.get(timeout=1)
+        self.assertEqual([first.eval_str, second.eval_str], ['POS', 'BEST'])
+        self.assertIsInstance(evt_queue.get(timeout=1), Event.RESUME_CLOCK)
+
+    def test_cancel_drops_pending_messages(self):
+        scheduler = MessageScheduler()
+        scheduler.show_sequence([(Message.PICOTUTOR_MSG(eval_str='POS'), 0.2), (Message.PICOTUTOR_MSG(eval_str='BEST'), 0.2)],
+                                fire_after=Event.RESUME_CLOCK())
+        self.assertEqual(self.display.msg_queue.get(timeout=1).eval_str, 'POS')
+        scheduler.cancel()
+        self.assertFalse(scheduler.is_busy())
+        with self.assertRaises(queue.Empty):
+            self.display.msg_queue.get(timeout=0.5)
+        self.assertTrue(evt_queue.empty())
+
+    def test_cancel_shows_not_cancelable_messages(self):
+        scheduler = MessageScheduler()
+        scheduler.show_sequence([(Message.COMPUTER_MOVE_DONE(), 0.2)], cancelable=False)
+        scheduler.show_sequence([(Message.PICOTUTOR_MSG(eval_str='POS'), 0.2), (Message.PICOTUTOR_MSG(eval_str='BEST'), 0.2),
+                                 (Message.PICOTUTOR_MSG(eval_str='HINT'), 0.2)], fire_after=Event.RESUME_CLOCK(), cancelable=False)
+        scheduler.show_sequence([(Message.PICOTUTOR_MSG(eval_str='THREAT'), 0.2)])
+        self.assertIsInstance(self.display.msg_queue.get(timeout=1), Message.COMPUTER_MOVE_DONE)
+        scheduler.cancel()  # the rest at once and in order - but neither the event nor the cancelable message
+        self.assertEqual([self.display.msg_queue.get_nowait().eval_str for _ in range(3)], ['POS', 'BEST', 'HINT'])
+        with self.assertRaises(queue.Empty):
+            self.display.msg_queue.get(timeout=0.5)
+        self.assertTrue(evt_queue.empty())
+
+    def test_cancel_waits_for_running_show(self):
+        scheduler = MessageScheduler()
+        order = []
+
+        def show(_):
+            canceler = threading.Thread(target=lambda: (scheduler.cancel(), order.append('cancel')))
+            canceler.start()
+            canceler.join(0.2)
+            order.append('show')
+
+        with patch('utilities.DisplayMsg.show', side_effect=show):
+            scheduler.show_sequence([(Message.PICOTUTOR_MSG(eval_str='POS'), 0)])
+            deadline = time.monotonic() + 2
+            while len(order) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertEqual(order, ['show', 'cancel'])
+
+
 if __name__ == '__main__':
     unittest.main()
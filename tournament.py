@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import itertools
+import json
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import threading
+import time
+from subprocess import DEVNULL
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import chess  # type: ignore
+import chess.pgn  # type: ignore
+import chess.uci  # type: ignore
+
+from uci.rating import Rating, Result
+from uci.read import read_engine_ini
+from uci.write import update_engine_elo
+
+# short opening lines, each one is played with both colors
+OPENINGS = [
+    'e2e4 e7e5 g1f3 b8c6 f1b5 a7a6',
+    'e2e4 c7c5 g1f3 d7d6 d2d4 c5d4 f3d4 g8f6',
+    'e2e4 e7e6 d2d4 d7d5 b1c3 g8f6',
+    'e2e4 c7c6 d2d4 d7d5 e4e5 c8f5',
+    'd2d4 d7d5 c2c4 e7e6 b1c3 g8f6',
+    'd2d4 g8f6 c2c4 g7g6 b1c3 f8g7 e2e4 d7d6',
+    'd2d4 g8f6 c2c4 e7e6 g1f3 b7b6',
+    'c2c4 e7e5 b1c3 g8f6 g1f3 b8c6',
+    'g1f3 d7d5 g2g3 g8f6 f1g2 e7e6',
+    'e2e4 d7d5 e4d5 d8d5 b1c3 d5a5',
+]
+START_DEVIATION = 350.0  # rating deviation of a new player
+
+
+class Player(NamedTuple):
+    name: str  # <engine file> or <engine file>:<level>
+    file: str
+    options: Dict[str, str]
+    elo: int  # the guess from engines.ini or the Elo@NNNN level name
+
+
+class GameTask(NamedTuple):
+    number: int
+    white: Player
+    black: Player
+    opening: str
+    base: int  # ms
+    increment: int  # ms
+    max_plies: int
+
+
+_worker: Dict = {}  # running engines of a pool process
+
+
+def _quit(engine):
+    if engine.is_alive():
+        engine.quit()
+
+
+def _engine(player: Player):
+    engines = _worker.setdefault('engines', {})
+    engine = engines.get(player.name)
+    if engine is None or not engine.is_alive():
+        engine = chess.uci.popen_engine(player.file, stderr=DEVNULL)
+        engine.uci()
+        options = dict(player.options)
+        for name, value in (('Threads', 1), ('Ponder', False)):
+            if name in engine.options:
+                options.setdefault(name, value)
+        engine.setoption(options)
+        engine.isready()
+        multiprocessing.util.Finalize(engine, _quit, args=(engine,), exitpriority=10)
+        engines[player.name] = engine
+    return engine
+
+
+def play_game(task: GameTask) -> Dict:
+    """Pool worker: play one game with a chess clock - returns the game result as dict."""
+    board = chess.Board()
+    for uci in task.opening.split():
+        board.push_uci(uci)
+    moves = []
+    termination = 'normal'
+    clock = {chess.WHITE: task.base, chess.BLACK: task.base}
+    players = {chess.WHITE: task.white, chess.BLACK: task.black}
+    try:
+        engines = {color: _engine(player) for color, player in players.items()}
+        for engine in engines.values():
+            engine.ucinewgame()
+        while not board.is_game_over(claim_draw=True) and len(moves) < task.max_plies:
+            engine = engines[board.turn]
+            engine.position(board)
+            started = time.monotonic()
+            bestmove = engine.go(wtime=clock[chess.WHITE], btime=clock[chess.BLACK],
+                                 winc=task.increment, binc=task.increment).bestmove
+            clock[board.turn] -= int((time.monotonic() - started) * 1000)
+            if clock[board.turn] <= 0:
+                termination = 'time forfeit'
+                break
+            clock[board.turn] += task.increment
+            if bestmove is None or bestmove not in board.legal_moves:
+                termination = 'illegal move'
+                break
+            board.push(bestmove)
+            moves.append(bestmove.uci())
+    except chess.uci.EngineTerminatedException:
+        termination = 'engine crash'
+        _worker.get('engines', {}).pop(players[board.turn].name, None)
+
+    if termination == 'normal':
+        result = board.result(claim_draw=True)
+        if result == '*':
+            termination = 'adjudication'
+            result = '1/2-1/2'
+    elif termination == 'time forfeit' and chess.popcount(board.occupied_co[not board.turn]) == 1:  # lone king cant win
+        result = '1/2-1/2'
+    else:
+        result = '0-1' if board.turn == chess.WHITE else '1-0'
+    return {'number': task.number, 'white': task.white.name, 'black': task.black.name, 'opening': task.opening,
+            'moves': moves, 'result': result, 'termination': termination}
+
+
+def rate_games(games: List[Dict], priors: Dict[str, int], anchors: Dict[str, int]) -> Dict[str, Rating]:
+    """Glicko rate the games in game order - anchors keep their rating, the others start with their prior."""
+    ratings = {name: Rating(elo, START_DEVIATION) for name, elo in priors.items()}
+    ratings.update({name: Rating(elo, 0) for name, elo in anchors.items()})
+    scores = {'1-0': Result.WIN, '0-1': Result.LOSS, '1/2-1/2': Result.DRAW}
+    opposite = {Result.WIN: Result.LOSS, Result.LOSS: Result.WIN, Result.DRAW: Result.DRAW}
+    for game in sorted(games, key=lambda game: game['number']):
+        white, black = game['white'], game['black']
+        result = scores[game['result']]
+        old_white, old_black = ratings[white], ratings[black]
+        if white not in anchors:
+            ratings[white] = old_white.rate(old_black, result)
+        if black not in anchors:
+            ratings[black] = old_black.rate(old_white, opposite[result])
+    return ratings
+
+
+class Tournament(object):
+
+    """Round robin of engine (levels) on a process pool, rated with Glicko against the anchor players."""
+
+    def __init__(self, players: List[Player], anchors: Dict[str, int], rounds=2, base=10000, increment=100,
+                 processes: Optional[int] = None, max_plies=400):
+        self.players = players
+        self.anchors = anchors
+        self.rounds = rounds  # games per pair and opening color
+        self.base = base
+        self.increment = increment
+        self.processes = processes or os.cpu_count() or 1
+        self.max_plies = max_plies
+        self.lock = threading.Lock()
+        self.games: List[Dict] = []
+        self.total = 0
+        self.pool = None
+        self.stopped = threading.Event()
+
+    def tasks(self) -> List[GameTask]:
+        """Return the games - every pair plays each opening with both colors."""
+        tasks = []
+        for _, (first, second) in itertools.product(range(self.rounds), itertools.combinations(self.players, 2)):
+            for white, black in ((first, second), (second, first)):
+                opening = OPENINGS[len(tasks) // 2 % len(OPENINGS)]
+                tasks.append(GameTask(len(tasks), white, black, opening, self.base, self.increment, self.max_plies))
+        return tasks
+
+    def cancel(self):
+        """Stop a running tournament - the finished games are kept."""
+        self.stopped.set()
+
+    def run(self, callback: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Play all games - callback gets every finished game."""
+        tasks = self.tasks()
+        self.stopped.clear()
+        with self.lock:
+            self.games, self.total = [], len(tasks)
+            self.pool = multiprocessing.Pool(self.processes)
+        try:
+            # poll like the annotator - the pool is terminated only after this loop
+            pending = self.pool.imap_unordered(play_game, tasks)
+            while not self.stopped.is_set():
+                try:
+                    game = pending.next(timeout=0.1)
+                except multiprocessing.TimeoutError:
+                    continue
+                except StopIteration:
+                    break
+                with self.lock:
+                    self.games.append(game)
+                if callback:
+                    callback(game)
+        except Exception as exc:  # a failed worker
+            logging.warning('tournament stopped: %s', exc)
+        finally:
+            with self.lock:
+                self.pool.terminate()
+                self.pool.join()
+                self.pool = None
+        return self.games
+
+    def ratings(self) -> Dict[str, Rating]:
+        return rate_games(self.games, {player.name: player.elo for player in self.players}, self.anchors)
+
+    def standings(self) -> List[Dict]:
+        """Return the players sorted by rating, with their score."""
+        ratings = self.ratings()
+        table = []
+        for player in self.players:
+            games = [game for game in self.games if player.name in (game['white'], game['black'])]
+            score = sum(1.0 if game['result'] == ('1-0' if game['white'] == player.name else '0-1')
+                        else 0.5 if game['result'] == '1/2-1/2' else 0.0 for game in games)
+            rating = ratings[player.name]
+            table.append({'player': player.name, 'guess': player.elo, 'rating': int(round(rating.rating)),
+                          'deviation': int(round(rating.rating_deviation)), 'games': len(games), 'score': score,
+                          'anchor': player.name in self.anchors})
+        return sorted(table, key=lambda line: -line['rating'])
+
+    def write_pgn(self, path: str):
+        """Write the played games."""
+        with open(path, 'w') as file:
+            for game in sorted(self.games, key=lambda game: game['number']):
+                pgn = chess.pgn.Game()
+                pgn.headers['Event'] = 'picochess calibration'
+                pgn.headers['Round'] = str(game['number'] + 1)
+                pgn.headers['White'] = game['white']
+                pgn.headers['Black'] = game['black']
+                pgn.headers['Result'] = game['result']
+                pgn.headers['Termination'] = game['termination']
+                pgn.headers['TimeControl'] = '{}+{}'.format(self.base / 1000, self.increment / 1000)
+                node = pgn
+                for uci in game['opening'].split() + game['moves']:
+                    node = node.add_variation(chess.Move.from_uci(uci))
+                print(pgn, file=file, end='\n\n')
+
+
+def players_of(library: List[Dict], names: List[str]) -> List[Player]:
+    """Return the players for names like "a-stockf" or "a-stockf:Elo@1500" ("a-stockf:*" = all levels)."""
+    engines = {os.path.basename(eng['file']): eng for eng in library}
+    players = []
+    for name in names:
+        file_name, _, level = name.partition(':')
+        eng = engines[file_name]
+        levels = list(eng['level_dict']) if level == '*' else [level]
+        for lvl in levels:
+            elo = int(lvl[4:]) if lvl.startswith('Elo@') and lvl[4:].isdigit() else int(eng['elo'])
+            players.append(Player(file_name + (':' + lvl if lvl else ''), eng['file'], eng['level_dict'][lvl] if lvl else {}, elo))
+    return players
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play engine tournaments to calibrate the engines.ini elo values.')
+    parser.add_argument('players', nargs='+', help='engine file name, with a level as "a-stockf:Elo@1500" or "a-stockf:*" for all levels')
+    parser.add_argument('-a', '--anchor', action='append', default=[], help='player with a known rating, eg. "b-texel:Level@05=2100"')
+    parser.add_argument('-p', '--engine-path', help='engine folder with engines.ini (default: engines/<machine>)')
+    parser.add_argument('-r', '--rounds', type=int, default=2, help='games per pair and color (default: %(default)s)')
+    parser.add_argument('-t', '--time-control', default='10+0.1', help='secs per game + increment (default: %(default)s)')
+    parser.add_argument('-j', '--processes', type=int, help='parallel games (default: cpu count)')
+    parser.add_argument('-o', '--output', default='tournament', help='writes <output>.pgn and <output>.json')
+    parser.add_argument('-w', '--write-elo', action='store_true', help='write the calibrated elo of the players without level to engines.ini')
+    args = parser.parse_args()
+
+    library = read_engine_ini(engine_path=args.engine_path)
+    players = players_of(library, args.players)
+    anchors = {}
+    for anchor in args.anchor:
+        name, _, rating = anchor.rpartition('=')
+        anchors[name] = int(rating)
+    if not anchors:
+        anchors = {players[0].name: players[0].elo}
+    if not set(anchors) <= {player.name for player in players}:
+        parser.error('anchors must be players of the tournament')
+    base, _, increment = args.time_control.partition('+')
+
+    tournament = Tournament(players, anchors, args.rounds, int(float(base) * 1000), int(float(increment or 0) * 1000),
+                            args.processes)
+
+    def show_game(game):
+        print('{}/{} {} - {} {} ({})'.format(len(tournament.games), tournament.total, game['white'], game['black'],
+                                             game['result'], game['termination']))
+
+    tournament.run(show_game)
+    standings = tournament.standings()
+    for line in standings:
+        print('{player:<25} {rating:>5} +/- {deviation:<4} (guess {guess}) {score}/{games}{0}'.format(' anchor' if line['anchor'] else '', **line))
+    tournament.write_pgn(args.output + '.pgn')
+    with open(args.output + '.json', 'w') as file:
+        json.dump({'time_control': args.time_control, 'standings': standings, 'games': tournament.games}, file, indent=1)
+    if args.write_elo:
+        engine_path = os.path.dirname(players[0].file)
+        update_engine_elo(engine_path, {line['player']: line['rating'] for line in standings
+                                        if ':' not in line['player'] and not line['anchor']})
+
+
+if __name__ == '__main__':
+    main()
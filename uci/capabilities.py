@@ -0,0 +1,181 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import configparser
+import hashlib
+import json
+import logging
+import os
+from multiprocessing import Pool
+from subprocess import DEVNULL
+from typing import Dict, List, Optional
+
+import chess.uci  # type: ignore
+
+CACHE_VERSION = 1
+CACHE_FILE = 'capabilities.json'
+
+
+def file_hash(path: str) -> str:
+    """Return the sha1 of a file."""
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def _calc_inc(diflevel: int):
+    """Calculate the increment for (max 20) levels."""
+    if diflevel > 1000:
+        inc = int(diflevel / 100)
+    else:
+        inc = int(diflevel / 10)
+    if 20 * inc < diflevel:
+        inc = int(diflevel / 20)
+    return inc
+
+
+def level_sections(options: Dict[str, Dict]) -> Dict[str, Dict[str, str]]:
+    """Return the level sections (for the <engine>.uci file) of the engine options."""
+    sections: Dict[str, Dict[str, str]] = {}
+    if 'UCI_LimitStrength' in options and 'UCI_Elo' in options:
+        minlevel, maxlevel = sorted((options['UCI_Elo']['min'], options['UCI_Elo']['max']))
+        lvl_inc = _calc_inc(maxlevel - minlevel)
+        level = minlevel
+        while level < maxlevel:
+            sections['Elo@{:04d}'.format(level)] = {'UCI_LimitStrength': 'true', 'UCI_Elo': str(level)}
+            level += lvl_inc
+        sections['Elo@{:04d}'.format(maxlevel)] = {'UCI_LimitStrength': 'false', 'UCI_Elo': str(maxlevel)}
+    for name in ('Skill Level', 'Handicap Level'):
+        if name in options:
+            minlevel, maxlevel = sorted((options[name]['min'], options[name]['max']))
+            for level in range(minlevel, maxlevel + 1):
+                sections['Level@{:02d}'.format(level)] = {name: str(level)}
+    if 'Strength' in options:
+        minlevel, maxlevel = sorted((options['Strength']['min'], options['Strength']['max']))
+        lvl_inc = _calc_inc(maxlevel - minlevel)
+        level = minlevel
+        count = 0
+        while level < maxlevel:
+            sections['Level@{:02d}'.format(count)] = {'Strength': str(level)}
+            level += lvl_inc
+            count += 1
+        sections['Level@{:02d}'.format(count)] = {'Strength': str(maxlevel)}
+    return sections
+
+
+def discover_engine(path: str):
+    """Start the engine and return (path, capabilities) - capabilities is None if the engine failed."""
+    try:
+        engine = chess.uci.popen_engine(path, stderr=DEVNULL)
+        engine.uci()
+    except (OSError, chess.uci.EngineTerminatedException) as exc:
+        logging.warning('engine %s failed: %s', path, exc)
+        return path, None
+    try:
+        options = {name: {'type': option.type, 'default': option.default, 'min': option.min, 'max': option.max,
+                          'var': list(option.var or [])} for name, option in engine.options.items()}
+        capabilities = {'name': engine.name, 'options': options, 'levels': level_sections(options)}
+    finally:
+        engine.quit()
+    return path, capabilities
+
+
+class CapabilityCache(object):
+
+    """Json cache of the engine capabilities (name, uci options, levels) and the parsed <engine>.uci level files."""
+
+    def __init__(self, engine_path: str, filename=CACHE_FILE):
+        self.path = os.path.join(engine_path, filename)
+        self.dirty = False
+        self.engines: Dict[str, Dict] = {}
+        self.uci_files: Dict[str, Dict] = {}
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+            if data.get('version') == CACHE_VERSION:
+                self.engines = data['engines']
+                self.uci_files = data['uci_files']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def save(self):
+        """Write the cache file if something changed."""
+        if not self.dirty:
+            return
+        data = {'version': CACHE_VERSION, 'engines': self.engines, 'uci_files': self.uci_files}
+        try:
+            with open(self.path + '.tmp', 'w') as file:
+                json.dump(data, file)
+            os.replace(self.path + '.tmp', self.path)
+            self.dirty = False
+        except OSError as exc:
+            logging.warning('cant write capability cache %s: %s', self.path, exc)
+
+    def _is_current(self, path: str, entry: Optional[Dict], stat: os.stat_result) -> bool:
+        """Return True if the entry still belongs to the file - the hash is only checked if size/mtime changed."""
+        if entry is None or entry['size'] != stat.st_size:
+            return False
+        if entry['mtime_ns'] == stat.st_mtime_ns:
+            return True
+        if entry['sha1'] != file_hash(path):
+            return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+        self.dirty = True
+        return True
+
+    def capabilities(self, paths: List[str], processes: Optional[int] = None) -> Dict[str, Optional[Dict]]:
+        """Return the capabilities of the engines - new or changed engines are started in parallel."""
+        result: Dict[str, Optional[Dict]] = {}
+        todo = []
+        for path in paths:
+            entry = self.engines.get(os.path.abspath(path))
+            if self._is_current(path, entry, os.stat(path)):
+                result[path] = entry['capabilities']
+            else:
+                todo.append(path)
+        if todo:
+            with Pool(processes or min(len(todo), os.cpu_count() or 1)) as pool:
+                discovered = pool.map(discover_engine, todo)
+            for path, capabilities in discovered:
+                result[path] = capabilities
+                if capabilities is not None:
+                    stat = os.stat(path)
+                    self.engines[os.path.abspath(path)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                                           'sha1': file_hash(path), 'capabilities': capabilities}
+                    self.dirty = True
+        return result
+
+    def levels(self, uci_path: str) -> Optional[Dict[str, Dict[str, str]]]:
+        """Return the level dict of an <engine>.uci file - None if there is no such file."""
+        try:
+            stat = os.stat(uci_path)
+        except OSError:
+            return None
+        key = os.path.abspath(uci_path)
+        entry = self.uci_files.get(key)
+        if entry is not None and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['levels']
+        parser = configparser.ConfigParser()
+        parser.optionxform = str  # type: ignore
+        if not parser.read(uci_path):
+            return None
+        levels = {section: dict(parser[section]) for section in parser.sections()}
+        self.uci_files[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'levels': levels}
+        self.dirty = True
+        return levels
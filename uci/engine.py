@@ -15,19 +15,18 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Optional
+from typing import List, Optional
 import logging
 import configparser
-import spur  # type: ignore
-import paramiko
-
 from subprocess import DEVNULL
 from dgt.api import Event
 from utilities import Observable
 import chess.uci  # type: ignore
 from chess import Board  # type: ignore
-from uci.informer import Informer
+from uci.informer import Informer, PvInfo
 from uci.rating import Rating, Result
+from uci.ssh_connection import ssh_connections
+from uci.transport import SyncUciEngine
 from utilities import write_picochess_ini
 
 
@@ -39,20 +38,8 @@ class UciShell(object):
         super(UciShell, self).__init__()
         if hostname:
             logging.info('connecting to [%s]', hostname)
-            if key_file:
-                if windows:
-                    self.shell = spur.SshShell(hostname=hostname, username=username, private_key_file=key_file,
-                                               missing_host_key=paramiko.AutoAddPolicy(), shell_type=spur.ssh.ShellTypes.windows)
-                else:
-                    self.shell = spur.SshShell(hostname=hostname, username=username, private_key_file=key_file,
-                                               missing_host_key=paramiko.AutoAddPolicy())
-            else:
-                if windows:
-                    self.shell = spur.SshShell(hostname=hostname, username=username, password=password,
-                                               missing_host_key=paramiko.AutoAddPolicy(), shell_type=spur.ssh.ShellTypes.windows)
-                else:
-                    self.shell = spur.SshShell(hostname=hostname, username=username, password=password,
-                                               missing_host_key=paramiko.AutoAddPolicy())
+            self.shell = ssh_connections.shell(hostname=hostname, username=username, key_file=key_file,
+                                               password=password, windows=windows)
         else:
             self.shell = None
 
@@ -64,9 +51,12 @@ class UciEngine(object):
 
     """Handle the uci engine communication."""
 
+    asyncio_transport = False  # start local engines with the asyncio transport instead of chess.uci popen
+
     def __init__(self, file: str, uci_shell: UciShell, mame_par: str):
         super(UciEngine, self).__init__()
         logging.info('mame parameters=' + mame_par)
+        self.informer = Informer()
         try:
             self.is_adaptive = False
             self.is_mame = False
@@ -83,13 +73,14 @@ class UciEngine(object):
                 logging.info(mfile)
             if self.shell:
                 self.engine = chess.uci.spur_spawn_engine(self.shell, mfile)
+            elif self.asyncio_transport:
+                self.engine = SyncUciEngine.popen(mfile, stderr=DEVNULL)
             else:
                 self.engine = chess.uci.popen_engine(mfile, stderr=DEVNULL)
 
             self.file = file
             if self.engine:
-                handler = Informer()
-                self.engine.info_handlers.append(handler)
+                self.engine.info_handlers.append(self.informer)
                 self.engine.uci()
             else:
                 logging.error('engine executable [%s] not found', file)
@@ -145,6 +136,26 @@ class UciEngine(object):
         """Return engine strength support."""
         return 'Strength' in self.engine.options
 
+    def has_multipv(self):
+        """Return multipv support."""
+        return 'MultiPV' in self.engine.options
+
+    def set_multipv(self, count: int):
+        """Set the number of lines to search - the engine limits are respected."""
+        if not self.has_multipv():
+            return 1
+        option = self.engine.options['MultiPV']
+        if option.min is not None:
+            count = max(count, option.min)
+        if option.max is not None:
+            count = min(count, option.max)
+        self.engine.setoption({'MultiPV': count})
+        return count
+
+    def get_analysis(self) -> List[PvInfo]:
+        """Return a snapshot of the current (or last) search - one entry per multipv line, best first."""
+        return self.informer.analysis()
+
     def has_chess960(self):
         """Return chess960 support."""
         return 'UCI_Chess960' in self.engine.options
@@ -153,6 +164,24 @@ class UciEngine(object):
         """Return ponder support."""
         return 'Ponder' in self.engine.options
 
+    def restore_defaults(self):
+        """Set the options sent by startup() back to the engine defaults - before the engine gets reused."""
+        defaults = {}
+        for name in self.options:
+            option = self.engine.options.get(name)
+            if option is not None and option.default is not None and option.type != 'button':
+                defaults[name] = option.default
+        if defaults:
+            self.engine.setoption(defaults)
+        self.options = {}
+        self.level_support = False
+        self.is_adaptive = False
+        self.engine_rating = -1
+        self.uci_elo_eval_fn = None
+        self.show_best = True
+        self.res = None
+        self.future = None
+
     def get_file(self):
         """Get File."""
         return self.file
@@ -272,6 +301,24 @@ class UciEngine(object):
         """Engine waiting."""
         return self.engine.idle
 
+    def wait_idle(self, timeout=None) -> bool:
+        """Wait (without polling) until the engine search ended - returns False on timeout."""
+        with self.engine.state_changed:
+            return self.engine.state_changed.wait_for(lambda: self.engine.idle, timeout)
+
+    def rss_mb(self) -> float:
+        """Return the resident memory (in MB) of a local engine process - 0 if unknown or remote."""
+        if self.shell is not None:
+            return 0.0
+        try:
+            with open('/proc/{}/status'.format(self.engine.process.pid())) as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1]) / 1024
+        except (AttributeError, OSError, ValueError):
+            pass
+        return 0.0
+
     def newgame(self, game: Board):
         """Engine sometimes need this to setup internal values."""
         self.engine.ucinewgame()
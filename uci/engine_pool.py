@@ -0,0 +1,126 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import chess.uci  # type: ignore
+
+from uci.engine import UciEngine, UciShell
+
+
+class EnginePool(object):
+
+    """Keep released engines alive (but idle) for a fast reuse - the least recently used ones are quit first."""
+
+    def __init__(self, size=2, max_memory=512):
+        self.size = size  # max. number of idle engines
+        self.max_memory = max_memory  # max. MB of all idle (local) engines together
+        self.lock = threading.Lock()
+        self.idle: 'OrderedDict[Tuple, UciEngine]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(file: str, uci_shell: UciShell, mame_par: str) -> Tuple:
+        shell = uci_shell.get()
+        return file, id(shell) if shell else None, mame_par
+
+    @staticmethod
+    def _is_alive(engine: UciEngine) -> bool:
+        try:
+            return engine.engine.is_alive()
+        except AttributeError:
+            return False
+
+    def acquire(self, file: str, uci_shell: UciShell, mame_par: str) -> UciEngine:
+        """Return an idle engine for file or start a new one."""
+        key = self._key(file, uci_shell, mame_par)
+        with self.lock:
+            engine = self.idle.pop(key, None)
+        if engine is not None:
+            if self._is_alive(engine):
+                self.hits += 1
+                logging.info('reusing idle engine %s', file)
+                return engine
+            engine.quit()
+        self.misses += 1
+        engine = UciEngine(file=file, uci_shell=uci_shell, mame_par=mame_par)
+        engine.pool_key = key
+        return engine
+
+    def release(self, engine: UciEngine) -> bool:
+        """Park the engine for a later acquire() or quit it - returns False if the engine didnt quit."""
+        key = getattr(engine, 'pool_key', None)
+        # an idle mame emulator keeps emulating and takes cpu from the playing engine
+        if self.size <= 0 or key is None or engine.is_mame or not self._is_alive(engine):
+            return engine.quit()
+        try:
+            if not engine.is_waiting():
+                engine.stop()
+            engine.restore_defaults()
+        except chess.uci.EngineTerminatedException:
+            logging.warning('engine terminated while released')
+            return engine.quit()
+        with self.lock:
+            evicted = []
+            old = self.idle.pop(key, None)
+            if old is not None and old is not engine:
+                evicted.append(old)
+            self.idle[key] = engine
+            while len(self.idle) > self.size or (self.idle and self._memory() > self.max_memory):
+                evicted.append(self.idle.popitem(last=False)[1])
+        for old in evicted:
+            logging.info('evicting idle engine %s', old.get_file())
+            old.quit()
+        return True
+
+    def _memory(self) -> float:
+        return sum(engine.rss_mb() for engine in self.idle.values())
+
+    def preload(self, engines: List[Dict[str, str]], uci_shell: UciShell, mame_par: str):
+        """Start (in the background) idle engines for the given engines.ini entries - retro engines are skipped."""
+        def _load():
+            for eng in engines:
+                with self.lock:
+                    if len(self.idle) >= self.size:
+                        break
+                    if self._key(eng['file'], uci_shell, mame_par) in self.idle:
+                        continue
+                if '/mame/' in eng['file']:
+                    continue
+                engine = UciEngine(file=eng['file'], uci_shell=uci_shell, mame_par=mame_par)
+                engine.pool_key = self._key(eng['file'], uci_shell, mame_par)
+                if not self._is_alive(engine) or not self.release(engine):
+                    logging.warning('engine %s not preloaded', eng['file'])
+        threading.Thread(target=_load, name='engine_pool_preload', daemon=True).start()
+
+    def close(self):
+        """Quit all idle engines."""
+        with self.lock:
+            engines = list(self.idle.values())
+            self.idle.clear()
+        for engine in engines:
+            engine.quit()
+
+    def stats(self) -> Dict:
+        """Return the hit/miss counters and the idle engines."""
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'idle': [key[0] for key in self.idle],
+                    'memory_mb': round(self._memory(), 1), 'size': self.size, 'max_memory_mb': self.max_memory}
@@ -15,82 +15,118 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from threading import Timer
+import time
+from typing import Dict, List, NamedTuple, Optional
 
 from utilities import Observable
 from dgt.api import Event
 import chess.uci  # type: ignore
 
 
+class PvInfo(NamedTuple):
+
+    """One line of a (multipv) search - score is in centipawns from the side to move."""
+
+    multipv: int
+    pv: List[chess.Move]
+    score: Optional[int]
+    mate: Optional[int]
+    depth: Optional[int]
+    seldepth: Optional[int]
+    nodes: Optional[int]
+    nps: Optional[int]
+    time: Optional[int]
+
+    def as_dict(self) -> Dict:
+        """Return the line as json compatible dict."""
+        result = self._asdict()
+        result['pv'] = [move.uci() for move in self.pv]
+        return result
+
+
 class Informer(chess.uci.InfoHandler):
 
-    """Internal uci engine info handler."""
+    """Internal uci engine info handler - coalesces score, pv and depth into NEW_INFO events."""
+
+    default_interval = 0.5  # min. seconds between two NEW_INFO events
 
-    def __init__(self):
+    def __init__(self, interval: Optional[float] = None):
         super(Informer, self).__init__()
-        self.allow_score = True
-        self.allow_pv = True
-        self.allow_depth = True
+        self.interval = self.default_interval if interval is None else interval
+        self.last_flush = 0.0
+        self.lines: Dict[int, PvInfo] = {}
+        self.line_has_pv = False
+        self._reset_pending()
+
+    def _reset_pending(self):
+        self.pending = False
+        self.new_score = self.new_mate = self.new_pv = self.new_depth = None
+
+    def _flush(self):
+        if self.pending:
+            Observable.fire(Event.NEW_INFO(score=self.new_score, mate=self.new_mate, pv=self.new_pv, depth=self.new_depth))
+            self._reset_pending()
+        self.last_flush = time.monotonic()
 
     def on_go(self):
         """Engine sends GO."""
-        self.allow_score = True
-        self.allow_pv = True
-        self.allow_depth = True
+        self._reset_pending()
+        self.last_flush = 0.0
+        with self.lock:
+            self.lines = {}
         Observable.fire(Event.START_SEARCH())
         super().on_go()
 
     def on_bestmove(self, bestmove, ponder):
+        with self.lock:
+            self._flush()
         Observable.fire(Event.STOP_SEARCH())
         super().on_bestmove(bestmove, ponder)
 
-    def _reset_allow_score(self):
-        self.allow_score = True
-
-    def _reset_allow_pv(self):
-        self.allow_pv = True
-
-    def _reset_allow_depth(self):
-        self.allow_depth = True
-
-    def _allow_fire_score(self):
-        if self.allow_score:
-            self.allow_score = False
-            Timer(0.5, self._reset_allow_score).start()
-            return True
-        else:
-            return False
-
-    def _allow_fire_pv(self):
-        if self.allow_pv:
-            self.allow_pv = False
-            Timer(0.5, self._reset_allow_pv).start()
-            return True
-        else:
-            return False
-
-    def _allow_fire_depth(self):
-        if self.allow_depth:
-            self.allow_depth = False
-            Timer(0.5, self._reset_allow_depth).start()
-            return True
-        else:
-            return False
-
     def score(self, cp, mate, lowerbound, upperbound):
         """Engine sends SCORE."""
-        if self._allow_fire_score():
-            Observable.fire(Event.NEW_SCORE(score=cp, mate=mate))
+        if self.info.get('multipv', 1) == 1:
+            self.new_score, self.new_mate = cp, mate
+            self.pending = True
         super().score(cp, mate, lowerbound, upperbound)
 
     def pv(self, moves):
         """Call when engine sends PV."""
-        if self._allow_fire_pv() and moves:
-            Observable.fire(Event.NEW_PV(pv=moves))
+        self.line_has_pv = bool(moves)
+        if moves and self.info.get('multipv', 1) == 1:
+            self.new_pv = moves
+            self.pending = True
         super().pv(moves)
 
     def depth(self, dep):
         """Engine sends DEPTH."""
-        if self._allow_fire_depth():
-            Observable.fire(Event.NEW_DEPTH(depth=dep))
+        self.new_depth = dep
+        self.pending = True
         super().depth(dep)
+
+    def pre_info(self, line):
+        """Engine starts an info line."""
+        super().pre_info(line)
+        self.line_has_pv = False
+
+    def post_info(self):
+        """Info line processed - send the collected infos if the interval is over."""
+        if self.line_has_pv:
+            self._store_line()
+        if self.pending and time.monotonic() - self.last_flush >= self.interval:
+            self._flush()
+        super().post_info()
+
+    def _store_line(self):
+        info = self.info
+        num = info.get('multipv', 1)
+        score = info['score'].get(num)
+        self.lines[num] = PvInfo(multipv=num, pv=list(info['pv'][num]),
+                                 score=score.cp if score else None, mate=score.mate if score else None,
+                                 depth=info.get('depth'), seldepth=info.get('seldepth'),
+                                 nodes=info.get('nodes'), nps=info.get('nps'), time=info.get('time'))
+
+    def analysis(self) -> List[PvInfo]:
+        """Return a snapshot of the current (or last) search - one entry per multipv line, best first."""
+        with self.lock:
+            return [self.lines[num] for num in sorted(self.lines)]
@@ -20,6 +20,7 @@ import platform
 import configparser
 import os
 from dgt.api import Dgt
+from uci.capabilities import CapabilityCache
 
 
 def read_engine_ini(engine_shell=None, engine_path=None, filename=None):
@@ -44,25 +45,25 @@ def read_engine_ini(engine_shell=None, engine_path=None, filename=None):
         pass
 
     library = []
+    capability_cache = CapabilityCache(engine_path) if engine_shell is None else None
+    remote_files = {}
+    if engine_shell is not None:
+        remote_files = engine_shell.read_files([engine_path + os.sep + section + '.uci' for section in config.sections()])
     for section in config.sections():
         parser = configparser.ConfigParser()
         parser.optionxform = str
 
         level_dict = {}
         if engine_shell is None:
-            success = parser.read(engine_path + os.sep + section + '.uci')
+            level_dict = capability_cache.levels(engine_path + os.sep + section + '.uci') or {}
         else:
-            try:
-                with engine_shell.open(engine_path + os.sep + section + '.uci', 'r') as file:
-                    parser.read_file(file)
-                success = True
-            except FileNotFoundError:
-                success = False
-        if success:
-            for p_section in parser.sections():
-                level_dict[p_section] = {}
-                for option in parser.options(p_section):
-                    level_dict[p_section][option] = parser[p_section][option]
+            uci_file = remote_files.get(engine_path + os.sep + section + '.uci')
+            if uci_file is not None:
+                parser.read_string(uci_file)
+                for p_section in parser.sections():
+                    level_dict[p_section] = {}
+                    for option in parser.options(p_section):
+                        level_dict[p_section][option] = parser[p_section][option]
 
         confsect = config[section]
         l_web_text = confsect['web'] if 'web' in confsect else confsect['large']
@@ -77,4 +78,6 @@ def read_engine_ini(engine_shell=None, engine_path=None, filename=None):
                 'elo': confsect['elo']
             }
         )
+    if capability_cache is not None:
+        capability_cache.save()
     return library
@@ -0,0 +1,183 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import spur  # type: ignore
+import paramiko
+
+KEEPALIVE = 30  # secs between two ssh keepalive packets
+CONNECT_TIMEOUT = 7  # secs
+
+# prints "<path>\0<content>\0" for every readable file - one ssh round trip for all files
+_READ_FILES_SCRIPT = 'for f; do if [ -r "$f" ]; then printf "%s\\0" "$f"; cat "$f"; printf "\\0"; fi; done'
+
+
+class _SharedSftp(object):
+
+    """Sftp client which survives the close() of spur's SftpFile - closed by the shell only."""
+
+    def __init__(self, sftp: paramiko.SFTPClient):
+        self.sftp = sftp
+
+    def __getattr__(self, name):
+        return getattr(self.sftp, name)
+
+    def close(self):
+        pass
+
+
+class KeepAliveSshShell(spur.SshShell):
+
+    """Spur ssh shell with one kept alive transport (reconnected if it died) and one shared sftp session."""
+
+    def __init__(self, *args, keepalive=KEEPALIVE, **kwargs):
+        super(KeepAliveSshShell, self).__init__(*args, **kwargs)
+        self.keepalive = keepalive
+        self.connects = 0
+        self._lock = threading.RLock()
+        self._sftp: Optional[paramiko.SFTPClient] = None
+
+    def is_connected(self) -> bool:
+        """Return True if the ssh transport is up."""
+        client = self._client
+        transport = client.get_transport() if client else None
+        return bool(transport and transport.is_active())
+
+    def _connect_ssh(self):
+        with self._lock:
+            if self._client is not None and not self.is_connected():
+                logging.info('ssh connection to [%s] lost - reconnecting', self._hostname)
+                self._drop()
+            if self._client is None:
+                client = super(KeepAliveSshShell, self)._connect_ssh()
+                client.get_transport().set_keepalive(self.keepalive)
+                self.connects += 1
+            return self._client
+
+    def _open_sftp_client(self):
+        with self._lock:
+            if self._sftp is None or self._sftp.get_channel().closed or not self.is_connected():
+                self._sftp = self._get_ssh_transport().open_sftp_client()
+            return _SharedSftp(self._sftp)
+
+    def _reconnect(self, error: Exception):
+        logging.info('ssh connection to [%s] broken (%s) - reconnecting', self._hostname, error)
+        with self._lock:
+            self._drop()
+
+    def spawn(self, *args, **kwargs):
+        # a dropped connection is only noticed when a channel gets opened - the command didnt start then, so retry once
+        try:
+            return super(KeepAliveSshShell, self).spawn(*args, **kwargs)
+        except spur.ssh.ConnectionError as error:
+            self._reconnect(error)
+        return super(KeepAliveSshShell, self).spawn(*args, **kwargs)
+
+    def open(self, name, mode='r'):
+        try:
+            return super(KeepAliveSshShell, self).open(name, mode)
+        except (EOFError, paramiko.SSHException, spur.ssh.ConnectionError) as error:
+            self._reconnect(error)
+        return super(KeepAliveSshShell, self).open(name, mode)
+
+    def _drop(self):
+        if self._sftp is not None:
+            try:
+                self._sftp.close()
+            except (EOFError, OSError, paramiko.SSHException):
+                pass
+            self._sftp = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def connect(self) -> bool:
+        """Open (or check) the connection - returns False if the server cant be reached."""
+        try:
+            self._get_ssh_transport()
+            return True
+        except (spur.ssh.ConnectionError, paramiko.SSHException, OSError) as exc:
+            logging.warning('ssh connection to [%s] failed: %s', self._hostname, exc)
+            return False
+
+    def read_files(self, paths: List[str]) -> Dict[str, str]:
+        """Return {path: content} of the readable files - missing files are left out."""
+        if not paths:
+            return {}
+        if self._shell_type is spur.ssh.ShellTypes.sh:
+            result = self.run(['sh', '-c', _READ_FILES_SCRIPT, 'sh'] + paths, allow_error=True)
+            parts = result.output.split(b'\0')
+            return {parts[i].decode('utf-8'): parts[i + 1].decode('utf-8', errors='replace')
+                    for i in range(0, len(parts) - 1, 2)}
+        files = {}  # no posix shell (windows server) - read over the shared sftp session instead
+        for path in paths:
+            try:
+                with self.open(path, 'r') as file:
+                    files[path] = file.read()
+            except FileNotFoundError:
+                pass
+        return files
+
+    def close(self):
+        with self._lock:
+            self._drop()
+            self._closed = True
+
+
+class SshConnectionPool(object):
+
+    """Hand out one shared KeepAliveSshShell per server/user/credentials."""
+
+    def __init__(self, keepalive=KEEPALIVE):
+        self.keepalive = keepalive
+        self.lock = threading.Lock()
+        self.shells: Dict[Tuple, KeepAliveSshShell] = {}
+
+    def shell(self, hostname: str, username=None, key_file=None, password=None, windows=False, port=None) -> KeepAliveSshShell:
+        """Return the shell for the server - the connection itself is opened on first use."""
+        if key_file:
+            password = None  # the key file wins
+        key = (hostname, port, username, key_file, password, windows)
+        with self.lock:
+            shell = self.shells.get(key)
+            if shell is None:
+                kwargs = {'shell_type': spur.ssh.ShellTypes.windows} if windows else {}
+                shell = KeepAliveSshShell(hostname=hostname, port=port, username=username, password=password,
+                                          private_key_file=key_file or None, missing_host_key=paramiko.AutoAddPolicy(),
+                                          connect_timeout=CONNECT_TIMEOUT, keepalive=self.keepalive, **kwargs)
+                self.shells[key] = shell
+            return shell
+
+    def check(self, hostname: str, username=None, key_file=None, password=None, windows=False, port=None) -> bool:
+        """Return True if the server is reachable - the tested connection stays open for the engines."""
+        if not hostname:
+            return False
+        return self.shell(hostname, username, key_file, password, windows, port).connect()
+
+    def close(self):
+        """Close all connections."""
+        with self.lock:
+            shells = list(self.shells.values())
+            self.shells.clear()
+        for shell in shells:
+            shell.close()
+
+
+ssh_connections = SshConnectionPool()
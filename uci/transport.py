@@ -0,0 +1,393 @@
+# Copyright (C) 2013-2018 Jean-Francois Romang (jromang@posteo.de)
+#                         Shivkumar Shivaji ()
+#                         Jürgen Précour (LocutusOfPenguin@posteo.de)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+import os
+import threading
+from subprocess import DEVNULL
+from typing import List, Optional
+
+import chess  # type: ignore
+import chess.uci  # type: ignore
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def event_loop() -> asyncio.AbstractEventLoop:
+    """Return the event loop (running in its own thread) shared by all asyncio engines."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            if hasattr(asyncio, 'PidfdChildWatcher') and hasattr(os, 'pidfd_open'):
+                try:
+                    os.close(os.pidfd_open(os.getpid()))
+                    watcher = asyncio.PidfdChildWatcher()  # no waitpid thread per engine
+                    watcher.attach_loop(_loop)
+                    asyncio.set_child_watcher(watcher)
+                except OSError:
+                    pass
+            threading.Thread(target=_loop.run_forever, name='uci_event_loop', daemon=True).start()
+        return _loop
+
+
+class _Process(object):
+
+    """The pid/return code part of the python-chess process api."""
+
+    def __init__(self, transport: asyncio.SubprocessTransport):
+        self.transport = transport
+
+    def pid(self):
+        return self.transport.get_pid()
+
+    def is_alive(self):
+        return self.transport.get_returncode() is None
+
+
+class _UciProtocol(asyncio.SubprocessProtocol):
+
+    def __init__(self, engine: 'AsyncUciEngine'):
+        self.engine = engine
+        self.buffer = b''
+
+    def pipe_data_received(self, fd, data):
+        if fd != 1:
+            return
+        lines = (self.buffer + data).split(b'\n')
+        self.buffer = lines.pop()
+        for line in lines:
+            self.engine.on_line_received(line.decode('utf-8', errors='replace').rstrip('\r'))
+
+    def process_exited(self):
+        self.engine.on_terminated()
+
+
+class AsyncUciEngine(object):
+
+    """
+    UCI engine driven by an asyncio subprocess - the commands are coroutines for the shared event loop.
+
+    The line parsers are the ones of chess.uci, so info handlers and options behave like with popen engines.
+    Reading the engine output needs no thread per engine and the search state changes are events.
+    """
+
+    _id = chess.uci.Engine._id
+    _info = chess.uci.Engine._info
+    _option = chess.uci.Engine._option
+    _bestmove = chess.uci.Engine._bestmove
+    _copyprotection = chess.uci.Engine._copyprotection
+    _registration = chess.uci.Engine._registration
+
+    def __init__(self):
+        self.idle = True
+        self.pondering = False
+        self.state_changed = threading.Condition()
+        self.board = chess.Board()
+        self.uci_chess960 = None
+        self.name = None
+        self.author = None
+        self.options = chess.uci.OptionMap()
+        self.info_handlers: List = []
+        self.bestmove = None
+        self.ponder = None
+        self.bestmove_received = threading.Event()
+        self.terminated = threading.Event()
+        self.exited: Optional[asyncio.Event] = None  # same as terminated for the coroutines - created on the loop by start()
+        self.return_code = None
+        self.process: Optional[_Process] = None
+        self.transport: Optional[asyncio.SubprocessTransport] = None
+        self._waiters = {}  # type: dict  # reply line -> futures waiting for it
+
+    async def start(self, command: List[str], stderr=DEVNULL):
+        """Start the engine process."""
+        loop = asyncio.get_event_loop()
+        self.exited = asyncio.Event()
+        self.transport, _ = await loop.subprocess_exec(lambda: _UciProtocol(self), *command, stderr=stderr)
+        self.process = _Process(self.transport)
+
+    def send_line(self, line: str):
+        logging.debug('%s << %s', self.process.pid(), line)
+        if self.terminated.is_set():
+            raise chess.uci.EngineTerminatedException()
+        self.transport.get_pipe_transport(0).write((line + '\n').encode('utf-8'))
+
+    def _set_state(self, idle: bool, pondering: bool):
+        with self.state_changed:
+            self.idle = idle
+            self.pondering = pondering
+            self.state_changed.notify_all()
+
+    def _expect(self, reply: str) -> asyncio.Future:
+        future = asyncio.get_event_loop().create_future()
+        if self.terminated.is_set():
+            future.set_exception(chess.uci.EngineTerminatedException())
+        else:
+            self._waiters.setdefault(reply, []).append(future)
+        return future
+
+    def _resolve(self, reply: str, result=None):
+        for future in self._waiters.pop(reply, []):
+            if not future.done():
+                future.set_result(result)
+
+    def on_line_received(self, buf: str):
+        logging.debug('%s >> %s', self.process.pid() if self.process else None, buf)
+        command_and_args = buf.split(None, 1)
+        if not command_and_args:
+            return
+        command = command_and_args[0]
+        if command in ('uciok', 'readyok'):
+            self._resolve(command)
+        elif len(command_and_args) == 2:
+            handler = {'id': self._id, 'info': self._info, 'option': self._option, 'bestmove': self._bestmove,
+                       'copyprotection': self._copyprotection, 'registration': self._registration}.get(command)
+            if handler:
+                handler(command_and_args[1])
+            if command == 'bestmove':
+                self._set_state(idle=True, pondering=False)
+                self._resolve('bestmove', chess.uci.BestMove(self.bestmove, self.ponder))
+
+    def on_terminated(self):
+        self.return_code = self.transport.get_returncode()
+        self.terminated.set()
+        self.exited.set()
+        self.bestmove_received.set()
+        for futures in self._waiters.values():
+            for future in futures:
+                if not future.done():
+                    future.set_exception(chess.uci.EngineTerminatedException())
+        self._waiters.clear()
+        self._set_state(idle=True, pondering=False)
+        self.transport.close()
+
+    async def uci(self):
+        """Send uci and wait for uciok - afterwards name & options are known."""
+        uciok = self._expect('uciok')
+        self.send_line('uci')
+        await uciok
+
+    async def isready(self):
+        """Wait until the engine is ready."""
+        readyok = self._expect('readyok')
+        self.send_line('isready')
+        await readyok
+
+    async def setoption(self, options: dict):
+        """Send the options (like chess.uci) and wait until the engine is ready."""
+        for name, value in options.items():
+            if name.lower() == 'uci_chess960':
+                self.uci_chess960 = value
+            builder = ['setoption name', name]
+            if value is True:
+                builder.append('value true')
+            elif value is False:
+                builder.append('value false')
+            elif value is not None:
+                builder.append('value {}'.format(value))
+            self.send_line(' '.join(builder))
+        await self.isready()
+
+    async def ucinewgame(self):
+        self.send_line('ucinewgame')
+        await self.isready()
+
+    async def position(self, board: chess.Board):
+        """Set the position (root fen and the moves of the move stack)."""
+        root = board.copy()
+        moves = []
+        while root.move_stack:
+            moves.append(root.pop())
+        fen = root.fen()
+        builder = ['position', 'startpos' if fen == chess.STARTING_FEN else 'fen ' + fen]
+        if moves:
+            builder.append('moves')
+            for move in reversed(moves):
+                builder.append(root.uci(move, chess960=self.uci_chess960))
+                root.push(move)
+        self.board = board.copy(stack=False)
+        self.send_line(' '.join(builder))
+        await self.isready()
+
+    def begin_search(self, ponder=False):
+        """Mark the engine as searching (thread safe) - raises EngineStateException if it is busy."""
+        with self.state_changed:
+            if not self.idle:
+                raise chess.uci.EngineStateException('go command while engine is already busy')
+            self.idle = False
+            self.pondering = ponder
+            self.bestmove_received.clear()
+            self.state_changed.notify_all()
+        for info_handler in self.info_handlers:
+            info_handler.on_go()
+
+    async def go(self, ponder=False, **params) -> chess.uci.BestMove:
+        """Search the current position - returns when the engine sent its bestmove."""
+        self.begin_search(ponder)
+        return await self.search(ponder=ponder, **params)
+
+    async def search(self, searchmoves=None, ponder=False, wtime=None, btime=None, winc=None, binc=None, movestogo=None,
+                     depth=None, nodes=None, mate=None, movetime=None, infinite=False) -> chess.uci.BestMove:
+        """Send go for a search marked by begin_search() - returns when the engine sent its bestmove."""
+        builder = ['go']
+        if ponder:
+            builder.append('ponder')
+        for name, value in (('wtime', wtime), ('btime', btime), ('winc', winc), ('binc', binc),
+                            ('movestogo', movestogo if movestogo else None), ('depth', depth),
+                            ('nodes', nodes), ('mate', mate), ('movetime', movetime)):
+            if value is not None:
+                builder.extend((name, str(int(value))))
+        if infinite:
+            builder.append('infinite')
+        if searchmoves:
+            builder.append('searchmoves')
+            builder.extend(self.board.uci(move, chess960=self.uci_chess960) for move in searchmoves)
+
+        bestmove = self._expect('bestmove')
+        try:
+            self.send_line(' '.join(builder))
+        except chess.uci.EngineTerminatedException:
+            self._set_state(idle=True, pondering=False)
+            raise
+        return await bestmove
+
+    async def stop(self):
+        """Stop the search - returns when the engine sent its bestmove (the go() result)."""
+        if self.idle:
+            return None
+        bestmove = self._expect('bestmove')
+        self.send_line('stop')
+        return await bestmove
+
+    def begin_ponderhit(self):
+        """Mark the pondering search as normal search (thread safe)."""
+        with self.state_changed:
+            if self.idle:
+                raise chess.uci.EngineStateException('ponderhit but not searching')
+            if not self.pondering:
+                raise chess.uci.EngineStateException('ponderhit but not pondering')
+            self.pondering = False
+            self.state_changed.notify_all()
+
+    async def ponderhit(self):
+        """Switch from pondering to a normal search."""
+        self.begin_ponderhit()
+        self.send_line('ponderhit')
+
+    async def send(self, line: str):
+        self.send_line(line)
+
+    async def quit(self, timeout=2.0):
+        """Send quit and wait for the process end - returns the exit code (None on timeout)."""
+        if not self.terminated.is_set():
+            self.send_line('quit')
+        return await self._wait_terminated(timeout)
+
+    async def _wait_terminated(self, timeout: float):
+        if self.exited is not None and not self.exited.is_set():
+            try:
+                await asyncio.wait_for(self.exited.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.return_code
+
+
+class SyncUciEngine(object):
+
+    """Blocking wrapper of AsyncUciEngine with the chess.uci engine api used by UciEngine."""
+
+    def __init__(self, engine: AsyncUciEngine, loop: asyncio.AbstractEventLoop):
+        self.async_engine = engine
+        self.loop = loop
+
+    @classmethod
+    def popen(cls, command: List[str], stderr=DEVNULL) -> 'SyncUciEngine':
+        """Start a local engine process."""
+        loop = event_loop()
+        engine = AsyncUciEngine()
+        asyncio.run_coroutine_threadsafe(engine.start(command, stderr), loop).result()
+        return cls(engine, loop)
+
+    def __getattr__(self, name):
+        # state & parser attributes: name, options, info_handlers, idle, pondering, state_changed, process...
+        return getattr(self.async_engine, name)
+
+    def _run(self, coro, async_callback=None, timeout=None):
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if async_callback is True:
+            return future
+        if async_callback:
+            future.add_done_callback(async_callback)  # called from the loop thread - must not block
+            return future
+        return future.result(timeout)
+
+    def uci(self, async_callback=None):
+        return self._run(self.async_engine.uci(), async_callback)
+
+    def isready(self, async_callback=None):
+        return self._run(self.async_engine.isready(), async_callback)
+
+    def setoption(self, options: dict, async_callback=None):
+        return self._run(self.async_engine.setoption(options), async_callback)
+
+    def ucinewgame(self, async_callback=None):
+        return self._run(self.async_engine.ucinewgame(), async_callback)
+
+    def position(self, board: chess.Board, async_callback=None):
+        return self._run(self.async_engine.position(board), async_callback)
+
+    def go(self, async_callback=None, **params):
+        self.async_engine.begin_search(params.get('ponder', False))
+        return self._run(self.async_engine.search(**params), async_callback)
+
+    def stop(self, async_callback=None):
+        return self._run(self.async_engine.stop(), async_callback)
+
+    def ponderhit(self, async_callback=None):
+        self.async_engine.begin_ponderhit()
+        return self._run(self.async_engine.send('ponderhit'), async_callback)
+
+    def wait_idle(self, timeout=None) -> bool:
+        """Wait for the end of the search (without polling) - returns False on timeout."""
+        with self.state_changed:
+            return self.state_changed.wait_for(lambda: self.async_engine.idle, timeout)
+
+    def is_alive(self):
+        return not self.async_engine.terminated.is_set()
+
+    def quit(self, timeout=2.0):
+        """Quit the engine (killed if it doesnt stop in time) - returns the exit code like chess.uci."""
+        try:
+            return_code = self._run(self.async_engine.quit(timeout), timeout=timeout + 1)
+        except chess.uci.EngineTerminatedException:
+            return_code = self.async_engine.return_code
+        return return_code if return_code is not None else self.kill(timeout)
+
+    def terminate(self, timeout=2.0):
+        return self._signal('terminate', timeout)
+
+    def kill(self, timeout=2.0):
+        return self._signal('kill', timeout)
+
+    def _signal(self, name: str, timeout: float):
+        async def _send():
+            if not self.async_engine.terminated.is_set():
+                getattr(self.async_engine.transport, name)()
+            return await self.async_engine._wait_terminated(timeout)
+        return self._run(_send(), timeout=timeout + 1)
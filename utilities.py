@@ -25,12 +25,15 @@ import json
 import time
 import copy
 import configparser
+import heapq
+import threading
 
 from threading import Timer
 from subprocess import Popen, PIPE
 
 from dgt.translate import DgtTranslate
 from dgt.api import Dgt
+from metrics import TimedQueue
 from ctypes import cdll
 
 from configobj import ConfigObj, ConfigObjError, DuplicateError  # type: ignore
@@ -38,8 +41,8 @@ from configobj import ConfigObj, ConfigObjError, DuplicateError  # type: ignore
 # picochess version
 version = '3.1'
 
-evt_queue: queue.Queue = queue.Queue()
-dispatch_queue: queue.Queue = queue.Queue()
+evt_queue: queue.Queue = TimedQueue('evt_queue')
+dispatch_queue: queue.Queue = TimedQueue('dispatch_queue')
 
 msgdisplay_devices = []
 dgtdisplay_devices = []
@@ -77,14 +80,15 @@ class DisplayMsg(object):
 
     def __init__(self):
         super(DisplayMsg, self).__init__()
-        self.msg_queue = queue.Queue()
+        self.msg_queue = TimedQueue('msg_queue ' + type(self).__name__)
         msgdisplay_devices.append(self)
 
     @staticmethod
     def show(message):
-        """Send a message on each display device."""
+        """Send a message on each display device - all devices share one read only snapshot."""
+        snapshot = copy.deepcopy(message)
         for display in msgdisplay_devices:
-            display.msg_queue.put(copy.deepcopy(message))
+            display.msg_queue.put(snapshot)
 
 
 class DisplayDgt(object):
@@ -93,14 +97,15 @@ class DisplayDgt(object):
 
     def __init__(self):
         super(DisplayDgt, self).__init__()
-        self.dgt_queue = queue.Queue()
+        self.dgt_queue = TimedQueue('dgt_queue ' + type(self).__name__)
         dgtdisplay_devices.append(self)
 
     @staticmethod
     def show(message):
-        """Send a message on each display device."""
+        """Send a message on each display device - all devices share one read only snapshot."""
+        snapshot = copy.deepcopy(message)
         for display in dgtdisplay_devices:
-            display.dgt_queue.put(copy.deepcopy(message))
+            display.dgt_queue.put(snapshot)
 
 
 class RepeatedTimer(object):
@@ -142,6 +147,84 @@ class RepeatedTimer(object):
             logging.info('repeated timer already stopped - strange!')
 
 
+class MessageScheduler(threading.Thread):
+
+    """Show display messages (or fire events) later, so the event loop doesnt need to sleep between them."""
+
+    def __init__(self):
+        super(MessageScheduler, self).__init__(daemon=True)
+        self.condition = threading.Condition()
+        self.pending = []  # heap of (due time, sequence number, generation (None: not cancelable), is_event, item)
+        self.counter = 0
+        self.generation = 0
+        self.sequence_end = 0.0
+
+    def show_sequence(self, steps, fire_after=None, cancelable=True):
+        """
+        Show the messages one after another - each one for its hold time (in secs).
+
+        The sequence starts after the still pending ones. If fire_after is given, this event is fired
+        once the last hold time is over (eg. to restart the clock) - unless the sequence is canceled before.
+        The messages of a not cancelable sequence are shown at once by cancel() - for messages a display
+        must get in order (eg. a COMPUTER_MOVE before its COMPUTER_MOVE_DONE).
+
+        :param steps: list of (message, hold_secs)
+        :param fire_after: event to fire at the end
+        :param cancelable: False if cancel() must not drop the messages
+        """
+        with self.condition:
+            if not self.is_alive():
+                self.start()
+            generation = self.generation if cancelable else None
+            due = max(time.monotonic(), self.sequence_end)
+            for message, hold_secs in steps:
+                self._push(due, generation, False, message)
+                due += hold_secs
+            if fire_after is not None:
+                self._push(due, generation, True, fire_after)
+            self.sequence_end = due
+            self.condition.notify()
+
+    def cancel(self):
+        """Drop all pending messages and events - the messages of not cancelable sequences are shown now."""
+        with self.condition:
+            if self.pending:
+                logging.debug('canceling %i scheduled messages', len(self.pending))
+            for _, _, generation, is_event, item in sorted(self.pending, key=lambda entry: entry[:2]):
+                if generation is None and not is_event:
+                    DisplayMsg.show(item)
+            self.pending = []
+            self.generation += 1
+            self.sequence_end = 0.0
+
+    def is_busy(self):
+        """Return True if messages are still pending or on display."""
+        with self.condition:
+            return bool(self.pending) or self.sequence_end > time.monotonic()
+
+    def _push(self, due: float, generation, is_event: bool, item):
+        self.counter += 1
+        heapq.heappush(self.pending, (due, self.counter, generation, is_event, item))
+
+    def run(self):
+        """Call by threading.Thread start() function."""
+        while True:
+            with self.condition:
+                while not self.pending or self.pending[0][0] > time.monotonic():
+                    self.condition.wait(self.pending[0][0] - time.monotonic() if self.pending else None)
+                _, _, generation, is_event, item = heapq.heappop(self.pending)
+                if generation is not None and generation != self.generation:
+                    continue
+                # still under the lock (both only put on a queue): a cancel() can't come between the check and the show
+                if is_event:
+                    Observable.fire(item)
+                else:
+                    DisplayMsg.show(item)
+
+
+message_scheduler = MessageScheduler()
+
+
 def get_opening_books():
     """Build an opening book lib."""
     config = configparser.ConfigParser()
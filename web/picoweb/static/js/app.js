@@ -122,9 +122,8 @@ var boardStatusEl = $('#BoardStatus'),
     moveListEl = $('#moveList')
 
 var gameHistory, fenHash, currentPosition;
-const SERVER_NAME = location.hostname
-const OBOCK_SERVER_PREFIX = 'http://' + SERVER_NAME + ':7777';
-const GAMES_SERVER_PREFIX = 'http://' + SERVER_NAME + ':7778';
+const OBOCK_SERVER_PREFIX = '';  // served by picochess itself (was obooksrv on port 7777)
+const GAMES_SERVER_PREFIX = '';  // served by picochess itself (was the scid gamesdb on port 7778)
 
 fenHash = {};
 